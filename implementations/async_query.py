@@ -0,0 +1,740 @@
+# -*- coding: utf-8 -*-
+"""
+Asynchronous counterparts of the query handlers and the query engine.
+Contains classes: AsyncJournalQueryHandler, AsyncCategoryQueryHandler, AsyncFullQueryEngine
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+
+from .handlers import Handler, check_page
+from .models import Journal, Category, Area, IdentifiableEntity
+from .query_handlers import JournalQueryHandler, CategoryQueryHandler
+from .query_engines import FullQueryEngine
+from .planner import QueryPlanner
+
+
+class AsyncJournalQueryHandler(JournalQueryHandler):
+    """
+    Journal query handler exposing coroutine versions of every query method.
+
+    The SPARQL requests are sent with aiohttp when it is installed; otherwise they
+    are delegated to ``requests`` running in the event loop's default executor.
+    The sync API inherited from JournalQueryHandler stays available.
+
+    Every event loop gets its own aiohttp session. It is closed by aclose(),
+    when leaving ``async with handler:``, or when the loop shuts down its
+    async generators (asyncio.run does so before closing the loop).
+    """
+
+    def __init__(self, dbPathOrUrl: str = "", max_connections: int = 100, **kwargs):
+        super().__init__(dbPathOrUrl, **kwargs)
+        self._max_connections: int = max_connections
+        self._sessions: Dict[asyncio.AbstractEventLoop, object] = {}
+        self._session_keepers: Dict[asyncio.AbstractEventLoop, object] = {}
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> 'AsyncJournalQueryHandler':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def getByIdAsync(self, entity_id: str) -> pd.DataFrame:
+        """Coroutine version of getById."""
+        return await self._run_async_query(self._by_id_query(entity_id), "querying journal by ID")
+
+    async def getByIdsAsync(self, entity_ids) -> pd.DataFrame:
+        """Coroutine version of getByIds; chunks are fetched concurrently."""
+        try:
+            cleaned_ids = sorted({str(entity_id) for entity_id in entity_ids if entity_id})
+            frames = await asyncio.gather(*[
+                self._run_async_query(
+                    self._by_ids_query(cleaned_ids[i:i + self.BATCH_SIZE]), "querying journals by IDs"
+                )
+                for i in range(0, len(cleaned_ids), self.BATCH_SIZE)
+            ])
+            frames = [df for df in frames if not df.empty]
+            if not frames:
+                return pd.DataFrame()
+            return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        except Exception as e:
+            print(f"Error while querying journals by IDs: {e}")
+            return pd.DataFrame()
+
+    async def getAllJournalsAsync(self, after: Optional[str] = None, limit: Optional[int] = None,
+                                  offset: int = 0) -> pd.DataFrame:
+        """Coroutine version of getAllJournals."""
+        return await self._run_async_query(
+            self._all_journals_query(after, limit, offset), "fetching all journals"
+        )
+
+    async def getJournalsWithTitleAsync(self, partialTitle: str, after: Optional[str] = None,
+                                        limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
+        """Coroutine version of getJournalsWithTitle."""
+        return await self._run_async_query(
+            self._journals_with_title_query(partialTitle, after, limit, offset), "searching journals by title"
+        )
+
+    async def getJournalsPublishedByAsync(self, partialName: str, after: Optional[str] = None,
+                                          limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
+        """Coroutine version of getJournalsPublishedBy."""
+        return await self._run_async_query(
+            self._journals_published_by_query(partialName, after, limit, offset),
+            "searching journals by publisher",
+        )
+
+    async def getJournalsWithLicenseAsync(self, licenses: Set[str], after: Optional[str] = None,
+                                          limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
+        """Coroutine version of getJournalsWithLicense."""
+        return await self._run_async_query(
+            self._journals_with_license_query(licenses, after, limit, offset), "searching journals by license"
+        )
+
+    async def getJournalsWithAPCAsync(self, after: Optional[str] = None, limit: Optional[int] = None,
+                                      offset: int = 0) -> pd.DataFrame:
+        """Coroutine version of getJournalsWithAPC."""
+        return await self._run_async_query(
+            self._journals_with_apc_query(after, limit, offset), "searching journals with APC"
+        )
+
+    async def getJournalsWithDOAJSealAsync(self, after: Optional[str] = None, limit: Optional[int] = None,
+                                           offset: int = 0) -> pd.DataFrame:
+        """Coroutine version of getJournalsWithDOAJSeal."""
+        return await self._run_async_query(
+            self._journals_with_doaj_seal_query(after, limit, offset), "searching journals with DOAJ Seal"
+        )
+
+    async def getJournalsWithoutAPCAsync(self, after: Optional[str] = None, limit: Optional[int] = None,
+                                         offset: int = 0) -> pd.DataFrame:
+        """Coroutine version of getJournalsWithoutAPC."""
+        return await self._run_async_query(
+            self._journals_without_apc_query(after, limit, offset), "searching journals without APC"
+        )
+
+    async def getJournalsByIssnsAsync(self, issns: Set[str], without_apc: bool = False,
+                                      licenses: Optional[Set[str]] = None,
+                                      limit: Optional[int] = None) -> pd.DataFrame:
+        """Coroutine version of getJournalsByIssns."""
+        return await self._run_async_query(
+            self._journals_by_issns_query(
+                issns, without_apc, licenses, limit, await self._has_identity_index_async()
+            ),
+            "searching journals by ISSNs",
+        )
+
+    async def getJournalsInIssnRangesAsync(self, ranges, without_apc: bool = False,
+                                           licenses: Optional[Set[str]] = None,
+                                           after: Optional[str] = None,
+                                           limit: Optional[int] = None) -> pd.DataFrame:
+        """Coroutine version of getJournalsInIssnRanges."""
+        return await self._run_async_query(
+            self._journals_in_issn_ranges_query(
+                ranges, without_apc, licenses, after, limit, await self._has_identity_index_async()
+            ),
+            "searching journals by ISSN ranges",
+        )
+
+    async def _has_identity_index_async(self) -> bool:
+        """Coroutine version of hasIdentityIndex."""
+        known = self._known_identity_index()
+        if known is not None:
+            return known
+        generation = self.getDataGeneration()
+        return self._remember_identity_index(
+            await self._execute_sparql_query_async(self._unindexed_journal_query()), generation
+        )
+
+    async def aclose(self) -> None:
+        """Close the HTTP session bound to the running event loop, if any."""
+        loop = asyncio.get_running_loop()
+        keeper = self._session_keepers.pop(loop, None)
+        session = self._sessions.pop(loop, None)
+        self._semaphores.pop(loop, None)
+        if keeper is not None:
+            await keeper.aclose()
+        elif session is not None:
+            await session.close()
+
+    async def _run_async_query(self, sparql_query: Optional[str], action: str) -> pd.DataFrame:
+        """Execute a prepared query, mirroring the error handling of the sync methods."""
+        try:
+            if sparql_query is None:
+                return pd.DataFrame()
+            return await self._execute_sparql_query_async(sparql_query)
+        except Exception as e:
+            print(f"Error while {action}: {e}")
+            return pd.DataFrame()
+
+    async def _execute_sparql_query_async(self, sparql_query: str) -> pd.DataFrame:
+        """
+        Execute a SPARQL query without blocking the event loop.
+
+        Args:
+            sparql_query (str): SPARQL query
+
+        Returns:
+            pd.DataFrame: Query result
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self._max_connections)
+
+        try:
+            async with semaphore:
+                session = await self._get_session(loop)
+                params = {'query': sparql_query, 'format': 'json'}
+                if session is None:
+                    # Only needed without aiohttp, so it is imported on first use
+                    import requests
+                    response = await loop.run_in_executor(
+                        None, functools.partial(requests.get, self._dbPathOrUrl, params=params)
+                    )
+                    status, data = response.status_code, (
+                        response.json() if response.status_code == 200 else None
+                    )
+                else:
+                    async with session.get(self._dbPathOrUrl, params=params) as response:
+                        status = response.status
+                        data = await response.json(content_type=None) if status == 200 else None
+
+            if status == 200:
+                return self._bindings_to_dataframe(data)
+            print(f"SPARQL query error: {status}")
+            return pd.DataFrame()
+
+        except Exception as e:
+            print(f"Error while executing SPARQL query: {e}")
+            return pd.DataFrame()
+
+    async def _get_session(self, loop: asyncio.AbstractEventLoop):
+        """Return the aiohttp session for the loop, or None when aiohttp is unavailable."""
+        if loop in self._sessions:
+            return self._sessions[loop]
+        # Sessions of loops closed without shutting down their async generators
+        # cannot be closed any more; drop them with the loops
+        for closed in [other for other in self._sessions if other.is_closed()]:
+            self._sessions.pop(closed, None)
+            self._session_keepers.pop(closed, None)
+            self._semaphores.pop(closed, None)
+        try:
+            import aiohttp
+        except ImportError:
+            self._sessions[loop] = None
+            return None
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self._max_connections)
+        )
+        self._sessions[loop] = session
+        keeper = self._keep_session(loop, session)
+        await keeper.asend(None)
+        self._session_keepers[loop] = keeper
+        return session
+
+    async def _keep_session(self, loop: asyncio.AbstractEventLoop, session):
+        """
+        Async generator suspended for the lifetime of a loop's session.
+
+        The loop tracks it as one of its async generators, so
+        loop.shutdown_asyncgens() (called by asyncio.run) resumes it and the
+        session is closed while the loop still runs.
+        """
+        try:
+            yield
+        finally:
+            if self._sessions.get(loop) is session:
+                self._sessions.pop(loop, None)
+                self._session_keepers.pop(loop, None)
+                self._semaphores.pop(loop, None)
+            await session.close()
+
+
+class AsyncCategoryQueryHandler(CategoryQueryHandler):
+    """
+    Category query handler exposing coroutine versions of every query method.
+
+    SQLite calls run on a dedicated, bounded thread pool so they never block
+    the event loop.
+    """
+
+    def __init__(self, dbPathOrUrl: str = "", max_workers: int = 8, **kwargs):
+        super().__init__(dbPathOrUrl, **kwargs)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="category-query"
+        )
+
+    async def getByIdAsync(self, entity_id: str) -> pd.DataFrame:
+        """Coroutine version of getById."""
+        return await self._run_in_executor(self.getById, entity_id)
+
+    async def getByIdsAsync(self, entity_ids) -> pd.DataFrame:
+        """Coroutine version of getByIds."""
+        return await self._run_in_executor(self.getByIds, list(entity_ids))
+
+    async def getAllCategoriesAsync(self) -> pd.DataFrame:
+        """Coroutine version of getAllCategories."""
+        return await self._run_in_executor(self.getAllCategories)
+
+    async def getAllAreasAsync(self) -> pd.DataFrame:
+        """Coroutine version of getAllAreas."""
+        return await self._run_in_executor(self.getAllAreas)
+
+    async def getCategoriesWithQuartileAsync(self, quartiles: Set[str]) -> pd.DataFrame:
+        """Coroutine version of getCategoriesWithQuartile."""
+        return await self._run_in_executor(self.getCategoriesWithQuartile, quartiles)
+
+    async def getCategoriesAssignedToAreasAsync(self, area_ids: Set[str]) -> pd.DataFrame:
+        """Coroutine version of getCategoriesAssignedToAreas."""
+        return await self._run_in_executor(self.getCategoriesAssignedToAreas, area_ids)
+
+    async def getAreasAssignedToCategoriesAsync(self, category_ids: Set[str]) -> pd.DataFrame:
+        """Coroutine version of getAreasAssignedToCategories."""
+        return await self._run_in_executor(self.getAreasAssignedToCategories, category_ids)
+
+    async def getByIdsRowsAsync(self, entity_ids) -> List[tuple]:
+        """Coroutine version of getByIdsRows."""
+        return await self._run_in_executor(self.getByIdsRows, list(entity_ids))
+
+    async def getAllCategoriesRowsAsync(self) -> List[tuple]:
+        """Coroutine version of getAllCategoriesRows."""
+        return await self._run_in_executor(self.getAllCategoriesRows)
+
+    async def getAllAreasRowsAsync(self) -> List[tuple]:
+        """Coroutine version of getAllAreasRows."""
+        return await self._run_in_executor(self.getAllAreasRows)
+
+    async def getCategoriesWithQuartileRowsAsync(self, quartiles: Set[str]) -> List[tuple]:
+        """Coroutine version of getCategoriesWithQuartileRows."""
+        return await self._run_in_executor(self.getCategoriesWithQuartileRows, quartiles)
+
+    async def getCategoriesAssignedToAreasRowsAsync(self, area_ids: Set[str]) -> List[tuple]:
+        """Coroutine version of getCategoriesAssignedToAreasRows."""
+        return await self._run_in_executor(self.getCategoriesAssignedToAreasRows, area_ids)
+
+    async def getAreasAssignedToCategoriesRowsAsync(self, category_ids: Set[str]) -> List[tuple]:
+        """Coroutine version of getAreasAssignedToCategoriesRows."""
+        return await self._run_in_executor(self.getAreasAssignedToCategoriesRows, category_ids)
+
+    async def __aenter__(self) -> 'AsyncCategoryQueryHandler':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Coroutine version of close; waits for the running SQLite calls without blocking the loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def close(self) -> None:
+        """Shut down the executor used for SQLite access and close the pooled connections."""
+        self._executor.shutdown(wait=True)
+        super().close()
+
+    async def _run_in_executor(self, method, *args):
+        """Run a sync handler method on the handler's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(method, *args))
+
+
+class AsyncFullQueryEngine(FullQueryEngine):
+    """
+    Query engine with coroutine versions of the BasicQueryEngine and
+    FullQueryEngine methods.
+
+    Each coroutine awaits all registered handlers concurrently and merges the
+    results in registration order, so the returned entities are the same as
+    the ones produced by the sync API. Handlers without coroutine methods are
+    run in the default executor. As in the sync engine, a handler call that
+    raises, or that has not answered within the engine timeout, is reported
+    and skipped.
+
+    ``async with engine:`` closes, on exit, the HTTP sessions the journal
+    handlers opened for the running loop and the engine's thread pool.
+    """
+
+    async def __aenter__(self) -> 'AsyncFullQueryEngine':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the running loop's sessions of the journal handlers and the engine's thread pool."""
+        for handler in self._journalQuery:
+            if isinstance(handler, AsyncJournalQueryHandler):
+                await handler.aclose()
+        await self._in_executor(self.close)
+
+    def _data_version(self) -> tuple:
+        """
+        Like BasicQueryEngine._data_version, without blocking the event loop.
+
+        In a thread running an event loop, the store versions read last are
+        returned; the coroutines read them again in the executor first (see
+        _refresh_store_versions_async).
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return super()._data_version()
+        versions = self._store_versions
+        return (Handler.getDataGeneration(), versions[1] if versions is not None else None)
+
+    async def _refresh_store_versions_async(self) -> None:
+        """Read the store versions in the executor if they are due for a check."""
+        if self._store_versions_stale():
+            await self._in_executor(self._refresh_store_versions)
+
+    async def getEntityByIdAsync(self, entity_id: str) -> Optional[IdentifiableEntity]:
+        """Coroutine version of getEntityById."""
+        try:
+            await self._refresh_store_versions_async()
+            if self._misses is not None and entity_id in self._misses:
+                return None
+            journal_handlers, category_handlers = self._route_handlers(entity_id)
+            handlers = journal_handlers + category_handlers
+            answers = await self._gather_indexed(handlers, 'getById', entity_id)
+            for index, df in answers:
+                if df.empty:
+                    continue
+                if index < len(journal_handlers):
+                    return self._with_relations(self._dataframe_to_journal(df.iloc[0]))
+                row = df.iloc[0]
+                if 'quartile' in row:
+                    return self._dataframe_to_category(row)
+                else:
+                    return self._dataframe_to_area(row)
+
+            # A handler that failed or timed out may still hold the entity
+            if len(answers) == len(handlers):
+                self._remember_misses([entity_id])
+            return None
+
+        except Exception as e:
+            print(f"Error while searching for entity by ID: {e}")
+            return None
+
+    async def getEntitiesByIdsAsync(self, entity_ids) -> Dict[str, Optional[IdentifiableEntity]]:
+        """Coroutine version of getEntitiesByIds."""
+        requested = [entity_id for entity_id in dict.fromkeys(entity_ids) if entity_id]
+        result: Dict[str, Optional[IdentifiableEntity]] = {entity_id: None for entity_id in requested}
+        try:
+            await self._refresh_store_versions_async()
+            remaining = self._unknown_identifiers(requested)
+            journal_ids, category_ids = self._route_identifiers(remaining)
+            journal_handlers = self._journalQuery if journal_ids else []
+            category_handlers = self._categoryQuery if category_ids else []
+            journal_frames, category_rows = await asyncio.gather(
+                self._gather_indexed(journal_handlers, 'getByIds', journal_ids),
+                self._gather_indexed(category_handlers, 'getByIdsRows', category_ids),
+            )
+            for _, df in journal_frames:
+                self._resolve_journal_ids(df, remaining, result)
+            for _, rows in category_rows:
+                self._resolve_category_ids(rows, remaining, result)
+            if len(journal_frames) + len(category_rows) == len(journal_handlers) + len(category_handlers):
+                self._remember_misses(remaining)
+            return result
+        except Exception as e:
+            print(f"Error while searching for entities by IDs: {e}")
+            return result
+
+    async def getAllJournalsAsync(self, limit: Optional[int] = None, offset: int = 0) -> List[Journal]:
+        """Coroutine version of getAllJournals."""
+        return await self._gather_journals('getAllJournals', (), "fetching all journals", limit, offset)
+
+    async def getJournalsWithTitleAsync(self, partialTitle: str, limit: Optional[int] = None,
+                                        offset: int = 0) -> List[Journal]:
+        """Coroutine version of getJournalsWithTitle."""
+        return await self._gather_journals(
+            'getJournalsWithTitle', (partialTitle,), "searching journals by title", limit, offset
+        )
+
+    async def getJournalsPublishedByAsync(self, partialName: str, limit: Optional[int] = None,
+                                          offset: int = 0) -> List[Journal]:
+        """Coroutine version of getJournalsPublishedBy."""
+        return await self._gather_journals(
+            'getJournalsPublishedBy', (partialName,), "searching journals by publisher", limit, offset
+        )
+
+    async def getJournalsWithLicenseAsync(self, licenses: Set[str], limit: Optional[int] = None,
+                                          offset: int = 0) -> List[Journal]:
+        """Coroutine version of getJournalsWithLicense."""
+        return await self._gather_journals(
+            'getJournalsWithLicense', (licenses,), "searching journals by license", limit, offset
+        )
+
+    async def getJournalsWithAPCAsync(self, limit: Optional[int] = None, offset: int = 0) -> List[Journal]:
+        """Coroutine version of getJournalsWithAPC."""
+        return await self._gather_journals(
+            'getJournalsWithAPC', (), "searching journals with APC", limit, offset
+        )
+
+    async def getJournalsWithDOAJSealAsync(self, limit: Optional[int] = None,
+                                           offset: int = 0) -> List[Journal]:
+        """Coroutine version of getJournalsWithDOAJSeal."""
+        return await self._gather_journals(
+            'getJournalsWithDOAJSeal', (), "searching journals with DOAJ Seal", limit, offset
+        )
+
+    async def getAllCategoriesAsync(self) -> List[Category]:
+        """Coroutine version of getAllCategories."""
+        return await self._gather_categories(
+            'getAllCategoriesRows', (), "fetching all categories"
+        )
+
+    async def getAllAreasAsync(self) -> List[Area]:
+        """Coroutine version of getAllAreas."""
+        return await self._gather_areas('getAllAreasRows', (), "fetching all areas")
+
+    async def getCategoriesWithQuartileAsync(self, quartiles: Set[str]) -> List[Category]:
+        """Coroutine version of getCategoriesWithQuartile."""
+        return await self._gather_categories(
+            'getCategoriesWithQuartileRows', (quartiles,), "searching categories by quartile"
+        )
+
+    async def getCategoriesAssignedToAreasAsync(self, area_ids: Set[str]) -> List[Category]:
+        """Coroutine version of getCategoriesAssignedToAreas."""
+        return await self._gather_categories(
+            'getCategoriesAssignedToAreasRows', (area_ids,), "searching categories by areas"
+        )
+
+    async def getAreasAssignedToCategoriesAsync(self, category_ids: Set[str]) -> List[Area]:
+        """Coroutine version of getAreasAssignedToCategories."""
+        return await self._gather_areas(
+            'getAreasAssignedToCategoriesRows', (category_ids,), "searching areas by categories"
+        )
+
+    async def getJournalsInCategoriesWithQuartileAsync(
+        self, category_ids: Set[str], quartiles: Set[str], limit: Optional[int] = None, offset: int = 0
+    ) -> List[Journal]:
+        """Coroutine version of getJournalsInCategoriesWithQuartile."""
+        check_page(limit, offset)
+        try:
+            plan, journal_issns = await asyncio.gather(
+                self._in_executor(self._planner.planJournalsInCategoriesWithQuartile, category_ids, quartiles),
+                self._in_executor(self._issns_in_categories, category_ids, quartiles),
+            )
+            if not journal_issns:
+                return []
+            return await self._journals_with_issns_async(
+                plan, journal_issns, 'getAllJournals', (), limit, offset
+            )
+
+        except Exception as e:
+            print(f"Error while searching journals in categories with quartile: {e}")
+            return []
+
+    async def getJournalsInAreasWithLicenseAsync(
+        self, area_ids: Set[str], licenses: Set[str], limit: Optional[int] = None, offset: int = 0
+    ) -> List[Journal]:
+        """Coroutine version of getJournalsInAreasWithLicense."""
+        check_page(limit, offset)
+        try:
+            plan, journal_issns_in_areas = await asyncio.gather(
+                self._in_executor(self._planner.planJournalsInAreasWithLicense, area_ids, licenses),
+                self._in_executor(self._issns_in_areas, area_ids),
+            )
+            if journal_issns_in_areas is None:
+                return await self.getJournalsWithLicenseAsync(licenses, limit, offset)
+            return await self._journals_with_issns_async(
+                plan, journal_issns_in_areas, 'getJournalsWithLicense', (licenses,), limit, offset,
+                licenses=licenses,
+            )
+
+        except Exception as e:
+            print(f"Error while searching journals in areas with license: {e}")
+            return []
+
+    async def getDiamondJournalsInAreasAndCategoriesWithQuartileAsync(
+        self, area_ids: Set[str], category_ids: Set[str], quartiles: Set[str],
+        limit: Optional[int] = None, offset: int = 0
+    ) -> List[Journal]:
+        """Coroutine version of getDiamondJournalsInAreasAndCategoriesWithQuartile."""
+        check_page(limit, offset)
+        try:
+            plan, journal_issns_in_areas, journal_issns_in_categories = await asyncio.gather(
+                self._in_executor(self._planner.planDiamondJournals, area_ids, category_ids, quartiles),
+                self._in_executor(self._issns_in_areas, area_ids),
+                self._in_executor(self._issns_in_categories, category_ids, quartiles),
+            )
+            issns = self._diamond_issns(journal_issns_in_areas, journal_issns_in_categories)
+            if issns is None:
+                return await self._diamond_journals_async(limit, offset)
+            if not issns:
+                return []
+            return await self._journals_with_issns_async(
+                plan, issns, 'getJournalsWithoutAPC', (), limit, offset, without_apc=True
+            )
+
+        except Exception as e:
+            print(f"Error while searching for diamond journals: {e}")
+            return []
+
+    async def _journals_with_issns_async(self, plan, issns: Set[str], method_name: str, args: tuple,
+                                         limit: Optional[int], offset: int, without_apc: bool = False,
+                                         licenses: Optional[Set[str]] = None) -> List[Journal]:
+        """Coroutine version of _journals_with_issns."""
+        strategy = plan.getStrategy()
+        if limit is not None and strategy != QueryPlanner.ISSNS_FIRST:
+            keys = await self._in_executor(self._journal_keys, issns)
+            return await self._in_executor(
+                self._first_matching_journals, method_name, args, keys, limit, offset
+            )
+        if strategy == QueryPlanner.JOURNALS_FIRST:
+            frames, keys = await asyncio.gather(
+                self._gather(self._journalQuery, method_name, *args),
+                self._in_executor(self._journal_keys, issns),
+            )
+            journals = self._filter_journals_by_issns(self._journal_result_set(frames), keys)
+            return self._page_by_title(journals, offset) if offset else journals
+        if limit is not None:
+            journals = await self._fetch_journals_by_issns_async(issns, without_apc, licenses, offset + limit)
+        else:
+            journals = await self._push_issns_async(plan, issns, without_apc, licenses)
+        return self._page_by_title(journals, offset, limit)
+
+    async def _push_issns_async(self, plan, issns: Set[str], without_apc: bool = False,
+                                licenses: Optional[Set[str]] = None) -> List[Journal]:
+        """Coroutine version of _push_issns."""
+        if plan.getStrategy() == QueryPlanner.SEMI_JOIN:
+            return await self._semi_join_journals_async(issns, without_apc, licenses)
+        return await self._fetch_journals_by_issns_async(issns, without_apc, licenses)
+
+    async def _semi_join_journals_async(self, issns: Set[str], without_apc: bool = False,
+                                        licenses: Optional[Set[str]] = None) -> List[Journal]:
+        """Coroutine version of _semi_join_journals."""
+        cleaned_ids = sorted({issn for issn in issns if issn})
+        if not cleaned_ids:
+            return []
+        groups = [
+            (set(group), self._issn_ranges(group, self.SEMI_JOIN_MAX_RANGES))
+            for group in self._chunked(cleaned_ids, self.SEMI_JOIN_GROUP_SIZE)
+        ]
+        frames = await asyncio.gather(*(
+            self._scan_issn_ranges_async(handler, group, ranges, without_apc, licenses)
+            for handler in self._journalQuery for group, ranges in groups
+        ))
+        return self._journal_result_set(frames)
+
+    async def _scan_issn_ranges_async(self, handler, issns: Set[str], ranges: list,
+                                      without_apc: bool, licenses: Optional[Set[str]]) -> pd.DataFrame:
+        """Coroutine version of _scan_issn_ranges."""
+        frames: List[pd.DataFrame] = []
+        after: Optional[str] = None
+        while True:
+            pages = await self._gather(
+                [handler], 'getJournalsInIssnRanges',
+                ranges, without_apc, licenses, after, self.SEMI_JOIN_PAGE_SIZE,
+            )
+            if not pages or pages[0].empty or 'journal' not in pages[0].columns:
+                break
+            page = pages[0]
+            frames.append(self._rows_with_identifiers(page, issns))
+            journals = page['journal'].astype(str)
+            if journals.nunique() < self.SEMI_JOIN_PAGE_SIZE:
+                break
+            after = journals.max()
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    async def _diamond_journals_async(self, limit: Optional[int] = None, offset: int = 0) -> List[Journal]:
+        """Coroutine version of _diamond_journals."""
+        return await self._gather_journals(
+            'getJournalsWithoutAPC', (), "searching for diamond journals", limit, offset
+        )
+
+    async def _gather(self, handlers: list, method_name: str, *args, **kwargs) -> List[pd.DataFrame]:
+        """Call the same method on every handler concurrently; the results of the handlers
+        that answered keep handler order."""
+        return [result for _, result in await self._gather_indexed(handlers, method_name, *args, **kwargs)]
+
+    async def _gather_indexed(self, handlers: list, method_name: str, *args, **kwargs) -> List[tuple]:
+        """
+        Like _gather, but return (handler index, result) pairs.
+
+        Each call is bounded by the engine timeout, as in _fan_out_calls; a
+        call that raises or times out is reported and left out.
+        """
+        await self._refresh_store_versions_async()
+        calls = []
+        for handler in handlers:
+            async_method = getattr(handler, method_name + 'Async', None)
+            if async_method is not None:
+                call = async_method(*args, **kwargs)
+            else:
+                call = self._in_executor(functools.partial(getattr(handler, method_name), **kwargs), *args)
+            calls.append(asyncio.wait_for(call, self._timeout))
+        answers = []
+        for index, result in enumerate(await asyncio.gather(*calls, return_exceptions=True)):
+            if isinstance(result, asyncio.TimeoutError):
+                print(f"Error while querying handler: no answer within {self._timeout} s")
+            elif isinstance(result, BaseException):
+                print(f"Error while querying handler: {result}")
+            else:
+                answers.append((index, result))
+        return answers
+
+    async def _gather_journals(self, method_name: str, args: tuple, action: str,
+                               limit: Optional[int] = None, offset: int = 0) -> List[Journal]:
+        """Gather journal frames from all handlers and merge them as the sync engine does."""
+        check_page(limit, offset)
+        try:
+            if limit is None and not offset:
+                return self._journal_result_set(await self._gather(self._journalQuery, method_name, *args))
+            frames = await self._gather(
+                self._journalQuery, method_name, *args, **self._page_arguments(limit, offset)
+            )
+            return self._merge_journal_page(frames, limit, offset)
+        except Exception as e:
+            print(f"Error while {action}: {e}")
+            return []
+
+    async def _gather_categories(self, method_name: str, args: tuple, action: str) -> List[Category]:
+        """Gather category rows from all handlers and merge them as the sync engine does."""
+        category_map: Dict[str, Category] = {}
+        try:
+            for rows in await self._gather(self._categoryQuery, method_name, *args):
+                self._collect_category_rows(rows, category_map)
+            return list(category_map.values())
+        except Exception as e:
+            print(f"Error while {action}: {e}")
+            return []
+
+    async def _gather_areas(self, method_name: str, args: tuple, action: str) -> List[Area]:
+        """Gather area rows from all handlers and merge them as the sync engine does."""
+        area_map: Dict[str, Area] = {}
+        try:
+            for rows in await self._gather(self._categoryQuery, method_name, *args):
+                self._collect_area_rows(rows, area_map)
+            return list(area_map.values())
+        except Exception as e:
+            print(f"Error while {action}: {e}")
+            return []
+
+    async def _fetch_journals_by_issns_async(self, issns: Set[str], without_apc: bool = False,
+                                             licenses: Optional[Set[str]] = None,
+                                             limit: Optional[int] = None) -> List[Journal]:
+        """Fetch all ISSN batches from all handlers concurrently."""
+        cleaned_ids = sorted({issn for issn in issns if issn})
+        if not cleaned_ids:
+            return []
+        chunks = [set(chunk) for chunk in self._chunked(cleaned_ids, self.ISSN_BATCH_SIZE)]
+        extra_args = self._issn_filter_args(without_apc, licenses)
+        page = {'limit': limit} if limit is not None and limit < self.ISSN_BATCH_SIZE else {}
+        calls = [
+            self._gather([handler], 'getJournalsByIssns', chunk, *extra_args, **page)
+            for handler in self._journalQuery
+            for chunk in chunks
+        ]
+        results = await asyncio.gather(*calls)
+        return self._journal_result_set(df for frames in results for df in frames)
+
+    async def _in_executor(self, function, *args):
+        """Run a blocking callable in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(function, *args))
@@ -4,15 +4,41 @@ Base handler classes for working with databases.
 Contains classes: Handler, UploadHandler, QueryHandler
 """
 
+import threading
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# Resource whose doaj:revision the journal uploader replaces on every write
+# (see JournalQueryHandler.getStoreVersion)
+STORE_RESOURCE = "http://doaj.org/store"
+
+
+def check_page(limit: Optional[int], offset: int) -> None:
+    """
+    Check the page arguments of a journal query.
+
+    Raises:
+        ValueError: If `limit` or `offset` is negative
+    """
+    if limit is not None and limit < 0:
+        raise ValueError(f"Page limit must not be negative: {limit}")
+    if offset < 0:
+        raise ValueError(f"Page offset must not be negative: {offset}")
 
 
 class Handler:
     """
     Base class for working with databases.
+
+    Handlers share a process-wide data generation counter. Upload handlers
+    increase it whenever they write data, so caches built from query results
+    (such as the query engines' identity map) can tell when they are stale.
     """
     
+    _data_generation: int = 0
+    _generation_lock = threading.Lock()
+    
     def __init__(
         self, dbPathOrUrl: str = ""
     ):  # ДОБАВЛЯЕМ ПАРАМЕТР ДЛЯ ТЕСТОВ И ТД И ЧТОБЫ ЛЕГЧЕ ВЫЗЫВАТЬ БД ЧЕРЕЗ handler = JournalQueryHandler("http://example.com/sparql")
@@ -43,6 +69,23 @@ class Handler:
             return True
         except Exception:
             return False
+    
+    @staticmethod
+    def getDataGeneration() -> int:
+        """
+        Return the current data generation.
+
+        Returns:
+            int: Number of uploads performed in this process
+        """
+        return Handler._data_generation
+    
+    @staticmethod
+    def _bump_data_generation() -> int:
+        """Record that data was written or replaced; return the new generation."""
+        with Handler._generation_lock:
+            Handler._data_generation += 1
+            return Handler._data_generation
 
 
 class UploadHandler(Handler):
@@ -62,6 +105,93 @@ class UploadHandler(Handler):
             bool: True if upload succeeded
         """
         pass
+    
+    # Records per batch of pushDataToDb and readBatches
+    BATCH_SIZE: int = 200
+    
+    # A bulk loader reads a file with readBatches, writes every batch with
+    # pushBatch (serializing, scheduling and retrying batches itself) and calls
+    # finishUpload; it writes exactly the data pushDataToDb writes. SQLite
+    # handlers keep pushDataToDb in one transaction, so a library upload stays
+    # all-or-nothing while the loader can resume batch by batch.
+    
+    @abstractmethod
+    def readBatches(self, path: str, batch_size: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Read a data file and split its records into batches.
+
+        Args:
+            path (str): Path to the data file (gzip-compressed if it ends with .gz)
+            batch_size (Optional[int]): Records per batch (default BATCH_SIZE)
+
+        Returns:
+            List[List[Dict[str, Any]]]: Batches of records, empty if the file cannot be read
+        """
+        pass
+    
+    @abstractmethod
+    def serializeBatch(self, batch: List[Dict[str, Any]]) -> str:
+        """
+        Serialize a batch into the statements written to the database.
+
+        Args:
+            batch (List[Dict[str, Any]]): Records of the batch
+
+        Returns:
+            str: Update text (SPARQL update or SQL script)
+        """
+        pass
+    
+    @abstractmethod
+    def countStatements(self, payload: str) -> int:
+        """
+        Count the statements (triples or SQL rows) of a serialized batch.
+
+        Args:
+            payload (str): Result of serializeBatch
+
+        Returns:
+            int: Number of statements
+        """
+        pass
+    
+    @abstractmethod
+    def pushBatch(self, batch: List[Dict[str, Any]], payload: Optional[str] = None) -> bool:
+        """
+        Write one batch to the database.
+
+        Args:
+            batch (List[Dict[str, Any]]): Records of the batch
+            payload (Optional[str]): Result of serializeBatch(batch), if already built
+
+        Returns:
+            bool: True if the batch was written
+        """
+        pass
+    
+    def finishUpload(self, records: List[Dict[str, Any]]) -> bool:
+        """
+        Complete an upload once all its batches are written.
+
+        Args:
+            records (List[Dict[str, Any]]): All the records of the uploaded file
+
+        Returns:
+            bool: True if the upload is complete
+        """
+        return True
+    
+    @staticmethod
+    def _chunked(items: Iterable[Dict[str, Any]], size: int):
+        """Split a list of dictionaries into batches of the specified size."""
+        batch: List[Dict[str, Any]] = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
 
 
 class QueryHandler(Handler):
@@ -82,3 +212,16 @@ class QueryHandler(Handler):
         # Default implementation - should be overridden in subclasses
         from pandas import DataFrame
         return DataFrame()
+    
+    def getStoreVersion(self) -> Optional[Any]:
+        """
+        Return a marker of the stored data that changes whenever the store is written.
+
+        Unlike getDataGeneration, the marker also changes when another
+        process writes the store, so caches built from query results can
+        compare it to tell whether they are stale.
+
+        Returns:
+            Any: Hashable marker, or None if the store cannot tell
+        """
+        return None
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Identity map shared by the entities built by a query engine.
+Contains classes: IdentityMap, MissCache
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from .handlers import Handler
+from .models import IdentifiableEntity
+
+
+class IdentityMap:
+    """
+    Map from (entity kind, identifier) to the single instance of that entity.
+
+    With ``max_size=None`` the map holds weak references, so an entity stays
+    shared for as long as some result still references it. With a size, it
+    keeps strong references to the ``max_size`` most recently used entities.
+    The map empties itself when its data version changes: by default the
+    process data generation (see Handler.getDataGeneration); the query
+    engines also include the versions of their stores, so writes from other
+    processes are seen too.
+    """
+
+    def __init__(self, max_size: Optional[int] = None,
+                 version: Callable[[], Any] = Handler.getDataGeneration):
+        """
+        Args:
+            max_size (int, optional): Number of entities kept alive (LRU); None for weak references
+            version (Callable): Returns the current data version
+        """
+        self._max_size: Optional[int] = max_size
+        self._version: Callable[[], Any] = version
+        self._entries = self._new_store()
+        self._generation: Any = version()
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, identifier: str) -> Optional[IdentifiableEntity]:
+        """
+        Return the shared instance of an entity, if any.
+
+        Args:
+            kind (str): Entity kind ('journal', 'category' or 'area')
+            identifier (str): Entity identifier
+
+        Returns:
+            IdentifiableEntity or None: Shared instance or None
+        """
+        # Read outside the lock: the version may come from the stores
+        version = self._version()
+        with self._lock:
+            self._check_generation(version)
+            entity = self._entries.get((kind, identifier))
+            if entity is not None and self._max_size is not None:
+                self._entries.move_to_end((kind, identifier))
+            return entity
+
+    def put(self, kind: str, identifier: str, entity: IdentifiableEntity) -> IdentifiableEntity:
+        """
+        Register an entity unless an instance is already registered.
+
+        Args:
+            kind (str): Entity kind
+            identifier (str): Entity identifier
+            entity (IdentifiableEntity): Candidate instance
+
+        Returns:
+            IdentifiableEntity: The registered instance (the existing one if any)
+        """
+        version = self._version()
+        with self._lock:
+            self._check_generation(version)
+            key = (kind, identifier)
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing
+            self._entries[key] = entity
+            if self._max_size is not None and len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+            return entity
+
+    def clear(self) -> None:
+        """Forget every entity."""
+        version = self._version()
+        with self._lock:
+            self._entries = self._new_store()
+            self._generation = version
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _check_generation(self, generation: Any) -> None:
+        """Empty the map if the data changed since it was filled; requires the lock."""
+        if generation != self._generation:
+            self._entries = self._new_store()
+            self._generation = generation
+
+    def _new_store(self):
+        """Return an empty store for the configured policy."""
+        if self._max_size is None:
+            return weakref.WeakValueDictionary()
+        return OrderedDict()
+
+
+class MissCache:
+    """
+    Bounded set of identifiers known not to exist, evicted least recently used.
+
+    Like IdentityMap, the cache empties itself when its data version changes.
+    """
+
+    def __init__(self, max_size: int = 4096, version: Callable[[], Any] = Handler.getDataGeneration):
+        """
+        Args:
+            max_size (int): Maximum number of identifiers remembered
+            version (Callable): Returns the current data version
+        """
+        self._max_size: int = max_size
+        self._version: Callable[[], Any] = version
+        self._misses: "OrderedDict[str, None]" = OrderedDict()
+        self._generation: Any = version()
+        self._lock = threading.Lock()
+
+    def __contains__(self, identifier: str) -> bool:
+        version = self._version()
+        with self._lock:
+            self._check_generation(version)
+            if identifier in self._misses:
+                self._misses.move_to_end(identifier)
+                return True
+            return False
+
+    def add(self, identifier: str) -> None:
+        """Remember that an identifier matched nothing."""
+        version = self._version()
+        with self._lock:
+            self._check_generation(version)
+            self._misses[identifier] = None
+            self._misses.move_to_end(identifier)
+            while len(self._misses) > self._max_size:
+                self._misses.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every miss."""
+        version = self._version()
+        with self._lock:
+            self._misses.clear()
+            self._generation = version
+
+    def __len__(self) -> int:
+        return len(self._misses)
+
+    def _check_generation(self, generation: Any) -> None:
+        """Empty the cache if the data changed since it was filled; requires the lock."""
+        if generation != self._generation:
+            self._misses.clear()
+            self._generation = generation
@@ -2,37 +2,78 @@
 """
 Main implementation module for the scientific journals analysis system.
 Contains imports of all necessary classes.
+
+The classes are resolved lazily through the module __getattr__: importing
+this module loads none of the submodules, and the first use of a name
+imports only the submodule defining it (with its dependencies, e.g. pandas
+for the query handlers). A process that only needs CategoryUploadHandler
+never loads pandas, NumPy or requests. The query handlers and engines
+return DataFrames, so importing them still loads pandas and NumPy;
+requests is loaded on the first SPARQL request.
 """
 
-# Data model class imports
-from .models import IdentifiableEntity, Journal, Category, Area
+import importlib
+from typing import TYPE_CHECKING
 
-# Base handler imports
-from .handlers import Handler, UploadHandler, QueryHandler
+if TYPE_CHECKING:
+    # Data model class imports
+    from .models import IdentifiableEntity, Journal, Category, Area
 
-# Upload handler imports
-from .upload_handlers import JournalUploadHandler, CategoryUploadHandler
+    # Base handler imports
+    from .handlers import Handler, UploadHandler, QueryHandler
 
-# Query handler imports
-from .query_handlers import JournalQueryHandler, CategoryQueryHandler
+    # Upload handler imports
+    from .upload_handlers import JournalUploadHandler, CategoryUploadHandler
 
-# Query engine imports
-from .query_engines import BasicQueryEngine, FullQueryEngine
+    # Query handler imports
+    from .query_handlers import JournalQueryHandler, CategoryQueryHandler
 
-# Export all classes for use in test.py
-__all__ = [
+    # Query engine imports
+    from .query_engines import BasicQueryEngine, FullQueryEngine
+    from .result_sets import JournalResultSet
+    from .planner import QueryPlan, QueryPlanner
+    from .mirror import LocalMirror, MirrorJournalQueryHandler, MirrorCategoryQueryHandler
+
+    # Asynchronous API imports
+    from .async_query import AsyncJournalQueryHandler, AsyncCategoryQueryHandler, AsyncFullQueryEngine
+
+# Submodule defining each exported class
+_EXPORTS = {
     # Data model
-    'IdentifiableEntity', 'Journal', 'Category', 'Area',
-    
+    'IdentifiableEntity': 'models', 'Journal': 'models', 'Category': 'models', 'Area': 'models',
+
     # Base handlers
-    'Handler', 'UploadHandler', 'QueryHandler',
-    
+    'Handler': 'handlers', 'UploadHandler': 'handlers', 'QueryHandler': 'handlers',
+
     # Upload handlers
-    'JournalUploadHandler', 'CategoryUploadHandler',
-    
+    'JournalUploadHandler': 'upload_handlers', 'CategoryUploadHandler': 'upload_handlers',
+
     # Query handlers
-    'JournalQueryHandler', 'CategoryQueryHandler',
-    
+    'JournalQueryHandler': 'query_handlers', 'CategoryQueryHandler': 'query_handlers',
+
     # Query engines
-    'BasicQueryEngine', 'FullQueryEngine'
-]
+    'BasicQueryEngine': 'query_engines', 'FullQueryEngine': 'query_engines',
+    'JournalResultSet': 'result_sets', 'QueryPlan': 'planner', 'QueryPlanner': 'planner',
+    'LocalMirror': 'mirror', 'MirrorJournalQueryHandler': 'mirror', 'MirrorCategoryQueryHandler': 'mirror',
+
+    # Asynchronous API
+    'AsyncJournalQueryHandler': 'async_query', 'AsyncCategoryQueryHandler': 'async_query',
+    'AsyncFullQueryEngine': 'async_query',
+}
+
+# Export all classes for use in test.py
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import the submodule defining an exported class on first use and cache the class."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __package__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+"""
+Command-line bulk loader for the journal and category stores.
+Contains classes: LoadProgress, BulkLoader
+
+Run ``python -m implementations.loader`` to load DOAJ CSV files into a
+SPARQL endpoint and Scimago JSON files into SQLite databases. The loader
+drives the batch methods of JournalUploadHandler and CategoryUploadHandler
+(readBatches, serializeBatch, pushBatch, finishUpload), which write the
+same rows as pushDataToDb, so a file loaded from the command line and a
+file loaded through the library end up as the same data.
+
+    python -m implementations.loader --journals data/doaj.csv --sparql http://127.0.0.1:9999/blazegraph/sparql \\
+        --categories data/scimago.json --sqlite relational.db --concurrency 8 --resume
+
+Progress is recorded after every written batch in a state file next to the
+input (``<input>.load-state.json``, or in --state-dir); with --resume the
+batches it lists are skipped, as long as the input, target and batch size
+are unchanged. Every SQLite batch is its own transaction, so an interrupted
+load keeps the batches written so far; pushDataToDb writes a whole file in
+one transaction instead. A batch committed just before an interruption but
+not yet recorded is written again on resume, which the INSERT OR IGNORE
+statements make harmless.
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, IO, List, Optional, Set
+
+from .handlers import Handler, UploadHandler
+from .upload_handlers import JournalUploadHandler, CategoryUploadHandler
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of sorted values (0 if empty)."""
+    if not values:
+        return 0.0
+    return values[min(max(1, math.ceil(fraction * len(values))), len(values)) - 1]
+
+
+def _duration(seconds: float) -> str:
+    """Format seconds as [h:]mm:ss."""
+    minutes, seconds = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+class LoadProgress:
+    """
+    Thread-safe counters of one file load: batches, records, statements
+    (triples or SQL rows) and bytes written, failed batches and the latency
+    of every batch (serialization and write).
+    """
+
+    def __init__(self, label: str, batches: int, records: int, skipped: int = 0, unit: str = "triples"):
+        """
+        Args:
+            label (str): Name of the load, shown in the progress line
+            batches (int): Batches to write
+            records (int): Records of those batches
+            skipped (int): Batches skipped because a previous run wrote them
+            unit (str): Name of the statements ("triples", "SQL rows")
+        """
+        self.label: str = label
+        self.unit: str = unit
+        self.batches: int = batches
+        self.records: int = records
+        self.skipped: int = skipped
+        self.done_batches: int = 0
+        self.done_records: int = 0
+        self.statements: int = 0
+        self.bytes: int = 0
+        self.failed: int = 0
+        self.complete: bool = False
+        self.latencies: List[float] = []
+        self._lock = threading.Lock()
+        self._start: float = time.perf_counter()
+        self._end: Optional[float] = None
+
+    def record(self, records: int, statements: int, size: int, latency: float, ok: bool) -> None:
+        """
+        Account for one processed batch.
+
+        Args:
+            records (int): Records of the batch
+            statements (int): Statements of its serialization
+            size (int): Bytes of its serialization (0 for SQLite batches, bound as parameters)
+            latency (float): Seconds spent on the batch
+            ok (bool): Whether the batch was written
+        """
+        with self._lock:
+            self.latencies.append(latency)
+            if ok:
+                self.done_batches += 1
+                self.done_records += records
+                self.statements += statements
+                self.bytes += size
+            else:
+                self.failed += 1
+
+    def finish(self, complete: bool) -> None:
+        """Stop the clock and record whether the whole file was loaded."""
+        self._end = time.perf_counter()
+        self.complete = complete
+
+    def elapsed(self) -> float:
+        """Return the seconds since the load started (until it finished)."""
+        return (self._end if self._end is not None else time.perf_counter()) - self._start
+
+    def line(self) -> str:
+        """Return the live progress line: counts, throughput and ETA."""
+        with self._lock:
+            elapsed = max(self.elapsed(), 1e-9)
+            processed = self.done_batches + self.failed
+            rate = self.done_records / elapsed
+            remaining = self.records - self.done_records
+            eta = _duration(remaining / rate) if rate > 0 else "--:--"
+            return (f"{self.label}: {processed}/{self.batches} batches, "
+                    f"{self.done_records}/{self.records} rows | "
+                    f"{rate:,.0f} rows/s, {self.statements / elapsed:,.0f} {self.unit}/s"
+                    + (f", {self.bytes / elapsed / 1e6:.2f} MB/s" if self.bytes else "")
+                    + f" | ETA {eta}"
+                    + (f" | {self.failed} failed" if self.failed else ""))
+
+    def summary(self) -> str:
+        """Return the final summary: totals, throughput and batch latency percentiles."""
+        elapsed = max(self.elapsed(), 1e-9)
+        latencies = sorted(self.latencies)
+        mean = sum(latencies) / len(latencies) if latencies else 0.0
+        status = "complete" if self.complete else "INCOMPLETE"
+        lines = [
+            f"{self.label}: {status} in {_duration(elapsed)} ({elapsed:.2f} s)",
+            f"  batches     {self.done_batches} written, {self.failed} failed, {self.skipped} skipped (resumed)",
+            f"  rows        {self.done_records} ({self.done_records / elapsed:,.0f}/s)",
+            f"  {self.unit:<11} {self.statements} ({self.statements / elapsed:,.0f}/s)",
+        ]
+        if self.bytes:
+            lines.append(f"  data        {self.bytes / 1e6:.2f} MB ({self.bytes / elapsed / 1e6:.2f} MB/s)")
+        lines += [
+            "  batch latency (ms)  "
+            + "  ".join(f"p{int(fraction * 100)} {_percentile(latencies, fraction) * 1000:.1f}"
+                        for fraction in (0.5, 0.9, 0.99))
+            + f"  max {(latencies[-1] if latencies else 0) * 1000:.1f}  mean {mean * 1000:.1f}",
+        ]
+        return "\n".join(lines)
+
+
+class BulkLoader:
+    """
+    Load files through an upload handler, batch by batch, with parallel
+    batches, resumable progress, a dry-run mode and live metrics.
+
+    SPARQL batches are sent by up to ``concurrency`` threads; SQLite has a
+    single writer, so category batches are always written one at a time.
+    """
+
+    STATE_SUFFIX = ".load-state.json"
+
+    def __init__(
+        self,
+        handler: UploadHandler,
+        concurrency: int = 1,
+        batch_size: Optional[int] = None,
+        resume: bool = False,
+        state_dir: Optional[str] = None,
+        dry_run: Optional[IO[str]] = None,
+        progress_interval: float = 1.0,
+        stream: Optional[IO[str]] = None,
+    ):
+        """
+        Args:
+            handler (UploadHandler): Handler writing the batches
+            concurrency (int): Batches written in parallel (SPARQL only)
+            batch_size (Optional[int]): Records per batch (default: the handler's BATCH_SIZE)
+            resume (bool): Skip the batches a previous run recorded as written
+            state_dir (Optional[str]): Directory of the state files (default: next to the inputs)
+            dry_run (Optional[IO[str]]): Text file receiving the serialized batches instead of the database
+            progress_interval (float): Seconds between progress lines (0 disables them)
+            stream (Optional[IO[str]]): Stream of the progress lines (default: stderr)
+        """
+        self._handler: UploadHandler = handler
+        self._concurrency: int = 1 if isinstance(handler, CategoryUploadHandler) else max(1, concurrency)
+        self._batch_size: int = batch_size or handler.BATCH_SIZE
+        self._resume: bool = resume
+        self._state_dir: Optional[str] = state_dir
+        self._dry_run: Optional[IO[str]] = dry_run
+        self._progress_interval: float = progress_interval
+        self._stream: IO[str] = stream if stream is not None else sys.stderr
+
+    def load(self, path: str) -> LoadProgress:
+        """
+        Load one file.
+
+        Args:
+            path (str): Path to the input file
+
+        Returns:
+            LoadProgress: Counters of the load; ``complete`` is False if it did not finish
+        """
+        batches = self._handler.readBatches(path, self._batch_size)
+        unit = "triples" if isinstance(self._handler, JournalUploadHandler) else "SQL rows"
+        if not batches:
+            print(f"Error: failed to read file {path}")
+            progress = LoadProgress(os.path.basename(path), 0, 0, unit=unit)
+            progress.finish(False)
+            return progress
+        state_path = self._state_path(path)
+        state = self._initial_state(path, len(batches)) if self._dry_run is None else None
+        done: Set[int] = set(state['done']) if state else set()
+        pending = [(index, batch) for index, batch in enumerate(batches) if index not in done]
+        progress = LoadProgress(os.path.basename(path), len(pending), sum(len(batch) for _, batch in pending),
+                                skipped=len(batches) - len(pending), unit=unit)
+        state_lock = threading.Lock()
+
+        # SQLite batches are inserted with bound parameters: their SQL text is only built for dry runs
+        serialize = self._dry_run is not None or not isinstance(self._handler, CategoryUploadHandler)
+
+        def write(item):
+            index, batch = item
+            start = time.perf_counter()
+            payload = self._handler.serializeBatch(batch) if serialize else None
+            try:
+                ok = True if self._dry_run is not None else self._handler.pushBatch(batch, payload)
+            except Exception as e:
+                print(f"Error while writing batch {index} of {path}: {e}")
+                ok = False
+            if payload is not None:
+                statements, size = self._handler.countStatements(payload), len(payload.encode('utf-8'))
+            else:
+                statements, size = self._handler.countRows(batch), 0
+            progress.record(len(batch), statements, size, time.perf_counter() - start, ok)
+            if ok and state is not None:
+                with state_lock:
+                    state['done'].append(index)
+                    self._save_state(state_path, state)
+            return payload if ok else None
+
+        stop = threading.Event()
+        reporter = threading.Thread(target=self._report, args=(progress, stop), daemon=True)
+        reporter.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self._concurrency) as executor:
+                # map keeps the input order, so a dry run writes the batches in order
+                for payload in executor.map(write, pending):
+                    if self._dry_run is not None and payload is not None:
+                        self._dry_run.write(payload if payload.endswith("\n") else payload + "\n")
+            complete = progress.failed == 0
+            if complete and self._dry_run is None:
+                try:
+                    complete = self._handler.finishUpload([record for batch in batches for record in batch])
+                except Exception as e:
+                    print(f"Error while finishing the upload of {path}: {e}")
+                    complete = False
+        finally:
+            stop.set()
+            reporter.join()
+            if self._dry_run is None:
+                # Even a failed load may have written some of the batches
+                Handler._bump_data_generation()
+        progress.finish(complete)
+        return progress
+
+    def _report(self, progress: LoadProgress, stop: threading.Event) -> None:
+        """Print the progress line every progress_interval seconds until stop is set."""
+        if self._progress_interval <= 0:
+            return
+        live = self._stream.isatty()
+        while not stop.wait(self._progress_interval):
+            self._stream.write(("\r" + progress.line() + "\033[K") if live else progress.line() + "\n")
+            self._stream.flush()
+        self._stream.write(("\r" + progress.line() + "\033[K\n") if live else progress.line() + "\n")
+        self._stream.flush()
+
+    def _state_path(self, path: str) -> str:
+        """Return the path of the state file of an input file."""
+        directory = self._state_dir or os.path.dirname(os.path.abspath(path))
+        return os.path.join(directory, os.path.basename(path) + self.STATE_SUFFIX)
+
+    def _initial_state(self, path: str, batches: int) -> Dict[str, Any]:
+        """Return the state to continue from: the saved one on --resume if it matches, else a new one."""
+        stat = os.stat(path)
+        state = {
+            'source': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'target': self._handler.getDbPathOrUrl(),
+            'batch_size': self._batch_size,
+            'batches': batches,
+            'done': [],
+        }
+        state_path = self._state_path(path)
+        if self._resume and os.path.exists(state_path):
+            try:
+                with open(state_path, encoding='utf-8') as file:
+                    saved = json.load(file)
+                if all(saved.get(key) == value for key, value in state.items() if key != 'done'):
+                    state['done'] = sorted(set(saved.get('done', [])))
+                else:
+                    print(f"State file {state_path} does not match the input, target or batch size; loading from the start")
+            except (OSError, ValueError) as e:
+                print(f"Error while reading state file {state_path}: {e}")
+        self._save_state(state_path, state)
+        return state
+
+    @staticmethod
+    def _save_state(state_path: str, state: Dict[str, Any]) -> None:
+        """Write a state file atomically."""
+        temporary = state_path + ".tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(state, file)
+        os.replace(temporary, state_path)
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Load DOAJ CSV files into a SPARQL endpoint and Scimago JSON files into SQLite."""
+    parser = argparse.ArgumentParser(description="Bulk load journal (DOAJ CSV) and category (Scimago JSON) data.")
+    parser.add_argument("--journals", action="append", default=[], metavar="CSV",
+                        help="DOAJ CSV file to load into --sparql (.gz files are decompressed)")
+    parser.add_argument("--categories", action="append", default=[], metavar="JSON",
+                        help="Scimago JSON file to load into --sqlite (.gz files are decompressed)")
+    parser.add_argument("--sparql", help="SPARQL update endpoint of the journal store")
+    parser.add_argument("--sqlite", help="SQLite database of the category store")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="SPARQL batches sent in parallel (SQLite batches are written one at a time)")
+    parser.add_argument("--batch-size", type=int, help="records per batch (default: 200 journals, 500 Scimago entries)")
+    parser.add_argument("--dry-run", metavar="FILE",
+                        help="write the serialized batches (SPARQL updates, SQL) to FILE instead of the stores")
+    parser.add_argument("--compress", action="store_true", help="gzip the --dry-run file (implied by a .gz name)")
+    parser.add_argument("--resume", action="store_true", help="skip the batches written by a previous run")
+    parser.add_argument("--state-dir", help="directory of the resume state files (default: next to the inputs)")
+    parser.add_argument("--progress-interval", type=float, default=1.0,
+                        help="seconds between progress lines (0 disables them)")
+    options = parser.parse_args(arguments)
+    if not options.journals and not options.categories:
+        parser.error("nothing to load: give --journals and/or --categories")
+    if options.batch_size is not None and options.batch_size < 1:
+        parser.error("--batch-size must be positive")
+    if options.dry_run is None:
+        if options.journals and not options.sparql:
+            parser.error("--journals needs --sparql (or --dry-run)")
+        if options.categories and not options.sqlite:
+            parser.error("--categories needs --sqlite (or --dry-run)")
+
+    dry_run = None
+    if options.dry_run is not None:
+        if options.compress or options.dry_run.endswith('.gz'):
+            dry_run = gzip.open(options.dry_run, 'wt', encoding='utf-8')
+        else:
+            dry_run = open(options.dry_run, 'w', encoding='utf-8')
+    loads = [(CategoryUploadHandler(options.sqlite or ""), path) for path in options.categories]
+    loads += [(JournalUploadHandler(options.sparql or ""), path) for path in options.journals]
+    results = []
+    try:
+        for handler, path in loads:
+            loader = BulkLoader(handler, concurrency=options.concurrency, batch_size=options.batch_size,
+                                resume=options.resume, state_dir=options.state_dir, dry_run=dry_run,
+                                progress_interval=options.progress_interval)
+            results.append(loader.load(path))
+    finally:
+        if dry_run is not None:
+            dry_run.close()
+    for progress in results:
+        print(progress.summary())
+    if dry_run is not None:
+        print(f"Dry run: serialized batches written to {options.dry_run}")
+    return 0 if all(progress.complete for progress in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,751 @@
+# -*- coding: utf-8 -*-
+"""
+Offline local mirror of the journal and relational stores.
+Contains classes: MirrorVersion, LocalMirror, MirrorJournalQueryHandler, MirrorCategoryQueryHandler
+
+A mirror directory holds versioned artifacts and a CURRENT file naming the
+published one:
+
+    <directory>/CURRENT
+    <directory>/<version>/manifest.json
+    <directory>/<version>/*.npy            journal rows and indexes (memory-mapped)
+    <directory>/<version>/relational-<i>.db copy of the i-th SQLite database
+
+A version is written under a temporary name, renamed into place and then
+published by replacing CURRENT with os.replace, so readers switch from one
+complete version to the next. Run ``python -m implementations.mirror`` to
+write a version from a SPARQL endpoint and SQLite databases.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.request import pathname2url
+
+import numpy as np
+import pandas as pd
+
+from .handlers import Handler
+from .query_handlers import JournalQueryHandler, CategoryQueryHandler
+
+
+class MirrorVersion:
+    """
+    One published version of a LocalMirror.
+
+    Journal rows are stored as they are returned by getAllJournals (one
+    row per combination of multi-valued fields), grouped by journal in URI
+    order, with missing values as empty strings and the seal and APC flags
+    normalized to "true"/"false". Per journal the version keeps the row
+    offsets, the title order, the APC and seal flags and the identity key;
+    the identifier (ISSN and EISSN) and ISSN indexes are sorted arrays with
+    the journal position of every value. Loading a version only maps the
+    files, so it takes milliseconds whatever the size of the stores.
+    """
+
+    MANIFEST = "manifest.json"
+    FORMAT = 1
+
+    # Row columns, in the order of the SPARQL journal queries
+    ROW_COLUMNS = ('journal', 'title', 'issn', 'eissn', 'language', 'publisher', 'seal', 'licence', 'apc')
+
+    _ARRAYS = (
+        'row_journal', 'row_title', 'row_issn', 'row_eissn', 'row_language',
+        'row_publisher', 'row_seal', 'row_licence', 'row_apc',
+        'journal_uris', 'journal_offsets', 'journal_titles', 'title_order',
+        'journal_apc', 'journal_seal', 'journal_keys',
+        'identifier_values', 'identifier_journals', 'issn_values', 'issn_journals',
+    )
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Directory of the version
+
+        Raises:
+            OSError, ValueError: If the version cannot be read
+        """
+        self._path: str = path
+        with open(os.path.join(path, self.MANIFEST), encoding='utf-8') as file:
+            self._manifest: Dict[str, Any] = json.load(file)
+        if self._manifest.get('format') != self.FORMAT:
+            raise ValueError(f"Unsupported mirror format: {self._manifest.get('format')}")
+        for name in self._ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r'))
+
+    def getName(self) -> str:
+        """Return the version name."""
+        return self._manifest['version']
+
+    def getManifest(self) -> Dict[str, Any]:
+        """Return the manifest of the version (counts, creation time, sources)."""
+        return dict(self._manifest)
+
+    def relationalCount(self) -> int:
+        """Return the number of relational databases in the version."""
+        return len(self._manifest.get('relational', []))
+
+    def relationalPath(self, index: int) -> str:
+        """Return the path of the index-th relational database copy."""
+        return os.path.join(self._path, self._manifest['relational'][index])
+
+    def journalCount(self) -> int:
+        """Return the number of journals in the version."""
+        return len(self.journal_uris)
+
+    def journalsWithValues(self, values_name: str, values: Iterable[str]) -> np.ndarray:
+        """Return the journal mask of the given values in the 'identifier' or 'issn' index."""
+        index = getattr(self, f"{values_name}_values")
+        journals = getattr(self, f"{values_name}_journals")
+        wanted = np.array(sorted({value for value in values if value}), dtype=str)
+        mask = np.zeros(self.journalCount(), dtype=bool)
+        if len(wanted) and len(index):
+            left = np.searchsorted(index, wanted, side='left')
+            right = np.searchsorted(index, wanted, side='right')
+            for start, stop in zip(left[left < right], right[left < right]):
+                mask[journals[start:stop]] = True
+        return mask
+
+    def journalsInRanges(self, ranges: Iterable[Tuple[str, str]]) -> np.ndarray:
+        """Return the journal mask of the identifiers within any of the inclusive ranges."""
+        mask = np.zeros(self.journalCount(), dtype=bool)
+        for low, high in ranges:
+            start = np.searchsorted(self.identifier_values, low, side='left')
+            stop = np.searchsorted(self.identifier_values, high, side='right')
+            mask[self.identifier_journals[start:stop]] = True
+        return mask
+
+    def journalsWithRows(self, row_mask: np.ndarray) -> np.ndarray:
+        """Return the mask of the journals with at least one row in row_mask."""
+        return np.bincount(self.row_journal[row_mask], minlength=self.journalCount()) > 0
+
+    def rowPositions(self, journals: np.ndarray) -> np.ndarray:
+        """Return the positions of the rows of the given journals, journal after journal."""
+        starts = self.journal_offsets[journals]
+        lengths = self.journal_offsets[journals + 1] - starts
+        if not len(lengths):
+            return np.zeros(0, dtype=np.int64)
+        shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return shifts + np.arange(int(lengths.sum()))
+
+    def rowsFrame(self, positions: np.ndarray) -> pd.DataFrame:
+        """Build the journal rows at the given positions, with None for missing values."""
+        data = {}
+        for column in self.ROW_COLUMNS:
+            if column == 'journal':
+                values = np.asarray(self.journal_uris)[self.row_journal[positions]].astype(object)
+            else:
+                values = np.asarray(getattr(self, f"row_{column}"))[positions].astype(object)
+            values[values == ""] = None
+            data[column] = values
+        return pd.DataFrame(data, columns=list(self.ROW_COLUMNS))
+
+    @classmethod
+    def write(cls, path: str, version: str, rows: pd.DataFrame, relational: List[str],
+              generation: int) -> None:
+        """
+        Write the journal arrays and the manifest of a version into an existing directory.
+
+        Args:
+            path (str): Directory of the version
+            version (str): Version name
+            rows (pd.DataFrame): Journal rows with ROW_COLUMNS as strings ("" for missing)
+            relational (List[str]): File names of the relational database copies
+            generation (int): Data generation of the writing process
+        """
+        rows = rows.sort_values('journal', kind='stable', ignore_index=True)
+        uris, row_journal = np.unique(rows['journal'].to_numpy(dtype=str), return_inverse=True)
+        count = len(uris)
+        arrays: Dict[str, np.ndarray] = {'row_journal': row_journal.astype(np.int64)}
+        for column in cls.ROW_COLUMNS[1:]:
+            arrays[f"row_{column}"] = rows[column].to_numpy(dtype=str)
+        arrays['journal_uris'] = uris.astype(str)
+        arrays['journal_offsets'] = np.concatenate(
+            [[0], np.cumsum(np.bincount(row_journal, minlength=count))]).astype(np.int64)
+
+        by_journal = pd.DataFrame({
+            'journal': row_journal,
+            'title': rows['title'].replace("", np.nan),
+            'issn': rows['issn'].replace("", np.nan),
+            'eissn': rows['eissn'].replace("", np.nan),
+        }).groupby('journal', sort=True)
+        titles = by_journal['title'].min().reindex(range(count)).fillna("").to_numpy(dtype=str)
+        firsts = by_journal[['issn', 'eissn']].first().reindex(range(count))
+        keys = firsts['issn'].fillna(firsts['eissn']).fillna(pd.Series(uris, index=firsts.index))
+        arrays['journal_titles'] = titles
+        arrays['title_order'] = np.lexsort((uris, titles)).astype(np.int64)
+        arrays['journal_keys'] = keys.to_numpy(dtype=str)
+        for flag in ('apc', 'seal'):
+            arrays[f"journal_{flag}"] = np.bincount(
+                row_journal[arrays[f"row_{flag}"] == "true"], minlength=count) > 0
+
+        for name, columns in (('identifier', ('issn', 'eissn')), ('issn', ('issn',))):
+            pairs = pd.concat([
+                pd.DataFrame({'value': rows[column], 'journal': row_journal}) for column in columns
+            ])
+            pairs = pairs[pairs['value'] != ""].drop_duplicates().sort_values(['value', 'journal'])
+            arrays[f"{name}_values"] = pairs['value'].to_numpy(dtype=str)
+            arrays[f"{name}_journals"] = pairs['journal'].to_numpy(dtype=np.int64)
+
+        for name in cls._ARRAYS:
+            values = arrays[name]
+            if values.dtype.kind == 'U' and values.dtype.itemsize == 0:
+                values = values.astype('<U1')
+            np.save(os.path.join(path, f"{name}.npy"), values)
+        manifest = {
+            'format': cls.FORMAT,
+            'version': version,
+            'created': datetime.now(timezone.utc).isoformat(),
+            'generation': generation,
+            'journals': count,
+            'journal_rows': len(rows),
+            'relational': relational,
+        }
+        with open(os.path.join(path, cls.MANIFEST), 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=2)
+
+
+class LocalMirror:
+    """
+    Versioned local copy of the journal and relational stores.
+
+    build() pulls the source handlers into a new version and publishes it
+    atomically; current() returns the published version, checking CURRENT
+    for a newer one at most once per check_interval seconds. With sources
+    attached, current() also rebuilds the mirror after an upload in this
+    process (a change of Handler.getDataGeneration()). Switching to a new
+    version counts as a data change, so the caches of the engines built
+    from the previous one are dropped.
+    """
+
+    CURRENT = "CURRENT"
+
+    # Generations created by version switches rather than uploads (process-wide)
+    _switch_generations: Set[int] = set()
+    _switch_lock = threading.Lock()
+
+    def __init__(self, directory: str, check_interval: float = 1.0, keep: int = 2):
+        """
+        Args:
+            directory (str): Mirror directory (created if needed)
+            check_interval (float): Minimum number of seconds between two CURRENT checks
+            keep (int): Number of versions kept on disk, the published one included
+        """
+        self._directory: str = directory
+        self._check_interval: float = check_interval
+        self._keep: int = max(1, keep)
+        self._version: Optional[MirrorVersion] = None
+        self._checked_at: float = 0.0
+        self._sources: Optional[Tuple[List[Any], List[Any]]] = None
+        self._source_generation: Optional[int] = None
+        self._lock = threading.RLock()
+
+    def getDirectory(self) -> str:
+        """Return the mirror directory."""
+        return self._directory
+
+    def attachSources(self, journal_handlers: Iterable[Any], category_handlers: Iterable[Any]) -> None:
+        """
+        Rebuild the mirror from these handlers when data is uploaded in this process.
+
+        Args:
+            journal_handlers (Iterable): Handlers answering getAllJournals
+            category_handlers (Iterable): Handlers of SQLite databases (getDbPathOrUrl)
+        """
+        with self._lock:
+            self._sources = (list(journal_handlers), list(category_handlers))
+            self._source_generation = Handler.getDataGeneration()
+
+    def current(self) -> MirrorVersion:
+        """
+        Return the published version, building the first one from the sources if needed.
+
+        Raises:
+            OSError, ValueError: If no version is published and none can be built
+        """
+        version = self._version
+        if (version is not None and time.monotonic() - self._checked_at < self._check_interval
+                and not self._sources_changed()):
+            return version
+        with self._lock:
+            if self._sources is not None and (self._sources_changed() or self._published() is None):
+                self.build(*self._sources)
+            name = self._published()
+            if name is None:
+                raise FileNotFoundError(f"No mirror version in {self._directory}")
+            if self._version is None or self._version.getName() != name:
+                replaced = self._version is not None
+                self._version = MirrorVersion(os.path.join(self._directory, name))
+                if replaced:
+                    with LocalMirror._switch_lock:
+                        LocalMirror._switch_generations.add(Handler._bump_data_generation())
+            self._checked_at = time.monotonic()
+            return self._version
+
+    def build(self, journal_handlers: Iterable[Any], category_handlers: Iterable[Any]) -> str:
+        """
+        Write a new version from the handlers and publish it.
+
+        Journal rows are read with getAllJournals from every journal handler;
+        each relational database is copied with the SQLite backup API, which
+        keeps its indexes and gives a consistent copy.
+
+        Args:
+            journal_handlers (Iterable): Handlers answering getAllJournals
+            category_handlers (Iterable): Handlers of SQLite databases (getDbPathOrUrl)
+
+        Returns:
+            str: Name of the published version
+        """
+        with self._lock:
+            generation = Handler.getDataGeneration()
+            os.makedirs(self._directory, exist_ok=True)
+            name = f"v{time.time_ns()}"
+            staging = os.path.join(self._directory, f".{name}.tmp")
+            os.makedirs(staging)
+            try:
+                frames = [self._journal_rows(handler.getAllJournals()) for handler in journal_handlers]
+                rows = pd.concat(frames, ignore_index=True).drop_duplicates(ignore_index=True) if frames \
+                    else pd.DataFrame({column: [] for column in MirrorVersion.ROW_COLUMNS}, dtype=str)
+                relational = []
+                for index, handler in enumerate(category_handlers):
+                    file_name = f"relational-{index}.db"
+                    self._copy_database(handler.getDbPathOrUrl(), os.path.join(staging, file_name))
+                    relational.append(file_name)
+                MirrorVersion.write(staging, name, rows, relational, generation)
+                os.rename(staging, os.path.join(self._directory, name))
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            pointer = os.path.join(self._directory, f".{self.CURRENT}.tmp")
+            with open(pointer, 'w', encoding='utf-8') as file:
+                file.write(name)
+            os.replace(pointer, os.path.join(self._directory, self.CURRENT))
+            if self._sources is not None:
+                self._source_generation = generation
+            # The next current() reads the new CURRENT
+            self._checked_at = 0.0
+            self._prune(name)
+            return name
+
+    def close(self) -> None:
+        """Drop the loaded version; it is loaded again on next use."""
+        with self._lock:
+            self._version = None
+
+    def _sources_changed(self) -> bool:
+        """
+        Return True if data was uploaded in this process since the last build
+        from the sources; generations created by version switches do not count.
+        """
+        if self._sources is None:
+            return False
+        generation = Handler.getDataGeneration()
+        if generation == self._source_generation:
+            return False
+        with LocalMirror._switch_lock:
+            uploaded = any(
+                step not in LocalMirror._switch_generations
+                for step in range(self._source_generation + 1, generation + 1)
+            )
+        if not uploaded:
+            self._source_generation = generation
+        return uploaded
+
+    def _published(self) -> Optional[str]:
+        """Return the name in CURRENT, or None if no version is published."""
+        try:
+            with open(os.path.join(self._directory, self.CURRENT), encoding='utf-8') as file:
+                return file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _prune(self, published: str) -> None:
+        """Delete the oldest versions beyond `keep`; readers still mapping one keep their files open."""
+        versions = sorted(
+            entry for entry in os.listdir(self._directory)
+            if entry.startswith('v') and entry != published
+            and os.path.isdir(os.path.join(self._directory, entry))
+        )
+        for entry in versions[:max(0, len(versions) - (self._keep - 1))]:
+            shutil.rmtree(os.path.join(self._directory, entry), ignore_errors=True)
+
+    @staticmethod
+    def _journal_rows(df: pd.DataFrame) -> pd.DataFrame:
+        """Convert journal rows of a handler to ROW_COLUMNS strings ("" for missing, flags as "true"/"false")."""
+        data = {}
+        for column in MirrorVersion.ROW_COLUMNS:
+            if df is None or column not in df.columns:
+                data[column] = [""] * (0 if df is None else len(df))
+                continue
+            values = df[column].astype(object)
+            missing = values.isna()
+            text = values.where(~missing, "").astype(str).str.strip()
+            if column in ('seal', 'apc'):
+                flags = text.str.lower().isin(JournalQueryHandler._TRUE_LITERALS)
+                text = flags.map({True: "true", False: "false"}).where(text != "", "")
+            data[column] = text.to_numpy(dtype=object)
+        return pd.DataFrame(data, columns=list(MirrorVersion.ROW_COLUMNS))
+
+    @staticmethod
+    def _copy_database(source: str, target: str) -> None:
+        """Copy a SQLite database with the backup API."""
+        source_conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(source))}?mode=ro", uri=True)
+        target_conn = sqlite3.connect(target)
+        try:
+            source_conn.backup(target_conn)
+        finally:
+            target_conn.close()
+            source_conn.close()
+
+
+class MirrorJournalQueryHandler(JournalQueryHandler):
+    """
+    Journal handler answering every JournalQueryHandler query from a LocalMirror.
+
+    Results have the rows, columns and order of the SPARQL queries, so the
+    engines merge them unchanged; filters run as NumPy masks over the
+    memory-mapped rows and indexes.
+    """
+
+    # Row column of each GROUP_FIELDS field
+    _GROUP_COLUMNS = {'licence': 'licence', 'language': 'language', 'publisher': 'publisher',
+                      'apc': 'apc', 'seal': 'seal'}
+
+    def __init__(self, mirror: LocalMirror, typed_results: bool = True,
+                 string_storage: Optional[str] = None):
+        """
+        Args:
+            mirror (LocalMirror): Mirror to read
+            typed_results (bool): Convert result columns as JournalQueryHandler does
+            string_storage (str, optional): Storage for free-text columns
+        """
+        super().__init__(mirror.getDirectory(), typed_results, string_storage)
+        self._mirror: LocalMirror = mirror
+
+    def getStoreVersion(self) -> Optional[Tuple]:
+        """
+        Return the name of the published version, which changes with every build.
+
+        Returns:
+            tuple or None: (mirror directory, version name), or None if no version can be read
+        """
+        try:
+            return (self._mirror.getDirectory(), self._mirror.current().getName())
+
+        except Exception as e:
+            print(f"Error while reading the mirror version: {e}")
+            return None
+
+    def getById(self, entity_id: str) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getById, answered from the mirror."""
+        return self._answer("searching journal by ID", lambda version: self._select(
+            version, version.journalsWithValues('issn', [entity_id]), ordered=False))
+
+    def getByIds(self, entity_ids: Iterable[str]) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getByIds, answered from the mirror."""
+        entity_ids = list(entity_ids)
+        return self._answer("searching journals by IDs", lambda version: self._select(
+            version, version.journalsWithValues('issn', entity_ids), ordered=False))
+
+    def getAllJournals(self, after: Optional[str] = None, limit: Optional[int] = None,
+                       offset: int = 0) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getAllJournals, answered from the mirror."""
+        return self._answer("getting all journals", lambda version: self._select(
+            version, after=after, limit=limit, offset=offset))
+
+    def getJournalsWithTitle(self, partialTitle: str, after: Optional[str] = None,
+                             limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getJournalsWithTitle, answered from the mirror."""
+        return self._answer("searching journals by title", lambda version: self._select(
+            version, row_mask=self._contains(version.row_title, partialTitle),
+            after=after, limit=limit, offset=offset))
+
+    def getJournalsPublishedBy(self, partialName: str, after: Optional[str] = None,
+                               limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getJournalsPublishedBy, answered from the mirror."""
+        return self._answer("searching journals by publisher", lambda version: self._select(
+            version, row_mask=self._contains(version.row_publisher, partialName),
+            after=after, limit=limit, offset=offset))
+
+    def getJournalsWithLicense(self, licenses: Set[str], after: Optional[str] = None,
+                               limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getJournalsWithLicense, answered from the mirror."""
+        return self._answer("searching journals by license", lambda version: self._select(
+            version, row_mask=self._licence_rows(version, licenses),
+            after=after, limit=limit, offset=offset))
+
+    def getJournalsWithAPC(self, after: Optional[str] = None, limit: Optional[int] = None,
+                           offset: int = 0) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getJournalsWithAPC, answered from the mirror."""
+        return self._answer("searching journals with APC", lambda version: self._select(
+            version, np.asarray(version.journal_apc), after=after, limit=limit, offset=offset))
+
+    def getJournalsWithDOAJSeal(self, after: Optional[str] = None, limit: Optional[int] = None,
+                                offset: int = 0) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getJournalsWithDOAJSeal, answered from the mirror."""
+        return self._answer("searching journals with DOAJ seal", lambda version: self._select(
+            version, np.asarray(version.journal_seal), after=after, limit=limit, offset=offset))
+
+    def getJournalsWithoutAPC(self, after: Optional[str] = None, limit: Optional[int] = None,
+                              offset: int = 0) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getJournalsWithoutAPC, answered from the mirror."""
+        return self._answer("searching journals without APC", lambda version: self._select(
+            version, ~np.asarray(version.journal_apc), after=after, limit=limit, offset=offset))
+
+    def getJournalsByIssns(self, issns: Set[str], without_apc: bool = False,
+                           licenses: Optional[Set[str]] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getJournalsByIssns, answered from the identifier index."""
+        return self._answer("searching journals by ISSN", lambda version: self._select(
+            version, self._filtered(version, version.journalsWithValues('identifier', issns), without_apc),
+            row_mask=self._licence_rows(version, licenses), limit=limit))
+
+    def getJournalsInIssnRanges(self, ranges: List[Tuple[str, str]], without_apc: bool = False,
+                                licenses: Optional[Set[str]] = None, after: Optional[str] = None,
+                                limit: Optional[int] = None) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getJournalsInIssnRanges, answered from the identifier index."""
+        return self._answer("searching journals by ISSN ranges", lambda version: self._select(
+            version, self._filtered(version, version.journalsInRanges(ranges), without_apc),
+            row_mask=self._licence_rows(version, licenses), after=after or "", limit=limit))
+
+    def getIdentityIndex(self, without_apc: bool = False,
+                         licenses: Optional[Set[str]] = None) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getIdentityIndex, answered from the identifier index."""
+        def index(version: MirrorVersion) -> pd.DataFrame:
+            journals = self._matching_journals(version, without_apc, licenses)
+            positions = np.asarray(version.identifier_journals)
+            kept = journals[positions]
+            if not kept.any():
+                return pd.DataFrame()
+            return pd.DataFrame({
+                'identifier': np.asarray(version.identifier_values)[kept].astype(object),
+                'key': np.asarray(version.journal_keys)[positions[kept]].astype(object),
+            })
+        return self._answer("reading the journal identity index", index)
+
+    def getStatistics(self) -> Dict[str, Any]:
+        """Same as JournalQueryHandler.getStatistics, answered from the mirror."""
+        try:
+            version = self._mirror.current()
+            licences = pd.DataFrame({'licence': version.row_licence, 'journal': version.row_journal})
+            licences = licences[licences['licence'] != ""].drop_duplicates()
+            return {
+                'journals': version.journalCount(),
+                'with_apc': int(np.count_nonzero(version.journal_apc)),
+                'with_seal': int(np.count_nonzero(version.journal_seal)),
+                'licences': {str(licence): int(count)
+                             for licence, count in licences['licence'].value_counts().items()},
+            }
+
+        except Exception as e:
+            print(f"Error while collecting journal statistics: {e}")
+            return {}
+
+    def countJournalsBy(self, field: str, without_apc: bool = False,
+                        licenses: Optional[Set[str]] = None) -> pd.DataFrame:
+        """Same as JournalQueryHandler.countJournalsBy, answered from the mirror."""
+        self._check_field(field)
+
+        def count(version: MirrorVersion) -> pd.DataFrame:
+            pairs = self._grouped_pairs(version, field, without_apc, licenses)
+            if pairs.empty:
+                return pd.DataFrame()
+            counts = pairs['value'].value_counts()
+            counts = pd.DataFrame({'value': counts.index.to_numpy(dtype=object), 'count': counts.to_numpy()})
+            return counts.sort_values(['count', 'value'], ascending=[False, True], ignore_index=True)
+        return self._answer(f"counting journals by {field}", count, typed=False)
+
+    def getJournalKeysGroupedBy(self, field: str, without_apc: bool = False,
+                                licenses: Optional[Set[str]] = None) -> pd.DataFrame:
+        """Same as JournalQueryHandler.getJournalKeysGroupedBy, answered from the mirror."""
+        self._check_field(field)
+
+        def keys(version: MirrorVersion) -> pd.DataFrame:
+            pairs = self._grouped_pairs(version, field, without_apc, licenses)
+            if pairs.empty:
+                return pd.DataFrame()
+            return pd.DataFrame({
+                'value': pairs['value'].to_numpy(dtype=object),
+                'key': np.asarray(version.journal_keys)[pairs['journal'].to_numpy()].astype(object),
+            }).drop_duplicates(ignore_index=True)
+        return self._answer(f"grouping journals by {field}", keys, typed=False)
+
+    def _answer(self, action: str, select: Callable[[MirrorVersion], pd.DataFrame],
+                typed: bool = True) -> pd.DataFrame:
+        """Run a selection on the current version; errors are reported as by the SPARQL handler."""
+        try:
+            df = select(self._mirror.current())
+            if typed and self._typed_results and not df.empty:
+                df = self._apply_result_schema(df)
+            return df
+
+        except Exception as e:
+            print(f"Error while {action}: {e}")
+            return pd.DataFrame()
+
+    def _select(self, version: MirrorVersion, journal_mask: Optional[np.ndarray] = None,
+                row_mask: Optional[np.ndarray] = None, ordered: bool = True,
+                after: Optional[str] = None, limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
+        """
+        Return the rows of the matching journals, paged and ordered as _build_journal_query.
+
+        A journal matches if it is in journal_mask and has a row in row_mask;
+        only its rows in row_mask are returned, as only the rows binding the
+        constrained variables are returned by SPARQL.
+        """
+        if row_mask is False:
+            return pd.DataFrame()
+        matching = np.ones(version.journalCount(), dtype=bool) if journal_mask is None else journal_mask
+        if row_mask is not None:
+            matching = matching & version.journalsWithRows(row_mask)
+        if after is not None:
+            journals = np.flatnonzero(matching)
+            if after:
+                journals = journals[journals >= np.searchsorted(version.journal_uris, after, side='right')]
+            if limit:
+                journals = journals[:limit]
+        else:
+            order = np.asarray(version.title_order)
+            journals = order[matching[order]] if ordered or limit is not None or offset else np.flatnonzero(matching)
+            if limit is not None or offset:
+                journals = journals[offset:None if limit is None else offset + limit]
+        positions = version.rowPositions(journals)
+        if row_mask is not None:
+            positions = positions[row_mask[positions]]
+        if not len(positions):
+            return pd.DataFrame()
+        return version.rowsFrame(positions)
+
+    def _matching_journals(self, version: MirrorVersion, without_apc: bool,
+                           licenses: Optional[Set[str]]) -> np.ndarray:
+        """Return the mask of the journals passing the APC and licence filters."""
+        matching = self._filtered(version, np.ones(version.journalCount(), dtype=bool), without_apc)
+        licence_rows = self._licence_rows(version, licenses)
+        if licence_rows is False:
+            return np.zeros(version.journalCount(), dtype=bool)
+        if licence_rows is not None:
+            matching &= version.journalsWithRows(licence_rows)
+        return matching
+
+    def _grouped_pairs(self, version: MirrorVersion, field: str, without_apc: bool,
+                       licenses: Optional[Set[str]]) -> pd.DataFrame:
+        """Return the distinct (journal, value) pairs of a field for the journals passing the filters."""
+        journals = self._matching_journals(version, without_apc, licenses)
+        values = np.asarray(getattr(version, f"row_{self._GROUP_COLUMNS[field]}"))
+        row_journals = np.asarray(version.row_journal)
+        kept = journals[row_journals]
+        if field in self._FLAG_FIELDS:
+            # Journals without the flag are grouped with those where it is false
+            pairs = pd.DataFrame({'journal': row_journals[kept], 'value': values[kept] == "true"})
+        else:
+            kept &= values != ""
+            pairs = pd.DataFrame({'journal': row_journals[kept], 'value': values[kept]})
+        pairs = pairs.drop_duplicates(ignore_index=True)
+        pairs['value'] = pairs['value'].astype(object)
+        return pairs
+
+    def _check_field(self, field: str) -> None:
+        """Raise ValueError for a field countJournalsBy cannot group on."""
+        if field not in self.GROUP_FIELDS:
+            raise ValueError(f"Cannot group journals by: {field}")
+
+    @staticmethod
+    def _filtered(version: MirrorVersion, journals: np.ndarray, without_apc: bool) -> np.ndarray:
+        """Remove the journals with APC from a journal mask when without_apc is set."""
+        return journals & ~np.asarray(version.journal_apc) if without_apc else journals
+
+    @staticmethod
+    def _contains(values: np.ndarray, part: str) -> np.ndarray:
+        """Return the mask of the values containing `part`, ignoring case (non-empty values only)."""
+        lowered = np.char.lower(np.asarray(values))
+        return (np.char.find(lowered, str(part).lower()) >= 0) & (lowered != "")
+
+    @staticmethod
+    def _licence_rows(version: MirrorVersion, licenses: Optional[Set[str]]):
+        """Return the row mask of the licenses, None for no restriction, False if nothing can match."""
+        if not licenses:
+            return None
+        wanted = [licence for licence in licenses if licence]
+        if not wanted:
+            return False
+        return np.isin(np.asarray(version.row_licence), wanted)
+
+
+class MirrorCategoryQueryHandler(CategoryQueryHandler):
+    """
+    Category handler answering every CategoryQueryHandler query from the
+    copy of one relational database in a LocalMirror.
+
+    The handler follows the published version: when it changes, the pooled
+    connections move to the new copy (queries already running finish on the
+    old one).
+    """
+
+    def __init__(self, mirror: LocalMirror, index: int = 0, pool_size: int = 4):
+        """
+        Args:
+            mirror (LocalMirror): Mirror to read
+            index (int): Position of the database among the mirrored ones
+            pool_size (int): Maximum number of pooled connections
+        """
+        super().__init__("", pool_size)
+        self._mirror: LocalMirror = mirror
+        self._index: int = index
+        self._follow_lock = threading.Lock()
+
+    def getStoreVersion(self) -> Optional[Tuple]:
+        """Same as CategoryQueryHandler.getStoreVersion, on the database copy of the published version."""
+        try:
+            self._follow_mirror()
+        except Exception as e:
+            print(f"Error while reading the mirror version: {e}")
+            return None
+        return super().getStoreVersion()
+
+    def _connection(self):
+        """Same as CategoryQueryHandler._connection, on the database copy of the published version."""
+        self._follow_mirror()
+        return super()._connection()
+
+    def _snapshot(self):
+        """Same as CategoryQueryHandler._snapshot, on the database copy of the published version."""
+        self._follow_mirror()
+        return super()._snapshot()
+
+    def _follow_mirror(self) -> None:
+        """Point the handler to the database copy of the published version."""
+        path = self._mirror.current().relationalPath(self._index)
+        if path != self._dbPathOrUrl:
+            with self._follow_lock:
+                if path != self._dbPathOrUrl:
+                    self.setDbPathOrUrl(path)
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    """Write and publish a mirror version from a SPARQL endpoint and SQLite databases."""
+    parser = argparse.ArgumentParser(description="Snapshot the journal and category stores into a local mirror.")
+    parser.add_argument("directory", help="mirror directory")
+    parser.add_argument("--sparql", action="append", default=[], help="SPARQL endpoint of a journal store")
+    parser.add_argument("--sqlite", action="append", default=[], help="SQLite database of a category store")
+    parser.add_argument("--keep", type=int, default=2, help="number of versions kept on disk")
+    options = parser.parse_args(arguments)
+    start = time.perf_counter()
+    mirror = LocalMirror(options.directory, keep=options.keep)
+    name = mirror.build(
+        [JournalQueryHandler(url, typed_results=False) for url in options.sparql],
+        [CategoryQueryHandler(path) for path in options.sqlite],
+    )
+    manifest = mirror.current().getManifest()
+    print(f"Published mirror version {name}: {manifest['journals']} journals, "
+          f"{len(manifest['relational'])} relational database(s) "
+          f"in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
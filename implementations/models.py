@@ -4,25 +4,90 @@ Data model for the scientific journals analysis system.
 Contains classes: IdentifiableEntity, Journal, Category, Area
 """
 
-from typing import List, Optional, Union
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a string value so equal values share one object."""
+    return sys.intern(value) if type(value) is str else value
+
+
+class FrozenList(list):
+    """
+    List that cannot be modified.
+
+    The model getters return these, so callers get a list as before while
+    an entity hands out the same instance on every call instead of a copy.
+    Methods that would modify the list raise TypeError; list(...) gives a
+    modifiable copy, and concatenation returns a plain list.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"'{type(self).__name__}' object cannot be modified; copy it with list()")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __copy__(self) -> 'FrozenList':
+        return self
+
+    def __reduce__(self):
+        # The default list pickling would call extend
+        return FrozenList, (list(self),)
+
+
+# Shared value of every empty collection
+_EMPTY = FrozenList()
+
+# Shared language lists: most journals accept one of a few combinations
+_LANGUAGE_LISTS: Dict[tuple, FrozenList] = {}
+_LANGUAGE_LISTS_MAX = 4096
+
+
+def _language_list(languages: Iterable[str]) -> FrozenList:
+    """Return the shared FrozenList of these languages, with interned strings."""
+    key = tuple(_intern(language) for language in languages)
+    if not key:
+        return _EMPTY
+    shared = _LANGUAGE_LISTS.get(key)
+    if shared is None:
+        shared = FrozenList(key)
+        if len(_LANGUAGE_LISTS) < _LANGUAGE_LISTS_MAX:
+            shared = _LANGUAGE_LISTS.setdefault(key, shared)
+    return shared
 
 
 class IdentifiableEntity:
     """
     Base class for all identifiable entities.
+
+    The models use ``__slots__`` instead of a per-instance ``__dict__``, and
+    their getters return a FrozenList held by the entity instead of copying
+    a list on every call. Identifiers are an insertion-ordered set kept as a
+    FrozenList (entities have one or two); a dict index for O(1) membership
+    is added once there are more than a few.
     """
     
+    __slots__ = ('_ids', '_ids_index', '__weakref__')
+    
+    # Number of identifiers from which membership uses a dict index
+    _INDEX_THRESHOLD = 8
+    
     def __init__(self):
-        self._ids: List[str] = []
+        self._ids: FrozenList = _EMPTY
+        self._ids_index: Optional[Dict[str, None]] = None
     
     def getIds(self) -> List[str]:
         """
         Return the list of entity identifiers.
 
         Returns:
-            List[str]: List of identifiers
+            List[str]: Read-only list of identifiers (a FrozenList)
         """
-        return self._ids.copy()
+        return self._ids
     
     def addId(self, entity_id: str) -> None:
         """
@@ -31,8 +96,16 @@ class IdentifiableEntity:
         Args:
             entity_id (str): Identifier to add
         """
-        if entity_id and entity_id not in self._ids:
-            self._ids.append(entity_id)
+        if not entity_id:
+            return
+        index = self._ids_index
+        if entity_id in (self._ids if index is None else index):
+            return
+        self._ids = FrozenList((*self._ids, entity_id))
+        if index is not None:
+            index[entity_id] = None
+        elif len(self._ids) >= self._INDEX_THRESHOLD:
+            self._ids_index = dict.fromkeys(self._ids)
     
     def setId(self, entity_id: str) -> None:
         """
@@ -41,32 +114,45 @@ class IdentifiableEntity:
         Args:
             entity_id (str): Identifier
         """
-        self._ids = [entity_id] if entity_id else []
+        self._ids = FrozenList((entity_id,)) if entity_id else _EMPTY
+        self._ids_index = None
 
 
 class Journal(IdentifiableEntity):
     """
     Journal class with metadata from DOAJ.
+
+    Categories and areas are insertion-ordered sets backed by a dict (None
+    while empty) with a cached FrozenList view. Licence, language and publisher
+    strings are interned: the same few values repeat across thousands of
+    journals. A query engine can set a relation loader that fills the
+    categories and areas when either is first read.
     """
     
+    __slots__ = ('_title', '_languages', '_publisher', '_seal', '_licence', '_apc',
+                 '_categories', '_categories_view', '_areas', '_areas_view', '_relation_loader')
+    
     def __init__(self):
         super().__init__()
         self._title: str = ""
-        self._languages: List[str] = []
+        self._languages: FrozenList = _EMPTY
         self._publisher: Optional[str] = None
         self._seal: bool = False
         self._licence: str = ""
         self._apc: bool = False
-        self._categories: List['Category'] = []
-        self._areas: List['Area'] = []
+        self._categories: Optional[Dict['Category', None]] = None
+        self._categories_view: Optional[FrozenList] = _EMPTY
+        self._areas: Optional[Dict['Area', None]] = None
+        self._areas_view: Optional[FrozenList] = _EMPTY
+        self._relation_loader: Optional[Any] = None
     
     def getTitle(self) -> str:
         """Return the journal title."""
         return self._title
     
     def getLanguages(self) -> List[str]:
-        """Return the journal languages list."""
-        return self._languages.copy()
+        """Return the journal languages list (read-only)."""
+        return self._languages
     
     def getPublisher(self) -> Optional[str]:
         """Return the journal publisher."""
@@ -85,24 +171,32 @@ class Journal(IdentifiableEntity):
         return self._apc
     
     def getCategories(self) -> List['Category']:
-        """Return related categories."""
-        return self._categories.copy()
+        """Return the list of related categories (read-only)."""
+        if self._relation_loader is not None:
+            self._relation_loader.load(self)
+        if self._categories_view is None:
+            self._categories_view = FrozenList(self._categories) if self._categories else _EMPTY
+        return self._categories_view
     
     def getAreas(self) -> List['Area']:
-        """Return related areas."""
-        return self._areas.copy()
+        """Return the list of related areas (read-only)."""
+        if self._relation_loader is not None:
+            self._relation_loader.load(self)
+        if self._areas_view is None:
+            self._areas_view = FrozenList(self._areas) if self._areas else _EMPTY
+        return self._areas_view
     
     def setTitle(self, title: str) -> None:
         """Set the journal title."""
         self._title = title
     
-    def setLanguages(self, languages: List[str]) -> None:
+    def setLanguages(self, languages: Iterable[str]) -> None:
         """Set the journal languages."""
-        self._languages = languages.copy() if languages else []
+        self._languages = _language_list(languages) if languages else _EMPTY
     
     def setPublisher(self, publisher: Optional[str]) -> None:
         """Set the journal publisher."""
-        self._publisher = publisher
+        self._publisher = _intern(publisher)
     
     def setSeal(self, seal: bool) -> None:
         """Set the presence of DOAJ Seal."""
@@ -110,21 +204,53 @@ class Journal(IdentifiableEntity):
     
     def setLicence(self, licence: str) -> None:
         """Set the journal licence."""
-        self._licence = licence
+        self._licence = _intern(licence)
     
     def setAPC(self, apc: bool) -> None:
         """Set whether APC applies."""
         self._apc = apc
     
+    def setRelationLoader(self, loader: Optional[Any]) -> None:
+        """
+        Set the object loading the categories and areas on first access.
+
+        Args:
+            loader: Object whose load(journal) adds them (see RelationBatch), or None
+        """
+        self._relation_loader = loader
+    
+    def __getstate__(self):
+        # Copies and pickles carry the loaded relations, not the loader
+        if self._relation_loader is not None:
+            self._relation_loader.load(self)
+        slots = {
+            name: getattr(self, name)
+            for cls in type(self).__mro__ for name in getattr(cls, '__slots__', ())
+            if not name.startswith('__') and hasattr(self, name)
+        }
+        return None, slots
+    
     def addCategory(self, category: 'Category') -> None:
         """Add a category to the journal."""
-        if category and category not in self._categories:
-            self._categories.append(category)
+        if not category:
+            return
+        if self._categories is None:
+            self._categories = {}
+        elif category in self._categories:
+            return
+        self._categories[category] = None
+        self._categories_view = None
     
     def addArea(self, area: 'Area') -> None:
         """Add an area to the journal."""
-        if area and area not in self._areas:
-            self._areas.append(area)
+        if not area:
+            return
+        if self._areas is None:
+            self._areas = {}
+        elif area in self._areas:
+            return
+        self._areas[area] = None
+        self._areas_view = None
 
 
 class Category(IdentifiableEntity):
@@ -132,6 +258,8 @@ class Category(IdentifiableEntity):
     Category class from Scimago Journal Rank.
     """
     
+    __slots__ = ('_quartile',)
+    
     def __init__(self):
         super().__init__()
         self._quartile: Optional[str] = None
@@ -142,7 +270,7 @@ class Category(IdentifiableEntity):
     
     def setQuartile(self, quartile: Optional[str]) -> None:
         """Set the category quartile."""
-        self._quartile = quartile
+        self._quartile = _intern(quartile)
 
 
 class Area(IdentifiableEntity):
@@ -150,5 +278,7 @@ class Area(IdentifiableEntity):
     Area class from Scimago Journal Rank.
     """
     
+    __slots__ = ()
+    
     def __init__(self):
         super().__init__()
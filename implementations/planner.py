@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+"""
+Cost-based planning of the FullQueryEngine mashup queries.
+Contains classes: CardinalityStatistics, QueryPlan, QueryPlanner
+"""
+
+import math
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class CardinalityStatistics:
+    """
+    Cardinalities of the journal and relational stores, summed over handlers.
+
+    The journal side counts journals in total, with APC, with DOAJ Seal and
+    per licence; the relational side counts ISSNs per area and per
+    (category, quartile) pair. The estimates are upper bounds.
+    """
+
+    def __init__(self):
+        self._journals: int = 0
+        self._with_apc: int = 0
+        self._with_seal: int = 0
+        self._licences: Dict[str, int] = {}
+        self._area_issns: Dict[str, int] = {}
+        self._category_quartile_issns: Dict[Tuple[str, Optional[str]], int] = {}
+        self._categorized_issns: int = 0
+        self._total_area_issns: int = 0
+        self._complete: bool = True
+
+    def addJournalStatistics(self, statistics: Dict[str, Any]) -> None:
+        """Add the result of a journal handler's getStatistics."""
+        if not statistics:
+            self._complete = False
+            return
+        self._journals += statistics.get('journals', 0)
+        self._with_apc += statistics.get('with_apc', 0)
+        self._with_seal += statistics.get('with_seal', 0)
+        for licence, count in statistics.get('licences', {}).items():
+            self._licences[licence] = self._licences.get(licence, 0) + count
+
+    def addCategoryStatistics(self, statistics: Dict[str, Any]) -> None:
+        """Add the result of a category handler's getStatistics."""
+        if not statistics:
+            self._complete = False
+            return
+        for area_id, count in statistics.get('areas', {}).items():
+            self._area_issns[area_id] = self._area_issns.get(area_id, 0) + count
+        for key, count in statistics.get('category_quartiles', {}).items():
+            self._category_quartile_issns[key] = self._category_quartile_issns.get(key, 0) + count
+        self._categorized_issns += statistics.get('categorized_issns', 0)
+        self._total_area_issns += statistics.get('area_issns', 0)
+
+    def markIncomplete(self) -> None:
+        """Record that a handler could not provide statistics."""
+        self._complete = False
+
+    def isComplete(self) -> bool:
+        """Return True if every handler provided statistics."""
+        return self._complete
+
+    def journals(self) -> int:
+        """Number of journals."""
+        return self._journals
+
+    def licensedJournals(self, licenses: Set[str]) -> int:
+        """Estimated number of journals with one of the licenses (all journals if none given)."""
+        if not licenses:
+            return self._journals
+        return min(self._journals, sum(self._licences.get(licence, 0) for licence in licenses))
+
+    def diamondJournals(self) -> int:
+        """Number of journals without APC."""
+        return max(0, self._journals - self._with_apc)
+
+    def issnsInAreas(self, area_ids: Set[str]) -> int:
+        """Estimated number of ISSNs in any of the areas."""
+        return min(self._total_area_issns, sum(self._area_issns.get(area_id, 0) for area_id in area_ids))
+
+    def issnsInCategories(self, category_ids: Set[str], quartiles: Set[str]) -> int:
+        """Estimated number of ISSNs in any of the categories with one of the quartiles."""
+        total = sum(
+            count for (category_id, quartile), count in self._category_quartile_issns.items()
+            if (not category_ids or category_id in category_ids) and (not quartiles or quartile in quartiles)
+        )
+        return min(self._categorized_issns, total)
+
+
+class QueryPlan:
+    """
+    Evaluation plan chosen for one mashup query.
+    """
+
+    def __init__(self, query: str, strategy: str, steps: List[str], cost: float,
+                 alternatives: Optional[Dict[str, float]] = None, estimated: bool = True):
+        """
+        Args:
+            query (str): Name of the engine method
+            strategy (str): One of the QueryPlanner strategies
+            steps (List[str]): Human-readable evaluation steps, in order
+            cost (float): Estimated cost of the plan
+            alternatives (Dict[str, float], optional): Estimated cost of the rejected strategies
+            estimated (bool): False when no statistics were available and the default plan is used
+        """
+        self._query: str = query
+        self._strategy: str = strategy
+        self._steps: List[str] = steps
+        self._cost: float = cost
+        self._alternatives: Dict[str, float] = alternatives or {}
+        self._estimated: bool = estimated
+
+    def getStrategy(self) -> str:
+        """Return the chosen strategy."""
+        return self._strategy
+
+    def getCost(self) -> float:
+        """Return the estimated cost of the plan."""
+        return self._cost
+
+    def explain(self) -> str:
+        """Return a text description of the plan."""
+        cost = f"cost {self._cost:.2f}" if self._estimated else "no statistics, default plan"
+        lines = [f"{self._query}: {self._strategy} ({cost})"]
+        lines.extend(f"  {number}. {step}" for number, step in enumerate(self._steps, start=1))
+        for strategy, alternative_cost in self._alternatives.items():
+            lines.append(f"  rejected: {strategy} (cost {alternative_cost:.2f})")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"QueryPlan({self._query!r}, {self._strategy!r}, cost={self._cost:.2f})"
+
+
+class QueryPlanner:
+    """
+    Chooses the evaluation order of the FullQueryEngine mashup queries.
+
+    A mashup combines an ISSN set from the relational store with journals
+    from the journal store. It can either resolve the ISSN set first and
+    push it (with the journal predicates) into the journal store in VALUES
+    batches (ISSNS_FIRST), scan the journal store for journals in sorted
+    ranges covering the ISSN set and check the exact ISSNs on the client
+    (SEMI_JOIN, for very large sets), or query the journal store with its
+    own predicate and filter the journals by ISSN on the client
+    (JOURNALS_FIRST). The cost of a plan is its number of journal store
+    requests times request_cost, plus its estimated number of transferred
+    rows times row_cost, plus scan_cost for every journal a semi-join page
+    request examines.
+
+    Statistics are collected from the handlers' getStatistics (COUNT
+    queries on the stores) on first use, and again when the engine's data
+    version changes: after an upload, a new store version (written by any
+    process, see BasicQueryEngine.STORE_CHECK_INTERVAL) or a handler change.
+    Without statistics the planner keeps the default plan of each query.
+    """
+
+    ISSNS_FIRST = 'issns_first'
+    SEMI_JOIN = 'semi_join'
+    JOURNALS_FIRST = 'journals_first'
+
+    def __init__(self, engine, request_cost: float = 1.0, row_cost: float = 0.01,
+                 scan_cost: float = 0.001):
+        """
+        Args:
+            engine (FullQueryEngine): Engine whose handlers are planned for
+            request_cost (float): Cost of one journal store request
+            row_cost (float): Cost of transferring one journal row
+            scan_cost (float): Cost of examining one journal in a semi-join page request
+        """
+        self._engine = engine
+        self._request_cost: float = request_cost
+        self._row_cost: float = row_cost
+        self._scan_cost: float = scan_cost
+        self._statistics: Optional[CardinalityStatistics] = None
+        self._statistics_key: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def getStatistics(self) -> CardinalityStatistics:
+        """Return the statistics of the engine's handlers, collecting them if needed."""
+        key = (
+            self._engine._data_version(),
+            tuple(id(handler) for handler in self._engine._journalQuery),
+            tuple(id(handler) for handler in self._engine._categoryQuery),
+        )
+        with self._lock:
+            if self._statistics is None or self._statistics_key != key:
+                self._statistics = self._collect()
+                self._statistics_key = key
+            return self._statistics
+
+    def invalidate(self) -> None:
+        """Drop the collected statistics; they are collected again on next use."""
+        with self._lock:
+            self._statistics = None
+            self._statistics_key = None
+
+    def _collect(self) -> CardinalityStatistics:
+        """Query every handler for its statistics."""
+        statistics = CardinalityStatistics()
+        for handlers, add in (
+            (self._engine._journalQuery, statistics.addJournalStatistics),
+            (self._engine._categoryQuery, statistics.addCategoryStatistics),
+        ):
+            supported = [handler for handler in handlers if hasattr(handler, 'getStatistics')]
+            if len(supported) != len(handlers):
+                statistics.markIncomplete()
+            answered = 0
+            for result in self._engine._fan_out(supported, 'getStatistics'):
+                add(result)
+                answered += 1
+            if answered != len(supported):
+                statistics.markIncomplete()
+        return statistics
+
+    # Plans
+
+    def planJournalsInCategoriesWithQuartile(self, category_ids: Set[str],
+                                             quartiles: Set[str]) -> QueryPlan:
+        """Plan getJournalsInCategoriesWithQuartile."""
+        query = 'getJournalsInCategoriesWithQuartile'
+        resolve = f"categories: ISSNs in {self._describe(category_ids, 'category')} with {self._describe(quartiles, 'quartile')}"
+        statistics = self.getStatistics()
+        if not statistics.isComplete():
+            return QueryPlan(query, self.ISSNS_FIRST,
+                             [resolve, "journals: journals by ISSN"], 0.0, estimated=False)
+        issns = statistics.issnsInCategories(category_ids, quartiles)
+        journals = statistics.journals()
+        return self._choose(query, {
+            self.ISSNS_FIRST: self._issns_first(
+                resolve, issns, min(issns, journals), "journals: journals by ISSN"),
+            self.SEMI_JOIN: self._semi_join(
+                resolve, issns, journals, journals, "journals: journals"),
+            self.JOURNALS_FIRST: self._journals_first(
+                resolve, journals, "journals: all journals"),
+        }, self.ISSNS_FIRST)
+
+    def planJournalsInAreasWithLicense(self, area_ids: Set[str], licenses: Set[str]) -> QueryPlan:
+        """Plan getJournalsInAreasWithLicense."""
+        query = 'getJournalsInAreasWithLicense'
+        licence_step = f"journals: journals with {self._describe(licenses, 'licence')}"
+        statistics = self.getStatistics()
+        if not area_ids:
+            return QueryPlan(query, self.JOURNALS_FIRST, [licence_step],
+                             self._journals_cost(statistics.licensedJournals(licenses)),
+                             estimated=statistics.isComplete())
+        resolve = f"categories: ISSNs in {self._describe(area_ids, 'area')}"
+        if not statistics.isComplete():
+            return QueryPlan(query, self.JOURNALS_FIRST,
+                             [resolve, licence_step, "client: keep journals with those ISSNs"],
+                             0.0, estimated=False)
+        issns = statistics.issnsInAreas(area_ids)
+        journals = statistics.journals()
+        licensed = statistics.licensedJournals(licenses)
+        return self._choose(query, {
+            self.ISSNS_FIRST: self._issns_first(
+                resolve, issns, self._scaled(min(issns, journals), licensed, journals),
+                f"journals: journals by ISSN with {self._describe(licenses, 'licence')}"),
+            self.SEMI_JOIN: self._semi_join(resolve, issns, licensed, journals, licence_step),
+            self.JOURNALS_FIRST: self._journals_first(resolve, licensed, licence_step),
+        }, self.JOURNALS_FIRST)
+
+    def planDiamondJournals(self, area_ids: Set[str], category_ids: Set[str],
+                            quartiles: Set[str]) -> QueryPlan:
+        """Plan getDiamondJournalsInAreasAndCategoriesWithQuartile."""
+        query = 'getDiamondJournalsInAreasAndCategoriesWithQuartile'
+        resolve = (f"categories: ISSNs in {self._describe(area_ids, 'area')} and in "
+                   f"{self._describe(category_ids, 'category')} with {self._describe(quartiles, 'quartile')}")
+        diamond_step = "journals: journals without APC"
+        statistics = self.getStatistics()
+        if not statistics.isComplete():
+            return QueryPlan(query, self.ISSNS_FIRST,
+                             [resolve, "journals: journals by ISSN without APC"], 0.0, estimated=False)
+        issns = statistics.issnsInCategories(category_ids, quartiles)
+        if area_ids:
+            issns = min(issns, statistics.issnsInAreas(area_ids))
+        journals = statistics.journals()
+        diamond = statistics.diamondJournals()
+        return self._choose(query, {
+            self.ISSNS_FIRST: self._issns_first(
+                resolve, issns, self._scaled(min(issns, journals), diamond, journals),
+                "journals: journals by ISSN without APC"),
+            self.SEMI_JOIN: self._semi_join(resolve, issns, diamond, journals, diamond_step),
+            self.JOURNALS_FIRST: self._journals_first(resolve, diamond, diamond_step),
+        }, self.ISSNS_FIRST)
+
+    # Cost model
+
+    def _issns_first(self, resolve: str, issns: int, rows: int, fetch: str) -> Tuple[float, List[str]]:
+        """Cost and steps of resolving the ISSNs first and pushing them into the journal store."""
+        requests = len(self._engine._journalQuery) * math.ceil(issns / self._engine.ISSN_BATCH_SIZE)
+        cost = requests * self._request_cost + rows * self._row_cost
+        return cost, [
+            f"{resolve} (est. {issns} ISSNs)",
+            f"{fetch}: {requests} request(s) of up to {self._engine.ISSN_BATCH_SIZE} ISSNs (est. {rows} rows)",
+        ]
+
+    def _semi_join(self, resolve: str, issns: int, matching: int, journals: int,
+                   fetch: str) -> Tuple[float, List[str]]:
+        """Cost and steps of scanning the journal store for journals in ISSN ranges."""
+        engine = self._engine
+        groups = max(1, math.ceil(issns / engine.SEMI_JOIN_GROUP_SIZE))
+        ranges = min(issns, groups * engine.SEMI_JOIN_MAX_RANGES)
+        candidates = min(journals, min(issns, journals) + math.ceil(journals * self._range_coverage(issns, ranges)))
+        pages = groups + candidates // engine.SEMI_JOIN_PAGE_SIZE
+        requests = len(engine._journalQuery) * pages
+        rows = self._scaled(candidates, matching, journals)
+        # Each group query examines the journals of its part of the identifier order
+        scanned = len(engine._journalQuery) * math.ceil(journals * pages / groups)
+        cost = requests * self._request_cost + rows * self._row_cost + scanned * self._scan_cost
+        return cost, [
+            f"{resolve} (est. {issns} ISSNs)",
+            f"{fetch} in {groups} group(s) of up to {engine.SEMI_JOIN_MAX_RANGES} ISSN ranges: "
+            f"{requests} page request(s) of up to {engine.SEMI_JOIN_PAGE_SIZE} journals (est. {rows} rows)",
+            "client: keep rows with exactly those ISSNs",
+        ]
+
+    @staticmethod
+    def _range_coverage(identifiers: int, ranges: int) -> float:
+        """
+        Share of the identifier space covered when `identifiers` values are split
+        into `ranges` ranges at the widest gaps, assuming uniformly spread values
+        (the worst case: real ISSNs cluster in publisher and country blocks).
+        """
+        if identifiers <= ranges:
+            return 0.0
+        merged = 1 - ranges / identifiers
+        return merged + (1 - merged) * math.log(1 - merged)
+
+    def _journals_first(self, resolve: str, rows: int, fetch: str) -> Tuple[float, List[str]]:
+        """Cost and steps of querying the journal store first and filtering by ISSN on the client."""
+        return self._journals_cost(rows), [
+            f"{fetch}: {len(self._engine._journalQuery)} request(s) (est. {rows} rows)",
+            resolve,
+            "client: keep journals with those ISSNs",
+        ]
+
+    def _journals_cost(self, rows: int) -> float:
+        """Cost of one request per journal handler transferring `rows` rows."""
+        return len(self._engine._journalQuery) * self._request_cost + rows * self._row_cost
+
+    def _choose(self, query: str, candidates: Dict[str, Tuple[float, List[str]]], default: str) -> QueryPlan:
+        """Return the cheapest candidate plan; ties keep the default strategy."""
+        if not all(hasattr(handler, 'getJournalsInIssnRanges') for handler in self._engine._journalQuery):
+            candidates.pop(self.SEMI_JOIN, None)
+        strategy = min(candidates, key=lambda name: (candidates[name][0], name != default))
+        cost, steps = candidates[strategy]
+        alternatives = {name: candidate[0] for name, candidate in candidates.items() if name != strategy}
+        return QueryPlan(query, strategy, steps, cost, alternatives)
+
+    @staticmethod
+    def _scaled(rows: int, matching: int, total: int) -> int:
+        """Scale `rows` by the selectivity matching / total."""
+        return rows if total <= 0 else math.ceil(rows * min(matching, total) / total)
+
+    @staticmethod
+    def _describe(values: Set[str], noun: str) -> str:
+        """Describe a filter set for explain()."""
+        if not values:
+            return f"any {noun}"
+        return f"{len(values)} {noun}(s)"
@@ -4,20 +4,214 @@ Query engines for performing complex queries against databases.
 Contains classes: BasicQueryEngine, FullQueryEngine
 """
 
+import bisect
+import functools
+import itertools
 import math
-from typing import Dict, Iterable, List, Set, Optional
-from .models import Journal, Category, Area, IdentifiableEntity
+import operator
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Optional
+from .handlers import Handler, check_page
+from .models import Journal, Category, Area, IdentifiableEntity, FrozenList
 from .query_handlers import JournalQueryHandler, CategoryQueryHandler
+from .result_sets import JournalResultSet
+from .identity_map import IdentityMap, MissCache
+from .planner import QueryPlanner
+from .relations import RelationLoader
+from .mirror import LocalMirror, MirrorJournalQueryHandler, MirrorCategoryQueryHandler
 
 
 class BasicQueryEngine:
     """
     Basic query engine for working with journals and categories.
+
+    Calls to the registered handlers are fanned out on a bounded thread pool
+    and their results are merged in registration order, so the returned
+    entities are the same as with a sequential loop over the handlers.
+    Journal queries return a lazy JournalResultSet, and entities are shared
+    across queries through an identity map until the data changes: an upload
+    in this process, or a new version of one of the stores (checked at most
+    once per STORE_CHECK_INTERVAL seconds), so writes from other processes
+    are seen as well. The journal get* methods take an optional `limit` and
+    `offset` selecting one page in title order; negative values raise
+    ValueError. The iter*
+    methods stream the same entities, reading the handlers in keyset pages.
+    The categories and areas of returned journals are loaded from the
+    category handlers for a whole result at once (see RelationLoader).
     """
     
-    def __init__(self):
+    # Number of ISSNs sent to a journal handler in one getJournalsByIssns call
+    ISSN_BATCH_SIZE = 50
+    
+    # Number of journals (or category and area rows) per handler page of the iter* methods
+    PAGE_SIZE = 1000
+    
+    # Seconds between two reads of the store versions (see QueryHandler.getStoreVersion)
+    STORE_CHECK_INTERVAL = 1.0
+    
+    def __init__(self, max_workers: int = 8, timeout: Optional[float] = None,
+                 identity_map: bool = True, identity_map_size: Optional[int] = None,
+                 miss_cache_size: int = 4096, relations: Optional[str] = 'lazy'):
+        """
+        Args:
+            max_workers (int): Maximum number of handler calls running concurrently
+            timeout (float, optional): Seconds each handler call may run, counted
+                from its start; calls that have not answered by then are skipped
+            identity_map (bool): Share one instance per journal, category and area across queries
+            identity_map_size (int, optional): Keep this many recently used entities alive
+                instead of sharing them only while referenced
+            miss_cache_size (int): Number of unknown identifiers remembered by the
+                entity lookups until the data changes, as for the identity map
+                (0 disables the cache)
+            relations (str, optional): When to load the categories and areas of the
+                returned journals: 'lazy' (first getCategories() or getAreas() call on
+                any journal of a result), 'eager' (when the first journal of a result
+                is built) or None (never; they stay empty)
+
+        Raises:
+            ValueError: If `relations` is not one of these values
+        """
         self._journalQuery: List[JournalQueryHandler] = []
         self._categoryQuery: List[CategoryQueryHandler] = []
+        self._max_workers: int = max(1, max_workers)
+        self._timeout: Optional[float] = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # (handler ids, store versions, monotonic time of the read) of the last store check
+        self._store_versions: Optional[tuple] = None
+        self._store_lock = threading.Lock()
+        self._identity: Optional[IdentityMap] = (
+            IdentityMap(identity_map_size, self._data_version) if identity_map else None
+        )
+        self._misses: Optional[MissCache] = MissCache(miss_cache_size, self._data_version) if miss_cache_size > 0 else None
+        self._mirror: Optional[LocalMirror] = None
+        self._mirror_sources: Optional[tuple] = None
+        self._relations: Optional[RelationLoader] = RelationLoader(self, relations) if relations else None
+    
+    def clearIdentityMap(self) -> None:
+        """Forget the shared entities; later queries build new instances."""
+        if self._identity is not None:
+            self._identity.clear()
+    
+    def _data_version(self) -> tuple:
+        """
+        Return the version of the data the engine reads.
+
+        It combines the process data generation (see Handler.getDataGeneration)
+        with the version of every registered store (see
+        QueryHandler.getStoreVersion); the stores are asked again at most once
+        per STORE_CHECK_INTERVAL seconds, and whenever handlers are added.
+        """
+        if self._store_versions_stale():
+            self._refresh_store_versions()
+        return (Handler.getDataGeneration(), self._store_versions[1])
+
+    def _store_handlers(self) -> List[Any]:
+        """Return the handlers whose store versions make up the data version."""
+        return list(self._journalQuery) + list(self._categoryQuery)
+
+    def _store_versions_stale(self) -> bool:
+        """Tell whether the store versions must be read again."""
+        versions = self._store_versions
+        return (versions is None
+                or versions[0] != tuple(id(handler) for handler in self._store_handlers())
+                or time.monotonic() - versions[2] >= self.STORE_CHECK_INTERVAL)
+
+    def _refresh_store_versions(self) -> None:
+        """Read the version of every store; a store that cannot tell counts as None."""
+        with self._store_lock:
+            if not self._store_versions_stale():
+                return
+            handlers = self._store_handlers()
+            versions = []
+            for handler in handlers:
+                try:
+                    versions.append(handler.getStoreVersion() if hasattr(handler, 'getStoreVersion') else None)
+                except Exception as e:
+                    print(f"Error while reading the store version: {e}")
+                    versions.append(None)
+            self._store_versions = (tuple(id(handler) for handler in handlers), tuple(versions), time.monotonic())
+
+    def close(self) -> None:
+        """Shut down the thread pool used to query the handlers; it is recreated when needed."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def enableMirror(self, directory: str, check_interval: float = 1.0) -> bool:
+        """
+        Answer every query from a LocalMirror instead of the registered handlers.
+
+        With handlers registered, the mirror in `directory` is built from them
+        when it has no version yet and rebuilt, then swapped in atomically,
+        after every upload in this process. Without handlers, an existing
+        mirror (e.g. written by ``python -m implementations.mirror``) is
+        opened read-only; versions published by other processes are picked up
+        within check_interval seconds in both cases.
+
+        Args:
+            directory (str): Mirror directory
+            check_interval (float): Seconds between two checks for a new version
+
+        Returns:
+            bool: True if the mirror is in use
+        """
+        try:
+            self.disableMirror()
+            mirror = LocalMirror(directory, check_interval)
+            if self._journalQuery or self._categoryQuery:
+                mirror.attachSources(self._journalQuery, self._categoryQuery)
+            version = mirror.current()
+            self._mirror_sources = (self._journalQuery, self._categoryQuery)
+            self._journalQuery = [MirrorJournalQueryHandler(mirror)]
+            self._categoryQuery = [
+                MirrorCategoryQueryHandler(mirror, index) for index in range(version.relationalCount())
+            ]
+            self._mirror = mirror
+            self._forget_misses()
+            return True
+        except Exception as e:
+            print(f"Error while opening the local mirror: {e}")
+            return False
+    
+    def disableMirror(self) -> bool:
+        """
+        Go back to querying the handlers registered before enableMirror.
+
+        Returns:
+            bool: True if the engine no longer uses a mirror
+        """
+        if self._mirror is None:
+            return True
+        for handler in self._categoryQuery:
+            handler.close()
+        self._journalQuery, self._categoryQuery = self._mirror_sources
+        self._mirror, self._mirror_sources = None, None
+        self._forget_misses()
+        return True
+    
+    def refreshMirror(self) -> bool:
+        """
+        Rebuild the mirror from the handlers registered before enableMirror and publish it.
+
+        Returns:
+            bool: True if a new version was published
+        """
+        if self._mirror is None or not any(self._mirror_sources):
+            return False
+        try:
+            self._mirror.build(*self._mirror_sources)
+            self._mirror.current()
+            return True
+        except Exception as e:
+            print(f"Error while refreshing the local mirror: {e}")
+            return False
     
     def cleanJournalHandlers(self) -> bool:
         """
@@ -28,6 +222,7 @@ class BasicQueryEngine:
         """
         try:
             self._journalQuery.clear()
+            self._forget_misses()
             return True
         except Exception:
             return False
@@ -41,6 +236,7 @@ class BasicQueryEngine:
         """
         try:
             self._categoryQuery.clear()
+            self._forget_misses()
             return True
         except Exception:
             return False
@@ -58,6 +254,7 @@ class BasicQueryEngine:
         try:
             if handler and handler not in self._journalQuery:
                 self._journalQuery.append(handler)
+                self._forget_misses()
             return True
         except Exception:
             return False
@@ -75,6 +272,7 @@ class BasicQueryEngine:
         try:
             if handler and handler not in self._categoryQuery:
                 self._categoryQuery.append(handler)
+                self._forget_misses()
             return True
         except Exception:
             return False
@@ -90,152 +288,288 @@ class BasicQueryEngine:
             IdentifiableEntity or None: Found entity or None
         """
         try:
-            # Search in journals
-            for handler in self._journalQuery:
-                df = handler.getById(entity_id)
-                if not df.empty:
-                    return self._dataframe_to_journal(df.iloc[0])
+            if self._misses is not None and entity_id in self._misses:
+                return None
             
-            # Search in categories
-            for handler in self._categoryQuery:
-                df = handler.getById(entity_id)
-                if not df.empty:
-                    row = df.iloc[0]
-                    if 'quartile' in row:
-                        return self._dataframe_to_category(row)
-                    else:
-                        return self._dataframe_to_area(row)
+            # Only the handlers that can hold this kind of identifier are
+            # queried, together; the first hit in registration order
+            # (journals before categories) wins
+            journal_handlers, category_handlers = self._route_handlers(entity_id)
+            handlers = journal_handlers + category_handlers
+            answered = 0
+            for index, df in self._fan_out_indexed(handlers, 'getById', entity_id):
+                answered += 1
+                if df.empty:
+                    continue
+                if index < len(journal_handlers):
+                    return self._with_relations(self._dataframe_to_journal(df.iloc[0]))
+                row = df.iloc[0]
+                if 'quartile' in row:
+                    return self._dataframe_to_category(row)
+                else:
+                    return self._dataframe_to_area(row)
             
+            # A handler that timed out may still hold the entity
+            if answered == len(handlers):
+                self._remember_misses([entity_id])
             return None
             
         except Exception as e:
             print(f"Error while searching for entity by ID: {e}")
             return None
     
-    def getAllJournals(self) -> List[Journal]:
+    def getEntitiesByIds(self, entity_ids: Iterable[str]) -> Dict[str, Optional[IdentifiableEntity]]:
         """
-        Return all journals.
+        Return entities for many identifiers at once.
+
+        Each handler is queried once per chunk of identifiers (see the
+        handlers' getByIds) instead of once per identifier. Precedence is
+        the same as in getEntityById: journals first, then categories, then
+        areas, in handler registration order.
+
+        Args:
+            entity_ids (Iterable[str]): Entity identifiers
 
         Returns:
-            List[Journal]: List of all journals
+            Dict[str, IdentifiableEntity or None]: Entity (or None) for every requested identifier
         """
-        journal_map: Dict[str, Journal] = {}
+        requested = [entity_id for entity_id in dict.fromkeys(entity_ids) if entity_id]
+        result: Dict[str, Optional[IdentifiableEntity]] = {entity_id: None for entity_id in requested}
         
         try:
-            for handler in self._journalQuery:
-                df = handler.getAllJournals()
-                self._collect_journals(df, journal_map)
+            # Every handler gets the identifiers it can hold, concurrently;
+            # resolving in registration order keeps the precedence of the
+            # sequential lookup
+            remaining = self._unknown_identifiers(requested)
+            journal_ids, category_ids = self._route_identifiers(remaining)
+            calls = []
+            if journal_ids:
+                calls += [functools.partial(handler.getByIds, journal_ids) for handler in self._journalQuery]
+            journal_calls = len(calls)
+            if category_ids:
+                calls += [functools.partial(handler.getByIdsRows, category_ids) for handler in self._categoryQuery]
+            answered = 0
+            for index, found in self._fan_out_calls(calls):
+                answered += 1
+                if index < journal_calls:
+                    self._resolve_journal_ids(found, remaining, result)
+                else:
+                    self._resolve_category_ids(found, remaining, result)
             
-            return list(journal_map.values())
+            if answered == len(calls):
+                self._remember_misses(remaining)
+            return result
+            
+        except Exception as e:
+            print(f"Error while searching for entities by IDs: {e}")
+            return result
+    
+    # Identifier routing: ISSNs live in the journal stores, anything else
+    # (category and area names) in the relational stores
+    _ISSN_PATTERN = re.compile(r'^\d{4}-?\d{3}[\dXx]$')
+    
+    @classmethod
+    def _classify_identifier(cls, entity_id: str) -> str:
+        """
+        Decide which kind of store can hold an identifier.
+
+        Args:
+            entity_id (str): Entity identifier
+
+        Returns:
+            str: 'journal' for an ISSN with a valid check digit, 'any' for an
+            ISSN-shaped value with a wrong check digit (stored data may contain
+            such typos) and 'category' for anything else
+        """
+        value = str(entity_id).strip()
+        if not cls._ISSN_PATTERN.match(value):
+            return 'category'
+        digits = value.replace('-', '')
+        total = sum(int(digit) * weight for digit, weight in zip(digits[:7], range(8, 1, -1)))
+        check = (11 - total % 11) % 11
+        expected = 'X' if check == 10 else str(check)
+        return 'journal' if digits[7].upper() == expected else 'any'
+    
+    def _route_handlers(self, entity_id: str) -> tuple:
+        """Return the (journal handlers, category handlers) to ask for an identifier."""
+        kind = self._classify_identifier(entity_id)
+        journal_handlers = list(self._journalQuery) if kind != 'category' else []
+        category_handlers = list(self._categoryQuery) if kind != 'journal' else []
+        return journal_handlers, category_handlers
+    
+    def _route_identifiers(self, entity_ids: Iterable[str]) -> tuple:
+        """Split identifiers into the sets to ask the journal and the category handlers for."""
+        journal_ids: Set[str] = set()
+        category_ids: Set[str] = set()
+        for entity_id in entity_ids:
+            kind = self._classify_identifier(entity_id)
+            if kind != 'category':
+                journal_ids.add(entity_id)
+            if kind != 'journal':
+                category_ids.add(entity_id)
+        return journal_ids, category_ids
+    
+    def _unknown_identifiers(self, entity_ids: Iterable[str]) -> Set[str]:
+        """Return the identifiers not already known to match nothing."""
+        if self._misses is None:
+            return set(entity_ids)
+        return {entity_id for entity_id in entity_ids if entity_id not in self._misses}
+    
+    def _remember_misses(self, entity_ids: Iterable[str]) -> None:
+        """Record identifiers that no handler knows."""
+        if self._misses is not None:
+            for entity_id in entity_ids:
+                self._misses.add(entity_id)
+    
+    def _forget_misses(self) -> None:
+        """Drop the remembered misses; a new handler may know them."""
+        if self._misses is not None:
+            self._misses.clear()
+    
+    def _resolve_journal_ids(self, df, remaining: Set[str],
+                             result: Dict[str, Optional[IdentifiableEntity]]) -> None:
+        """Assign journals from a getByIds frame to the still unresolved identifiers."""
+        journal_map: Dict[str, Journal] = {}
+        self._collect_journals(df, journal_map)
+        if self._relations is not None:
+            self._relations.attach(journal_map.values())
+        for key, journal in journal_map.items():
+            if key in remaining:
+                result[key] = journal
+                remaining.discard(key)
+
+    def _resolve_category_ids(self, rows: List[tuple], remaining: Set[str],
+                              result: Dict[str, Optional[IdentifiableEntity]]) -> None:
+        """Assign categories (preferred) or areas from getByIdsRows tuples to unresolved identifiers."""
+        found: Dict[str, IdentifiableEntity] = {}
+        for identifier, quartile, entity_type in rows:
+            if entity_type == 'category':
+                found[identifier] = self._row_to_category(identifier, quartile)
+            elif identifier not in found:
+                found[identifier] = self._row_to_area(identifier)
+        for identifier, entity in found.items():
+            if identifier in remaining:
+                result[identifier] = entity
+                remaining.discard(identifier)
+    
+    def getAllJournals(self, limit: Optional[int] = None,
+                       offset: int = 0) -> List[Journal]:
+        """
+        Return all journals.
+
+        Args:
+            limit (int, optional): Maximum number of journals; a page is returned in title order
+            offset (int): Number of journals skipped, in title order
+
+        Returns:
+            List[Journal]: List of all journals
+        """
+        check_page(limit, offset)
+        try:
+            return self._journals('getAllJournals', limit=limit, offset=offset)
             
         except Exception as e:
             print(f"Error while fetching all journals: {e}")
             return []
     
-    def getJournalsWithTitle(self, partialTitle: str) -> List[Journal]:
+    def getJournalsWithTitle(self, partialTitle: str, limit: Optional[int] = None,
+                             offset: int = 0) -> List[Journal]:
         """
         Return journals with partial title match.
 
         Args:
             partialTitle (str): Partial title to search for
+            limit (int, optional): Maximum number of journals; a page is returned in title order
+            offset (int): Number of journals skipped, in title order
 
         Returns:
             List[Journal]: List of found journals
         """
-        journal_map: Dict[str, Journal] = {}
-        
+        check_page(limit, offset)
         try:
-            for handler in self._journalQuery:
-                df = handler.getJournalsWithTitle(partialTitle)
-                self._collect_journals(df, journal_map)
-            
-            return list(journal_map.values())
+            return self._journals('getJournalsWithTitle', partialTitle, limit=limit, offset=offset)
             
         except Exception as e:
             print(f"Error while searching journals by title: {e}")
             return []
     
-    def getJournalsPublishedBy(self, partialName: str) -> List[Journal]:
+    def getJournalsPublishedBy(self, partialName: str, limit: Optional[int] = None,
+                               offset: int = 0) -> List[Journal]:
         """
         Return journals with partial publisher name match.
 
         Args:
             partialName (str): Partial publisher name to search for
+            limit (int, optional): Maximum number of journals; a page is returned in title order
+            offset (int): Number of journals skipped, in title order
 
         Returns:
             List[Journal]: List of found journals
         """
-        journal_map: Dict[str, Journal] = {}
-        
+        check_page(limit, offset)
         try:
-            for handler in self._journalQuery:
-                df = handler.getJournalsPublishedBy(partialName)
-                self._collect_journals(df, journal_map)
-            
-            return list(journal_map.values())
+            return self._journals('getJournalsPublishedBy', partialName, limit=limit, offset=offset)
             
         except Exception as e:
             print(f"Error while searching journals by publisher: {e}")
             return []
     
-    def getJournalsWithLicense(self, licenses: Set[str]) -> List[Journal]:
+    def getJournalsWithLicense(self, licenses: Set[str], limit: Optional[int] = None,
+                               offset: int = 0) -> List[Journal]:
         """
         Return journals with specified licenses.
 
         Args:
             licenses (Set[str]): Set of licenses to search for
+            limit (int, optional): Maximum number of journals; a page is returned in title order
+            offset (int): Number of journals skipped, in title order
 
         Returns:
             List[Journal]: List of found journals
         """
-        journal_map: Dict[str, Journal] = {}
-        
+        check_page(limit, offset)
         try:
-            for handler in self._journalQuery:
-                df = handler.getJournalsWithLicense(licenses)
-                self._collect_journals(df, journal_map)
-            
-            return list(journal_map.values())
+            return self._journals('getJournalsWithLicense', licenses, limit=limit, offset=offset)
             
         except Exception as e:
             print(f"Error while searching journals by license: {e}")
             return []
     
-    def getJournalsWithAPC(self) -> List[Journal]:
+    def getJournalsWithAPC(self, limit: Optional[int] = None,
+                           offset: int = 0) -> List[Journal]:
         """
         Return journals that have Article Processing Charge (APC).
 
+        Args:
+            limit (int, optional): Maximum number of journals; a page is returned in title order
+            offset (int): Number of journals skipped, in title order
+
         Returns:
             List[Journal]: List of journals with APC
         """
-        journal_map: Dict[str, Journal] = {}
-        
+        check_page(limit, offset)
         try:
-            for handler in self._journalQuery:
-                df = handler.getJournalsWithAPC()
-                self._collect_journals(df, journal_map)
-            
-            return list(journal_map.values())
+            return self._journals('getJournalsWithAPC', limit=limit, offset=offset)
             
         except Exception as e:
             print(f"Error while searching journals with APC: {e}")
             return []
     
-    def getJournalsWithDOAJSeal(self) -> List[Journal]:
+    def getJournalsWithDOAJSeal(self, limit: Optional[int] = None,
+                                offset: int = 0) -> List[Journal]:
         """
         Return journals that have DOAJ Seal.
 
+        Args:
+            limit (int, optional): Maximum number of journals; a page is returned in title order
+            offset (int): Number of journals skipped, in title order
+
         Returns:
             List[Journal]: List of journals with DOAJ Seal
         """
-        journal_map: Dict[str, Journal] = {}
-        
+        check_page(limit, offset)
         try:
-            for handler in self._journalQuery:
-                df = handler.getJournalsWithDOAJSeal()
-                self._collect_journals(df, journal_map)
-            
-            return list(journal_map.values())
+            return self._journals('getJournalsWithDOAJSeal', limit=limit, offset=offset)
             
         except Exception as e:
             print(f"Error while searching journals with DOAJ Seal: {e}")
@@ -251,9 +585,8 @@ class BasicQueryEngine:
         category_map: Dict[str, Category] = {}
         
         try:
-            for handler in self._categoryQuery:
-                df = handler.getAllCategories()
-                self._collect_categories(df, category_map)
+            for rows in self._fan_out(self._categoryQuery, 'getAllCategoriesRows'):
+                self._collect_category_rows(rows, category_map)
             
             return list(category_map.values())
             
@@ -271,9 +604,8 @@ class BasicQueryEngine:
         area_map: Dict[str, Area] = {}
         
         try:
-            for handler in self._categoryQuery:
-                df = handler.getAllAreas()
-                self._collect_areas(df, area_map)
+            for rows in self._fan_out(self._categoryQuery, 'getAllAreasRows'):
+                self._collect_area_rows(rows, area_map)
             
             return list(area_map.values())
             
@@ -294,9 +626,8 @@ class BasicQueryEngine:
         category_map: Dict[str, Category] = {}
         
         try:
-            for handler in self._categoryQuery:
-                df = handler.getCategoriesWithQuartile(quartiles)
-                self._collect_categories(df, category_map)
+            for rows in self._fan_out(self._categoryQuery, 'getCategoriesWithQuartileRows', quartiles):
+                self._collect_category_rows(rows, category_map)
             
             return list(category_map.values())
             
@@ -317,9 +648,8 @@ class BasicQueryEngine:
         category_map: Dict[str, Category] = {}
         
         try:
-            for handler in self._categoryQuery:
-                df = handler.getCategoriesAssignedToAreas(area_ids)
-                self._collect_categories(df, category_map)
+            for rows in self._fan_out(self._categoryQuery, 'getCategoriesAssignedToAreasRows', area_ids):
+                self._collect_category_rows(rows, category_map)
             
             return list(category_map.values())
             
@@ -340,9 +670,8 @@ class BasicQueryEngine:
         area_map: Dict[str, Area] = {}
         
         try:
-            for handler in self._categoryQuery:
-                df = handler.getAreasAssignedToCategories(category_ids)
-                self._collect_areas(df, area_map)
+            for rows in self._fan_out(self._categoryQuery, 'getAreasAssignedToCategoriesRows', category_ids):
+                self._collect_area_rows(rows, area_map)
             
             return list(area_map.values())
             
@@ -350,20 +679,580 @@ class BasicQueryEngine:
             print(f"Error while searching areas by categories: {e}")
             return []
 
+    def iterAllJournals(self) -> Iterator[Journal]:
+        """
+        Streaming version of getAllJournals.
+
+        Yields:
+            Journal: Every journal, in journal URI order
+        """
+        yield from self._iter_journals("fetching all journals", 'getAllJournals')
+    
+    def iterJournalsWithTitle(self, partialTitle: str) -> Iterator[Journal]:
+        """
+        Streaming version of getJournalsWithTitle.
+
+        Args:
+            partialTitle (str): Partial title to search for
+
+        Yields:
+            Journal: Found journals, in journal URI order
+        """
+        yield from self._iter_journals("searching journals by title", 'getJournalsWithTitle', partialTitle)
+    
+    def iterJournalsPublishedBy(self, partialName: str) -> Iterator[Journal]:
+        """
+        Streaming version of getJournalsPublishedBy.
+
+        Args:
+            partialName (str): Partial publisher name to search for
+
+        Yields:
+            Journal: Found journals, in journal URI order
+        """
+        yield from self._iter_journals("searching journals by publisher", 'getJournalsPublishedBy', partialName)
+    
+    def iterJournalsWithLicense(self, licenses: Set[str]) -> Iterator[Journal]:
+        """
+        Streaming version of getJournalsWithLicense.
+
+        Args:
+            licenses (Set[str]): Set of licenses to search for
+
+        Yields:
+            Journal: Found journals, in journal URI order
+        """
+        yield from self._iter_journals("searching journals by license", 'getJournalsWithLicense', licenses)
+    
+    def iterJournalsWithAPC(self) -> Iterator[Journal]:
+        """
+        Streaming version of getJournalsWithAPC.
+
+        Yields:
+            Journal: Journals with APC, in journal URI order
+        """
+        yield from self._iter_journals("searching journals with APC", 'getJournalsWithAPC')
+    
+    def iterJournalsWithDOAJSeal(self) -> Iterator[Journal]:
+        """
+        Streaming version of getJournalsWithDOAJSeal.
+
+        Yields:
+            Journal: Journals with DOAJ Seal, in journal URI order
+        """
+        yield from self._iter_journals("searching journals with DOAJ Seal", 'getJournalsWithDOAJSeal')
+    
+    def iterAllCategories(self) -> Iterator[Category]:
+        """
+        Streaming version of getAllCategories.
+
+        Yields:
+            Category: Every category, in identifier order
+        """
+        yield from self._iter_categories("fetching all categories", 'getAllCategoriesRows')
+    
+    def iterAllAreas(self) -> Iterator[Area]:
+        """
+        Streaming version of getAllAreas.
+
+        Yields:
+            Area: Every area, in identifier order
+        """
+        yield from self._iter_areas("fetching all areas", 'getAllAreasRows')
+    
+    def iterCategoriesWithQuartile(self, quartiles: Set[str]) -> Iterator[Category]:
+        """
+        Streaming version of getCategoriesWithQuartile.
+
+        Args:
+            quartiles (Set[str]): Set of quartiles to search for
+
+        Yields:
+            Category: Found categories, in identifier order
+        """
+        yield from self._iter_categories(
+            "searching categories by quartile", 'getCategoriesWithQuartileRows', quartiles
+        )
+    
+    def iterCategoriesAssignedToAreas(self, area_ids: Set[str]) -> Iterator[Category]:
+        """
+        Streaming version of getCategoriesAssignedToAreas.
+
+        Args:
+            area_ids (Set[str]): Set of area identifiers
+
+        Yields:
+            Category: Found categories, in identifier order
+        """
+        yield from self._iter_categories(
+            "searching categories by areas", 'getCategoriesAssignedToAreasRows', area_ids
+        )
+    
+    def iterAreasAssignedToCategories(self, category_ids: Set[str]) -> Iterator[Area]:
+        """
+        Streaming version of getAreasAssignedToCategories.
+
+        Args:
+            category_ids (Set[str]): Set of category identifiers
+
+        Yields:
+            Area: Found areas, in identifier order
+        """
+        yield from self._iter_areas(
+            "searching areas by categories", 'getAreasAssignedToCategoriesRows', category_ids
+        )
+
+    def countJournalsBy(self, field: str, without_apc: bool = False,
+                        licenses: Optional[Set[str]] = None) -> Dict[Any, int]:
+        """
+        Count the journals per value of a journal field, without building them.
+
+        A single journal handler answers with one COUNT/GROUP BY query;
+        several handlers return their distinct (value, journal key) pairs, so
+        a journal held by more than one store is counted once.
+
+        Args:
+            field (str): 'licence', 'language', 'publisher', 'apc' or 'seal'
+            without_apc (bool): Only count journals without APC
+            licenses (Set[str], optional): Only count journals with one of these licenses
+
+        Returns:
+            Dict[Any, int]: Number of journals per value (True/False for 'apc'
+            and 'seal'), by decreasing count
+
+        Raises:
+            ValueError: If the field cannot be grouped on
+        """
+        if field not in JournalQueryHandler.GROUP_FIELDS:
+            raise ValueError(f"Cannot group journals by: {field}")
+        try:
+            filters = self._issn_filter_args(without_apc, licenses)
+            if len(self._journalQuery) == 1:
+                return self._ordered_counts(
+                    (value, count)
+                    for df in self._fan_out(self._journalQuery, 'countJournalsBy', field, *filters)
+                    if not df.empty
+                    for value, count in zip(df['value'], df['count'])
+                )
+            frames = [
+                df for df in self._fan_out(self._journalQuery, 'getJournalKeysGroupedBy', field, *filters)
+                if {'value', 'key'}.issubset(df.columns)
+            ]
+            if not frames:
+                return {}
+            pairs = pd.concat(frames, ignore_index=True).drop_duplicates(['value', 'key'])
+            return self._ordered_counts(pairs['value'].value_counts().items())
+        except Exception as e:
+            print(f"Error while counting journals by {field}: {e}")
+            return {}
+
+    def countCategorizedJournalsBy(self, dimension: str, entity_ids: Set[str] = frozenset(),
+                                   quartiles: Set[str] = frozenset()) -> Dict[str, int]:
+        """
+        Count the journals of the relational store per area, category or quartile.
+
+        Every category handler answers with one GROUP BY query and the counts
+        of several handlers are added up.
+
+        Args:
+            dimension (str): 'area', 'category' or 'quartile'
+            entity_ids (Set[str]): Area or category identifiers to restrict to
+                (categories for 'quartile'; empty for all)
+            quartiles (Set[str]): Quartiles to restrict to (empty for any; ignored for 'area')
+
+        Returns:
+            Dict[str, int]: Number of journals per group, by decreasing count
+
+        Raises:
+            ValueError: If the dimension cannot be grouped on
+        """
+        if dimension not in CategoryQueryHandler.GROUP_DIMENSIONS:
+            raise ValueError(f"Cannot group journals by: {dimension}")
+        try:
+            counts: Dict[str, int] = {}
+            for df in self._fan_out(self._categoryQuery, 'countJournalsBy', dimension, entity_ids, quartiles):
+                if df.empty:
+                    continue
+                for value, count in zip(df['value'], df['count']):
+                    counts[value] = counts.get(value, 0) + int(count)
+            return self._ordered_counts(counts.items())
+        except Exception as e:
+            print(f"Error while counting journals by {dimension}: {e}")
+            return {}
+
+    @staticmethod
+    def _ordered_counts(counts: Iterable[tuple]) -> Dict[Any, int]:
+        """Return (value, count) pairs as a dict ordered by decreasing count, then value."""
+        ordered = sorted(
+            ((value, int(count)) for value, count in counts), key=lambda item: (-item[1], str(item[0]))
+        )
+        return dict(ordered)
+
+    def _journals(self, method_name: str, *args, limit: Optional[int] = None,
+                  offset: int = 0) -> List[Journal]:
+        """
+        Run a journal query on every handler and fold the rows into journals.
+
+        With `limit` or `offset`, one page of the journals in title order is
+        returned instead (see _page_arguments).
+        """
+        if limit is None and not offset:
+            return self._journal_result_set(self._fan_out(self._journalQuery, method_name, *args))
+        page = self._page_arguments(limit, offset)
+        calls = [
+            functools.partial(getattr(handler, method_name), *args, **page)
+            for handler in self._journalQuery
+        ]
+        return self._merge_journal_page((df for _, df in self._fan_out_calls(calls)), limit, offset)
+
+    def _page_arguments(self, limit: Optional[int], offset: int) -> Dict[str, int]:
+        """
+        Keyword arguments asking each journal handler for its part of one page.
+
+        A single handler gets the page itself. With several handlers a
+        journal may come from any of them, so each returns its first
+        offset + limit journals and the page is cut after the merge.
+        """
+        if len(self._journalQuery) == 1:
+            return {'limit': limit, 'offset': offset}
+        return {'limit': offset + limit} if limit is not None else {}
+
+    def _merge_journal_page(self, frames: Iterable, limit: Optional[int], offset: int) -> List[Journal]:
+        """Fold the handler frames requested with _page_arguments into the page."""
+        journals = self._journal_result_set(frames)
+        if len(self._journalQuery) == 1:
+            return journals
+        return self._page_by_title(journals, offset, limit)
+
+    def _order_by_title(self, journals: List[Journal]) -> List[Journal]:
+        """Return the journals in title order, as returned by getAllJournals."""
+        if isinstance(journals, JournalResultSet):
+            titles = journals.column('title')
+            return journals.take(sorted(range(len(titles)), key=titles.__getitem__))
+        return sorted(journals, key=lambda journal: journal.getTitle())
+
+    def _page_by_title(self, journals: List[Journal], offset: int = 0,
+                       limit: Optional[int] = None) -> List[Journal]:
+        """Return the journals in title order, from position `offset` and at most `limit` of them."""
+        ordered = self._order_by_title(journals)
+        if limit is None and not offset:
+            return ordered
+        stop = len(ordered) if limit is None else min(len(ordered), offset + limit)
+        if isinstance(ordered, JournalResultSet):
+            return ordered.take(range(offset, stop))
+        return ordered[offset:stop]
+
+    def _iter_journals(self, action: str, method_name: str, *args) -> Iterator[Journal]:
+        """Yield the journals of a journal handler query batch by batch (see _journal_batches)."""
+        try:
+            for journals in self._journal_batches(method_name, *args):
+                yield from journals
+        except Exception as e:
+            print(f"Error while {action}: {e}")
+
+    def _iter_categories(self, action: str, method_name: str, *args) -> Iterator[Category]:
+        """Yield the categories of a row query of the category handlers, merged page by page."""
+        try:
+            read_page = functools.partial(self._read_row_page, method_name, args)
+            for parts in self._merge_pages(self._categoryQuery, read_page, self._split_rows):
+                category_map: Dict[str, Category] = {}
+                self._collect_category_rows(self._rows_by_id(parts), category_map)
+                yield from category_map.values()
+        except Exception as e:
+            print(f"Error while {action}: {e}")
+
+    def _iter_areas(self, action: str, method_name: str, *args) -> Iterator[Area]:
+        """Yield the areas of a row query of the category handlers, merged page by page."""
+        try:
+            read_page = functools.partial(self._read_row_page, method_name, args)
+            for parts in self._merge_pages(self._categoryQuery, read_page, self._split_rows):
+                area_map: Dict[str, Area] = {}
+                self._collect_area_rows(self._rows_by_id(parts), area_map)
+                yield from area_map.values()
+        except Exception as e:
+            print(f"Error while {action}: {e}")
+
+    def _journal_batches(self, method_name: str, *args) -> Iterator[JournalResultSet]:
+        """
+        Read a journal query from every handler in keyset pages and yield it in batches.
+
+        Each handler is asked for PAGE_SIZE journals at a time, those after
+        the last journal URI it returned, so concurrent writes never shift a
+        page and at most one page per handler is held. A batch holds the
+        journals that every handler has moved past, folded across handlers
+        as in the list methods and ordered by journal URI.
+        """
+        read_page = functools.partial(self._read_journal_page, method_name, args)
+        for parts in self._merge_pages(self._journalQuery, read_page, self._split_journal_page):
+            frame = pd.concat(parts) if len(parts) > 1 else parts[0]
+            yield self._journal_result_set([frame.sort_values('journal', kind='stable')])
+
+    def _merge_pages(self, handlers: List[Any], read_page: Callable, split: Callable) -> Iterator[list]:
+        """
+        Merge the keyset-paged results of several handlers in key order.
+
+        read_page(handler, after) returns (rows, last key, whether it was the
+        last page) for the page after the given key; rows are sorted by key,
+        every row of a key is in the same page, and rows is None for an empty
+        page. The handlers that need a page are read concurrently. Each step
+        yields, in handler order, the rows with a key up to the smallest last
+        key of the handlers that have more pages, which are then complete;
+        split(rows, key) returns those rows and the rest (None when empty), or
+        all rows for key None. A handler that fails is skipped from then on.
+        """
+        count = len(handlers)
+        pending: List[Any] = [None] * count
+        after: List[Optional[str]] = [None] * count
+        done: List[bool] = [False] * count
+        while True:
+            refill = [i for i in range(count) if pending[i] is None and not done[i]]
+            calls = [functools.partial(read_page, handlers[i], after[i]) for i in refill]
+            answered = set()
+            for index, (rows, last_key, last_page) in self._fan_out_calls(calls):
+                i = refill[index]
+                answered.add(i)
+                pending[i], done[i] = rows, last_page
+                if last_key is not None:
+                    after[i] = last_key
+            for i in set(refill) - answered:
+                done[i] = True
+            open_keys = [after[i] for i in range(count) if not done[i]]
+            watermark = min(open_keys) if open_keys else None
+            ready = []
+            for i in range(count):
+                if pending[i] is not None:
+                    part, pending[i] = split(pending[i], watermark)
+                    if part is not None:
+                        ready.append(part)
+            if ready:
+                yield ready
+            if all(done) and all(rows is None for rows in pending):
+                return
+
+    def _read_journal_page(self, method_name: str, args: tuple, handler: JournalQueryHandler,
+                           after: Optional[str]) -> tuple:
+        """Read one page of a journal query for _merge_pages, keyed by journal URI."""
+        page = getattr(handler, method_name)(*args, after=after or "", limit=self.PAGE_SIZE)
+        if page is None or page.empty or 'journal' not in page.columns:
+            return None, None, True
+        uris = page['journal'].astype(str)
+        return page, uris.max(), uris.nunique() < self.PAGE_SIZE
+
+    @staticmethod
+    def _split_journal_page(page: pd.DataFrame, watermark: Optional[str]) -> tuple:
+        """Split journal rows into those with a URI up to the watermark and the rest."""
+        if watermark is None:
+            return page, None
+        ready = (page['journal'].astype(str) <= watermark).to_numpy()
+        if ready.all():
+            return page, None
+        return (page[ready] if ready.any() else None), page[~ready]
+
+    def _read_row_page(self, method_name: str, args: tuple, handler: CategoryQueryHandler,
+                       after: Optional[str]) -> tuple:
+        """Read one page of a category or area row query for _merge_pages, keyed by identifier."""
+        rows = getattr(handler, method_name)(*args, after=after, limit=self.PAGE_SIZE)
+        if not rows:
+            return None, None, True
+        return rows, rows[-1][0], len(rows) < self.PAGE_SIZE
+
+    @staticmethod
+    def _split_rows(rows: List[tuple], watermark: Optional[str]) -> tuple:
+        """Split rows sorted by identifier into those up to the watermark and the rest."""
+        if watermark is None:
+            return rows, None
+        position = bisect.bisect_right(rows, watermark, key=operator.itemgetter(0))
+        return rows[:position] or None, rows[position:] or None
+
+    @staticmethod
+    def _rows_by_id(parts: List[List[tuple]]) -> List[tuple]:
+        """Merge the row parts of several handlers by identifier, keeping handler order for equal ones."""
+        return sorted(itertools.chain.from_iterable(parts), key=operator.itemgetter(0))
+
     def _collect_journals(self, df, target: Dict[str, Journal]) -> None:
-        """Merge journal rows into a deduplicated dictionary keyed by identifier."""
+        """
+        Merge journal rows into a deduplicated dictionary keyed by identifier.
+
+        The rows are first folded per key with vectorized operations (see
+        _fold_journal_rows), then one Journal is built or updated per key,
+        with the same rules as _dataframe_to_journal/_update_journal_from_row
+        applied row by row: first non-empty title, publisher and licence,
+        distinct languages in order of appearance, last non-empty seal and APC.
+        """
         if df is None or df.empty:
             return
-        for idx, row in df.iterrows():
-            key = self._get_journal_key(row, idx)
-            if not key:
+        folded = self._fold_journal_rows(df)
+        for key, identifier, title, languages, publisher, licence, seal, apc in zip(
+            folded['key'], folded['id'], folded['title'], folded['languages'],
+            folded['publisher'], folded['licence'], folded['seal'], folded['apc'],
+        ):
+            journal = target.get(key)
+            if journal is None:
+                journal = Journal()
+                if identifier is not None:
+                    journal.setId(identifier)
+                journal.setTitle(title if title is not None else "")
+                journal.setLanguages(languages)
+                journal.setPublisher(publisher)
+                journal.setSeal(bool(seal) if seal is not None else False)
+                journal.setLicence(licence if licence is not None else "")
+                journal.setAPC(bool(apc) if apc is not None else False)
+                target[key] = self._shared_journal(journal)
                 continue
-            if key in target:
-                self._update_journal_from_row(target[key], row)
-            else:
-                journal = self._dataframe_to_journal(row)
-                if journal:
-                    target[key] = journal
+
+            if title is not None and not journal.getTitle():
+                journal.setTitle(title)
+            if languages:
+                known = journal.getLanguages()
+                added = [language for language in languages if language not in known]
+                if added:
+                    journal.setLanguages(known + added)
+            if publisher is not None and not journal.getPublisher():
+                journal.setPublisher(publisher)
+            if seal is not None:
+                journal.setSeal(bool(seal))
+            if licence is not None and not journal.getLicence():
+                journal.setLicence(licence)
+            if apc is not None:
+                journal.setAPC(bool(apc))
+
+    def _journal_result_set(self, frames: Iterable) -> JournalResultSet:
+        """
+        Fold the journal frames of several handlers into one lazy result set.
+
+        Folding the frames concatenated in handler order gives the same
+        journals as merging them one after the other with _collect_journals.
+
+        Args:
+            frames (Iterable[pd.DataFrame]): Handler results, in merge order
+
+        Returns:
+            JournalResultSet: One entry per journal
+        """
+        frames = [df for df in frames if df is not None and not df.empty]
+        if not frames:
+            return JournalResultSet(share=self._shared_journal, relations=self._relations)
+        folded = self._fold_journal_rows(frames[0] if len(frames) == 1 else pd.concat(frames))
+        return JournalResultSet({
+            'id': folded['id'],
+            'title': [title if title is not None else "" for title in folded['title']],
+            'languages': [FrozenList(languages) for languages in folded['languages']],
+            'publisher': folded['publisher'],
+            'seal': [bool(seal) if seal is not None else False for seal in folded['seal']],
+            'licence': [licence if licence is not None else "" for licence in folded['licence']],
+            'apc': [bool(apc) if apc is not None else False for apc in folded['apc']],
+        }, share=self._shared_journal, relations=self._relations)
+
+    def _fold_journal_rows(self, df) -> Dict[str, list]:
+        """
+        Fold journal rows into one entry per journal key.
+
+        The key column follows _get_journal_key (issn, then eissn, then the
+        journal URI, else ``__row_<index>``) and is computed once for the whole
+        frame. Cells are cleaned column-wise; missing and blank values become
+        None. Per key the result holds the identifier of its first row, the
+        first non-empty title/publisher/licence, the last non-empty seal/APC
+        flag and the list of distinct languages.
+
+        Args:
+            df (pd.DataFrame): Journal rows
+
+        Returns:
+            Dict[str, list]: Column name -> values, one value per key in order of first appearance
+        """
+        issn = self._text_values(df, 'issn')
+        eissn = self._text_values(df, 'eissn')
+        identifiers = np.where(pd.notna(issn), issn, eissn)
+        keys = np.where(pd.notna(identifiers), identifiers, self._text_values(df, 'journal'))
+        missing = pd.isna(keys)
+        if missing.any():
+            keys[missing] = [f"__row_{idx}" for idx in df.index[missing]]
+
+        frame = pd.DataFrame({
+            'key': keys,
+            'id': identifiers,
+            'title': self._text_values(df, 'title'),
+            'publisher': self._text_values(df, 'publisher'),
+            'licence': self._text_values(df, 'licence'),
+            'seal': self._flag_values(df, 'seal'),
+            'apc': self._flag_values(df, 'apc'),
+        })
+        grouped = frame.groupby('key', sort=False)
+        first_rows = frame.drop_duplicates('key')
+        order = pd.Index(first_rows['key'])
+        firsts = grouped[['title', 'publisher', 'licence']].first().reindex(order)
+        lasts = grouped[['seal', 'apc']].last().reindex(order)
+
+        languages = self._text_values(df, 'language')
+        present = pd.notna(languages)
+        language_lists: Dict[str, List[str]] = {}
+        if present.any():
+            pairs = pd.DataFrame({'key': keys[present], 'language': languages[present]}).drop_duplicates()
+            for key, language in zip(pairs['key'].to_numpy(dtype=object), pairs['language'].to_numpy(dtype=object)):
+                language_lists.setdefault(key, []).append(language)
+
+        return {
+            'key': list(order),
+            'id': self._none_for_missing(first_rows['id']),
+            'title': self._none_for_missing(firsts['title']),
+            'publisher': self._none_for_missing(firsts['publisher']),
+            'licence': self._none_for_missing(firsts['licence']),
+            'seal': self._none_for_missing(lasts['seal']),
+            'apc': self._none_for_missing(lasts['apc']),
+            'languages': [language_lists.get(key, []) for key in order],
+        }
+
+    @staticmethod
+    def _none_for_missing(series) -> list:
+        """Return the values of a column as a list, with None for missing values."""
+        values = series.to_numpy(dtype=object)
+        return [None if missing else value for value, missing in zip(values, pd.isna(values))]
+
+    @classmethod
+    def _text_values(cls, df, column: str) -> np.ndarray:
+        """
+        Return a column as stripped strings, with None for missing or blank cells.
+
+        Categorical columns are cleaned once per category instead of per row.
+        """
+        if column not in df.columns:
+            return np.full(len(df), None, dtype=object)
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = cls._strip_values(series.cat.categories.to_numpy(dtype=object))
+            codes = series.cat.codes.to_numpy()
+            values = np.full(len(series), None, dtype=object)
+            valid = codes >= 0
+            values[valid] = categories[codes[valid]]
+            return values
+        return cls._strip_values(series.to_numpy(dtype=object))
+
+    @staticmethod
+    def _strip_values(values: np.ndarray) -> np.ndarray:
+        """Apply str/strip to the present values of an object array, None elsewhere."""
+        result = np.full(len(values), None, dtype=object)
+        present = np.flatnonzero(pd.notna(values))
+        if len(present):
+            text = np.array([str(value).strip() for value in values[present]], dtype=object)
+            filled = text != ""
+            result[present[filled]] = text[filled]
+        return result
+
+    def _flag_values(self, df, column: str) -> np.ndarray:
+        """Return a column converted with _to_bool, with None where _has_value is False."""
+        values = np.full(len(df), None, dtype=object)
+        if column not in df.columns:
+            return values
+        series = df[column]
+        raw = series.to_numpy(dtype=object)
+        present = np.flatnonzero(pd.notna(raw))
+        if pd.api.types.is_bool_dtype(series.dtype):
+            values[present] = [bool(value) for value in raw[present]]
+        else:
+            for position in present:
+                if self._has_value(raw[position]):
+                    values[position] = self._to_bool(raw[position])
+        return values
 
     def _collect_categories(self, df, target: Dict[str, Category]) -> None:
         """Collect categories without duplicates."""
@@ -393,17 +1282,218 @@ class BasicQueryEngine:
             if identifier not in target:
                 target[identifier] = area
 
-    def _fetch_journals_by_issns(self, issns: Set[str]) -> List[Journal]:
-        """Fetch journals in batches by ISSN using the registered handlers."""
+    def _collect_category_rows(self, rows: List[tuple], target: Dict[str, Category]) -> None:
+        """Collect categories from (id, quartile) tuples without duplicates, bypassing pandas."""
+        for idx, (identifier, quartile) in enumerate(rows):
+            category = self._row_to_category(identifier, quartile)
+            key = category.getIds()[0] if category.getIds() else f"__row_{idx}"
+            existing = target.get(key)
+            if existing is None:
+                target[key] = category
+            elif not existing.getQuartile() and category.getQuartile():
+                existing.setQuartile(category.getQuartile())
+
+    def _collect_area_rows(self, rows: List[tuple], target: Dict[str, Area]) -> None:
+        """Collect areas from (id,) tuples without duplicates, bypassing pandas."""
+        for idx, (identifier,) in enumerate(rows):
+            area = self._row_to_area(identifier)
+            key = area.getIds()[0] if area.getIds() else f"__row_{idx}"
+            if key not in target:
+                target[key] = area
+
+    def _row_to_category(self, identifier, quartile) -> Category:
+        """Build a Category from raw column values."""
+        category = Category()
+        category.setId(str(identifier).strip() if self._has_value(identifier) else "")
+        category.setQuartile(str(quartile).strip() if self._has_value(quartile) else None)
+        return self._shared_category(category)
+
+    def _row_to_area(self, identifier) -> Area:
+        """Build an Area from a raw column value."""
+        area = Area()
+        area.setId(str(identifier).strip() if self._has_value(identifier) else "")
+        return self._shared_area(area)
+
+    def _shared_journal(self, journal: Journal) -> Journal:
+        """
+        Return the shared instance of a journal from the identity map.
+
+        If the journal is already known, the shared instance takes the
+        scalar fields of the new one, which was just built from fresh rows:
+        title, publisher, licence, seal and APC are replaced; new languages,
+        categories and areas are added. The shared instance is returned.
+        Journals without an identifier are not shared.
+        """
+        ids = journal.getIds()
+        if self._identity is None or not ids:
+            return journal
+        shared = self._identity.put('journal', ids[0], journal)
+        if shared is journal:
+            return journal
+        shared.setTitle(journal.getTitle())
+        known = shared.getLanguages()
+        added = [language for language in journal.getLanguages() if language not in known]
+        if added:
+            shared.setLanguages(known + added)
+        shared.setPublisher(journal.getPublisher())
+        shared.setLicence(journal.getLicence())
+        shared.setSeal(journal.hasDOASeal())
+        shared.setAPC(journal.hasAPC())
+        for category in journal.getCategories():
+            shared.addCategory(category)
+        for area in journal.getAreas():
+            shared.addArea(area)
+        return shared
+
+    def _with_relations(self, journal: Optional[Journal]) -> Optional[Journal]:
+        """Attach a journal built outside a result set to its own relation batch; return it."""
+        if journal is not None and self._relations is not None:
+            self._relations.attach([journal])
+        return journal
+
+    def _shared_category(self, category: Category) -> Category:
+        """Return the shared instance of a category, filling in its quartile if missing."""
+        ids = category.getIds()
+        if self._identity is None or not ids:
+            return category
+        shared = self._identity.put('category', ids[0], category)
+        if shared is not category and category.getQuartile() and not shared.getQuartile():
+            shared.setQuartile(category.getQuartile())
+        return shared
+
+    def _shared_area(self, area: Area) -> Area:
+        """Return the shared instance of an area."""
+        ids = area.getIds()
+        if self._identity is None or not ids:
+            return area
+        return self._identity.put('area', ids[0], area)
+
+    def _fetch_journals_by_issns(self, issns: Set[str], without_apc: bool = False,
+                                 licenses: Optional[Set[str]] = None,
+                                 limit: Optional[int] = None) -> List[Journal]:
+        """
+        Fetch journals in batches by ISSN using the registered handlers.
+
+        Args:
+            issns (Set[str]): ISSNs of the journals to fetch
+            without_apc (bool): Only fetch journals without APC
+            licenses (Set[str], optional): Only fetch journals with one of these licenses
+            limit (int, optional): Only fetch the first journals of every batch in title order
+
+        Returns:
+            List[Journal]: Matching journals
+        """
         cleaned_ids = sorted({issn for issn in issns if issn})
         if not cleaned_ids:
             return []
-        journal_map: Dict[str, Journal] = {}
-        for handler in self._journalQuery:
-            for chunk in self._chunked(cleaned_ids, 50):
-                df = handler.getJournalsByIssns(set(chunk))
-                self._collect_journals(df, journal_map)
-        return list(journal_map.values())
+        chunks = list(self._chunked(cleaned_ids, self.ISSN_BATCH_SIZE))
+        extra_args = self._issn_filter_args(without_apc, licenses)
+        # A batch matches at most ISSN_BATCH_SIZE journals: larger limits change nothing
+        page = {'limit': limit} if limit is not None and limit < self.ISSN_BATCH_SIZE else {}
+        calls = [
+            functools.partial(handler.getJournalsByIssns, set(chunk), *extra_args, **page)
+            for handler in self._journalQuery for chunk in chunks
+        ]
+        return self._journal_result_set(df for _, df in self._fan_out_calls(calls))
+
+    @staticmethod
+    def _issn_filter_args(without_apc: bool, licenses: Optional[Set[str]]) -> tuple:
+        """Extra getJournalsByIssns arguments; filters are only passed when set, so custom
+        handlers need not accept them."""
+        if licenses:
+            return (without_apc, licenses)
+        return (True,) if without_apc else ()
+
+    def _fan_out(self, handlers: List[Any], method_name: str, *args) -> Iterator[Any]:
+        """Call `method_name` on every handler concurrently and yield the results in handler order."""
+        for _, result in self._fan_out_indexed(handlers, method_name, *args):
+            yield result
+
+    def _fan_out_indexed(self, handlers: List[Any], method_name: str, *args) -> Iterator[tuple]:
+        """Like _fan_out, but yield (handler index, result) pairs."""
+        calls = [functools.partial(getattr(handler, method_name), *args) for handler in handlers]
+        return self._fan_out_calls(calls)
+
+    def _fan_out_calls(self, calls: List[Callable[[], Any]]) -> Iterator[tuple]:
+        """
+        Run zero-argument calls on the engine's thread pool.
+
+        (index, result) pairs are yielded in call order, each one as soon as it
+        and all the earlier results are available, so merging overlaps with the
+        slower calls while staying deterministic. A call that raises, or that
+        has not finished within the engine timeout, is reported and skipped.
+        The timeout of a call starts when a worker starts running it, so
+        calls queued behind others (more calls than max_workers) get their
+        full time. A single call without a timeout runs inline.
+
+        Args:
+            calls (List[Callable]): Calls to run, in merge order
+
+        Yields:
+            tuple: (index of the call, its result)
+        """
+        if len(calls) == 1 and self._timeout is None:
+            try:
+                result = calls[0]()
+            except Exception as e:
+                print(f"Error while querying handler: {e}")
+                return
+            yield 0, result
+            return
+
+        # Start time of every call, set by the worker running it
+        started: List[Optional[float]] = [None] * len(calls)
+
+        def run(index: int, call: Callable[[], Any]) -> Any:
+            started[index] = time.monotonic()
+            return call()
+
+        executor = self._get_executor()
+        futures = [executor.submit(run, index, call) for index, call in enumerate(calls)]
+        try:
+            for index, future in enumerate(futures):
+                try:
+                    result = self._call_result(future, started, index)
+                except FutureTimeoutError:
+                    print(f"Error while querying handler: no answer within {self._timeout} s")
+                    continue
+                except Exception as e:
+                    print(f"Error while querying handler: {e}")
+                    continue
+                yield index, result
+        finally:
+            # Calls not started yet are dropped when the caller stops early
+            for future in futures:
+                future.cancel()
+
+    def _call_result(self, future, started: List[Optional[float]], index: int) -> Any:
+        """
+        Wait for the result of a call of _fan_out_calls.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the call has run for longer than the engine timeout
+        """
+        if self._timeout is None:
+            return future.result()
+        while True:
+            start = started[index]
+            # A queued call has not used any of its time yet
+            wait = self._timeout if start is None else start + self._timeout - time.monotonic()
+            try:
+                return future.result(timeout=max(0.0, wait))
+            except FutureTimeoutError:
+                start = started[index]
+                if start is not None and time.monotonic() >= start + self._timeout:
+                    raise
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the engine's thread pool, creating it on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="query-engine"
+                )
+            return self._executor
 
     def _chunked(self, items: Iterable[str], size: int) -> Iterable[List[str]]:
         """Yield chunks of the input iterable with at most `size` elements."""
@@ -435,8 +1525,7 @@ class BasicQueryEngine:
             languages = journal.getLanguages()
             lang_value = str(language).strip()
             if lang_value not in languages:
-                languages.append(lang_value)
-                journal.setLanguages(languages)
+                journal.setLanguages(languages + [lang_value])
 
         if self._has_value(row.get('publisher')) and not journal.getPublisher():
             journal.setPublisher(str(row.get('publisher')).strip())
@@ -455,8 +1544,8 @@ class BasicQueryEngine:
 
     @staticmethod
     def _has_value(value) -> bool:
-        """Return True if the value is meaningful (not None/empty/nan)."""
-        if value is None:
+        """Return True if the value is meaningful (not None/empty/nan/NA)."""
+        if value is None or value is pd.NA or value is pd.NaT:
             return False
         if isinstance(value, float) and math.isnan(value):
             return False
@@ -466,9 +1555,11 @@ class BasicQueryEngine:
 
     @staticmethod
     def _to_bool(value) -> bool:
-        """Convert a mixed value into a boolean."""
+        """Convert a mixed value (string literal, bool, numpy/nullable boolean) into a boolean."""
         if isinstance(value, bool):
             return value
+        if value is pd.NA:
+            return False
         if isinstance(value, str):
             return value.strip().lower() in {'1', 'true', 'yes'}
         return bool(value)
@@ -516,7 +1607,7 @@ class BasicQueryEngine:
             apc_value = row.get('apc')
             journal.setAPC(self._to_bool(apc_value) if self._has_value(apc_value) else False)
             
-            return journal
+            return self._shared_journal(journal)
             
         except Exception as e:
             print(f"Error while creating Journal object: {e}")
@@ -538,7 +1629,7 @@ class BasicQueryEngine:
             category.setId(str(identifier).strip() if self._has_value(identifier) else "")
             quartile = row.get('quartile')
             category.setQuartile(str(quartile).strip() if self._has_value(quartile) else None)
-            return category
+            return self._shared_category(category)
             
         except Exception as e:
             print(f"Error while creating Category object: {e}")
@@ -558,7 +1649,7 @@ class BasicQueryEngine:
             area = Area()
             identifier = row.get('id')
             area.setId(str(identifier).strip() if self._has_value(identifier) else "")
-            return area
+            return self._shared_area(area)
             
         except Exception as e:
             print(f"Error while creating Area object: {e}")
@@ -568,85 +1659,106 @@ class BasicQueryEngine:
 class FullQueryEngine(BasicQueryEngine):
     """
     Extended query engine for performing complex mashup queries.
+
+    The evaluation order of each mashup query is chosen by a QueryPlanner
+    from cardinality statistics of the handlers; explain() shows the plan.
     """
     
-    def getJournalsInCategoriesWithQuartile(self, category_ids: Set[str], quartiles: Set[str]) -> List[Journal]:
+    # Semi-join: journals per page, identifiers per group and ranges per group query
+    SEMI_JOIN_PAGE_SIZE = 1000
+    SEMI_JOIN_GROUP_SIZE = 1024
+    SEMI_JOIN_MAX_RANGES = 64
+    
+    def __init__(self, *args, **kwargs):
+        """
+        Args:
+            *args, **kwargs: BasicQueryEngine arguments
+        """
+        super().__init__(*args, **kwargs)
+        self._planner: QueryPlanner = QueryPlanner(self)
+        self._identity_index: Optional[Dict[str, str]] = None
+        self._identity_index_key: Optional[tuple] = None
+        self._identity_lock = threading.Lock()
+    
+    def explain(self, query: str, *args) -> str:
+        """
+        Return the evaluation plan of a mashup query without running it.
+
+        Args:
+            query (str): Name of the mashup method, e.g. "getJournalsInAreasWithLicense"
+            *args: Arguments of the method
+
+        Returns:
+            str: Description of the chosen plan
+
+        Raises:
+            ValueError: If the method is not a planned mashup query
+        """
+        planners = {
+            'getJournalsInCategoriesWithQuartile': self._planner.planJournalsInCategoriesWithQuartile,
+            'getJournalsInAreasWithLicense': self._planner.planJournalsInAreasWithLicense,
+            'getDiamondJournalsInAreasAndCategoriesWithQuartile': self._planner.planDiamondJournals,
+        }
+        if query not in planners:
+            raise ValueError(f"No plan for query: {query}")
+        return planners[query](*args).explain()
+    
+    def getJournalsInCategoriesWithQuartile(self, category_ids: Set[str], quartiles: Set[str],
+                                            limit: Optional[int] = None, offset: int = 0) -> List[Journal]:
         """
         Return journals in specified categories with given quartiles.
 
         Args:
             category_ids (Set[str]): Set of category identifiers
             quartiles (Set[str]): Set of quartiles
+            limit (int, optional): Maximum number of journals; a page is returned in title order
+            offset (int): Number of journals skipped, in title order
 
         Returns:
             List[Journal]: List of found journals
         """
+        check_page(limit, offset)
         try:
-            # Get categories with specified quartiles
-            categories_with_quartile = self.getCategoriesWithQuartile(quartiles)
-            if not categories_with_quartile and quartiles:
-                return []
-            
-            # Filter by specified categories if provided
-            if category_ids:
-                categories_with_quartile = [cat for cat in categories_with_quartile 
-                                          if cat.getIds()[0] in category_ids]
-                if not categories_with_quartile:
-                    return []
+            plan = self._planner.planJournalsInCategoriesWithQuartile(category_ids, quartiles)
             
-            if not categories_with_quartile:
+            # Get ISSNs of journals from the categories with the specified quartiles
+            journal_issns = self._issns_in_categories(category_ids, quartiles)
+            if not journal_issns:
                 return []
             
-            # Get ISSNs of journals from these categories
-            journal_issns: Set[str] = set()
-            for handler in self._categoryQuery:
-                for category in categories_with_quartile:
-                    category_id = category.getIds()[0]
-                    issns = self._get_issns_for_category(handler, category_id)
-                    journal_issns.update(issns)
-            
-            return self._fetch_journals_by_issns(journal_issns)
+            return self._journals_with_issns(plan, journal_issns, 'getAllJournals', (), limit, offset)
             
         except Exception as e:
             print(f"Error while searching journals in categories with quartile: {e}")
             return []
     
-    def getJournalsInAreasWithLicense(self, area_ids: Set[str], licenses: Set[str]) -> List[Journal]:
+    def getJournalsInAreasWithLicense(self, area_ids: Set[str], licenses: Set[str],
+                                      limit: Optional[int] = None, offset: int = 0) -> List[Journal]:
         """
         Return journals in specified areas with given licenses.
 
         Args:
             area_ids (Set[str]): Set of area identifiers
             licenses (Set[str]): Set of licenses
+            limit (int, optional): Maximum number of journals; a page is returned in title order
+            offset (int): Number of journals skipped, in title order
 
         Returns:
             List[Journal]: List of found journals
         """
+        check_page(limit, offset)
         try:
-            # Get journals with specified licenses
-            journals_with_license = self.getJournalsWithLicense(licenses)
+            plan = self._planner.planJournalsInAreasWithLicense(area_ids, licenses)
             
             # Get ISSNs of journals in specified areas
-            journal_issns_in_areas: Optional[Set[str]] = set()
-            if area_ids:
-                for handler in self._categoryQuery:
-                    for area_id in area_ids:
-                        issns = self._get_issns_for_area(handler, area_id)
-                        journal_issns_in_areas.update(issns)
-            else:
-                journal_issns_in_areas = None
-            
-            # Filter journals by areas if needed
+            journal_issns_in_areas = self._issns_in_areas(area_ids)
             if journal_issns_in_areas is None:
-                return journals_with_license
+                return self.getJournalsWithLicense(licenses, limit, offset)
             
-            filtered: Dict[str, Journal] = {}
-            for journal in journals_with_license:
-                journal_issn = journal.getIds()[0] if journal.getIds() else None
-                if journal_issn and journal_issn in journal_issns_in_areas:
-                    filtered[journal_issn] = journal
-            
-            return list(filtered.values())
+            return self._journals_with_issns(
+                plan, journal_issns_in_areas, 'getJournalsWithLicense', (licenses,), limit, offset,
+                licenses=licenses,
+            )
             
         except Exception as e:
             print(f"Error while searching journals in areas with license: {e}")
@@ -654,7 +1766,9 @@ class FullQueryEngine(BasicQueryEngine):
     
     def getDiamondJournalsInAreasAndCategoriesWithQuartile(self, area_ids: Set[str], 
                                                           category_ids: Set[str], 
-                                                          quartiles: Set[str]) -> List[Journal]:
+                                                          quartiles: Set[str],
+                                                          limit: Optional[int] = None,
+                                                          offset: int = 0) -> List[Journal]:
         """
         Return diamond journals (no APC) in specified areas and categories with given quartiles.
 
@@ -662,102 +1776,515 @@ class FullQueryEngine(BasicQueryEngine):
             area_ids (Set[str]): Set of area identifiers
             category_ids (Set[str]): Set of category identifiers
             quartiles (Set[str]): Set of quartiles
+            limit (int, optional): Maximum number of journals; a page is returned in title order
+            offset (int): Number of journals skipped, in title order
 
         Returns:
             List[Journal]: List of found journals
         """
+        check_page(limit, offset)
         try:
-            # Get journals without APC
-            journals_without_apc = [journal for journal in self.getAllJournals() if not journal.hasAPC()]
+            plan = self._planner.planDiamondJournals(area_ids, category_ids, quartiles)
             
-            # Get ISSNs of journals in specified areas
-            journal_issns_in_areas: Optional[Set[str]] = set()
-            if area_ids:
-                for handler in self._categoryQuery:
-                    for area_id in area_ids:
-                        issns = self._get_issns_for_area(handler, area_id)
-                        journal_issns_in_areas.update(issns)
-            else:
-                journal_issns_in_areas = None
-            
-            # Get ISSNs of journals in specified categories with quartiles
-            journal_issns_in_categories: Optional[Set[str]] = set()
-            categories_with_quartile = self.getCategoriesWithQuartile(quartiles)
-            if not categories_with_quartile and quartiles:
+            # Resolve the ISSN restrictions on the relational side first
+            journal_issns_in_areas = self._issns_in_areas(area_ids)
+            journal_issns_in_categories = self._issns_in_categories(category_ids, quartiles)
+            issns = self._diamond_issns(journal_issns_in_areas, journal_issns_in_categories)
+            if issns is None:
+                # No restriction: let the graph store select the diamond journals
+                return self._diamond_journals(limit, offset)
+            if not issns:
                 return []
-            if category_ids:
-                categories_with_quartile = [cat for cat in categories_with_quartile 
-                                          if cat.getIds()[0] in category_ids]
-                if not categories_with_quartile:
-                    return []
-            
-            if categories_with_quartile:
-                for handler in self._categoryQuery:
-                    for category in categories_with_quartile:
-                        category_id = category.getIds()[0]
-                        issns = self._get_issns_for_category(handler, category_id)
-                        journal_issns_in_categories.update(issns)
-            else:
-                journal_issns_in_categories = None
             
-            # Filter journals
-            filtered: Dict[str, Journal] = {}
-            for journal in journals_without_apc:
-                journal_issn = journal.getIds()[0] if journal.getIds() else None
-                if not journal_issn:
-                    continue
-                if journal_issns_in_areas is not None and journal_issn not in journal_issns_in_areas:
-                    continue
-                if journal_issns_in_categories is not None and journal_issn not in journal_issns_in_categories:
-                    continue
-                filtered[journal_issn] = journal
-            
-            return list(filtered.values())
+            # Fetch only the matching journals, with the APC condition pushed down
+            return self._journals_with_issns(
+                plan, issns, 'getJournalsWithoutAPC', (), limit, offset, without_apc=True
+            )
             
         except Exception as e:
             print(f"Error while searching for diamond journals: {e}")
             return []
-    
-    def _get_issns_for_category(self, handler: CategoryQueryHandler, category_id: str) -> Set[str]:
+
+    def iterJournalsInCategoriesWithQuartile(self, category_ids: Set[str],
+                                             quartiles: Set[str]) -> Iterator[Journal]:
         """
-        Get ISSNs of journals for the specified category.
+        Streaming version of getJournalsInCategoriesWithQuartile.
 
         Args:
-            handler (CategoryQueryHandler): Category handler
-            category_id (str): Category identifier
+            category_ids (Set[str]): Set of category identifiers
+            quartiles (Set[str]): Set of quartiles
 
-        Returns:
-            Set[str]: Set of journal ISSNs
+        Yields:
+            Journal: Found journals, batch by batch rather than in title order
         """
         try:
-            import sqlite3
-            conn = sqlite3.connect(handler.getDbPathOrUrl())
-            query = "SELECT DISTINCT issn FROM journal_categories WHERE category_id = ?"
-            cursor = conn.execute(query, (category_id,))
-            issns = {row[0] for row in cursor.fetchall()}
-            conn.close()
-            return issns
-        except Exception:
-            return set()
-    
-    def _get_issns_for_area(self, handler: CategoryQueryHandler, area_id: str) -> Set[str]:
+            plan = self._planner.planJournalsInCategoriesWithQuartile(category_ids, quartiles)
+            journal_issns = self._issns_in_categories(category_ids, quartiles)
+            if not journal_issns:
+                return
+            yield from self._iter_pushed_issns(plan, journal_issns, 'getAllJournals')
+        except Exception as e:
+            print(f"Error while searching journals in categories with quartile: {e}")
+
+    def iterJournalsInAreasWithLicense(self, area_ids: Set[str], licenses: Set[str]) -> Iterator[Journal]:
         """
-        Get ISSNs of journals for the specified area.
+        Streaming version of getJournalsInAreasWithLicense.
 
         Args:
-            handler (CategoryQueryHandler): Category handler
-            area_id (str): Area identifier
+            area_ids (Set[str]): Set of area identifiers
+            licenses (Set[str]): Set of licenses
+
+        Yields:
+            Journal: Found journals, batch by batch rather than in title order
+        """
+        try:
+            plan = self._planner.planJournalsInAreasWithLicense(area_ids, licenses)
+            journal_issns_in_areas = self._issns_in_areas(area_ids)
+            if journal_issns_in_areas is None:
+                yield from self.iterJournalsWithLicense(licenses)
+                return
+            yield from self._iter_pushed_issns(
+                plan, journal_issns_in_areas, 'getJournalsWithLicense', licenses, licenses=licenses
+            )
+        except Exception as e:
+            print(f"Error while searching journals in areas with license: {e}")
+
+    def iterDiamondJournalsInAreasAndCategoriesWithQuartile(self, area_ids: Set[str],
+                                                           category_ids: Set[str],
+                                                           quartiles: Set[str]) -> Iterator[Journal]:
+        """
+        Streaming version of getDiamondJournalsInAreasAndCategoriesWithQuartile.
+
+        Args:
+            area_ids (Set[str]): Set of area identifiers
+            category_ids (Set[str]): Set of category identifiers
+            quartiles (Set[str]): Set of quartiles
+
+        Yields:
+            Journal: Found journals, batch by batch rather than in title order
+        """
+        try:
+            plan = self._planner.planDiamondJournals(area_ids, category_ids, quartiles)
+            issns = self._diamond_issns(
+                self._issns_in_areas(area_ids), self._issns_in_categories(category_ids, quartiles)
+            )
+            if issns is None:
+                for journals in self._journal_batches('getJournalsWithoutAPC'):
+                    yield from journals
+                return
+            if not issns:
+                return
+            yield from self._iter_pushed_issns(plan, issns, 'getJournalsWithoutAPC', without_apc=True)
+        except Exception as e:
+            print(f"Error while searching for diamond journals: {e}")
+
+    def countJournalsInGroups(self, dimension: str, entity_ids: Set[str] = frozenset(),
+                              quartiles: Set[str] = frozenset(), without_apc: bool = False,
+                              licenses: Optional[Set[str]] = None) -> Dict[str, int]:
+        """
+        Count the journals of the journal store per Scimago area, category or quartile.
+
+        The category handlers return the (group, ISSN) pairs of the grouping
+        and the journal handlers the identity index of the journals passing
+        the filters; the two are joined on ISSN and the distinct journal keys
+        of every group are counted, without building any journal. The count
+        of a group is the number of journals the matching mashup query
+        returns for it, e.g. getJournalsInAreasWithLicense({area}, licenses).
+
+        Args:
+            dimension (str): 'area', 'category' or 'quartile'
+            entity_ids (Set[str]): Area or category identifiers to restrict to
+                (categories for 'quartile'; empty for all)
+            quartiles (Set[str]): Quartiles to restrict to (empty for any; ignored for 'area')
+            without_apc (bool): Only count journals without APC
+            licenses (Set[str], optional): Only count journals with one of these licenses
 
         Returns:
-            Set[str]: Set of journal ISSNs
+            Dict[str, int]: Number of journals per group, by decreasing count
+
+        Raises:
+            ValueError: If the dimension cannot be grouped on
         """
+        if dimension not in CategoryQueryHandler.GROUP_DIMENSIONS:
+            raise ValueError(f"Cannot group journals by: {dimension}")
         try:
-            import sqlite3
-            conn = sqlite3.connect(handler.getDbPathOrUrl())
-            query = "SELECT DISTINCT issn FROM journal_areas WHERE area_id = ?"
-            cursor = conn.execute(query, (area_id,))
-            issns = {row[0] for row in cursor.fetchall()}
-            conn.close()
-            return issns
-        except Exception:
-            return set()
+            return self._count_group_keys(
+                dimension, entity_ids, quartiles, self._journal_identity_index(without_apc, licenses)
+            )
+        except Exception as e:
+            print(f"Error while counting journals by {dimension}: {e}")
+            return {}
+
+    def countCategorizedJournalsBy(self, dimension: str, entity_ids: Set[str] = frozenset(),
+                                   quartiles: Set[str] = frozenset()) -> Dict[str, int]:
+        """
+        Count the journals of the relational store per area, category or quartile.
+
+        As BasicQueryEngine.countCategorizedJournalsBy. When a category
+        handler has no journal identity table (see
+        CategoryQueryHandler.hasIdentityIndex), its identifiers are mapped to
+        their journals with the identity index of the journal store instead,
+        so a journal listed under its ISSN and its EISSN is still counted once;
+        identifiers the journal store does not know count as journals of their own.
+
+        Raises:
+            ValueError: If the dimension cannot be grouped on
+        """
+        if dimension not in CategoryQueryHandler.GROUP_DIMENSIONS:
+            raise ValueError(f"Cannot group journals by: {dimension}")
+        if all(handler.hasIdentityIndex() for handler in self._categoryQuery if hasattr(handler, 'hasIdentityIndex')):
+            return super().countCategorizedJournalsBy(dimension, entity_ids, quartiles)
+        try:
+            return self._count_group_keys(
+                dimension, entity_ids, quartiles, self._journal_identity_index(), keep_unknown=True
+            )
+        except Exception as e:
+            print(f"Error while counting journals by {dimension}: {e}")
+            return {}
+
+    def _count_group_keys(self, dimension: str, entity_ids: Set[str], quartiles: Set[str],
+                          index: Dict[str, str], keep_unknown: bool = False) -> Dict[str, int]:
+        """
+        Count the distinct journal keys of every group from the (group, ISSN) pairs of the category handlers.
+
+        ISSNs missing from the index are dropped, as they are not journals of
+        the journal store (or are filtered out), unless keep_unknown is set.
+        """
+        pairs = [
+            pair for rows in self._fan_out(
+                self._categoryQuery, 'getIssnsGroupedBy', dimension, entity_ids, quartiles
+            )
+            for pair in rows
+        ]
+        if not pairs:
+            return {}
+        frame = pd.DataFrame.from_records(pairs, columns=['value', 'issn'])
+        frame['key'] = frame['issn'].map(index)
+        if keep_unknown:
+            frame['key'] = frame['key'].fillna(frame['issn'])
+        frame = frame.dropna(subset=['key']).drop_duplicates(['value', 'key'])
+        return self._ordered_counts(frame['value'].value_counts().items())
+
+    def _iter_pushed_issns(self, plan, issns: Set[str], method_name: str, *args,
+                           without_apc: bool = False, licenses: Optional[Set[str]] = None) -> Iterator[Journal]:
+        """
+        Yield the journals with the given ISSNs for a streaming mashup query.
+
+        With ISSNS_FIRST the ISSNs are pushed in windows of ISSN_BATCH_SIZE
+        identifiers per worker; every identifier of a journal goes to the same
+        window, so no journal is yielded twice. The other plans page through
+        the journals of `method_name` and keep those with a matching key: a
+        semi-join is only chosen when the ISSNs cover a large share of the
+        store, where the paged scan reads about as much and holds one page.
+        """
+        index = self._journal_identity_index()
+        if plan.getStrategy() != QueryPlanner.ISSNS_FIRST:
+            keys = {index.get(issn, issn) for issn in issns}
+            for journals in self._journal_batches(method_name, *args):
+                yield from self._filter_journals_by_issns(journals, keys)
+            return
+        by_key: Dict[str, List[str]] = {}
+        for issn in sorted(issn for issn in issns if issn):
+            by_key.setdefault(index.get(issn, issn), []).append(issn)
+        window: Set[str] = set()
+        window_size = self.ISSN_BATCH_SIZE * self._max_workers
+        for key in sorted(by_key):
+            window.update(by_key[key])
+            if len(window) >= window_size:
+                yield from self._fetch_journals_by_issns(window, without_apc, licenses)
+                window = set()
+        if window:
+            yield from self._fetch_journals_by_issns(window, without_apc, licenses)
+
+    def _journal_keys(self, issns: Set[str]) -> Set[str]:
+        """
+        Map ISSNs and EISSNs to the identifiers the engine uses for their journals.
+
+        Identifiers missing from the identity index of the journal store are
+        kept as they are.
+        """
+        index = self._journal_identity_index()
+        return {index.get(issn, issn) for issn in issns}
+
+    def _journal_identity_index(self, without_apc: bool = False,
+                                licenses: Optional[Set[str]] = None) -> Dict[str, str]:
+        """
+        Return the identity index (identifier -> journal key) of the journal handlers.
+
+        The index is read once per data generation and set of handlers;
+        handlers without getIdentityIndex add nothing, and an index missing
+        the answer of a handler is used but not kept. An index restricted to
+        the journals passing a filter is read every time.
+        """
+        if without_apc or licenses:
+            index, _ = self._read_identity_index(self._issn_filter_args(without_apc, licenses))
+            return index
+        key = (Handler.getDataGeneration(), tuple(id(handler) for handler in self._journalQuery))
+        with self._identity_lock:
+            if self._identity_index is not None and self._identity_index_key == key:
+                return self._identity_index
+            index, complete = self._read_identity_index(())
+            if complete:
+                self._identity_index = index
+                self._identity_index_key = key
+            return index
+
+    def _read_identity_index(self, filters: tuple) -> tuple:
+        """Read the identity indexes of the journal handlers; return (index, whether every handler answered)."""
+        supported = [handler for handler in self._journalQuery if hasattr(handler, 'getIdentityIndex')]
+        frames = [
+            df for df in self._fan_out(supported, 'getIdentityIndex', *filters)
+            if {'identifier', 'key'}.issubset(df.columns)
+        ]
+        index: Dict[str, str] = {}
+        if frames:
+            # The first handler that knows an identifier decides its key
+            pairs = pd.concat(frames, ignore_index=True).dropna().drop_duplicates('identifier')
+            index = dict(zip(pairs['identifier'].astype(str), pairs['key'].astype(str)))
+        return index, len(frames) == len(supported)
+
+    def _journals_with_issns(self, plan, issns: Set[str], method_name: str, args: tuple,
+                             limit: Optional[int], offset: int, without_apc: bool = False,
+                             licenses: Optional[Set[str]] = None) -> List[Journal]:
+        """
+        Return the journals of a mashup query among those with the given ISSNs.
+
+        JOURNALS_FIRST filters the journals of `method_name` by key; the other
+        plans fetch the journals with the ISSNs and order them by title. For
+        one page, ISSNS_FIRST asks every VALUES batch for its first
+        offset + limit journals by title, and the other plans read title
+        pages of `method_name` until enough of them match.
+        """
+        strategy = plan.getStrategy()
+        if limit is not None and strategy != QueryPlanner.ISSNS_FIRST:
+            return self._first_matching_journals(method_name, args, self._journal_keys(issns), limit, offset)
+        if strategy == QueryPlanner.JOURNALS_FIRST:
+            journals = self._filter_journals_by_issns(
+                self._journals(method_name, *args), self._journal_keys(issns)
+            )
+            return self._page_by_title(journals, offset) if offset else journals
+        if limit is not None:
+            journals = self._fetch_journals_by_issns(issns, without_apc, licenses, offset + limit)
+        else:
+            journals = self._push_issns(plan, issns, without_apc, licenses)
+        return self._page_by_title(journals, offset, limit)
+
+    def _first_matching_journals(self, method_name: str, args: tuple, keys: Set[str],
+                                 limit: int, offset: int) -> List[Journal]:
+        """
+        Return one title-ordered page of the journals of `method_name` whose key is in `keys`.
+
+        Pages of the journal query are read in title order until
+        offset + limit journals matched. Each page is at least twice as large
+        as the previous one, and large enough for the missing journals at
+        the share of journals that matched so far.
+        """
+        wanted = offset + limit
+        matches: List[Journal] = []
+        position, size = 0, wanted
+        while len(matches) < wanted:
+            page = self._journals(method_name, *args, limit=size, offset=position)
+            matches.extend(self._filter_journals_by_issns(page, keys))
+            if len(page) < size:
+                break
+            position += size
+            if matches:
+                size = max(2 * size, math.ceil(1.25 * (wanted - len(matches)) * position / len(matches)))
+            else:
+                size *= 2
+        return matches[offset:wanted]
+
+    def _push_issns(self, plan, issns: Set[str], without_apc: bool = False,
+                    licenses: Optional[Set[str]] = None) -> List[Journal]:
+        """Fetch the journals with the given ISSNs as the plan says: VALUES batches or a semi-join."""
+        if plan.getStrategy() == QueryPlanner.SEMI_JOIN:
+            return self._semi_join_journals(issns, without_apc, licenses)
+        return self._fetch_journals_by_issns(issns, without_apc, licenses)
+
+    def _semi_join_journals(self, issns: Set[str], without_apc: bool = False,
+                            licenses: Optional[Set[str]] = None) -> List[Journal]:
+        """
+        Fetch the journals with the given ISSNs through a range semi-join.
+
+        The sorted ISSN set is split into groups of SEMI_JOIN_GROUP_SIZE
+        neighbouring identifiers and each group is reduced to at most
+        SEMI_JOIN_MAX_RANGES identifier ranges. Every (handler, group) pair
+        is scanned concurrently, page by page, for journals in the group's
+        ranges, and only rows with an exact identifier in the set are kept. A
+        journal whose ISSN and EISSN fall in different groups is read twice
+        and merged with itself when the rows are folded.
+
+        Args:
+            issns (Set[str]): ISSNs of the journals to fetch
+            without_apc (bool): Only fetch journals without APC
+            licenses (Set[str], optional): Only fetch journals with one of these licenses
+
+        Returns:
+            List[Journal]: Matching journals
+        """
+        cleaned_ids = sorted({issn for issn in issns if issn})
+        if not cleaned_ids:
+            return []
+        groups = [
+            (set(group), self._issn_ranges(group, self.SEMI_JOIN_MAX_RANGES))
+            for group in self._chunked(cleaned_ids, self.SEMI_JOIN_GROUP_SIZE)
+        ]
+        calls = [
+            functools.partial(self._scan_issn_ranges, handler, group, ranges, without_apc, licenses)
+            for handler in self._journalQuery for group, ranges in groups
+        ]
+        return self._journal_result_set(df for _, df in self._fan_out_calls(calls))
+
+    def _scan_issn_ranges(self, handler: JournalQueryHandler, issns: Set[str], ranges: List[tuple],
+                          without_apc: bool, licenses: Optional[Set[str]]) -> pd.DataFrame:
+        """Read every page of a handler's journals in the ranges, keeping the exact matches."""
+        frames: List[pd.DataFrame] = []
+        after: Optional[str] = None
+        while True:
+            page = handler.getJournalsInIssnRanges(
+                ranges, without_apc, licenses, after, self.SEMI_JOIN_PAGE_SIZE
+            )
+            if page.empty or 'journal' not in page.columns:
+                break
+            frames.append(self._rows_with_identifiers(page, issns))
+            journals = page['journal'].astype(str)
+            if journals.nunique() < self.SEMI_JOIN_PAGE_SIZE:
+                break
+            after = journals.max()
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    @staticmethod
+    def _rows_with_identifiers(df: pd.DataFrame, issns: Set[str]) -> pd.DataFrame:
+        """Keep the rows whose ISSN or EISSN is in the set."""
+        matches = np.zeros(len(df), dtype=bool)
+        for column in ('issn', 'eissn'):
+            if column in df.columns:
+                matches |= df[column].astype(object).isin(issns).to_numpy()
+        return df[matches]
+
+    @classmethod
+    def _issn_ranges(cls, issns: Iterable[str], max_ranges: int) -> List[tuple]:
+        """
+        Cover a set of identifiers with at most `max_ranges` inclusive (lowest, highest) ranges.
+
+        Identifiers are sorted as strings (the order used by the SPARQL
+        comparison) and split at the widest numeric gaps between neighbouring
+        ISSNs; a split is always preferred next to an identifier that is not
+        an ISSN.
+        """
+        ordered = sorted(issns)
+        if len(ordered) <= max_ranges:
+            return [(identifier, identifier) for identifier in ordered]
+
+        def number(identifier: str) -> Optional[int]:
+            if not cls._ISSN_PATTERN.match(identifier):
+                return None
+            return int(identifier.replace('-', '')[:7])
+
+        numbers = [number(identifier) for identifier in ordered]
+        gaps = [
+            math.inf if low is None or high is None else abs(high - low)
+            for low, high in zip(numbers, numbers[1:])
+        ]
+        splits = sorted(np.argsort(gaps, kind='stable')[::-1][:max_ranges - 1])
+        ranges = []
+        start = 0
+        for split in splits:
+            ranges.append((ordered[start], ordered[split]))
+            start = split + 1
+        ranges.append((ordered[start], ordered[-1]))
+        return ranges
+
+    def _diamond_journals(self, limit: Optional[int] = None, offset: int = 0) -> List[Journal]:
+        """Return every journal without APC (or one page of them), selected by the journal handlers."""
+        return self._journals('getJournalsWithoutAPC', limit=limit, offset=offset)
+
+    def _diamond_issns(self, journal_issns_in_areas: Optional[Set[str]],
+                       journal_issns_in_categories: Optional[Set[str]]) -> Optional[Set[str]]:
+        """
+        Combine the area and category restrictions of the diamond journal query.
+
+        Args:
+            journal_issns_in_areas (Set[str] or None): Result of _issns_in_areas
+            journal_issns_in_categories (Set[str] or None): Result of _issns_in_categories
+
+        Returns:
+            Set[str] or None: ISSNs satisfying every restriction (possibly empty),
+            or None when no restriction applies
+        """
+        restrictions = [
+            issns for issns in (journal_issns_in_areas, journal_issns_in_categories)
+            if issns is not None
+        ]
+        if not restrictions:
+            return None
+        return set.intersection(*(set(issns) for issns in restrictions))
+
+    def _issns_in_categories(self, category_ids: Set[str], quartiles: Set[str]) -> Optional[Set[str]]:
+        """
+        Resolve the ISSNs of journals in the given categories, with one query per handler.
+
+        Args:
+            category_ids (Set[str]): Category identifiers to restrict to (empty for all)
+            quartiles (Set[str]): Requested quartiles (empty for any)
+
+        Returns:
+            Set[str] or None: Matching ISSNs, an empty set when nothing can match,
+            or None when no category restriction applies
+        """
+        journal_issns: Set[str] = set()
+        for issns in self._fan_out(self._categoryQuery, 'getIssnsInCategories', category_ids, quartiles):
+            journal_issns.update(issns)
+        if not journal_issns and not category_ids and not quartiles:
+            # No journal has a category at all
+            return None
+        return journal_issns
+
+    def _issns_in_areas(self, area_ids: Set[str]) -> Optional[Set[str]]:
+        """
+        Resolve the ISSNs of journals in the given areas, with one query per handler.
+
+        Args:
+            area_ids (Set[str]): Area identifiers
+
+        Returns:
+            Set[str] or None: Matching ISSNs, or None when no area restriction applies
+        """
+        if not area_ids:
+            return None
+        journal_issns: Set[str] = set()
+        for issns in self._fan_out(self._categoryQuery, 'getIssnsInAreas', area_ids):
+            journal_issns.update(issns)
+        return journal_issns
+
+    def _filter_journals_by_issns(self, journals: List[Journal], *issn_sets: Optional[Set[str]]) -> List[Journal]:
+        """
+        Keep the journals whose identifier belongs to every given ISSN set.
+
+        ISSN sets of the relational store hold every ISSN and EISSN of a
+        journal; pass them through _journal_keys to compare them with the
+        identifiers of the journals.
+
+        Args:
+            journals (List[Journal]): Candidate journals
+            *issn_sets (Set[str] or None): ISSN restrictions; None means no restriction
+
+        Returns:
+            List[Journal]: Filtered journals, deduplicated by identifier
+        """
+        restrictions = [issns for issns in issn_sets if issns is not None]
+        if isinstance(journals, JournalResultSet):
+            # Identifiers of a result set are unique: select positions lazily
+            return journals.take(
+                position for position, journal_issn in enumerate(journals.column('id'))
+                if journal_issn and all(journal_issn in issns for issns in restrictions)
+            )
+        filtered: Dict[str, Journal] = {}
+        for journal in journals:
+            journal_issn = journal.getIds()[0] if journal.getIds() else None
+            if not journal_issn:
+                continue
+            if any(journal_issn not in issns for issns in restrictions):
+                continue
+            filtered[journal_issn] = journal
+        return list(filtered.values())
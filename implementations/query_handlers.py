@@ -4,19 +4,93 @@ Query handlers for databases.
 Contains classes: JournalQueryHandler, CategoryQueryHandler
 """
 
-import requests
-import sqlite3
+import bisect
+import json
+import operator
+import threading
 import pandas as pd
-from typing import List, Set, Optional
-from .handlers import QueryHandler
+from typing import Any, Dict, Iterable, List, Set, Optional, Tuple
+from .handlers import QueryHandler, STORE_RESOURCE, check_page
+from .sqlite_pool import SQLiteConnectionPool, SQLiteVersionProbe
+from .snapshot import CategorySnapshot, SnapshotHolder
 from .models import Journal, Category, Area
 
 
 class JournalQueryHandler(QueryHandler):
     """
     Handler for journal queries against a Blazegraph graph database.
+
+    The get* journal methods can return one page of their journals: with
+    `after`, a keyset page by journal URI (the URI of the last journal of
+    the previous page, "" for the first page); with `limit` or `offset`
+    alone, a page in title order. A negative `limit` or `offset` raises
+    ValueError. See _build_journal_query.
     """
 
+    _PREFIXES = """
+            PREFIX doaj: <http://doaj.org/>
+            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+            """
+
+    # Optional journal attributes and the predicates they are stored under
+    _OPTIONAL_FIELDS = (
+        ('issn', 'doaj:issn'),
+        ('eissn', 'doaj:eissn'),
+        ('language', 'doaj:language'),
+        ('publisher', 'doaj:publisher'),
+        ('seal', 'doaj:hasDOAJSeal'),
+        ('licence', 'doaj:licence'),
+        ('apc', 'doaj:hasAPC'),
+    )
+
+    # Column dtypes applied to SPARQL results when typed results are enabled
+    _RESULT_SCHEMA = {
+        'seal': 'boolean',
+        'apc': 'boolean',
+        'licence': 'category',
+        'language': 'category',
+        'publisher': 'category',
+    }
+
+    # Free-text columns that may be stored as Arrow-backed strings
+    _STRING_COLUMNS = ('journal', 'title', 'issn', 'eissn')
+
+    _TRUE_LITERALS = frozenset({'1', 'true', 'yes'})
+
+    # Keeps diamond journals only: no APC, or no APC information at all
+    _WITHOUT_APC_FILTER = 'FILTER NOT EXISTS { ?journal doaj:hasAPC "true"^^xsd:boolean }'
+
+    # Number of identifiers sent in a single VALUES block by getByIds
+    BATCH_SIZE = 500
+
+    # Fields countJournalsBy can group on and the predicates they are stored under
+    GROUP_FIELDS = {
+        'licence': 'doaj:licence',
+        'language': 'doaj:language',
+        'publisher': 'doaj:publisher',
+        'apc': 'doaj:hasAPC',
+        'seal': 'doaj:hasDOAJSeal',
+    }
+
+    # Boolean fields, grouped as True and False
+    _FLAG_FIELDS = frozenset({'apc', 'seal'})
+
+    def __init__(self, dbPathOrUrl: str = "", typed_results: bool = True,
+                 string_storage: Optional[str] = None):
+        """
+        Args:
+            dbPathOrUrl (str): SPARQL endpoint URL
+            typed_results (bool): Convert result columns according to _RESULT_SCHEMA
+            string_storage (str, optional): Storage for free-text columns, e.g. "pyarrow";
+                None keeps the pandas default
+        """
+        super().__init__(dbPathOrUrl)
+        self._typed_results: bool = typed_results
+        self._string_storage: Optional[str] = string_storage
+        # (endpoint, data generation, answer) of the last hasIdentityIndex check
+        self._identity_index_check: Optional[Tuple[str, int, bool]] = None
+
     def _escape_literal(self, value: str) -> str:
         """
         Escape a Python string so that it can be safely injected inside double quotes
@@ -31,423 +105,1194 @@ class JournalQueryHandler(QueryHandler):
             .replace("\n", "\\n")
             .replace("\r", "\\r")
         )
-    
-    def getById(self, entity_id: str) -> pd.DataFrame:
+
+    def _build_journal_query(
+        self,
+        constraints: str = "",
+        required: Set[str] = frozenset(),
+        ordered: bool = True,
+        tail: str = "",
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> str:
         """
-        Return a journal by identifier (ISSN).
+        Build the standard journal SELECT query.
 
-            else:
-                # Build query with area filter
+        With `after`, a subquery first selects one keyset page of the
+        matching journals by journal URI, and the rows of those journals are
+        returned ordered by URI. With `limit` or `offset` alone, the subquery
+        selects one page of the journals in title order instead, grouped by
+        journal so that a journal with several rows counts once.
+
+        Args:
+            constraints (str): Extra triple patterns and filters restricting the journals
+            required (Set[str]): Fields already bound by the constraints (no OPTIONAL needed)
+            ordered (bool): Whether to sort the result by title
+            tail (str): Patterns appended after the OPTIONAL blocks
+            after (str, optional): Only journals whose URI sorts after this one ("" for the first page)
+            limit (int, optional): Maximum number of journals
+            offset (int): Number of journals skipped, in title order (without `after`)
 
         Returns:
-            pd.DataFrame: Journal data or an empty DataFrame
+            str: SPARQL query
+
+        Raises:
+            ValueError: If `limit` or `offset` is negative
         """
-        try:
-            escaped_id = self._escape_literal(entity_id)
-            sparql_query = f"""
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
+        check_page(limit, offset)
+        optionals = "\n".join(
+            f"                OPTIONAL {{ ?journal {predicate} ?{field} }}"
+            for field, predicate in self._OPTIONAL_FIELDS
+            if field not in required
+        )
+        page = ""
+        order_clause = "ORDER BY ?title" if ordered else ""
+        patterns = f"""{constraints}
+                    ?journal rdf:type doaj:Journal .
+                    ?journal doaj:title ?title .
+                    {tail}"""
+        if after is not None:
+            page = self._journal_page(patterns, after, limit)
+            order_clause = "ORDER BY ?journal"
+        elif limit is not None or offset:
+            page = self._journal_title_page(patterns, limit, offset)
+            order_clause = "ORDER BY ?pageTitle ?journal"
+        return f"""{self._PREFIXES}
             SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
             WHERE {{
+                {page}
+                {constraints}
                 ?journal rdf:type doaj:Journal .
-                ?journal doaj:issn "{escaped_id}" .
                 ?journal doaj:title ?title .
-                OPTIONAL {{ ?journal doaj:issn ?issn }}
-                OPTIONAL {{ ?journal doaj:eissn ?eissn }}
-                OPTIONAL {{ ?journal doaj:language ?language }}
-                OPTIONAL {{ ?journal doaj:publisher ?publisher }}
-                OPTIONAL {{ ?journal doaj:hasDOAJSeal ?seal }}
-                OPTIONAL {{ ?journal doaj:licence ?licence }}
-                OPTIONAL {{ ?journal doaj:hasAPC ?apc }}
+{optionals}
+                {tail}
             }}
+            {order_clause}
             """
-            
-            return self._execute_sparql_query(sparql_query)
+
+    def _journal_page(self, patterns: str, after: Optional[str], limit: Optional[int]) -> str:
+        """Build the subquery selecting one keyset page, by journal URI, of the journals matching the patterns."""
+        after_filter = f'FILTER (STR(?journal) > "{self._escape_literal(after)}")' if after else ""
+        limit_clause = f"LIMIT {int(limit)}" if limit else ""
+        return f"""{{ SELECT DISTINCT ?journal WHERE {{
+                    {patterns}
+                    {after_filter}
+                }} ORDER BY ?journal {limit_clause} }}"""
+
+    def _journal_title_page(self, patterns: str, limit: Optional[int], offset: int) -> str:
+        """Build the subquery selecting one page, in title order, of the journals matching the patterns."""
+        limit_clause = f"LIMIT {int(limit)}" if limit is not None else ""
+        offset_clause = f"OFFSET {int(offset)}" if offset else ""
+        return f"""{{ SELECT ?journal (MIN(?title) AS ?pageTitle) WHERE {{
+                    {patterns}
+                }} GROUP BY ?journal ORDER BY ?pageTitle ?journal {limit_clause} {offset_clause} }}"""
+
+    def _by_id_query(self, entity_id: str) -> str:
+        """Build the query used by getById."""
+        escaped_id = self._escape_literal(entity_id)
+        return self._build_journal_query(
+            f'?journal doaj:issn "{escaped_id}" .', ordered=False
+        )
+
+    def _by_ids_query(self, entity_ids: List[str]) -> str:
+        """Build the query used by getByIds for one chunk of identifiers."""
+        values_clause = " ".join(f'"{self._escape_literal(entity_id)}"' for entity_id in entity_ids)
+        return self._build_journal_query(
+            f"""VALUES ?lookupId {{ {values_clause} }}
+                ?journal doaj:issn ?lookupId .""",
+            ordered=False,
+        )
+
+    def _all_journals_query(self, after: Optional[str] = None, limit: Optional[int] = None,
+                            offset: int = 0) -> str:
+        """Build the query used by getAllJournals."""
+        return self._build_journal_query(after=after, limit=limit, offset=offset)
+
+    def _journals_with_title_query(self, partialTitle: str, after: Optional[str] = None,
+                                   limit: Optional[int] = None, offset: int = 0) -> str:
+        """Build the query used by getJournalsWithTitle."""
+        value = self._escape_literal(partialTitle)
+        return self._build_journal_query(
+            f'FILTER (CONTAINS(LCASE(?title), LCASE("{value}")))', after=after, limit=limit, offset=offset
+        )
+
+    def _journals_published_by_query(self, partialName: str, after: Optional[str] = None,
+                                     limit: Optional[int] = None, offset: int = 0) -> str:
+        """Build the query used by getJournalsPublishedBy."""
+        value = self._escape_literal(partialName)
+        return self._build_journal_query(
+            f"""?journal doaj:publisher ?publisher .
+                FILTER (CONTAINS(LCASE(?publisher), LCASE("{value}")))""",
+            required={'publisher'}, after=after, limit=limit, offset=offset,
+        )
+
+    def _licence_constraint(self, licenses: Set[str]) -> Optional[str]:
+        """Build the patterns restricting ?licence to the given licenses (None if nothing can match)."""
+        escaped_licenses = [
+            f'"{self._escape_literal(license)}"' for license in licenses if license
+        ]
+        if not escaped_licenses:
+            return None
+        license_filter = " || ".join(
+            [f'?licence = {licence}' for licence in escaped_licenses]
+        )
+        return f"""?journal doaj:licence ?licence .
+                FILTER ({license_filter})"""
+
+    def _journals_with_license_query(self, licenses: Set[str], after: Optional[str] = None,
+                                     limit: Optional[int] = None, offset: int = 0) -> Optional[str]:
+        """Build the query used by getJournalsWithLicense (None if nothing can match)."""
+        if not licenses:
+            return self._all_journals_query(after, limit, offset)
+        constraint = self._licence_constraint(licenses)
+        if constraint is None:
+            return None
+        return self._build_journal_query(
+            constraint, required={'licence'}, after=after, limit=limit, offset=offset
+        )
+
+    def _journals_with_apc_query(self, after: Optional[str] = None, limit: Optional[int] = None,
+                                 offset: int = 0) -> str:
+        """Build the query used by getJournalsWithAPC."""
+        return self._build_journal_query(
+            '?journal doaj:hasAPC "true"^^xsd:boolean .', after=after, limit=limit, offset=offset
+        )
+
+    def _journals_with_doaj_seal_query(self, after: Optional[str] = None, limit: Optional[int] = None,
+                                       offset: int = 0) -> str:
+        """Build the query used by getJournalsWithDOAJSeal."""
+        return self._build_journal_query(
+            '?journal doaj:hasDOAJSeal "true"^^xsd:boolean .', after=after, limit=limit, offset=offset
+        )
+
+    def _journals_by_issns_query(self, issns: Set[str], without_apc: bool = False,
+                                 licenses: Optional[Set[str]] = None,
+                                 limit: Optional[int] = None, indexed: bool = True) -> Optional[str]:
+        """
+        Build the query used by getJournalsByIssns (None if nothing can match).
+
+        Identifiers are joined on the doaj:identifier index written at upload
+        (on doaj:issn and doaj:eissn when `indexed` is False), so a journal
+        matches on its ISSN or its EISSN; the subquery returns it once even
+        when both are in the set.
+        """
+        cleaned_ids = {issn for issn in issns if issn}
+        if not cleaned_ids:
+            return None
+        licence_constraint = ""
+        if licenses:
+            licence_constraint = self._licence_constraint(licenses)
+            if licence_constraint is None:
+                return None
+        values_clause = " ".join(
+            f'"{self._escape_literal(issn)}"' for issn in sorted(cleaned_ids)
+        )
+        return self._build_journal_query(
+            f"""{{ SELECT DISTINCT ?journal WHERE {{
+                    VALUES ?anyId {{ {values_clause} }}
+                    {self._identifier_pattern('anyId', indexed)}
+                }} }}
+                {licence_constraint}""",
+            required={'licence'} if licence_constraint else frozenset(),
+            tail=self._WITHOUT_APC_FILTER if without_apc else "",
+            limit=limit,
+        )
+
+    def _journals_in_issn_ranges_query(self, ranges: List[Tuple[str, str]], without_apc: bool = False,
+                                       licenses: Optional[Set[str]] = None, after: Optional[str] = None,
+                                       limit: Optional[int] = None, indexed: bool = True) -> Optional[str]:
+        """Build the query used by getJournalsInIssnRanges (None if nothing can match)."""
+        if not ranges:
+            return None
+        licence_constraint = ""
+        if licenses:
+            licence_constraint = self._licence_constraint(licenses)
+            if licence_constraint is None:
+                return None
+        range_filter = " || ".join(
+            f'(?anyId >= "{self._escape_literal(low)}" && ?anyId <= "{self._escape_literal(high)}")'
+            for low, high in ranges
+        )
+        # The subquery selects one page of journals, the outer query their rows
+        return self._build_journal_query(
+            self._journal_page(
+                f"""?journal rdf:type doaj:Journal .
+                    ?journal doaj:title ?pageTitle .
+                    {self._identifier_pattern('anyId', indexed)}
+                    FILTER ({range_filter})
+                    {licence_constraint}
+                    {self._WITHOUT_APC_FILTER if without_apc else ""}""",
+                after, limit,
+            ),
+            ordered=False,
+        )
+
+    @staticmethod
+    def _identifier_pattern(variable: str, indexed: bool) -> str:
+        """Return the patterns binding ?variable to every ISSN and EISSN of ?journal."""
+        if indexed:
+            return f"?journal doaj:identifier ?{variable} ."
+        return f"{{ ?journal doaj:issn ?{variable} }} UNION {{ ?journal doaj:eissn ?{variable} }}"
+
+    def _journals_without_apc_query(self, after: Optional[str] = None, limit: Optional[int] = None,
+                                    offset: int = 0) -> str:
+        """Build the query used by getJournalsWithoutAPC."""
+        return self._build_journal_query(
+            tail=self._WITHOUT_APC_FILTER, after=after, limit=limit, offset=offset
+        )
+    
+    def getById(self, entity_id: str) -> pd.DataFrame:
+        """
+        Return a journal by identifier (ISSN).
+
+        Args:
+            entity_id (str): Journal ISSN
+
+        Returns:
+            pd.DataFrame: Journal data or an empty DataFrame
+        """
+        try:
+            return self._execute_sparql_query(self._by_id_query(entity_id))
             
         except Exception as e:
             print(f"Error while querying journal by ID: {e}")
             return pd.DataFrame()
     
-    def getAllJournals(self) -> pd.DataFrame:
+    def getByIds(self, entity_ids: Iterable[str]) -> pd.DataFrame:
+        """
+        Return the journals matching any of the given identifiers (ISSNs).
+
+        Identifiers are resolved with one VALUES query per chunk of
+        BATCH_SIZE identifiers instead of one query per identifier.
+
+        Args:
+            entity_ids (Iterable[str]): Journal ISSNs
+
+        Returns:
+            pd.DataFrame: Rows of all matching journals or an empty DataFrame
+        """
+        try:
+            cleaned_ids = sorted({str(entity_id) for entity_id in entity_ids if entity_id})
+            frames = [
+                self._execute_sparql_query(self._by_ids_query(cleaned_ids[i:i + self.BATCH_SIZE]))
+                for i in range(0, len(cleaned_ids), self.BATCH_SIZE)
+            ]
+            frames = [df for df in frames if not df.empty]
+            if not frames:
+                return pd.DataFrame()
+            return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            
+        except Exception as e:
+            print(f"Error while querying journals by IDs: {e}")
+            return pd.DataFrame()
+    
+    def getAllJournals(self, after: Optional[str] = None,
+                       limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
         """
         Return all journals from the database.
 
+        Args:
+            after (str, optional): Journal URI of the last journal of the previous page ("" for the first)
+            limit (int, optional): Maximum number of journals in the page
+            offset (int): Number of journals skipped, in title order
+
         Returns:
             pd.DataFrame: DataFrame with all journals
         """
+        sparql_query = self._all_journals_query(after, limit, offset)
         try:
-            sparql_query = """
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {
-                ?journal rdf:type doaj:Journal .
-                ?journal doaj:title ?title .
-                OPTIONAL { ?journal doaj:issn ?issn }
-                OPTIONAL { ?journal doaj:eissn ?eissn }
-                OPTIONAL { ?journal doaj:language ?language }
-                OPTIONAL { ?journal doaj:publisher ?publisher }
-                OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
-                OPTIONAL { ?journal doaj:licence ?licence }
-                OPTIONAL { ?journal doaj:hasAPC ?apc }
-            }
-            ORDER BY ?title
-            """
-            
             return self._execute_sparql_query(sparql_query)
             
         except Exception as e:
             print(f"Error while fetching all journals: {e}")
             return pd.DataFrame()
     
-    def getJournalsWithTitle(self, partialTitle: str) -> pd.DataFrame:
+    def getJournalsWithTitle(self, partialTitle: str, after: Optional[str] = None,
+                             limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
         """
         Return journals with partial title match.
 
         Args:
             partialTitle (str): Partial title to search for
+            after (str, optional): Journal URI of the last journal of the previous page ("" for the first)
+            limit (int, optional): Maximum number of journals in the page
+            offset (int): Number of journals skipped, in title order
 
         Returns:
             pd.DataFrame: DataFrame with found journals
         """
+        sparql_query = self._journals_with_title_query(partialTitle, after, limit, offset)
         try:
-            value = self._escape_literal(partialTitle)
-            sparql_query = f"""
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {{
-                ?journal rdf:type doaj:Journal .
-                ?journal doaj:title ?title .
-                FILTER (CONTAINS(LCASE(?title), LCASE("{value}")))
-                OPTIONAL {{ ?journal doaj:issn ?issn }}
-                OPTIONAL {{ ?journal doaj:eissn ?eissn }}
-                OPTIONAL {{ ?journal doaj:language ?language }}
-                OPTIONAL {{ ?journal doaj:publisher ?publisher }}
-                OPTIONAL {{ ?journal doaj:hasDOAJSeal ?seal }}
-                OPTIONAL {{ ?journal doaj:licence ?licence }}
-                OPTIONAL {{ ?journal doaj:hasAPC ?apc }}
-            }}
-            ORDER BY ?title
-            """
-            
             return self._execute_sparql_query(sparql_query)
             
         except Exception as e:
             print(f"Error while searching journals by title: {e}")
             return pd.DataFrame()
     
-    def getJournalsPublishedBy(self, partialName: str) -> pd.DataFrame:
+    def getJournalsPublishedBy(self, partialName: str, after: Optional[str] = None,
+                               limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
         """
         Return journals with partial publisher name match.
 
         Args:
             partialName (str): Partial publisher name to search for
+            after (str, optional): Journal URI of the last journal of the previous page ("" for the first)
+            limit (int, optional): Maximum number of journals in the page
+            offset (int): Number of journals skipped, in title order
 
         Returns:
             pd.DataFrame: DataFrame with found journals
         """
+        sparql_query = self._journals_published_by_query(partialName, after, limit, offset)
         try:
-            value = self._escape_literal(partialName)
-            sparql_query = f"""
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {{
-                ?journal rdf:type doaj:Journal .
-                ?journal doaj:title ?title .
-                ?journal doaj:publisher ?publisher .
-                FILTER (CONTAINS(LCASE(?publisher), LCASE("{value}")))
-                OPTIONAL {{ ?journal doaj:issn ?issn }}
-                OPTIONAL {{ ?journal doaj:eissn ?eissn }}
-                OPTIONAL {{ ?journal doaj:language ?language }}
-                OPTIONAL {{ ?journal doaj:hasDOAJSeal ?seal }}
-                OPTIONAL {{ ?journal doaj:licence ?licence }}
-                OPTIONAL {{ ?journal doaj:hasAPC ?apc }}
-            }}
-            ORDER BY ?title
-            """
-            
             return self._execute_sparql_query(sparql_query)
             
         except Exception as e:
             print(f"Error while searching journals by publisher: {e}")
             return pd.DataFrame()
     
-    def getJournalsWithLicense(self, licenses: Set[str]) -> pd.DataFrame:
+    def getJournalsWithLicense(self, licenses: Set[str], after: Optional[str] = None,
+                               limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
         """
         Return journals with specified licenses.
 
         Args:
             licenses (Set[str]): Set of licenses to search for
+            after (str, optional): Journal URI of the last journal of the previous page ("" for the first)
+            limit (int, optional): Maximum number of journals in the page
+            offset (int): Number of journals skipped, in title order
 
         Returns:
             pd.DataFrame: DataFrame with found journals
         """
+        sparql_query = self._journals_with_license_query(licenses, after, limit, offset)
         try:
-            if not licenses:
-                return self.getAllJournals()
-            # Build the license filter
-            escaped_licenses = [
-                f'"{self._escape_literal(license)}"' for license in licenses if license
-            ]
-            if not escaped_licenses:
+            if sparql_query is None:
                 return pd.DataFrame()
-            license_filter = " || ".join(
-                [f'?licence = {licence}' for licence in escaped_licenses]
-            )
-            
-            sparql_query = f"""
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {{
-                ?journal rdf:type doaj:Journal .
-                ?journal doaj:title ?title .
-                ?journal doaj:licence ?licence .
-                FILTER ({license_filter})
-                OPTIONAL {{ ?journal doaj:issn ?issn }}
-                OPTIONAL {{ ?journal doaj:eissn ?eissn }}
-                OPTIONAL {{ ?journal doaj:language ?language }}
-                OPTIONAL {{ ?journal doaj:publisher ?publisher }}
-                OPTIONAL {{ ?journal doaj:hasDOAJSeal ?seal }}
-                OPTIONAL {{ ?journal doaj:hasAPC ?apc }}
-            }}
-            ORDER BY ?title
-            """
-            
             return self._execute_sparql_query(sparql_query)
             
         except Exception as e:
             print(f"Error while searching journals by license: {e}")
             return pd.DataFrame()
     
-    def getJournalsWithAPC(self) -> pd.DataFrame:
+    def getJournalsWithAPC(self, after: Optional[str] = None,
+                           limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
         """
         Return journals that have Article Processing Charge (APC).
 
+        Args:
+            after (str, optional): Journal URI of the last journal of the previous page ("" for the first)
+            limit (int, optional): Maximum number of journals in the page
+            offset (int): Number of journals skipped, in title order
+
         Returns:
             pd.DataFrame: DataFrame with journals that have APC
         """
+        sparql_query = self._journals_with_apc_query(after, limit, offset)
         try:
-            sparql_query = """
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {
-                ?journal rdf:type doaj:Journal .
-                ?journal doaj:title ?title .
-                ?journal doaj:hasAPC "true"^^xsd:boolean .
-                OPTIONAL { ?journal doaj:issn ?issn }
-                OPTIONAL { ?journal doaj:eissn ?eissn }
-                OPTIONAL { ?journal doaj:language ?language }
-                OPTIONAL { ?journal doaj:publisher ?publisher }
-                OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
-                OPTIONAL { ?journal doaj:licence ?licence }
-                OPTIONAL { ?journal doaj:hasAPC ?apc }
-            }
-            ORDER BY ?title
-            """
-            
             return self._execute_sparql_query(sparql_query)
             
         except Exception as e:
             print(f"Error while searching journals with APC: {e}")
             return pd.DataFrame()
     
-    def getJournalsWithDOAJSeal(self) -> pd.DataFrame:
+    def getJournalsWithDOAJSeal(self, after: Optional[str] = None,
+                                limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
         """
         Return journals that have DOAJ Seal.
 
+        Args:
+            after (str, optional): Journal URI of the last journal of the previous page ("" for the first)
+            limit (int, optional): Maximum number of journals in the page
+            offset (int): Number of journals skipped, in title order
+
         Returns:
             pd.DataFrame: DataFrame with journals that have DOAJ Seal
         """
+        sparql_query = self._journals_with_doaj_seal_query(after, limit, offset)
         try:
-            sparql_query = """
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {
-                ?journal rdf:type doaj:Journal .
-                ?journal doaj:title ?title .
-                ?journal doaj:hasDOAJSeal "true"^^xsd:boolean .
-                OPTIONAL { ?journal doaj:issn ?issn }
-                OPTIONAL { ?journal doaj:eissn ?eissn }
-                OPTIONAL { ?journal doaj:language ?language }
-                OPTIONAL { ?journal doaj:publisher ?publisher }
-                OPTIONAL { ?journal doaj:hasDOAJSeal ?seal }
-                OPTIONAL { ?journal doaj:licence ?licence }
-                OPTIONAL { ?journal doaj:hasAPC ?apc }
-            }
-            ORDER BY ?title
-            """
-            
             return self._execute_sparql_query(sparql_query)
             
         except Exception as e:
             print(f"Error while searching journals with DOAJ Seal: {e}")
             return pd.DataFrame()
     
-    def getJournalsByIssns(self, issns: Set[str]) -> pd.DataFrame:
-        """
-        Return journals that match any of the provided ISSNs or EISSNs.
+    def getJournalsWithoutAPC(self, after: Optional[str] = None,
+                              limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
         """
-        cleaned_ids = {issn for issn in issns if issn}
-        if not cleaned_ids:
-            return pd.DataFrame()
+        Return diamond journals, i.e. journals without Article Processing Charge (APC).
 
-        values_clause = " ".join(
-            f'"{self._escape_literal(issn)}"' for issn in sorted(cleaned_ids)
-        )
+        Args:
+            after (str, optional): Journal URI of the last journal of the previous page ("" for the first)
+            limit (int, optional): Maximum number of journals in the page
+            offset (int): Number of journals skipped, in title order
+
+        Returns:
+            pd.DataFrame: DataFrame with journals that have no APC
+        """
+        sparql_query = self._journals_without_apc_query(after, limit, offset)
         try:
-            sparql_query = f"""
-            PREFIX doaj: <http://doaj.org/>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-            SELECT ?journal ?title ?issn ?eissn ?language ?publisher ?seal ?licence ?apc
-            WHERE {{
-                VALUES ?targetId {{ {values_clause} }}
-                ?journal rdf:type doaj:Journal .
-                ?journal doaj:title ?title .
-                OPTIONAL {{ ?journal doaj:issn ?issn }}
-                OPTIONAL {{ ?journal doaj:eissn ?eissn }}
-                OPTIONAL {{ ?journal doaj:language ?language }}
-                OPTIONAL {{ ?journal doaj:publisher ?publisher }}
-                OPTIONAL {{ ?journal doaj:hasDOAJSeal ?seal }}
-                OPTIONAL {{ ?journal doaj:licence ?licence }}
-                OPTIONAL {{ ?journal doaj:hasAPC ?apc }}
-                BIND(COALESCE(?issn, ?eissn) AS ?anyId)
-                FILTER (?anyId IN ({values_clause}))
-            }}
-            ORDER BY ?title
-            """
             return self._execute_sparql_query(sparql_query)
+            
         except Exception as e:
-            print(f"Error while searching journals by ISSNs: {e}")
+            print(f"Error while searching journals without APC: {e}")
             return pd.DataFrame()
-
-    def _execute_sparql_query(self, sparql_query: str) -> pd.DataFrame:
+    
+    def getJournalsByIssns(self, issns: Set[str], without_apc: bool = False,
+                           licenses: Optional[Set[str]] = None,
+                           limit: Optional[int] = None) -> pd.DataFrame:
         """
-        Execute a SPARQL query and return the result as a DataFrame.
+        Return journals whose ISSN or EISSN is any of the provided identifiers.
 
         Args:
-            sparql_query (str): SPARQL query
+            issns (Set[str]): Journal ISSNs and EISSNs
+            without_apc (bool): Only return journals without APC
+            licenses (Set[str], optional): Only return journals with one of these licenses
+            limit (int, optional): Only return the first matching journals in title order
 
         Returns:
-            pd.DataFrame: Query result
+            pd.DataFrame: Rows of all matching journals or an empty DataFrame
         """
         try:
-            response = requests.get(
-                self._dbPathOrUrl,
-                params={'query': sparql_query, 'format': 'json'}
+            sparql_query = self._journals_by_issns_query(
+                issns, without_apc, licenses, limit, self.hasIdentityIndex()
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                bindings = data.get('results', {}).get('bindings', [])
-                
-                if not bindings:
-                    return pd.DataFrame()
-                
-                # Convert the result to a DataFrame
-                rows = []
-                for binding in bindings:
-                    row = {}
-                    for var_name, var_value in binding.items():
-                        row[var_name] = var_value.get('value', '')
-                    rows.append(row)
-                
-                return pd.DataFrame(rows)
-            else:
-                print(f"SPARQL query error: {response.status_code}")
+            if sparql_query is None:
                 return pd.DataFrame()
-                
+            return self._execute_sparql_query(sparql_query)
         except Exception as e:
-            print(f"Error while executing SPARQL query: {e}")
+            print(f"Error while searching journals by ISSNs: {e}")
             return pd.DataFrame()
 
-
-class CategoryQueryHandler(QueryHandler):
-    """
-    Handler for categories and areas queries in a relational SQLite database.
-    """
-    
-    def getById(self, entity_id: str) -> pd.DataFrame:
+    def getJournalsInIssnRanges(self, ranges: List[Tuple[str, str]], without_apc: bool = False,
+                                licenses: Optional[Set[str]] = None, after: Optional[str] = None,
+                                limit: Optional[int] = None) -> pd.DataFrame:
         """
-        Return an entity by identifier.
+        Return one page of the journals whose ISSN or EISSN falls in any of the ranges.
+
+        Journals are paged by journal URI: a page holds the first `limit`
+        matching journals whose URI sorts after `after`, with all their rows.
+        The ranges are a coarse filter; callers check exact identifiers.
 
         Args:
-            entity_id (str): Entity identifier
+            ranges (List[Tuple[str, str]]): Inclusive (lowest, highest) identifier ranges
+            without_apc (bool): Only return journals without APC
+            licenses (Set[str], optional): Only return journals with one of these licenses
+            after (str, optional): Journal URI of the last journal of the previous page
+            limit (int, optional): Maximum number of journals in the page
 
         Returns:
-            pd.DataFrame: Entity data or an empty DataFrame
+            pd.DataFrame: Rows of the journals in the page or an empty DataFrame
         """
         try:
-            conn = sqlite3.connect(self._dbPathOrUrl)
-            
-            # Check if this is a category
-            category_query = "SELECT id, quartile FROM categories WHERE id = ?"
-            category_df = pd.read_sql_query(category_query, conn, params=(entity_id,))
-            
-            if not category_df.empty:
-                conn.close()
-                return category_df
-            
-            # Check if this is an area
-            area_query = "SELECT id FROM areas WHERE id = ?"
-            area_df = pd.read_sql_query(area_query, conn, params=(entity_id,))
-            
-            conn.close()
-            return area_df
+            sparql_query = self._journals_in_issn_ranges_query(
+                ranges, without_apc, licenses, after, limit, self.hasIdentityIndex()
+            )
+            if sparql_query is None:
+                return pd.DataFrame()
+            return self._execute_sparql_query(sparql_query)
             
         except Exception as e:
-            print(f"Error while querying entity by ID: {e}")
+            print(f"Error while searching journals by ISSN ranges: {e}")
             return pd.DataFrame()
-    
-    def getAllCategories(self) -> pd.DataFrame:
+
+    def getIdentityIndex(self, without_apc: bool = False,
+                         licenses: Optional[Set[str]] = None) -> pd.DataFrame:
         """
-        Return all categories from the database.
+        Return the identity index of the journal store.
+
+        Every ISSN and EISSN is mapped to the key of its journal: the ISSN of
+        the journal, or its EISSN when it has none, which is the identifier
+        the engines use for it. With a filter, only the matching journals are
+        indexed, so the engine can count them per Scimago group.
+
+        Args:
+            without_apc (bool): Only index journals without APC
+            licenses (Set[str], optional): Only index journals with one of these licenses
 
         Returns:
-            pd.DataFrame: DataFrame with all categories
+            pd.DataFrame: Columns 'identifier' and 'key', or an empty DataFrame
         """
         try:
-            conn = sqlite3.connect(self._dbPathOrUrl)
-            query = "SELECT DISTINCT id, quartile FROM categories ORDER BY id"
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            return df
+            sparql_query = self._identity_index_query(without_apc, licenses, self.hasIdentityIndex())
+            if sparql_query is None:
+                return pd.DataFrame()
+            df = self._execute_sparql_query(sparql_query)
+            if df.empty or 'identifier' not in df.columns:
+                return pd.DataFrame()
+            issns = df['issn'].astype(object) if 'issn' in df.columns else pd.Series(None, index=df.index)
+            eissns = df['eissn'].astype(object) if 'eissn' in df.columns else pd.Series(None, index=df.index)
+            return pd.DataFrame({
+                'identifier': df['identifier'].astype(object),
+                'key': issns.where(issns.notna(), eissns),
+            }).drop_duplicates(ignore_index=True)
             
         except Exception as e:
-            print(f"Error while fetching all categories: {e}")
+            print(f"Error while reading the journal identity index: {e}")
             return pd.DataFrame()
-    
-    def getAllAreas(self) -> pd.DataFrame:
+
+    def _identity_index_query(self, without_apc: bool = False,
+                              licenses: Optional[Set[str]] = None, indexed: bool = True) -> Optional[str]:
+        """Build the query used by getIdentityIndex (None if nothing can match)."""
+        constraint = ""
+        if licenses:
+            constraint = self._licence_constraint(licenses)
+            if constraint is None:
+                return None
+        return f"""{self._PREFIXES}
+            SELECT ?identifier ?issn ?eissn
+            WHERE {{
+                {self._identifier_pattern('identifier', indexed)}
+                {constraint}
+                {self._WITHOUT_APC_FILTER if without_apc else ""}
+                OPTIONAL {{ ?journal doaj:issn ?issn }}
+                OPTIONAL {{ ?journal doaj:eissn ?eissn }}
+            }}
+            """
+
+    def getStoreVersion(self) -> Optional[Tuple]:
         """
-        Return all areas from the database.
+        Return the revision of the store written by the last upload.
+
+        JournalUploadHandler replaces the doaj:revision of the store resource
+        with a new value in every update it sends, so the marker changes
+        whenever journals are uploaded, from any process. Stores written by
+        other tools keep the same marker.
+
+        Returns:
+            tuple: (endpoint, revisions); no revision if the store has none or cannot be queried
+        """
+        df = self._execute_sparql_query(
+            f"""{self._PREFIXES}
+            SELECT ?revision WHERE {{ <{STORE_RESOURCE}> doaj:revision ?revision }}
+            """
+        )
+        revisions = tuple(sorted(df['revision'])) if 'revision' in df.columns else ()
+        return (self._dbPathOrUrl, revisions)
+
+    def hasIdentityIndex(self) -> bool:
+        """
+        Tell whether every journal of the store has its doaj:identifier triples.
+
+        Stores loaded before the uploader wrote them have none, and a later
+        upload only indexes its own journals; getJournalsByIssns,
+        getJournalsInIssnRanges and getIdentityIndex then match doaj:issn
+        and doaj:eissn instead. The answer is kept until the endpoint or the
+        data generation changes; a store that cannot be queried counts as
+        not indexed and is checked again next time.
+
+        Returns:
+            bool: True if the ISSN joins can use doaj:identifier
+        """
+        known = self._known_identity_index()
+        if known is not None:
+            return known
+        generation = self.getDataGeneration()
+        return self._remember_identity_index(
+            self._execute_sparql_query(self._unindexed_journal_query()), generation
+        )
+
+    def _known_identity_index(self) -> Optional[bool]:
+        """Return the kept answer of hasIdentityIndex, or None if it must be checked."""
+        check = self._identity_index_check
+        if check is not None and check[:2] == (self._dbPathOrUrl, self.getDataGeneration()):
+            return check[2]
+        return None
+
+    def _remember_identity_index(self, df: pd.DataFrame, generation: int) -> bool:
+        """Keep and return the answer of _unindexed_journal_query read at the given data generation."""
+        if df.empty or 'unindexed' not in df.columns:
+            return False
+        indexed = int(df['unindexed'].iloc[0]) == 0
+        self._identity_index_check = (self._dbPathOrUrl, generation, indexed)
+        return indexed
+
+    def _unindexed_journal_query(self) -> str:
+        """Build the query used by hasIdentityIndex: the number (0 or 1) of journals without doaj:identifier."""
+        return f"""{self._PREFIXES}
+            SELECT (COUNT(?journal) AS ?unindexed)
+            WHERE {{
+                {{ SELECT ?journal WHERE {{
+                    ?journal rdf:type doaj:Journal .
+                    FILTER NOT EXISTS {{ ?journal doaj:identifier ?identifier }}
+                }} LIMIT 1 }}
+            }}
+            """
+
+    def getStatistics(self) -> Dict[str, Any]:
+        """
+        Return cardinality statistics of the journal store, used by the query planner.
+
+        Returns:
+            Dict[str, Any]: Numbers of 'journals', of journals 'with_apc' and
+            'with_seal', and 'licences' mapping each licence to its number of
+            journals; an empty dict if the store cannot be queried
+        """
+        try:
+            totals = self._execute_sparql_query(self._statistics_query())
+            if totals.empty:
+                return {}
+            licences = self._execute_sparql_query(self._licence_statistics_query())
+            row = totals.iloc[0]
+            return {
+                'journals': int(row.get('journals', 0)),
+                'with_apc': int(row.get('withApc', 0)),
+                'with_seal': int(row.get('withSeal', 0)),
+                'licences': {} if licences.empty else {
+                    str(licence): int(count)
+                    for licence, count in zip(licences['licence'], licences['journals'])
+                },
+            }
+            
+        except Exception as e:
+            print(f"Error while collecting journal statistics: {e}")
+            return {}
+
+    def _statistics_query(self) -> str:
+        """Build the journal, APC and seal count query used by getStatistics."""
+        return f"""{self._PREFIXES}
+            SELECT (COUNT(DISTINCT ?journal) AS ?journals)
+                   (COUNT(DISTINCT ?apcJournal) AS ?withApc)
+                   (COUNT(DISTINCT ?sealJournal) AS ?withSeal)
+            WHERE {{
+                ?journal rdf:type doaj:Journal .
+                OPTIONAL {{ ?journal doaj:hasAPC "true"^^xsd:boolean . BIND(?journal AS ?apcJournal) }}
+                OPTIONAL {{ ?journal doaj:hasDOAJSeal "true"^^xsd:boolean . BIND(?journal AS ?sealJournal) }}
+            }}
+            """
+
+    def _licence_statistics_query(self) -> str:
+        """Build the journals-per-licence query used by getStatistics."""
+        return f"""{self._PREFIXES}
+            SELECT ?licence (COUNT(DISTINCT ?journal) AS ?journals)
+            WHERE {{
+                ?journal rdf:type doaj:Journal .
+                ?journal doaj:licence ?licence .
+            }}
+            GROUP BY ?licence
+            """
+
+    def countJournalsBy(self, field: str, without_apc: bool = False,
+                        licenses: Optional[Set[str]] = None) -> pd.DataFrame:
+        """
+        Count the journals of the store per value of a journal field, in one
+        COUNT/GROUP BY query.
+
+        A journal with several values of the field (e.g. several licences) is
+        counted once for each of them and a journal without any is not
+        counted; for the 'apc' and 'seal' flags a missing value counts as False.
+
+        Args:
+            field (str): One of GROUP_FIELDS
+            without_apc (bool): Only count journals without APC
+            licenses (Set[str], optional): Only count journals with one of these licenses
+
+        Returns:
+            pd.DataFrame: Columns 'value' and 'count', by decreasing count, or an empty DataFrame
+
+        Raises:
+            ValueError: If the field cannot be grouped on
+        """
+        sparql_query = self._count_by_query(field, without_apc, licenses)
+        try:
+            if sparql_query is None:
+                return pd.DataFrame()
+            df = self._execute_sparql_query(sparql_query)
+            if df.empty or 'value' not in df.columns:
+                return pd.DataFrame()
+            counts = pd.DataFrame({
+                'value': self._group_values(field, df['value']),
+                'count': df['count'].astype(int),
+            })
+            return counts.sort_values(['count', 'value'], ascending=[False, True], ignore_index=True)
+            
+        except Exception as e:
+            print(f"Error while counting journals by {field}: {e}")
+            return pd.DataFrame()
+
+    def getJournalKeysGroupedBy(self, field: str, without_apc: bool = False,
+                                licenses: Optional[Set[str]] = None) -> pd.DataFrame:
+        """
+        Return the distinct (value, journal key) pairs of a journal field.
+
+        The engine counts these pairs when several journal stores may hold the
+        same journal; the key follows getIdentityIndex (ISSN, then EISSN, then
+        the journal URI). Values and filters are the ones of countJournalsBy.
+
+        Args:
+            field (str): One of GROUP_FIELDS
+            without_apc (bool): Only keep journals without APC
+            licenses (Set[str], optional): Only keep journals with one of these licenses
+
+        Returns:
+            pd.DataFrame: Columns 'value' and 'key', or an empty DataFrame
+
+        Raises:
+            ValueError: If the field cannot be grouped on
+        """
+        sparql_query = self._keys_grouped_by_query(field, without_apc, licenses)
+        try:
+            if sparql_query is None:
+                return pd.DataFrame()
+            df = self._execute_sparql_query(sparql_query)
+            if df.empty or 'value' not in df.columns:
+                return pd.DataFrame()
+            return pd.DataFrame({
+                'value': self._group_values(field, df['value']),
+                'key': df['key'].astype(object),
+            })
+            
+        except Exception as e:
+            print(f"Error while grouping journals by {field}: {e}")
+            return pd.DataFrame()
+
+    def _count_by_query(self, field: str, without_apc: bool = False,
+                        licenses: Optional[Set[str]] = None) -> Optional[str]:
+        """Build the query used by countJournalsBy (None if nothing can match)."""
+        patterns = self._group_patterns(field, without_apc, licenses)
+        if patterns is None:
+            return None
+        return f"""{self._PREFIXES}
+            SELECT ?value (COUNT(DISTINCT ?journal) AS ?count)
+            WHERE {{
+                {patterns}
+            }}
+            GROUP BY ?value
+            """
+
+    def _keys_grouped_by_query(self, field: str, without_apc: bool = False,
+                               licenses: Optional[Set[str]] = None) -> Optional[str]:
+        """Build the query used by getJournalKeysGroupedBy (None if nothing can match)."""
+        patterns = self._group_patterns(field, without_apc, licenses)
+        if patterns is None:
+            return None
+        return f"""{self._PREFIXES}
+            SELECT DISTINCT ?value ?key
+            WHERE {{
+                {patterns}
+                OPTIONAL {{ ?journal doaj:issn ?issn }}
+                OPTIONAL {{ ?journal doaj:eissn ?eissn }}
+                BIND(COALESCE(?issn, ?eissn, STR(?journal)) AS ?key)
+            }}
+            """
+
+    def _group_patterns(self, field: str, without_apc: bool = False,
+                        licenses: Optional[Set[str]] = None) -> Optional[str]:
+        """Build the patterns binding ?journal and ?value for a grouped query (None if nothing can match)."""
+        if field not in self.GROUP_FIELDS:
+            raise ValueError(f"Cannot group journals by: {field}")
+        predicate = self.GROUP_FIELDS[field]
+        constraint = ""
+        if licenses:
+            constraint = self._licence_constraint(licenses)
+            if constraint is None:
+                return None
+        if field in self._FLAG_FIELDS:
+            # Journals without the flag are grouped with those where it is false
+            value_patterns = f"""OPTIONAL {{ ?journal {predicate} ?flag }}
+                    BIND(IF(BOUND(?flag) && LCASE(STR(?flag)) IN ("1", "true", "yes"), "true", "false") AS ?value)"""
+        else:
+            value_patterns = f"?journal {predicate} ?value ."
+        return f"""?journal rdf:type doaj:Journal .
+                    {constraint}
+                    {self._WITHOUT_APC_FILTER if without_apc else ""}
+                    {value_patterns}"""
+
+    def _group_values(self, field: str, values: pd.Series) -> pd.Series:
+        """Convert the ?value column of a grouped query: booleans for flags, strings otherwise."""
+        values = values.astype(object)
+        if field in self._FLAG_FIELDS:
+            return values.astype(str).str.lower().isin(self._TRUE_LITERALS).astype(object)
+        return values
+
+    def _execute_sparql_query(self, sparql_query: str) -> pd.DataFrame:
+        """
+        Execute a SPARQL query and return the result as a DataFrame.
+
+        Args:
+            sparql_query (str): SPARQL query
+
+        Returns:
+            pd.DataFrame: Query result
+        """
+        try:
+            # Imported on first query, so processes using only SQLite never load requests
+            import requests
+            response = requests.get(
+                self._dbPathOrUrl,
+                params={'query': sparql_query, 'format': 'json'}
+            )
+            
+            if response.status_code == 200:
+                return self._bindings_to_dataframe(response.json())
+            else:
+                print(f"SPARQL query error: {response.status_code}")
+                return pd.DataFrame()
+                
+        except Exception as e:
+            print(f"Error while executing SPARQL query: {e}")
+            return pd.DataFrame()
+
+    def _bindings_to_dataframe(self, data: dict) -> pd.DataFrame:
+        """
+        Convert a SPARQL JSON result document to a DataFrame.
+
+        Args:
+            data (dict): Parsed SPARQL JSON response
+
+        Returns:
+            pd.DataFrame: Query result
+        """
+        bindings = data.get('results', {}).get('bindings', [])
+        
+        if not bindings:
+            return pd.DataFrame()
+        
+        # Convert the result to a DataFrame
+        rows = []
+        for binding in bindings:
+            row = {}
+            for var_name, var_value in binding.items():
+                row[var_name] = var_value.get('value', '')
+            rows.append(row)
+        
+        df = pd.DataFrame(rows)
+        if self._typed_results:
+            df = self._apply_result_schema(df)
+        return df
+
+    def _apply_result_schema(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convert raw string columns to compact dtypes.
+
+        Boolean flags become nullable booleans (missing or empty literals become NA),
+        low-cardinality columns become categoricals and, if a string storage is
+        configured, free-text columns use that storage.
+
+        Args:
+            df (pd.DataFrame): Result with string columns
+
+        Returns:
+            pd.DataFrame: Result with typed columns
+        """
+        for column, dtype in self._RESULT_SCHEMA.items():
+            if column not in df.columns:
+                continue
+            if dtype == 'boolean':
+                values = df[column].astype(object).fillna("").astype(str).str.strip()
+                flags = values.str.lower().isin(self._TRUE_LITERALS).astype('boolean')
+                df[column] = flags.mask(values == "")
+            else:
+                df[column] = df[column].astype(dtype)
+        
+        if self._string_storage:
+            string_dtype = pd.StringDtype(self._string_storage)
+            for column in self._STRING_COLUMNS:
+                if column in df.columns:
+                    df[column] = df[column].astype(string_dtype)
+        return df
+
+
+class CategoryQueryHandler(QueryHandler):
+    """
+    Handler for categories and areas queries in a relational SQLite database.
+
+    Queries run on persistent read-only connections taken from a
+    SQLiteConnectionPool, which is opened on first use and can be shared
+    safely by the threads of a thread-pool server.
+
+    Every list query also has a *Rows variant returning the raw cursor
+    tuples, which the query engines use to build objects without pandas.
+    """
+
+    # Identifiers per query in getByIds (each is bound twice, below SQLite's variable limit)
+    BATCH_SIZE = 400
+
+    # Column layout of the tuples returned by the *Rows methods
+    CATEGORY_COLUMNS = ('id', 'quartile')
+    AREA_COLUMNS = ('id',)
+    LOOKUP_COLUMNS = ('id', 'quartile', 'type')
+    RELATION_COLUMNS = ('issn', 'type', 'id', 'quartile')
+
+    # Dimensions countJournalsBy can group on: relation table, grouped column, filtered column
+    GROUP_DIMENSIONS = {
+        'area': ('journal_areas', 'area_id', 'area_id'),
+        'category': ('journal_categories', 'category_id', 'category_id'),
+        'quartile': ('journal_categories', 'quartile', 'category_id'),
+    }
+
+    def __init__(self, dbPathOrUrl: str = "", pool_size: int = 4,
+                 snapshot: bool = False, snapshot_check_interval: float = 1.0):
+        """
+        Args:
+            dbPathOrUrl (str): Path of the SQLite database
+            pool_size (int): Maximum number of pooled connections
+            snapshot (bool): Answer queries from an in-memory snapshot (see enableSnapshot)
+            snapshot_check_interval (float): Seconds between two checks for database changes
+        """
+        super().__init__(dbPathOrUrl)
+        self._pool_size: int = pool_size
+        self._pool: Optional[SQLiteConnectionPool] = None
+        self._version_probe: Optional[SQLiteVersionProbe] = None
+        self._pool_lock = threading.Lock()
+        self._snapshot_enabled: bool = snapshot
+        self._snapshot_check_interval: float = snapshot_check_interval
+        self._snapshot_holder: Optional[SnapshotHolder] = None
+        # (database, data generation, answer) of the last hasIdentityIndex check
+        self._identity_index_check: Optional[Tuple[str, int, bool]] = None
+
+    def enableSnapshot(self, check_interval: Optional[float] = None) -> None:
+        """
+        Answer every query from an in-memory CategorySnapshot of the database.
+
+        The snapshot is loaded on the first query and reloaded only when
+        PRAGMA data_version or the file modification time shows a change,
+        checked at most once per check_interval seconds.
+
+        Args:
+            check_interval (float, optional): Seconds between two change checks
+        """
+        if check_interval is not None:
+            self._snapshot_check_interval = check_interval
+        self._close_snapshot()
+        self._snapshot_enabled = True
+
+    def disableSnapshot(self) -> None:
+        """Go back to answering queries from SQLite and drop the snapshot."""
+        self._snapshot_enabled = False
+        self._close_snapshot()
+
+    def _snapshot(self) -> Optional[CategorySnapshot]:
+        """Return the current snapshot, or None when snapshot mode is off."""
+        if not self._snapshot_enabled:
+            return None
+        holder = self._snapshot_holder
+        if holder is None:
+            with self._pool_lock:
+                if self._snapshot_holder is None:
+                    self._snapshot_holder = SnapshotHolder(
+                        self._dbPathOrUrl, self._snapshot_check_interval
+                    )
+                holder = self._snapshot_holder
+        return holder.get()
+
+    def _close_snapshot(self) -> None:
+        """Detach and close the snapshot holder, if any."""
+        with self._pool_lock:
+            holder, self._snapshot_holder = self._snapshot_holder, None
+        if holder is not None:
+            holder.close()
+
+    def setDbPathOrUrl(self, pathOrUrl: str) -> bool:
+        """
+        Set the database path, closing connections opened for the previous one.
+
+        Args:
+            pathOrUrl (str): Database path
+
+        Returns:
+            bool: True if the assignment succeeded
+        """
+        result = super().setDbPathOrUrl(pathOrUrl)
+        self._close_pool()
+        self._close_snapshot()
+        return result
+
+    def close(self) -> None:
+        """Close the pooled connections and the snapshot; they are reopened on the next query."""
+        self._close_pool()
+        self._close_snapshot()
+
+    def getStoreVersion(self) -> Optional[Tuple]:
+        """
+        Return a marker of the database that changes on every committed write.
+
+        See SQLiteVersionProbe: file times and sizes and PRAGMA data_version,
+        so writes from other processes are detected too.
+
+        Returns:
+            tuple or None: (database path, marker), or None if the database cannot be read
+        """
+        probe = self._version_probe
+        if probe is None:
+            with self._pool_lock:
+                if self._version_probe is None:
+                    self._version_probe = SQLiteVersionProbe(self._dbPathOrUrl)
+                probe = self._version_probe
+        version = probe.read()
+        return None if version is None else (self._dbPathOrUrl, version)
+
+    def _close_pool(self) -> None:
+        """Detach and close the current connection pool and version probe, if any."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+            probe, self._version_probe = self._version_probe, None
+        if pool is not None:
+            pool.close()
+        if probe is not None:
+            probe.close()
+
+    def _connection(self):
+        """Return a context manager checking out a pooled connection."""
+        pool = self._pool
+        if pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = SQLiteConnectionPool(self._dbPathOrUrl, self._pool_size)
+                pool = self._pool
+        return pool.connection()
+    
+    def getById(self, entity_id: str) -> pd.DataFrame:
+        """
+        Return an entity by identifier.
+
+        Args:
+            entity_id (str): Entity identifier
+
+        Returns:
+            pd.DataFrame: Entity data or an empty DataFrame
+        """
+        try:
+            snapshot = self._snapshot()
+            if snapshot is not None:
+                rows = snapshot.byIdsRows([entity_id])
+                if not rows:
+                    return pd.DataFrame(columns=list(self.AREA_COLUMNS))
+                identifier, quartile, kind = rows[0]
+                if kind == 'category':
+                    return self._rows_to_frame([(identifier, quartile)], self.CATEGORY_COLUMNS)
+                return self._rows_to_frame([(identifier,)], self.AREA_COLUMNS)
+
+            # Categories and areas are looked up in one round trip; a
+            # category takes precedence over an area with the same name
+            rows = self._read_rows(
+                """
+                SELECT id, quartile, 'category' AS type FROM categories WHERE id = ?
+                UNION ALL
+                SELECT id, NULL, 'area' FROM areas WHERE id = ?
+                """,
+                (entity_id, entity_id),
+            )
+            category_rows = [(identifier, quartile) for identifier, quartile, kind in rows if kind == 'category']
+            if category_rows:
+                return self._rows_to_frame(category_rows, self.CATEGORY_COLUMNS)
+            area_rows = [(identifier,) for identifier, _, kind in rows if kind == 'area']
+            return self._rows_to_frame(area_rows, self.AREA_COLUMNS)
+            
+        except Exception as e:
+            print(f"Error while querying entity by ID: {e}")
+            return pd.DataFrame()
+    
+    def getByIds(self, entity_ids: Iterable[str]) -> pd.DataFrame:
+        """
+        Return the categories and areas matching any of the given identifiers.
+
+        Categories and areas are looked up together with one UNION query per
+        chunk of BATCH_SIZE identifiers.
+
+        Args:
+            entity_ids (Iterable[str]): Category or area identifiers
+
+        Returns:
+            pd.DataFrame: Columns id, quartile and type ("category" or "area");
+            an identifier that is both a category and an area yields two rows
+        """
+        rows = self.getByIdsRows(entity_ids)
+        if not rows:
+            return pd.DataFrame()
+        return self._rows_to_frame(rows, self.LOOKUP_COLUMNS)
+
+    def getByIdsRows(self, entity_ids: Iterable[str]) -> List[tuple]:
+        """
+        Row-tuple version of getByIds.
+
+        Returns:
+            List[tuple]: (id, quartile, type) tuples
+        """
+        try:
+            cleaned_ids = sorted({str(entity_id) for entity_id in entity_ids if entity_id})
+            snapshot = self._snapshot()
+            if snapshot is not None:
+                return snapshot.byIdsRows(cleaned_ids)
+            rows: List[tuple] = []
+            with self._connection() as conn:
+                for i in range(0, len(cleaned_ids), self.BATCH_SIZE):
+                    chunk = cleaned_ids[i:i + self.BATCH_SIZE]
+                    placeholders = ','.join(['?' for _ in chunk])
+                    query = f"""
+                    SELECT id, quartile, 'category' AS type FROM categories WHERE id IN ({placeholders})
+                    UNION ALL
+                    SELECT id, NULL AS quartile, 'area' AS type FROM areas WHERE id IN ({placeholders})
+                    """
+                    rows.extend(conn.execute(query, chunk + chunk).fetchall())
+            return rows
+            
+        except Exception as e:
+            print(f"Error while querying entities by IDs: {e}")
+            return []
+    
+    def getAllCategories(self) -> pd.DataFrame:
+        """
+        Return all categories from the database.
+
+        Returns:
+            pd.DataFrame: DataFrame with all categories
+        """
+        return self._rows_to_frame(self.getAllCategoriesRows(), self.CATEGORY_COLUMNS)
+
+    def getAllCategoriesRows(self, after: Optional[str] = None,
+                             limit: Optional[int] = None) -> List[tuple]:
+        """
+        Row-tuple version of getAllCategories.
+
+        Args:
+            after (str, optional): Identifier of the last row of the previous page
+            limit (int, optional): Maximum number of rows in the page
+
+        Returns:
+            List[tuple]: (id, quartile) tuples
+        """
+        try:
+            snapshot = self._snapshot()
+            if snapshot is not None:
+                return self._page_rows(snapshot.allCategoriesRows(), after, limit)
+            return self._read_page("SELECT DISTINCT id, quartile FROM categories ORDER BY id", (), after, limit)
+            
+        except Exception as e:
+            print(f"Error while fetching all categories: {e}")
+            return []
+    
+    def getAllAreas(self) -> pd.DataFrame:
+        """
+        Return all areas from the database.
 
         Returns:
             pd.DataFrame: DataFrame with all areas
         """
+        return self._rows_to_frame(self.getAllAreasRows(), self.AREA_COLUMNS)
+
+    def getAllAreasRows(self, after: Optional[str] = None,
+                        limit: Optional[int] = None) -> List[tuple]:
+        """
+        Row-tuple version of getAllAreas.
+
+        Args:
+            after (str, optional): Identifier of the last row of the previous page
+            limit (int, optional): Maximum number of rows in the page
+
+        Returns:
+            List[tuple]: (id,) tuples
+        """
         try:
-            conn = sqlite3.connect(self._dbPathOrUrl)
-            query = "SELECT DISTINCT id FROM areas ORDER BY id"
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            return df
+            snapshot = self._snapshot()
+            if snapshot is not None:
+                return self._page_rows(snapshot.allAreasRows(), after, limit)
+            return self._read_page("SELECT DISTINCT id FROM areas ORDER BY id", (), after, limit)
             
         except Exception as e:
             print(f"Error while fetching all areas: {e}")
-            return pd.DataFrame()
+            return []
     
     def getCategoriesWithQuartile(self, quartiles: Set[str]) -> pd.DataFrame:
         """
@@ -459,25 +1304,37 @@ class CategoryQueryHandler(QueryHandler):
         Returns:
             pd.DataFrame: DataFrame with found categories
         """
+        return self._rows_to_frame(self.getCategoriesWithQuartileRows(quartiles), self.CATEGORY_COLUMNS)
+
+    def getCategoriesWithQuartileRows(self, quartiles: Set[str], after: Optional[str] = None,
+                                      limit: Optional[int] = None) -> List[tuple]:
+        """
+        Row-tuple version of getCategoriesWithQuartile.
+
+        Args:
+            quartiles (Set[str]): Set of quartiles to search for
+            after (str, optional): Identifier of the last row of the previous page
+            limit (int, optional): Maximum number of rows in the page
+
+        Returns:
+            List[tuple]: (id, quartile) tuples
+        """
         try:
-            conn = sqlite3.connect(self._dbPathOrUrl)
-            
+            snapshot = self._snapshot()
+            if snapshot is not None:
+                return self._page_rows(snapshot.categoriesWithQuartileRows(quartiles), after, limit)
             if not quartiles:
                 # If quartiles are not specified, return all categories
-                query = "SELECT DISTINCT id, quartile FROM categories ORDER BY id"
-                df = pd.read_sql_query(query, conn)
-            else:
-                # Build query with quartile filter
-                placeholders = ','.join(['?' for _ in quartiles])
-                query = f"SELECT DISTINCT id, quartile FROM categories WHERE quartile IN ({placeholders}) ORDER BY id"
-                df = pd.read_sql_query(query, conn, params=list(quartiles))
+                return self._read_page("SELECT DISTINCT id, quartile FROM categories ORDER BY id", (), after, limit)
             
-            conn.close()
-            return df
+            # Build query with quartile filter
+            placeholders = ','.join(['?' for _ in quartiles])
+            query = f"SELECT DISTINCT id, quartile FROM categories WHERE quartile IN ({placeholders}) ORDER BY id"
+            return self._read_page(query, list(quartiles), after, limit)
             
         except Exception as e:
             print(f"Error while searching categories by quartile: {e}")
-            return pd.DataFrame()
+            return []
     
     def getCategoriesAssignedToAreas(self, area_ids: Set[str]) -> pd.DataFrame:
         """
@@ -489,9 +1346,25 @@ class CategoryQueryHandler(QueryHandler):
         Returns:
             pd.DataFrame: DataFrame with found categories
         """
+        return self._rows_to_frame(self.getCategoriesAssignedToAreasRows(area_ids), self.CATEGORY_COLUMNS)
+
+    def getCategoriesAssignedToAreasRows(self, area_ids: Set[str], after: Optional[str] = None,
+                                         limit: Optional[int] = None) -> List[tuple]:
+        """
+        Row-tuple version of getCategoriesAssignedToAreas.
+
+        Args:
+            area_ids (Set[str]): Set of area identifiers
+            after (str, optional): Identifier of the last row of the previous page
+            limit (int, optional): Maximum number of rows in the page
+
+        Returns:
+            List[tuple]: (id, quartile) tuples
+        """
         try:
-            conn = sqlite3.connect(self._dbPathOrUrl)
-            
+            snapshot = self._snapshot()
+            if snapshot is not None:
+                return self._page_rows(snapshot.categoriesAssignedToAreasRows(area_ids), after, limit)
             if not area_ids:
                 # If areas are not specified, return all categories
                 query = """
@@ -499,26 +1372,23 @@ class CategoryQueryHandler(QueryHandler):
                 FROM categories c 
                 ORDER BY c.id
                 """
-                df = pd.read_sql_query(query, conn)
-            else:
-                # Build query with area filter
-                placeholders = ','.join(['?' for _ in area_ids])
-                query = f"""
-                SELECT DISTINCT c.id, c.quartile 
-                FROM categories c
-                JOIN journal_categories jc ON c.id = jc.category_id
-                JOIN journal_areas ja ON jc.issn = ja.issn
-                WHERE ja.area_id IN ({placeholders})
-                ORDER BY c.id
-                """
-                df = pd.read_sql_query(query, conn, params=list(area_ids))
+                return self._read_page(query, (), after, limit)
             
-            conn.close()
-            return df
+            # Build query with area filter
+            placeholders = ','.join(['?' for _ in area_ids])
+            query = f"""
+            SELECT DISTINCT c.id, c.quartile 
+            FROM categories c
+            JOIN journal_categories jc ON c.id = jc.category_id
+            JOIN journal_areas ja ON jc.issn = ja.issn
+            WHERE ja.area_id IN ({placeholders})
+            ORDER BY c.id
+            """
+            return self._read_page(query, list(area_ids), after, limit)
             
         except Exception as e:
             print(f"Error while searching categories by areas: {e}")
-            return pd.DataFrame()
+            return []
     
     def getAreasAssignedToCategories(self, category_ids: Set[str]) -> pd.DataFrame:
         """
@@ -530,29 +1400,364 @@ class CategoryQueryHandler(QueryHandler):
         Returns:
             pd.DataFrame: DataFrame with found areas
         """
+        return self._rows_to_frame(self.getAreasAssignedToCategoriesRows(category_ids), self.AREA_COLUMNS)
+
+    def getAreasAssignedToCategoriesRows(self, category_ids: Set[str], after: Optional[str] = None,
+                                         limit: Optional[int] = None) -> List[tuple]:
+        """
+        Row-tuple version of getAreasAssignedToCategories.
+
+        Args:
+            category_ids (Set[str]): Set of category identifiers
+            after (str, optional): Identifier of the last row of the previous page
+            limit (int, optional): Maximum number of rows in the page
+
+        Returns:
+            List[tuple]: (id,) tuples
+        """
         try:
-            conn = sqlite3.connect(self._dbPathOrUrl)
-            
+            snapshot = self._snapshot()
+            if snapshot is not None:
+                return self._page_rows(snapshot.areasAssignedToCategoriesRows(category_ids), after, limit)
             if not category_ids:
                 # If categories are not specified, return all areas
-                query = "SELECT DISTINCT id FROM areas ORDER BY id"
-                df = pd.read_sql_query(query, conn)
-            else:
-                # Build query with category filter
-                placeholders = ','.join(['?' for _ in category_ids])
-                query = f"""
-                SELECT DISTINCT a.id 
-                FROM areas a
-                JOIN journal_areas ja ON a.id = ja.area_id
-                JOIN journal_categories jc ON ja.issn = jc.issn
-                WHERE jc.category_id IN ({placeholders})
-                ORDER BY a.id
-                """
-                df = pd.read_sql_query(query, conn, params=list(category_ids))
+                return self._read_page("SELECT DISTINCT id FROM areas ORDER BY id", (), after, limit)
             
-            conn.close()
-            return df
+            # Build query with category filter
+            placeholders = ','.join(['?' for _ in category_ids])
+            query = f"""
+            SELECT DISTINCT a.id 
+            FROM areas a
+            JOIN journal_areas ja ON a.id = ja.area_id
+            JOIN journal_categories jc ON ja.issn = jc.issn
+            WHERE jc.category_id IN ({placeholders})
+            ORDER BY a.id
+            """
+            return self._read_page(query, list(category_ids), after, limit)
             
         except Exception as e:
             print(f"Error while searching areas by categories: {e}")
+            return []
+
+    def getIssnsInCategories(self, category_ids: Set[str], quartiles: Set[str]) -> Set[str]:
+        """
+        Return the ISSNs of the journals assigned to any of the given categories
+        with one of the given quartiles, in a single query.
+
+        The quartile is the one of the journal in that category
+        (journal_categories.quartile). The set holds every ISSN and EISSN of
+        the matching journals (see CategoryUploadHandler._update_identity).
+
+        Args:
+            category_ids (Set[str]): Category identifiers (empty for all categories)
+            quartiles (Set[str]): Quartiles (empty for any quartile)
+
+        Returns:
+            Set[str]: Set of journal ISSNs
+        """
+        try:
+            snapshot = self._snapshot()
+            if snapshot is not None:
+                return snapshot.issnsInCategories(category_ids, quartiles)
+            conditions = []
+            params: List[str] = []
+            if quartiles:
+                conditions.append(f"quartile IN ({','.join(['?' for _ in quartiles])})")
+                params.extend(quartiles)
+            return self._read_issns("journal_categories", "category_id", category_ids, conditions, params)
+            
+        except Exception as e:
+            print(f"Error while searching ISSNs by categories: {e}")
+            return set()
+    
+    def getIssnsInAreas(self, area_ids: Set[str]) -> Set[str]:
+        """
+        Return the ISSNs of the journals assigned to any of the given areas, in a single query.
+
+        The set holds every ISSN and EISSN of the matching journals (see
+        CategoryUploadHandler._update_identity).
+
+        Args:
+            area_ids (Set[str]): Area identifiers (empty for all areas)
+
+        Returns:
+            Set[str]: Set of journal ISSNs
+        """
+        try:
+            snapshot = self._snapshot()
+            if snapshot is not None:
+                return snapshot.issnsInAreas(area_ids)
+            return self._read_issns("journal_areas", "area_id", area_ids)
+            
+        except Exception as e:
+            print(f"Error while searching ISSNs by areas: {e}")
+            return set()
+
+    def getJournalRelations(self, issns: Iterable[str]) -> pd.DataFrame:
+        """
+        Return the categories and areas of the journals with the given ISSNs.
+
+        Args:
+            issns (Iterable[str]): Journal ISSNs or EISSNs
+
+        Returns:
+            pd.DataFrame: Columns issn, type ("category" or "area"), id and
+            quartile (the quartile of the journal in the category, None for areas)
+        """
+        rows = self.getJournalRelationsRows(issns)
+        if not rows:
             return pd.DataFrame()
+        return self._rows_to_frame(rows, self.RELATION_COLUMNS)
+
+    def getJournalRelationsRows(self, issns: Iterable[str]) -> List[tuple]:
+        """
+        Row-tuple version of getJournalRelations.
+
+        Categories and areas are read together with one UNION query per
+        chunk of BATCH_SIZE ISSNs, on one pooled connection; both relation
+        tables are keyed by ISSN first. Every identifier of a journal has the
+        relations of the others (see CategoryUploadHandler._update_identity),
+        so any one of them is enough.
+
+        Returns:
+            List[tuple]: (issn, type, id, quartile) tuples, ordered by ISSN,
+            then areas before categories, then id
+        """
+        try:
+            cleaned_ids = sorted({str(issn) for issn in issns if issn})
+            snapshot = self._snapshot()
+            if snapshot is not None:
+                return snapshot.journalRelationsRows(cleaned_ids)
+            rows: List[tuple] = []
+            with self._connection() as conn:
+                for i in range(0, len(cleaned_ids), self.BATCH_SIZE):
+                    chunk = cleaned_ids[i:i + self.BATCH_SIZE]
+                    placeholders = ','.join(['?' for _ in chunk])
+                    query = f"""
+                    SELECT issn, 'category' AS type, category_id AS id, quartile
+                    FROM journal_categories WHERE issn IN ({placeholders})
+                    UNION ALL
+                    SELECT issn, 'area' AS type, area_id AS id, NULL AS quartile
+                    FROM journal_areas WHERE issn IN ({placeholders})
+                    ORDER BY issn, type, id
+                    """
+                    rows.extend(conn.execute(query, chunk + chunk).fetchall())
+            return rows
+            
+        except Exception as e:
+            print(f"Error while reading journal relations: {e}")
+            return []
+
+    def getStatistics(self) -> Dict[str, Any]:
+        """
+        Return cardinality statistics of the relational store, used by the query planner.
+
+        Returns:
+            Dict[str, Any]: 'areas' mapping each area to its number of ISSNs,
+            'category_quartiles' mapping each (category, quartile) pair to its
+            number of ISSNs, and the numbers of distinct ISSNs with a category
+            ('categorized_issns') and with an area ('area_issns'); an empty dict
+            if the database cannot be read
+        """
+        try:
+            with self._connection() as conn:
+                areas = conn.execute(
+                    "SELECT area_id, COUNT(*) FROM journal_areas GROUP BY area_id").fetchall()
+                category_quartiles = conn.execute(
+                    "SELECT category_id, quartile, COUNT(*) FROM journal_categories "
+                    "GROUP BY category_id, quartile").fetchall()
+                categorized_issns, area_issns = conn.execute(
+                    "SELECT (SELECT COUNT(DISTINCT issn) FROM journal_categories), "
+                    "(SELECT COUNT(DISTINCT issn) FROM journal_areas)").fetchone()
+            return {
+                'areas': dict(areas),
+                'category_quartiles': {
+                    (category_id, quartile): count for category_id, quartile, count in category_quartiles
+                },
+                'categorized_issns': categorized_issns,
+                'area_issns': area_issns,
+            }
+            
+        except Exception as e:
+            print(f"Error while collecting category statistics: {e}")
+            return {}
+
+    def countJournalsBy(self, dimension: str, entity_ids: Set[str] = frozenset(),
+                        quartiles: Set[str] = frozenset()) -> pd.DataFrame:
+        """
+        Count the journals per area, category or quartile, in one GROUP BY query.
+
+        A journal is counted once per group whatever the number of its ISSNs
+        in the relation tables: identifiers are replaced with their journal
+        key from journal_identity. For the 'quartile' dimension a journal is
+        counted once per quartile it has in any of the categories. In a
+        database without journal_identity (see hasIdentityIndex) the distinct
+        identifiers of each group are counted instead.
+
+        Args:
+            dimension (str): One of GROUP_DIMENSIONS
+            entity_ids (Set[str]): Area or category identifiers to restrict to
+                (categories for 'quartile'; empty for all)
+            quartiles (Set[str]): Quartiles to restrict to (empty for any;
+                ignored for 'area')
+
+        Returns:
+            pd.DataFrame: Columns 'value' and 'count', by decreasing count, or an empty DataFrame
+
+        Raises:
+            ValueError: If the dimension cannot be grouped on
+        """
+        table, value_column, where, params = self._group_clauses(dimension, entity_ids, quartiles)
+        try:
+            key, join = "relation.issn", ""
+            if self.hasIdentityIndex():
+                key = "COALESCE(identity.journal_key, relation.issn)"
+                join = "LEFT JOIN journal_identity identity ON identity.issn = relation.issn "
+            rows = self._read_rows(
+                f"SELECT relation.{value_column} AS value, COUNT(DISTINCT {key}) AS count "
+                f"FROM {table} relation {join}"
+                f"WHERE {where} GROUP BY value ORDER BY count DESC, value",
+                params,
+            )
+            return self._rows_to_frame(rows, ('value', 'count'))
+            
+        except Exception as e:
+            print(f"Error while counting journals by {dimension}: {e}")
+            return pd.DataFrame()
+
+    def hasIdentityIndex(self) -> bool:
+        """
+        Tell whether the database has the journal_identity table.
+
+        Databases loaded before the uploader wrote it only hold one relation
+        row per identifier listed in the Scimago data, and nothing tells which
+        identifiers belong to the same journal. The answer is kept until the
+        database path or the data generation changes; a database that cannot
+        be read counts as not indexed and is checked again next time.
+
+        Returns:
+            bool: True if countJournalsBy can count journals by journal key
+        """
+        check = self._identity_index_check
+        generation = self.getDataGeneration()
+        if check is not None and check[:2] == (self._dbPathOrUrl, generation):
+            return check[2]
+        try:
+            rows = self._read_rows(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'journal_identity'"
+            )
+        except Exception as e:
+            print(f"Error while checking the journal identity table: {e}")
+            return False
+        self._identity_index_check = (self._dbPathOrUrl, generation, bool(rows))
+        return bool(rows)
+
+    def getIssnsGroupedBy(self, dimension: str, entity_ids: Set[str] = frozenset(),
+                          quartiles: Set[str] = frozenset()) -> List[tuple]:
+        """
+        Return the distinct (value, ISSN) pairs of an area, category or quartile grouping.
+
+        The engine joins these pairs with the journal store to count journals
+        per group without building them. As for getIssnsInAreas, every ISSN
+        and EISSN of a journal is listed.
+
+        Args:
+            dimension (str): One of GROUP_DIMENSIONS
+            entity_ids (Set[str]): As for countJournalsBy
+            quartiles (Set[str]): As for countJournalsBy
+
+        Returns:
+            List[tuple]: (value, issn) tuples
+
+        Raises:
+            ValueError: If the dimension cannot be grouped on
+        """
+        table, value_column, where, params = self._group_clauses(dimension, entity_ids, quartiles)
+        try:
+            return self._read_rows(
+                f"SELECT DISTINCT relation.{value_column}, relation.issn FROM {table} relation WHERE {where}",
+                params,
+            )
+            
+        except Exception as e:
+            print(f"Error while grouping ISSNs by {dimension}: {e}")
+            return []
+
+    def _group_clauses(self, dimension: str, entity_ids: Set[str],
+                       quartiles: Set[str]) -> Tuple[str, str, str, List[str]]:
+        """
+        Return the relation table, grouped column, WHERE clause and parameters of a grouped query.
+
+        Identifiers are bound as one JSON array read with json_each rather
+        than in BATCH_SIZE chunks: groups of different chunks could share
+        journals, and a journal must be counted once per group.
+        """
+        if dimension not in self.GROUP_DIMENSIONS:
+            raise ValueError(f"Cannot group journals by: {dimension}")
+        table, value_column, id_column = self.GROUP_DIMENSIONS[dimension]
+        conditions = [f"relation.{value_column} IS NOT NULL"]
+        params: List[str] = []
+        if entity_ids:
+            conditions.append(f"relation.{id_column} IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(sorted(entity_ids)))
+        if quartiles and table == 'journal_categories':
+            conditions.append(f"relation.quartile IN ({','.join(['?' for _ in quartiles])})")
+            params.extend(sorted(quartiles))
+        return table, value_column, " AND ".join(conditions), params
+
+    def _read_issns(self, table: str, id_column: str, entity_ids: Set[str],
+                    conditions: Iterable[str] = (), params: Iterable[str] = ()) -> Set[str]:
+        """
+        Read the distinct ISSNs of a relation table, optionally restricted to some identifiers.
+
+        Identifiers are sent in chunks of BATCH_SIZE on one pooled connection.
+        """
+        conditions = list(conditions)
+        params = list(params)
+        if not entity_ids:
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            return {row[0] for row in self._read_rows(f"SELECT DISTINCT issn FROM {table} {where}", params)}
+        cleaned_ids = sorted(entity_ids)
+        issns: Set[str] = set()
+        with self._connection() as conn:
+            for i in range(0, len(cleaned_ids), self.BATCH_SIZE):
+                chunk = cleaned_ids[i:i + self.BATCH_SIZE]
+                chunk_conditions = [f"{id_column} IN ({','.join(['?' for _ in chunk])})"] + conditions
+                query = f"SELECT DISTINCT issn FROM {table} WHERE {' AND '.join(chunk_conditions)}"
+                issns.update(row[0] for row in conn.execute(query, chunk + params))
+        return issns
+
+    def _read_page(self, query: str, params=(), after: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[tuple]:
+        """
+        Run a row query ordered by id and return one keyset page of its rows:
+        those whose id sorts after `after`, at most `limit` of them. The ids
+        are primary keys of categories or areas, so a page never splits one.
+        """
+        if after is None and limit is None:
+            return self._read_rows(query, params)
+        params = list(params)
+        where = ""
+        if after is not None:
+            where = "WHERE id > ?"
+            params.append(after)
+        params.append(limit if limit is not None else -1)
+        return self._read_rows(f"SELECT * FROM ({query}) {where} ORDER BY id LIMIT ?", params)
+
+    @staticmethod
+    def _page_rows(rows: List[tuple], after: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[tuple]:
+        """Return the same keyset page as _read_page from rows already sorted by id."""
+        if after is not None:
+            rows = rows[bisect.bisect_right(rows, after, key=operator.itemgetter(0)):]
+        return rows[:limit] if limit is not None else rows
+
+    def _read_rows(self, query: str, params=()) -> List[tuple]:
+        """Run a query on a pooled connection and return the raw cursor tuples."""
+        with self._connection() as conn:
+            return conn.execute(query, params).fetchall()
+
+    @staticmethod
+    def _rows_to_frame(rows: List[tuple], columns) -> pd.DataFrame:
+        """Build a DataFrame from cursor tuples."""
+        return pd.DataFrame.from_records(rows, columns=list(columns))
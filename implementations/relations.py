@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Batched loading of the categories and areas of journals.
+Contains classes: RelationLoader, RelationBatch
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .models import Journal, Category, Area
+
+
+class RelationLoader:
+    """
+    Loads the categories and areas of journals from the category handlers of an engine.
+
+    Journals are never loaded one by one. As with a DataLoader, the engine
+    groups the journals of one result into a RelationBatch; the first
+    getCategories() or getAreas() call on any of them loads the whole batch
+    with one getJournalRelationsRows call per category handler, which sends
+    one query per chunk of ISSNs. In eager mode the batch is loaded when the
+    first of its journals is built, so journals come with their relations;
+    filtering a lazy result (JournalResultSet.take) builds no journal, so
+    the intermediate results of the mashup queries are never loaded.
+
+    A category of a journal carries the quartile of that journal in the
+    category (journal_categories.quartile), so journals ranked differently
+    in a category get different Category instances. The engine's shared
+    instance is used when its quartile is the same; areas are always the
+    shared instances.
+    """
+
+    MODES = ('lazy', 'eager')
+
+    def __init__(self, engine: Any, mode: str = 'lazy'):
+        """
+        Args:
+            engine (BasicQueryEngine): Engine whose category handlers are queried
+            mode (str): 'lazy' to load on first access, 'eager' to load when journals are built
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown relation loading mode: {mode}")
+        self._engine = engine
+        self._eager: bool = mode == 'eager'
+
+    def isEager(self) -> bool:
+        """Return True if journals are loaded as soon as they are built."""
+        return self._eager
+
+    def batch(self, identifiers: Iterable[Optional[str]]) -> 'RelationBatch':
+        """
+        Return a batch for the journals with these identifiers.
+
+        Args:
+            identifiers (Iterable[str]): Identifier of every journal of a result (None if missing)
+
+        Returns:
+            RelationBatch: Batch to attach the journals to
+        """
+        return RelationBatch(self, identifiers)
+
+    def attach(self, journals: Iterable[Journal]) -> None:
+        """Attach journals built outside a JournalResultSet to one batch."""
+        journals = list(journals)
+        if not journals:
+            return
+        batch = self.batch(journal.getIds()[0] for journal in journals if journal.getIds())
+        for journal in journals:
+            batch.attach(journal)
+
+    def fetch(self, identifiers: List[str]) -> Dict[str, Tuple[tuple, tuple]]:
+        """
+        Read the relations of journals from every category handler.
+
+        Args:
+            identifiers (List[str]): Journal identifiers (ISSN or EISSN)
+
+        Returns:
+            Dict[str, Tuple[tuple, tuple]]: Identifier -> (categories, areas) for
+            the journals with at least one relation
+        """
+        if not identifiers:
+            return {}
+        engine = self._engine
+        found: Dict[str, Tuple[Dict[Category, None], Dict[Area, None]]] = {}
+        # Entities are built once per distinct value of one fetch
+        categories: Dict[tuple, Optional[Category]] = {}
+        areas: Dict[Any, Optional[Area]] = {}
+        for rows in engine._fan_out(engine._categoryQuery, 'getJournalRelationsRows', identifiers):
+            for issn, kind, identifier, quartile in rows:
+                if kind == 'category':
+                    key = (identifier, quartile)
+                    if key not in categories:
+                        categories[key] = self._category(identifier, quartile)
+                    entity = categories[key]
+                else:
+                    if identifier not in areas:
+                        areas[identifier] = engine._row_to_area(identifier) if engine._has_value(identifier) else None
+                    entity = areas[identifier]
+                if entity is not None:
+                    found.setdefault(issn, ({}, {}))[kind != 'category'][entity] = None
+        return {
+            issn: (tuple(journal_categories), tuple(journal_areas))
+            for issn, (journal_categories, journal_areas) in found.items()
+        }
+
+    def _category(self, identifier, quartile) -> Optional[Category]:
+        """Return the category instance for a (category, journal quartile) pair, None without identifier."""
+        engine = self._engine
+        if not engine._has_value(identifier):
+            return None
+        identifier = str(identifier).strip()
+        quartile = str(quartile).strip() if engine._has_value(quartile) else None
+        shared = engine._identity.get('category', identifier) if engine._identity is not None else None
+        if shared is not None and shared.getQuartile() == quartile:
+            return shared
+        category = Category()
+        category.setId(identifier)
+        category.setQuartile(quartile)
+        return category
+
+
+class RelationBatch:
+    """
+    Journals of one result whose categories and areas are loaded together.
+
+    The batch knows the identifiers of every journal of the result, including
+    the ones a lazy JournalResultSet has not built yet, so loading them
+    later needs no further query.
+    """
+
+    # Serializes the additions to journals, which may be shared between batches
+    _journal_lock = threading.Lock()
+
+    def __init__(self, loader: RelationLoader, identifiers: Iterable[Optional[str]]):
+        """
+        Args:
+            loader (RelationLoader): Loader reading the relations
+            identifiers (Iterable[str]): Journal identifiers (None values are skipped)
+        """
+        self._loader: RelationLoader = loader
+        self._identifiers: List[str] = [identifier for identifier in dict.fromkeys(identifiers) if identifier]
+        self._relations: Optional[Dict[str, Tuple[tuple, tuple]]] = None
+        self._lock = threading.Lock()
+
+    def attach(self, journal: Journal) -> Journal:
+        """Make the journal load its relations from this batch on first access; return it."""
+        if self._relations is not None or self._loader.isEager():
+            self.load(journal)
+        else:
+            journal.setRelationLoader(self)
+        return journal
+
+    def relations(self) -> Dict[str, Tuple[tuple, tuple]]:
+        """Return the relations of the batch, reading them on the first call."""
+        relations = self._relations
+        if relations is None:
+            with self._lock:
+                if self._relations is None:
+                    self._relations = self._loader.fetch(self._identifiers)
+                    self._identifiers = []
+                relations = self._relations
+        return relations
+
+    def load(self, journal: Journal) -> None:
+        """
+        Add the categories and areas of a journal of the batch to it.
+
+        A journal shared by several results (identity map) is loaded by the
+        batch of each of them; relations it already has, compared by
+        identifier and quartile, are not added again.
+        """
+        ids = journal.getIds()
+        categories, areas = self.relations().get(ids[0], ((), ())) if ids else ((), ())
+        with self._journal_lock:
+            journal.setRelationLoader(None)
+            if categories:
+                known = {(tuple(category.getIds()), category.getQuartile()) for category in journal.getCategories()}
+                for category in categories:
+                    if (tuple(category.getIds()), category.getQuartile()) not in known:
+                        journal.addCategory(category)
+            if areas:
+                known = {tuple(area.getIds()) for area in journal.getAreas()}
+                for area in areas:
+                    if tuple(area.getIds()) not in known:
+                        journal.addArea(area)
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Lazy result types returned by the query engines.
+Contains classes: JournalResultSet
+"""
+
+import operator
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from .models import Journal
+from .relations import RelationBatch, RelationLoader
+
+
+class JournalResultSet(list):
+    """
+    Lazy, list-compatible result of the journal queries of the engines.
+
+    The set holds the folded journal data column by column (one entry per
+    journal, see BasicQueryEngine._fold_journal_rows) and only creates a
+    Journal object when that position is accessed; created journals are
+    cached, so the same object is returned each time. len(), column(),
+    to_dataframe() and the Arrow exports (to_arrow(), to_record_batches(),
+    write_parquet(), write_ipc(), which need the optional pyarrow package)
+    never create Journal objects. With a RelationLoader, the categories and
+    areas of every journal of the set are loaded in one batch when the first
+    of them is read.
+
+    The class subclasses list so existing callers keep working: indexing,
+    iteration and slicing stay lazy, while any other list operation
+    (mutation, comparison, concatenation, repr, ...) first materializes every
+    journal into the underlying list. Code that reads list storage at the C
+    level without going through these methods should call materialize().
+    """
+
+    COLUMNS = ('id', 'title', 'languages', 'publisher', 'seal', 'licence', 'apc')
+
+    def __init__(self, columns: Optional[Dict[str, list]] = None,
+                 share: Optional[Callable[[Journal], Journal]] = None,
+                 relations: Optional[RelationLoader] = None):
+        """
+        Args:
+            columns (Dict[str, list], optional): Values per column in COLUMNS, one per journal,
+                already in the form returned by the Journal getters (id may be None)
+            share (Callable, optional): Called on every newly built Journal; returns the
+                instance to use instead (e.g. the engine's shared instance)
+            relations (RelationLoader, optional): Loads the categories and areas of all
+                the journals of the set in one batch
+        """
+        super().__init__()
+        self._share: Optional[Callable[[Journal], Journal]] = share
+        columns = columns or {}
+        self._columns: Dict[str, list] = {name: list(columns.get(name, ())) for name in self.COLUMNS}
+        self._size: int = len(self._columns['id'])
+        self._journals: List[Optional[Journal]] = [None] * self._size
+        self._materialized: bool = False
+        self._relations: Optional[RelationLoader] = relations
+        self._relation_batch: Optional[RelationBatch] = (
+            relations.batch(self._columns['id']) if relations is not None and self._size else None
+        )
+
+    def column(self, name: str) -> list:
+        """
+        Return the values of one column for every journal, without creating Journal objects.
+
+        The values are the ones returned by this query; a journal shared with
+        other results through the engine's identity map may hold more data.
+
+        Args:
+            name (str): One of COLUMNS
+
+        Returns:
+            list: One value per journal, in result order
+
+        Raises:
+            KeyError: If the column does not exist
+        """
+        if name not in self.COLUMNS:
+            raise KeyError(f"Unknown journal column: {name}")
+        if self._materialized:
+            return [self._value_of(journal, name) for journal in list.__iter__(self)]
+        return list(self._columns[name])
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Return the result as a DataFrame with one row per journal.
+
+        Returns:
+            pd.DataFrame: Columns as in COLUMNS; languages holds lists
+        """
+        data = {name: self.column(name) for name in self.COLUMNS}
+        data['languages'] = [list(languages) for languages in data['languages']]
+        return pd.DataFrame(data, columns=list(self.COLUMNS))
+
+    def to_arrow(self):
+        """
+        Return the result as an Arrow table with one row per journal.
+
+        Columns are built from the column lists of the set, without creating
+        Journal objects; languages becomes a list<string> column.
+
+        Returns:
+            pyarrow.Table: Columns as in COLUMNS
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        pa = _pyarrow()
+        schema = self._arrow_schema(pa)
+        columns = self._columns if not self._materialized else {name: self.column(name) for name in self.COLUMNS}
+        return pa.Table.from_arrays(
+            [pa.array(columns[field.name], type=field.type) for field in schema], schema=schema
+        )
+
+    def to_record_batches(self, max_chunksize: Optional[int] = None) -> list:
+        """
+        Return the result as Arrow record batches.
+
+        Args:
+            max_chunksize (int, optional): Maximum number of journals per batch
+
+        Returns:
+            List[pyarrow.RecordBatch]: Batches sharing the buffers of to_arrow()
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        return self.to_arrow().to_batches(max_chunksize=max_chunksize)
+
+    def write_parquet(self, where, **options) -> None:
+        """
+        Write the result to a Parquet file.
+
+        Args:
+            where: File path or writable binary file object
+            **options: Options of pyarrow.parquet.write_table (e.g. compression)
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        _pyarrow()
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), where, **options)
+
+    def write_ipc(self, sink, max_chunksize: Optional[int] = None) -> None:
+        """
+        Write the result as an Arrow IPC stream, readable with pyarrow.ipc.open_stream.
+
+        Args:
+            sink: File path or writable binary file object
+            max_chunksize (int, optional): Maximum number of journals per record batch
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        pa = _pyarrow()
+        table = self.to_arrow()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max_chunksize)
+
+    def take(self, positions: Iterable[int]) -> 'JournalResultSet':
+        """
+        Return a new lazy result set with the journals at the given positions.
+
+        Args:
+            positions (Iterable[int]): Positions in this result set
+
+        Returns:
+            JournalResultSet: Selected journals, in the given order
+        """
+        positions = list(positions)
+        if self._materialized:
+            journals = [list.__getitem__(self, position) for position in positions]
+            columns = {name: [self._value_of(journal, name) for journal in journals]
+                       for name in self.COLUMNS}
+            result = JournalResultSet(columns, self._share, self._relations)
+            result._journals = journals
+            return result
+        columns = {name: [values[position] for position in positions]
+                   for name, values in self._columns.items()}
+        result = JournalResultSet(columns, self._share, self._relations)
+        result._journals = [self._journals[position] for position in positions]
+        return result
+
+    def materialize(self) -> 'JournalResultSet':
+        """Create every Journal and store them in the underlying list; return self."""
+        if not self._materialized:
+            list.extend(self, [self._journal(position) for position in range(self._size)])
+            self._materialized = True
+            self._columns = {}
+            self._journals = []
+        return self
+
+    # Lazy part of the sequence protocol
+
+    def __len__(self) -> int:
+        if self._materialized:
+            return list.__len__(self)
+        return self._size
+
+    def __iter__(self):
+        if self._materialized:
+            return list.__iter__(self)
+        return (self._journal(position) for position in range(self._size))
+
+    def __getitem__(self, index):
+        if self._materialized:
+            return list.__getitem__(self, index)
+        if isinstance(index, slice):
+            return [self._journal(position) for position in range(*index.indices(self._size))]
+        position = operator.index(index)
+        if position < 0:
+            position += self._size
+        if not 0 <= position < self._size:
+            raise IndexError("list index out of range")
+        return self._journal(position)
+
+    def __radd__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(other) + list(self.materialize())
+
+    def __reduce_ex__(self, protocol):
+        # Copies and pickles are plain lists of journals
+        return list, (list(self),)
+
+    def _journal(self, position: int) -> Journal:
+        """Return the Journal at a position, creating it on first access."""
+        journal = self._journals[position]
+        if journal is None:
+            columns = self._columns
+            journal = Journal()
+            if columns['id'][position] is not None:
+                journal.setId(columns['id'][position])
+            journal.setTitle(columns['title'][position])
+            journal.setLanguages(columns['languages'][position])
+            journal.setPublisher(columns['publisher'][position])
+            journal.setSeal(columns['seal'][position])
+            journal.setLicence(columns['licence'][position])
+            journal.setAPC(columns['apc'][position])
+            if self._share is not None:
+                journal = self._share(journal)
+            if self._relation_batch is not None:
+                self._relation_batch.attach(journal)
+            self._journals[position] = journal
+        return journal
+
+    @staticmethod
+    def _arrow_schema(pa):
+        """Return the Arrow schema of the result columns, in COLUMNS order."""
+        return pa.schema([
+            ('id', pa.string()),
+            ('title', pa.string()),
+            ('languages', pa.list_(pa.string())),
+            ('publisher', pa.string()),
+            ('seal', pa.bool_()),
+            ('licence', pa.string()),
+            ('apc', pa.bool_()),
+        ])
+
+    @staticmethod
+    def _value_of(journal: Journal, name: str):
+        """Read a column value from a Journal object."""
+        if name == 'id':
+            ids = journal.getIds()
+            return ids[0] if ids else None
+        if name == 'title':
+            return journal.getTitle()
+        if name == 'languages':
+            return journal.getLanguages()
+        if name == 'publisher':
+            return journal.getPublisher()
+        if name == 'seal':
+            return journal.hasDOASeal()
+        if name == 'licence':
+            return journal.getLicence()
+        return journal.hasAPC()
+
+
+def _pyarrow():
+    """Import pyarrow, which only the Arrow and Parquet exports need."""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("pyarrow is required to export journals as Arrow or Parquet") from e
+    return pyarrow
+
+
+def _materializing(name: str):
+    """Wrap a list method so the result set is materialized before it runs."""
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self.materialize()
+        for arg in args:
+            if isinstance(arg, JournalResultSet):
+                arg.materialize()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+for _name in (
+    '__repr__', '__eq__', '__ne__', '__lt__', '__le__', '__gt__', '__ge__',
+    '__contains__', '__reversed__', '__add__', '__iadd__', '__mul__', '__rmul__', '__imul__',
+    '__setitem__', '__delitem__', 'append', 'extend', 'insert', 'pop', 'remove', 'clear',
+    'index', 'count', 'sort', 'reverse', 'copy',
+):
+    setattr(JournalResultSet, _name, _materializing(_name))
+del _name
+
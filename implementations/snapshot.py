@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory snapshot of the relational (categories and areas) store.
+Contains classes: CategorySnapshot, SnapshotHolder
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from urllib.request import pathname2url
+
+import numpy as np
+
+
+class CategorySnapshot:
+    """
+    Compact, read-only copy of the four Scimago tables.
+
+    Categories and areas are kept as sorted NumPy arrays (so ordered listings
+    need no sorting) and the journal relations as dictionaries mapping each
+    category and area to the frozenset of its ISSNs and each ISSN to its
+    categories and areas. Every CategoryQueryHandler row query can be
+    answered from these structures with the same result as the SQL version.
+
+    The snapshot keeps a dedicated read-only connection to detect changes
+    through ``PRAGMA data_version`` and the file modification time.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the SQLite database
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened or read
+        """
+        self._path: str = path
+        self._conn = sqlite3.connect(
+            f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._mtime_ns: int = os.stat(path).st_mtime_ns
+        self._data_version: int = self._read_data_version()
+        self._load()
+
+    def isStale(self) -> bool:
+        """Return True if the database changed since the snapshot was loaded."""
+        try:
+            if os.stat(self._path).st_mtime_ns != self._mtime_ns:
+                return True
+            with self._lock:
+                return self._read_data_version() != self._data_version
+        except (OSError, sqlite3.Error):
+            return True
+
+    def close(self) -> None:
+        """Close the change-detection connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _read_data_version(self) -> int:
+        """Return the connection's current PRAGMA data_version."""
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _load(self) -> None:
+        """Read the four tables in one read transaction and build the indexes."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                categories = self._conn.execute(
+                    "SELECT DISTINCT id, quartile FROM categories ORDER BY id").fetchall()
+                areas = self._conn.execute(
+                    "SELECT DISTINCT id FROM areas ORDER BY id").fetchall()
+                journal_categories = self._conn.execute(
+                    "SELECT issn, category_id, quartile FROM journal_categories").fetchall()
+                journal_areas = self._conn.execute(
+                    "SELECT issn, area_id FROM journal_areas").fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+
+        self._category_ids = np.array([row[0] for row in categories], dtype=object)
+        self._category_quartiles = np.array([row[1] for row in categories], dtype=object)
+        self._area_ids = np.array([row[0] for row in areas], dtype=object)
+        self._category_rows: List[Tuple] = [tuple(row) for row in categories]
+        self._area_rows: List[Tuple] = [tuple(row) for row in areas]
+        self._category_positions: Dict[str, int] = {
+            identifier: position for position, identifier in enumerate(self._category_ids)
+        }
+        self._area_set: FrozenSet[str] = frozenset(self._area_ids)
+
+        self._category_issns = self._freeze(
+            (category_id, issn) for issn, category_id, _ in journal_categories)
+        self._issn_categories = self._freeze(
+            (issn, category_id) for issn, category_id, _ in journal_categories)
+        self._issn_category_quartiles = self._freeze(
+            (issn, (category_id, quartile)) for issn, category_id, quartile in journal_categories)
+        self._category_quartile_issns = self._freeze(
+            ((category_id, quartile), issn) for issn, category_id, quartile in journal_categories)
+        self._area_issns = self._freeze((area_id, issn) for issn, area_id in journal_areas)
+        self._issn_areas = self._freeze((issn, area_id) for issn, area_id in journal_areas)
+
+    @staticmethod
+    def _freeze(pairs: Iterable[Tuple]) -> Dict:
+        """Group (key, value) pairs into a dict of frozensets."""
+        grouped: Dict = {}
+        for key, value in pairs:
+            grouped.setdefault(key, set()).add(value)
+        return {key: frozenset(values) for key, values in grouped.items()}
+
+    # Row queries (same results as the SQL queries of CategoryQueryHandler)
+
+    def allCategoriesRows(self) -> List[Tuple]:
+        """Rows of getAllCategoriesRows."""
+        return list(self._category_rows)
+
+    def allAreasRows(self) -> List[Tuple]:
+        """Rows of getAllAreasRows."""
+        return list(self._area_rows)
+
+    def categoriesWithQuartileRows(self, quartiles: Set[str]) -> List[Tuple]:
+        """Rows of getCategoriesWithQuartileRows."""
+        if not quartiles:
+            return self.allCategoriesRows()
+        mask = np.isin(self._category_quartiles, list(quartiles))
+        return [self._category_rows[i] for i in np.flatnonzero(mask)]
+
+    def categoriesAssignedToAreasRows(self, area_ids: Set[str]) -> List[Tuple]:
+        """Rows of getCategoriesAssignedToAreasRows."""
+        if not area_ids:
+            return self.allCategoriesRows()
+        issns = self._union(self._area_issns, area_ids)
+        category_ids = self._union(self._issn_categories, issns)
+        return self._category_rows_for(category_ids)
+
+    def areasAssignedToCategoriesRows(self, category_ids: Set[str]) -> List[Tuple]:
+        """Rows of getAreasAssignedToCategoriesRows."""
+        if not category_ids:
+            return self.allAreasRows()
+        issns = self._union(self._category_issns, category_ids)
+        area_ids = self._union(self._issn_areas, issns) & self._area_set
+        return [(area_id,) for area_id in sorted(area_ids)]
+
+    def byIdsRows(self, entity_ids: Iterable[str]) -> List[Tuple]:
+        """Rows of getByIdsRows."""
+        rows: List[Tuple] = []
+        wanted = set(entity_ids)
+        for identifier in sorted(wanted):
+            position = self._category_positions.get(identifier)
+            if position is not None:
+                rows.append((identifier, self._category_quartiles[position], 'category'))
+        rows.extend((identifier, None, 'area') for identifier in sorted(wanted & self._area_set))
+        return rows
+
+    def issnsInCategories(self, category_ids: Set[str], quartiles: Set[str]) -> Set[str]:
+        """Result of getIssnsInCategories."""
+        if not quartiles:
+            if not category_ids:
+                return set(self._issn_categories)
+            return self._union(self._category_issns, category_ids)
+        if not category_ids:
+            category_ids = self._category_issns.keys()
+        return self._union(
+            self._category_quartile_issns,
+            ((category_id, quartile) for category_id in category_ids for quartile in quartiles),
+        )
+
+    def issnsInAreas(self, area_ids: Set[str]) -> Set[str]:
+        """Result of getIssnsInAreas."""
+        if not area_ids:
+            return set(self._issn_areas)
+        return self._union(self._area_issns, area_ids)
+
+    def journalRelationsRows(self, issns: Iterable[str]) -> List[Tuple]:
+        """Rows of getJournalRelationsRows."""
+        rows: List[Tuple] = []
+        for issn in sorted(set(issns)):
+            rows.extend((issn, 'area', area_id, None) for area_id in sorted(self._issn_areas.get(issn, ())))
+            rows.extend(
+                (issn, 'category', category_id, quartile)
+                for category_id, quartile in sorted(self._issn_category_quartiles.get(issn, ()))
+            )
+        return rows
+
+    def _category_rows_for(self, category_ids: Set[str]) -> List[Tuple]:
+        """Return the category rows for the given identifiers, ordered by identifier."""
+        positions = sorted(
+            self._category_positions[category_id]
+            for category_id in category_ids if category_id in self._category_positions
+        )
+        return [self._category_rows[i] for i in positions]
+
+    @staticmethod
+    def _union(index: Dict, keys: Iterable) -> Set:
+        """Union of the index values for the given keys."""
+        result: Set = set()
+        for key in keys:
+            values = index.get(key)
+            if values:
+                result.update(values)
+        return result
+
+
+class SnapshotHolder:
+    """
+    Keeps the current CategorySnapshot of a database fresh.
+
+    The database is checked for changes at most once per ``check_interval``
+    seconds; a changed database is reloaded into a new snapshot which then
+    replaces the old one atomically, so readers never see a partial load.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        """
+        Args:
+            path (str): Path of the SQLite database
+            check_interval (float): Minimum number of seconds between two change checks
+        """
+        self._path: str = path
+        self._check_interval: float = check_interval
+        self._snapshot: Optional[CategorySnapshot] = None
+        self._checked_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> CategorySnapshot:
+        """
+        Return an up-to-date snapshot, loading or reloading it if needed.
+
+        Raises:
+            sqlite3.Error, OSError: If the database cannot be read
+        """
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._checked_at < self._check_interval:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.isStale():
+                replacement = CategorySnapshot(self._path)
+                self._snapshot = replacement
+                if snapshot is not None:
+                    snapshot.close()
+                snapshot = replacement
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def close(self) -> None:
+        """Drop the snapshot and close its connection."""
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot.close()
+                self._snapshot = None
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Pool of persistent, read-only SQLite connections shared by the query side.
+Contains classes: SQLiteConnectionPool, SQLiteVersionProbe
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+from urllib.request import pathname2url
+
+
+class SQLiteConnectionPool:
+    """
+    Bounded pool of read-only SQLite connections.
+
+    Connections are opened lazily in URI mode (``mode=ro``) with ``query_only``,
+    ``mmap_size`` and ``cache_size`` set, and are kept open between calls so the
+    page cache and the prepared statement cache survive. A connection is used by
+    a single thread at a time; idle connections are reused last-in first-out, so
+    a thread that queries repeatedly tends to get the same connection back.
+    """
+
+    def __init__(self, path: str, max_connections: int = 4,
+                 mmap_size: int = 256 * 1024 * 1024, cache_size_kib: int = 64 * 1024,
+                 acquire_timeout: Optional[float] = None):
+        """
+        Args:
+            path (str): Path of the SQLite database file
+            max_connections (int): Maximum number of simultaneously open connections
+            mmap_size (int): Bytes of the database file to memory-map
+            cache_size_kib (int): Page cache size per connection, in KiB
+            acquire_timeout (float, optional): Seconds to wait for a free connection
+        """
+        self._path: str = path
+        self._mmap_size: int = mmap_size
+        self._cache_size_kib: int = cache_size_kib
+        self._acquire_timeout: Optional[float] = acquire_timeout
+        self._slots = threading.BoundedSemaphore(max(1, max_connections))
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._closed: bool = False
+        _OPEN_POOLS.add(self)
+
+    def getPath(self) -> str:
+        """Return the database path served by the pool."""
+        return self._path
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Check out a connection for the duration of the ``with`` block.
+
+        Raises:
+            TimeoutError: If no connection becomes free within acquire_timeout
+            sqlite3.Error: If the database cannot be opened
+        """
+        if not self._slots.acquire(timeout=self._acquire_timeout):
+            raise TimeoutError(f"No free SQLite connection for {self._path}")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                with self._lock:
+                    if self._closed:
+                        conn.close()
+                    else:
+                        self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Close every idle connection; connections in use are closed when returned."""
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+        _OPEN_POOLS.discard(self)
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a new read-only connection with the pool's pragmas."""
+        uri = f"file:{pathname2url(os.path.abspath(self._path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA mmap_size = {int(self._mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = {-int(self._cache_size_kib)}")
+        return conn
+
+
+class SQLiteVersionProbe:
+    """
+    Reads a version marker of an SQLite database that changes on every committed write.
+
+    The marker combines the modification time and size of the database file
+    and of its write-ahead log with ``PRAGMA data_version``, read on a
+    dedicated read-only connection kept open between calls (the pragma only
+    changes between two reads on the same connection). Writes from other
+    connections and other processes are detected as well.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the SQLite database file
+        """
+        self._path: str = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def read(self) -> Optional[Tuple]:
+        """
+        Return the current version marker of the database.
+
+        Returns:
+            tuple or None: Marker, or None if the database cannot be read
+        """
+        with self._lock:
+            try:
+                files = tuple(self._stat(self._path + suffix) for suffix in ("", "-wal"))
+                if files[0] is None:
+                    return None
+                if self._conn is None:
+                    self._conn = sqlite3.connect(
+                        f"file:{pathname2url(os.path.abspath(self._path))}?mode=ro",
+                        uri=True, check_same_thread=False,
+                    )
+                return files + (self._conn.execute("PRAGMA data_version").fetchone()[0],)
+            except sqlite3.Error:
+                self._close()
+                return None
+
+    def close(self) -> None:
+        """Close the probe's connection."""
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        """Close the connection; requires the lock."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        """Return (modification time in ns, size) of a file, None if it does not exist."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+# Pools still open at interpreter shutdown are closed cleanly
+_OPEN_POOLS: "weakref.WeakSet[SQLiteConnectionPool]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_pools() -> None:
+    for pool in list(_OPEN_POOLS):
+        pool.close()
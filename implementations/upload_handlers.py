@@ -5,11 +5,19 @@ Contains classes: JournalUploadHandler, CategoryUploadHandler
 """
 
 import csv
+import gzip
 import json
 import sqlite3
-import requests
-from typing import List, Dict, Any
-from .handlers import UploadHandler
+import uuid
+from typing import List, Dict, Any, Optional
+from .handlers import UploadHandler, STORE_RESOURCE
+
+
+def _open_text(path: str):
+    """Open a UTF-8 text file for reading, decompressing it if the name ends with .gz."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
 
 
 class JournalUploadHandler(UploadHandler):
@@ -35,7 +43,11 @@ class JournalUploadHandler(UploadHandler):
                 return False
             
             # Upload data to Blazegraph
-            return self._upload_to_blazegraph(journals_data)
+            try:
+                return self._upload_to_blazegraph(journals_data)
+            finally:
+                # Even a failed upload may have written some of the batches
+                self._bump_data_generation()
             
         except Exception as e:
             print(f"Error while uploading journals: {e}")
@@ -54,7 +66,7 @@ class JournalUploadHandler(UploadHandler):
         journals = []
         
         try:
-            with open(path, 'r', encoding='utf-8') as file:
+            with _open_text(path) as file:
                 reader = csv.DictReader(file)
                 for row in reader:
                     journal_data = {
@@ -91,22 +103,10 @@ class JournalUploadHandler(UploadHandler):
             
             total_records = len(journals_data)
             uploaded_records = 0
-            batch_size = 200
             
-            for batch in self._chunked(journals_data, batch_size):
-                sparql_query = self._build_insert_query(batch)
-                
-                response = requests.post(
-                    self._dbPathOrUrl,
-                    data={'update': sparql_query},
-                    headers={'Content-Type': 'application/x-www-form-urlencoded'}
-                )
-                
-                if response.status_code == 200:
+            for batch in self._chunked(journals_data, self.BATCH_SIZE):
+                if self.pushBatch(batch):
                     uploaded_records += len(batch)
-                else:
-                    sample_issn = batch[0].get('issn_print') or batch[0].get('eissn') or 'unknown'
-                    print(f"Error while uploading journal batch (sample ISSN {sample_issn}): {response.status_code}")
             
             if uploaded_records == total_records:
                 print(f"Successfully uploaded {uploaded_records} of {total_records} journals to Blazegraph")
@@ -122,6 +122,85 @@ class JournalUploadHandler(UploadHandler):
             print(f"Error while uploading to Blazegraph: {e}")
             return False
     
+    def readBatches(self, path: str, batch_size: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Read a CSV file with journal data and split it into batches.
+
+        Args:
+            path (str): Path to the CSV file (gzip-compressed if it ends with .gz)
+            batch_size (Optional[int]): Journals per batch (default BATCH_SIZE)
+
+        Returns:
+            List[List[Dict[str, Any]]]: Batches of journal data
+        """
+        return list(self._chunked(self._read_csv_file(path), batch_size or self.BATCH_SIZE))
+    
+    def serializeBatch(self, batch: List[Dict[str, Any]]) -> str:
+        """
+        Build the SPARQL update uploading a batch of journals.
+
+        Args:
+            batch (List[Dict[str, Any]]): Journal data
+
+        Returns:
+            str: SPARQL INSERT DATA update
+        """
+        return self._build_insert_query(batch)
+    
+    def countStatements(self, payload: str) -> int:
+        """
+        Count the triples of a SPARQL update built by serializeBatch.
+
+        Args:
+            payload (str): SPARQL INSERT DATA update
+
+        Returns:
+            int: Number of triples (literals are escaped, so every triple ends a line)
+        """
+        return payload.count(" .\n")
+    
+    def pushBatch(self, batch: List[Dict[str, Any]], payload: Optional[str] = None) -> bool:
+        """
+        Send the SPARQL update of a batch of journals to Blazegraph.
+
+        Args:
+            batch (List[Dict[str, Any]]): Journal data
+            payload (Optional[str]): Result of serializeBatch(batch), if already built
+
+        Returns:
+            bool: True if the endpoint accepted the update
+
+        Raises:
+            requests.RequestException: If the endpoint cannot be reached
+        """
+        # Only journal uploads send HTTP requests; importing here keeps the module light
+        import requests
+        
+        # The same request replaces the store revision (see JournalQueryHandler.getStoreVersion)
+        update = (payload if payload is not None else self.serializeBatch(batch)) + self._revision_update()
+        response = requests.post(
+            self._dbPathOrUrl,
+            data={'update': update},
+            headers={'Content-Type': 'application/x-www-form-urlencoded'}
+        )
+        
+        if response.status_code == 200:
+            return True
+        sample_issn = batch[0].get('issn_print') or batch[0].get('eissn') or 'unknown'
+        print(f"Error while uploading journal batch (sample ISSN {sample_issn}): {response.status_code}")
+        return False
+    
+    @staticmethod
+    def _revision_update() -> str:
+        """Return the update operation, appended to an INSERT DATA update, giving the store a new revision."""
+        store = f"<{STORE_RESOURCE}>"
+        revision = "<http://doaj.org/revision>"
+        return (
+            f" ;\nDELETE {{ {store} {revision} ?revision }}\n"
+            f"INSERT {{ {store} {revision} \"{uuid.uuid4().hex}\" }}\n"
+            f"WHERE {{ OPTIONAL {{ {store} {revision} ?revision }} }}"
+        )
+    
     def _build_insert_query(self, journals_data: List[Dict[str, Any]]) -> str:
         """
         Build a SPARQL INSERT query for uploading journals.
@@ -160,6 +239,10 @@ class JournalUploadHandler(UploadHandler):
             if journal['eissn']:
                 insert_data += f"    {journal_uri} doaj:eissn \"{journal['eissn']}\" .\n"
             
+            # Identity index: every ISSN and EISSN points to the journal
+            for identifier in self._identifiers(journal):
+                insert_data += f"    {journal_uri} doaj:identifier \"{identifier}\" .\n"
+            
             # Languages
             for lang in journal['languages']:
                 insert_data += f"    {journal_uri} doaj:language \"{self._escape_string(lang)}\" .\n"
@@ -215,6 +298,10 @@ class JournalUploadHandler(UploadHandler):
         if journal['eissn']:
             insert_data += f"    {journal_uri} doaj:eissn \"{journal['eissn']}\" .\n"
         
+        # Identity index: every ISSN and EISSN points to the journal
+        for identifier in self._identifiers(journal):
+            insert_data += f"    {journal_uri} doaj:identifier \"{identifier}\" .\n"
+        
         # Languages
         for lang in journal['languages']:
             insert_data += f"    {journal_uri} doaj:language \"{self._escape_string(lang)}\" .\n"
@@ -253,28 +340,37 @@ class JournalUploadHandler(UploadHandler):
             .replace('\r', '\\r')
         )
 
+    @staticmethod
+    def _identifiers(journal: Dict[str, Any]) -> List[str]:
+        """Return the non-empty ISSN and EISSN of a journal."""
+        return [identifier for identifier in (journal['issn_print'], journal['eissn']) if identifier]
+
     def _bool_literal(self, value: bool) -> str:
         """Return a lowercase boolean literal for SPARQL."""
         return "true" if bool(value) else "false"
-    
-    @staticmethod
-    def _chunked(items: List[Dict[str, Any]], size: int):
-        """Split a list of dictionaries into batches of the specified size."""
-        batch: List[Dict[str, Any]] = []
-        for item in items:
-            batch.append(item)
-            if len(batch) == size:
-                yield batch
-                batch = []
-        if batch:
-            yield batch
 
 
 class CategoryUploadHandler(UploadHandler):
     """
     Handler for uploading categories and areas from JSON into a relational SQLite database.
+
+    pushDataToDb writes a whole file in one transaction, so a failed upload
+    leaves the database unchanged. The bulk loader writes one transaction per
+    batch with pushBatch instead (so it can resume) and merges the identity
+    index with finishUpload once all the batches are written.
     """
     
+    # Scimago entries per batch (one transaction each with pushBatch)
+    BATCH_SIZE = 500
+    
+    # Table and columns of the rows inserted for every Scimago entry
+    _INSERTS = (
+        ('areas', ('id',)),
+        ('categories', ('id', 'quartile')),
+        ('journal_categories', ('issn', 'category_id', 'quartile')),
+        ('journal_areas', ('issn', 'area_id')),
+    )
+    
     def pushDataToDb(self, path: str) -> bool:
         """
         Upload categories and areas data from a JSON file into SQLite.
@@ -293,7 +389,10 @@ class CategoryUploadHandler(UploadHandler):
                 return False
             
             # Create tables and insert data
-            return self._upload_to_sqlite(scimago_data)
+            try:
+                return self._upload_to_sqlite(scimago_data)
+            finally:
+                self._bump_data_generation()
             
         except Exception as e:
             print(f"Error while uploading categories: {e}")
@@ -310,23 +409,143 @@ class CategoryUploadHandler(UploadHandler):
             List[Dict[str, Any]]: List of dictionaries with data
         """
         try:
-            with open(path, 'r', encoding='utf-8') as file:
+            with _open_text(path) as file:
                 data = json.load(file)
                 return data
         except Exception as e:
             print(f"Error while reading JSON file: {e}")
             return []
     
+    def readBatches(self, path: str, batch_size: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Read a JSON file with Scimago data and split it into batches.
+
+        Args:
+            path (str): Path to the JSON file (gzip-compressed if it ends with .gz)
+            batch_size (Optional[int]): Entries per batch (default BATCH_SIZE)
+
+        Returns:
+            List[List[Dict[str, Any]]]: Batches of Scimago entries
+        """
+        return list(self._chunked(self._read_json_file(path), batch_size or self.BATCH_SIZE))
+    
+    def serializeBatch(self, batch: List[Dict[str, Any]]) -> str:
+        """
+        Build the SQL script inserting a batch of Scimago entries.
+
+        The script is only written by dry runs: the database itself is
+        written with parameterized statements (see pushBatch).
+
+        Args:
+            batch (List[Dict[str, Any]]): Scimago entries
+
+        Returns:
+            str: One INSERT OR IGNORE statement per line
+        """
+        statements = []
+        for (table, columns), rows in zip(self._INSERTS, self._batch_rows(batch)):
+            for row in rows:
+                values = ", ".join(self._sql_literal(value) for value in row)
+                statements.append(f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({values});\n")
+        return "".join(statements)
+    
+    def countStatements(self, payload: str) -> int:
+        """
+        Count the INSERT statements of a SQL script built by serializeBatch.
+
+        Args:
+            payload (str): SQL script
+
+        Returns:
+            int: Number of statements
+        """
+        return payload.count(";\n")
+    
+    def countRows(self, batch: List[Dict[str, Any]]) -> int:
+        """
+        Count the rows inserted for a batch of Scimago entries.
+
+        Args:
+            batch (List[Dict[str, Any]]): Scimago entries
+
+        Returns:
+            int: Number of rows (the statements of serializeBatch(batch))
+        """
+        return sum(len(rows) for rows in self._batch_rows(batch))
+    
+    def pushBatch(self, batch: List[Dict[str, Any]], payload: Optional[str] = None) -> bool:
+        """
+        Insert a batch of Scimago entries in one transaction.
+
+        The rows are bound as parameters; the SQL text of serializeBatch is
+        not executed, so payload is ignored.
+
+        Args:
+            batch (List[Dict[str, Any]]): Scimago entries
+            payload (Optional[str]): Result of serializeBatch(batch), if already built
+
+        Returns:
+            bool: True once the batch is committed
+
+        Raises:
+            sqlite3.Error: If the batch cannot be written (nothing of it is kept)
+        """
+        conn = sqlite3.connect(self._dbPathOrUrl)
+        try:
+            cursor = conn.cursor()
+            self._create_tables(cursor)
+            self._insert_data(cursor, batch)
+            conn.commit()
+            return True
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def finishUpload(self, records: List[Dict[str, Any]]) -> bool:
+        """
+        Merge the identifiers of all the uploaded entries into the identity index.
+
+        Args:
+            records (List[Dict[str, Any]]): All the Scimago entries of the file
+
+        Returns:
+            bool: True once the identity index is committed
+
+        Raises:
+            sqlite3.Error: If the index cannot be written
+        """
+        conn = sqlite3.connect(self._dbPathOrUrl)
+        try:
+            cursor = conn.cursor()
+            self._create_tables(cursor)
+            self._update_identity(cursor, records)
+            conn.commit()
+            return True
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _sql_literal(value: Any) -> str:
+        """Return a value as an SQLite literal (text quoted, None as NULL) for the dry-run scripts."""
+        if value is None:
+            return "NULL"
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return repr(value)
+        return "'" + str(value).replace("'", "''") + "'"
+    
     def _upload_to_sqlite(self, scimago_data: List[Dict[str, Any]]) -> bool:
         """
-        Upload data into the SQLite database.
+        Upload data into the SQLite database in one transaction.
 
         Args:
             scimago_data (List[Dict[str, Any]]): Scimago data
 
         Returns:
-            bool: True if the upload succeeded
+            bool: True if the upload succeeded (otherwise nothing is written)
         """
+        conn = None
         try:
             conn = sqlite3.connect(self._dbPathOrUrl)
             cursor = conn.cursor()
@@ -334,18 +553,61 @@ class CategoryUploadHandler(UploadHandler):
             # Create tables
             self._create_tables(cursor)
             
-            # Insert data
-            self._insert_data(cursor, scimago_data)
+            # Insert data batch by batch, then merge the identifiers
+            for batch in self._chunked(scimago_data, self.BATCH_SIZE):
+                self._insert_data(cursor, batch)
+            self._update_identity(cursor, scimago_data)
             
             conn.commit()
-            conn.close()
             
             print(f"Successfully loaded data into SQLite database {self._dbPathOrUrl}")
             return True
             
         except Exception as e:
+            if conn is not None:
+                conn.rollback()
             print(f"Error while uploading to SQLite: {e}")
             return False
+        finally:
+            if conn is not None:
+                conn.close()
+    
+    def _batch_rows(self, batch: List[Dict[str, Any]]) -> List[List[tuple]]:
+        """
+        Return the rows of a batch of Scimago entries, one list per table of _INSERTS.
+
+        Args:
+            batch (List[Dict[str, Any]]): Scimago entries
+
+        Returns:
+            List[List[tuple]]: Areas, categories, journal-category and journal-area rows
+        """
+        areas, categories, journal_categories, journal_areas = [], [], [], []
+        for entry in batch:
+            identifiers = entry.get('identifiers', [])
+            entry_categories = [(category.get('id'), category.get('quartile'))
+                                for category in entry.get('categories', [])]
+            entry_areas = entry.get('areas', [])
+            
+            areas.extend((area,) for area in entry_areas)
+            categories.extend(entry_categories)
+            for issn in identifiers:
+                journal_categories.extend((issn, category_id, quartile) for category_id, quartile in entry_categories)
+            for issn in identifiers:
+                journal_areas.extend((issn, area) for area in entry_areas)
+        return [areas, categories, journal_categories, journal_areas]
+    
+    def _insert_data(self, cursor, scimago_data: List[Dict[str, Any]]) -> None:
+        """
+        Insert data into the SQLite tables.
+
+        Args:
+            cursor: SQLite cursor
+            scimago_data (List[Dict[str, Any]]): Scimago data
+        """
+        for (table, columns), rows in zip(self._INSERTS, self._batch_rows(scimago_data)):
+            placeholders = ", ".join("?" for _ in columns)
+            cursor.executemany(f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
     
     def _create_tables(self, cursor) -> None:
         """
@@ -389,41 +651,80 @@ class CategoryUploadHandler(UploadHandler):
                 FOREIGN KEY (area_id) REFERENCES areas(id)
             )
         ''')
+        
+        # Identity index: every ISSN and EISSN -> canonical key of its journal
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS journal_identity (
+                issn TEXT PRIMARY KEY,
+                journal_key TEXT NOT NULL
+            )
+        ''')
+        
+        # Indexes for the ISSN lookups by category (and quartile) and by area
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_journal_categories_category '
+            'ON journal_categories (category_id, quartile)'
+        )
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_journal_areas_area ON journal_areas (area_id)'
+        )
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_journal_identity_key ON journal_identity (journal_key)'
+        )
     
-    def _insert_data(self, cursor, scimago_data: List[Dict[str, Any]]) -> None:
+    def _update_identity(self, cursor, scimago_data: List[Dict[str, Any]]) -> None:
         """
-        Insert data into the SQLite tables.
+        Merge the identifiers of the Scimago entries into the journal_identity table.
+
+        Identifiers listed in the same entry, or already sharing a key in the
+        table, belong to the same journal. The canonical key of a journal is
+        its smallest identifier, so it does not depend on the upload order.
+        Every identifier of a journal then gets the category and area
+        relations of the others, so an ISSN lookup on either relation table
+        returns all the identifiers of the matching journals.
 
         Args:
             cursor: SQLite cursor
             scimago_data (List[Dict[str, Any]]): Scimago data
         """
+        parents: Dict[str, str] = {}
+        
+        def find(identifier: str) -> str:
+            parents.setdefault(identifier, identifier)
+            while parents[identifier] != identifier:
+                parents[identifier] = parents[parents[identifier]]
+                identifier = parents[identifier]
+            return identifier
+        
+        def union(first: str, second: str) -> None:
+            first, second = find(first), find(second)
+            if first != second:
+                # The smaller identifier stays the root, so a root is the smallest of its journal
+                parents[max(first, second)] = min(first, second)
+        
+        for issn, journal_key in cursor.execute('SELECT issn, journal_key FROM journal_identity').fetchall():
+            union(issn, journal_key)
         for entry in scimago_data:
-            identifiers = entry.get('identifiers', [])
-            categories = entry.get('categories', [])
-            areas = entry.get('areas', [])
-            
-            # Insert areas
-            for area in areas:
-                cursor.execute('INSERT OR IGNORE INTO areas (id) VALUES (?)', (area,))
-            
-            # Insert categories
-            for category in categories:
-                category_id = category.get('id')
-                quartile = category.get('quartile')
-                cursor.execute('INSERT OR IGNORE INTO categories (id, quartile) VALUES (?, ?)', 
-                             (category_id, quartile))
-            
-            # Insert journal-category relations
-            for issn in identifiers:
-                for category in categories:
-                    category_id = category.get('id')
-                    quartile = category.get('quartile')
-                    cursor.execute('INSERT OR IGNORE INTO journal_categories (issn, category_id, quartile) VALUES (?, ?, ?)',
-                                 (issn, category_id, quartile))
-            
-            # Insert journal-area relations
+            identifiers = [issn for issn in entry.get('identifiers', []) if issn]
             for issn in identifiers:
-                for area in areas:
-                    cursor.execute('INSERT OR IGNORE INTO journal_areas (issn, area_id) VALUES (?, ?)',
-                                 (issn, area))
+                union(identifiers[0], issn)
+        
+        cursor.executemany('INSERT OR REPLACE INTO journal_identity (issn, journal_key) VALUES (?, ?)',
+                           [(issn, find(issn)) for issn in parents])
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO journal_categories (issn, category_id, quartile)
+            SELECT same.issn, relation.category_id, relation.quartile
+            FROM journal_categories relation
+            JOIN journal_identity known ON known.issn = relation.issn
+            JOIN journal_identity same ON same.journal_key = known.journal_key
+            WHERE same.issn != relation.issn
+        ''')
+        cursor.execute('''
+            INSERT OR IGNORE INTO journal_areas (issn, area_id)
+            SELECT same.issn, relation.area_id
+            FROM journal_areas relation
+            JOIN journal_identity known ON known.issn = relation.issn
+            JOIN journal_identity same ON same.journal_key = known.journal_key
+            WHERE same.issn != relation.issn
+        ''')
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the count APIs against counting materialized journals.
+
+A simulated journal store charges a round-trip latency per request and a
+transfer cost per returned row, and answers grouped counts with one row
+per group. Journals per licence are counted from getAllJournals and with
+countJournalsBy; journals per Scimago area with a licence are counted
+from one getJournalsInAreasWithLicense call per area and with
+countJournalsInGroups, which joins the ISSNs of the synthetic Scimago
+database with the identity index of the store.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import FullQueryEngine
+from implementations.query_handlers import CategoryQueryHandler
+from bench_sqlite_pool import build_database
+
+LATENCY = 0.005
+ROW_COST = 0.00002
+JOURNALS = 5000
+LICENCES = ["CC BY", "CC BY-SA", "CC BY-NC"]
+
+
+class CountingJournalStore:
+    """Journal store answering journal and grouped count queries with simulated costs."""
+
+    def __init__(self, journals):
+        # Same ISSNs as the journals of build_database
+        self._frame = pd.DataFrame({
+            'journal': [f"j{i:06d}" for i in range(journals)],
+            'issn': [f"{i:04d}-{i % 1000:04d}" for i in range(journals)],
+            'title': [f"Journal {i:06d}" for i in range(journals)],
+            'licence': [LICENCES[i % len(LICENCES)] for i in range(journals)],
+        })
+        self.rows = 0
+
+    def _respond(self, frame):
+        time.sleep(LATENCY + ROW_COST * len(frame))
+        self.rows += len(frame)
+        return frame
+
+    def _with_license(self, licenses):
+        return self._frame[self._frame['licence'].isin(licenses)] if licenses else self._frame
+
+    def getAllJournals(self):
+        return self._respond(self._frame)
+
+    def getJournalsWithLicense(self, licenses):
+        return self._respond(self._with_license(licenses))
+
+    def getJournalsByIssns(self, issns, without_apc=False, licenses=None):
+        frame = self._with_license(licenses)
+        return self._respond(frame[frame['issn'].isin(issns)])
+
+    def getIdentityIndex(self, without_apc=False, licenses=None):
+        frame = self._with_license(licenses)
+        return self._respond(pd.DataFrame({'identifier': frame['issn'], 'key': frame['issn']}))
+
+    def countJournalsBy(self, field, without_apc=False, licenses=None):
+        counts = self._with_license(licenses)[field].value_counts()
+        return self._respond(pd.DataFrame({'value': counts.index, 'count': counts.to_numpy()}))
+
+    def getStatistics(self):
+        return {
+            'journals': len(self._frame),
+            'with_apc': 0,
+            'with_seal': 0,
+            'licences': self._frame['licence'].value_counts().to_dict(),
+        }
+
+
+def timed(store, function):
+    """Return (result, wall time in milliseconds, rows transferred) of one call."""
+    store.rows = 0
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000, store.rows
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        category_handler = CategoryQueryHandler()
+        category_handler.setDbPathOrUrl(build_database(directory, JOURNALS))
+        store = CountingJournalStore(JOURNALS)
+        engine = FullQueryEngine(identity_map=False)
+        engine.addJournalHandler(store)
+        engine.addCategoryHandler(category_handler)
+        areas = [area.getIds()[0] for area in engine.getAllAreas()]
+
+        def licence_counts():
+            return dict(Counter(journal.getLicence() for journal in engine.getAllJournals()))
+
+        def area_counts():
+            counts = {area: len(engine.getJournalsInAreasWithLicense({area}, {"CC BY"})) for area in areas}
+            return {area: count for area, count in counts.items() if count}
+
+        runs = [
+            ("per licence", licence_counts, lambda: engine.countJournalsBy('licence')),
+            ("per area + licence", area_counts,
+             lambda: engine.countJournalsInGroups('area', licenses={"CC BY"})),
+        ]
+
+        print(f"=== journal counts, {JOURNALS} journals, {len(areas)} areas ===")
+        print(f"{'query':<20} {'objects (ms)':>13} {'rows':>7} {'count (ms)':>11} {'rows':>6} {'speedup':>8}")
+        for label, materialized, counted in runs:
+            expected, before, before_rows = timed(store, materialized)
+            result, after, after_rows = timed(store, counted)
+            print(f"{label:<20} {before:>13.1f} {before_rows:>7} {after:>11.1f} {after_rows:>6} "
+                  f"{before / after:>7.1f}x")
+            if result != expected:
+                raise AssertionError(f"counts differ for {label}")
+
+        engine.close()
+        category_handler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the Arrow and Parquet exports of JournalResultSet.
+
+For a large folded result it compares the hand conversion downstream jobs
+used (iterate the journals, read every getter, build a DataFrame and
+convert it to Arrow) with JournalResultSet.to_arrow, and the size and
+write time of the Parquet and Arrow IPC outputs. Needs pyarrow.
+"""
+
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+import pyarrow as pa
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import BasicQueryEngine
+from bench_collect_journals import build_frame
+
+ROWS = 200000
+
+
+def measured(function):
+    """Return (result, wall time in milliseconds, peak MiB traced) of one call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+def by_hand(journals):
+    """Previous downstream conversion: one getter call per journal and field."""
+    frame = pd.DataFrame({
+        'id': [journal.getIds()[0] if journal.getIds() else None for journal in journals],
+        'title': [journal.getTitle() for journal in journals],
+        'languages': [journal.getLanguages() for journal in journals],
+        'publisher': [journal.getPublisher() for journal in journals],
+        'seal': [journal.hasDOASeal() for journal in journals],
+        'licence': [journal.getLicence() for journal in journals],
+        'apc': [journal.hasAPC() for journal in journals],
+    })
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+def main():
+    engine = BasicQueryEngine(identity_map=False)
+    frames = [build_frame(ROWS // 2, seed=1), build_frame(ROWS // 2, seed=2)]
+
+    # Separate result sets: the hand conversion caches a Journal per position
+    hand_result = engine._journal_result_set(frames)
+    result = engine._journal_result_set(frames)
+    hand_table, hand_ms, hand_peak = measured(lambda: by_hand(hand_result))
+    table, arrow_ms, arrow_peak = measured(result.to_arrow)
+    print(f"=== {ROWS} rows, {table.num_rows} journals ===")
+    # tracemalloc only sees Python allocations, not the Arrow buffers (reported separately)
+    print(f"{'conversion':<24} {'time (ms)':>10} {'peak (MiB)':>11}")
+    print(f"{'getters + from_pandas':<24} {hand_ms:>10.1f} {hand_peak:>11.1f}")
+    print(f"{'to_arrow':<24} {arrow_ms:>10.1f} {arrow_peak:>11.1f}")
+    print(f"{'Arrow buffers':<24} {'':>10} {table.nbytes / 2 ** 20:>11.1f}")
+    if hand_table.column('title').to_pylist() != table.column('title').to_pylist():
+        raise AssertionError("Arrow export differs from the hand conversion")
+
+    print(f"{'output':<24} {'time (ms)':>10} {'size (KiB)':>11}")
+    for label, write in [
+        ("write_parquet", lambda sink: result.write_parquet(sink)),
+        ("write_ipc", lambda sink: result.write_ipc(sink)),
+    ]:
+        sink = io.BytesIO()
+        start = time.perf_counter()
+        write(sink)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{label:<24} {elapsed:>10.1f} {sink.getbuffer().nbytes / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the command-line bulk loader against pushDataToDb.
+
+A local HTTP endpoint accepts SPARQL updates after a fixed latency per
+request (the round trip and commit of a remote store) and keeps every
+update it receives. data/doaj.csv is uploaded once with
+JournalUploadHandler.pushDataToDb, then with the BulkLoader at several
+concurrency levels; every run must send the same updates.
+"""
+
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.loader import BulkLoader
+from implementations.upload_handlers import JournalUploadHandler
+
+DOAJ_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'doaj.csv')
+UPDATE_LATENCY = 0.02
+
+
+class RecordingEndpoint(BaseHTTPRequestHandler):
+    """SPARQL update endpoint keeping the updates it receives."""
+
+    updates = []
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        time.sleep(UPDATE_LATENCY)
+        update = parse_qs(body.decode('utf-8'))['update'][0]
+        with self.lock:
+            # Every update ends with a new store revision, unique per request
+            self.updates.append(update.split(" ;\nDELETE {")[0])
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RecordingEndpoint)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/sparql"
+    print(f"=== data/doaj.csv, {UPDATE_LATENCY * 1000:.0f} ms per update ===")
+    print(f"{'upload':<22} {'time (s)':>9} {'rows/s':>9}  batch latency p50 / p99 (ms)")
+    rows = sum(len(batch) for batch in JournalUploadHandler().readBatches(DOAJ_CSV))
+    expected = None
+    runs = [("pushDataToDb", None)] + [(f"loader, {workers} thread(s)", workers) for workers in (1, 4, 8)]
+    for label, workers in runs:
+        RecordingEndpoint.updates = []
+        handler = JournalUploadHandler(url)
+        start = time.perf_counter()
+        if workers is None:
+            if not handler.pushDataToDb(DOAJ_CSV):
+                raise AssertionError("pushDataToDb failed")
+            latencies = ""
+        else:
+            with tempfile.TemporaryDirectory() as state_dir:
+                progress = BulkLoader(handler, concurrency=workers, state_dir=state_dir,
+                                      progress_interval=0, stream=io.StringIO()).load(DOAJ_CSV)
+            if not progress.complete:
+                raise AssertionError(f"{label} failed")
+            ordered = sorted(progress.latencies)
+            latencies = f"{ordered[len(ordered) // 2] * 1000:.1f} / {ordered[int(len(ordered) * 0.99)] * 1000:.1f}"
+        elapsed = time.perf_counter() - start
+        updates = sorted(RecordingEndpoint.updates)
+        print(f"{label:<22} {elapsed:>9.2f} {rows / elapsed:>9,.0f}  {latencies}")
+        if expected is None:
+            expected = updates
+        elif updates != expected:
+            raise AssertionError(f"{label} sent different updates")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the raw-row path for category and area queries.
+
+For several result sizes it compares building Category objects through
+the DataFrame path (read_sql_query + iterrows) with the row-tuple path
+(cursor tuples + direct object construction) used by the query engines.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_handlers import CategoryQueryHandler
+from implementations.query_engines import BasicQueryEngine
+
+SIZES = [10, 100, 500, 2000, 10000]
+
+
+def build_database(path, categories):
+    """Create a database holding `categories` categories."""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE categories (id TEXT PRIMARY KEY, quartile TEXT)")
+    conn.execute("CREATE TABLE areas (id TEXT PRIMARY KEY)")
+    conn.executemany(
+        "INSERT INTO categories (id, quartile) VALUES (?, ?)",
+        [(f"Category {i:06d}", f"Q{i % 4 + 1}") for i in range(categories)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def best_of(function, repeat):
+    """Return the best wall time in milliseconds over `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    engine = BasicQueryEngine()
+    print("=== getAllCategories: DataFrame path vs row path ===")
+    print(f"{'rows':>8} {'DataFrame (ms)':>16} {'rows (ms)':>12} {'speedup':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            path = os.path.join(directory, f"categories_{size}.db")
+            build_database(path, size)
+            handler = CategoryQueryHandler()
+            handler.setDbPathOrUrl(path)
+            repeat = max(5, 20000 // size)
+
+            def dataframe_path():
+                engine._collect_categories(handler.getAllCategories(), {})
+
+            def row_path():
+                engine._collect_category_rows(handler.getAllCategoriesRows(), {})
+
+            before = best_of(dataframe_path, repeat)
+            after = best_of(row_path, repeat)
+            print(f"{size:>8} {before:>16.3f} {after:>12.3f} {before / after:>8.1f}x")
+            handler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the in-memory snapshot mode of CategoryQueryHandler.
+
+Runs the same category and area queries against pooled SQLite connections
+and against the snapshot, checks that both return identical rows and
+reports the per-query latency of each.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_handlers import CategoryQueryHandler
+from bench_sqlite_pool import build_database
+
+
+def timed(function, calls):
+    """Return the mean latency in microseconds of `calls` invocations."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main(calls=500):
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = build_database(directory)
+        sql_handler = CategoryQueryHandler(db_path)
+        snapshot_handler = CategoryQueryHandler(db_path, snapshot=True)
+        queries = [
+            ("getAllCategoriesRows", ()),
+            ("getCategoriesWithQuartileRows", ({'Q1', 'Q2'},)),
+            ("getCategoriesAssignedToAreasRows", ({'Area 1', 'Area 2'},)),
+            ("getAreasAssignedToCategoriesRows", ({'Category 1', 'Category 2'},)),
+            ("getByIdsRows", ([f"Category {i}" for i in range(0, 300, 7)] + ['Area 3'],)),
+            ("getIssnsInCategories", ({'Category 42', 'Category 43'}, {'Q1'})),
+            ("getIssnsInCategories", (set(), {'Q2', 'Q3'})),
+            ("getIssnsInAreas", ({'Area 1', 'Area 2'},)),
+        ]
+
+        print("=== CategoryQueryHandler: SQLite vs in-memory snapshot ===")
+        print(f"{'query':<36} {'SQLite (us)':>12} {'snapshot (us)':>14} {'speedup':>9}")
+        for name, args in queries:
+            expected = getattr(sql_handler, name)(*args)
+            actual = getattr(snapshot_handler, name)(*args)
+            if expected != actual:
+                raise AssertionError(f"{name}: snapshot result differs from SQLite")
+            before = timed(lambda: getattr(sql_handler, name)(*args), calls)
+            after = timed(lambda: getattr(snapshot_handler, name)(*args), calls)
+            print(f"{name:<36} {before:>12.1f} {after:>14.1f} {before / after:>8.1f}x")
+        sql_handler.close()
+        snapshot_handler.close()
+
+
+if __name__ == "__main__":
+    main()
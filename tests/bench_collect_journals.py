@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the journal row folding in BasicQueryEngine._collect_journals.
+
+Builds synthetic SPARQL-shaped result frames (one row per journal and
+language, with missing and blank cells) and compares the previous row-by-row
+loop over iterrows() with the vectorized folding, after checking that both
+produce identical Journal objects, including when merging into journals
+collected from an earlier frame.
+"""
+
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import BasicQueryEngine
+from implementations.query_handlers import JournalQueryHandler
+
+SIZES = [1000, 10000, 100000, 200000]
+LANGUAGES = ['English', 'Spanish', 'French', 'German', 'Portuguese', ' Italian ']
+LICENCES = ['CC BY', 'CC BY-SA', 'CC BY-NC', '', None]
+BOOLEANS = ['true', 'false', '', None]
+
+
+def build_frame(rows, seed=0, typed=True):
+    """Return a getAllJournals-like frame with about `rows` rows."""
+    rng = random.Random(seed)
+    records = []
+    journal = 0
+    while len(records) < rows:
+        journal += 1
+        issn = f"{journal % 10000:04d}-{journal // 10000:04d}" if rng.random() > 0.05 else None
+        eissn = f"{journal:04d}-X" if rng.random() > 0.3 else ''
+        for _ in range(rng.randint(1, 3)):
+            records.append({
+                'journal': f"https://example.org/journal/{journal}" if rng.random() > 0.02 else None,
+                'title': rng.choice([f"Journal {journal}", f" Journal {journal} ", '', None]),
+                'issn': issn,
+                'eissn': eissn,
+                'language': rng.choice(LANGUAGES + [None]),
+                'publisher': rng.choice([f"Publisher {journal % 97}", None, '  ']),
+                'seal': rng.choice(BOOLEANS),
+                'licence': rng.choice(LICENCES),
+                'apc': rng.choice(BOOLEANS),
+            })
+    df = pd.DataFrame(records[:rows])
+    if typed:
+        df = JournalQueryHandler()._apply_result_schema(df)
+    return df
+
+
+def row_by_row(engine, df, target):
+    """Previous behaviour of _collect_journals."""
+    if df is None or df.empty:
+        return
+    for idx, row in df.iterrows():
+        key = engine._get_journal_key(row, idx)
+        if not key:
+            continue
+        if key in target:
+            engine._update_journal_from_row(target[key], row)
+        else:
+            journal = engine._dataframe_to_journal(row)
+            if journal:
+                target[key] = journal
+
+
+def signature(target):
+    return [
+        (key, j.getIds(), j.getTitle(), j.getLanguages(), j.getPublisher(),
+         j.hasDOASeal(), j.getLicence(), j.hasAPC())
+        for key, j in target.items()
+    ]
+
+
+def check_equivalence(engine):
+    """Compare both implementations on typed/untyped frames merged into a shared target."""
+    for typed in (True, False):
+        frames = [build_frame(3000, seed=1, typed=typed), build_frame(3000, seed=2, typed=typed)]
+        frames.append(frames[0].iloc[::-1])
+        expected, actual = {}, {}
+        for frame in frames:
+            row_by_row(engine, frame, expected)
+            engine._collect_journals(frame, actual)
+        if signature(expected) != signature(actual):
+            raise AssertionError(f"vectorized folding differs from the row loop (typed={typed})")
+
+
+def best_of(function, repeat):
+    """Return the best wall time in milliseconds over `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    engine = BasicQueryEngine(identity_map=False)
+    check_equivalence(engine)
+    print("=== _collect_journals: iterrows loop vs vectorized folding ===")
+    print(f"{'rows':>8} {'iterrows (ms)':>14} {'vectorized (ms)':>16} {'speedup':>9}")
+    for size in SIZES:
+        df = build_frame(size)
+        repeat = 1 if size >= 100000 else 3
+        before = best_of(lambda: row_by_row(engine, df, {}), repeat)
+        after = best_of(lambda: engine._collect_journals(df, {}), repeat)
+        print(f"{size:>8} {before:>14.1f} {after:>16.1f} {before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of getDiamondJournalsInAreasAndCategoriesWithQuartile.
+
+The journal store is simulated with a round-trip latency plus a transfer
+cost per returned row; categories and areas come from a synthetic SQLite
+database. The previous plan (fetch every journal, drop the ones with APC
+and filter by ISSN in Python) is compared with the pushed-down plan (ISSN
+set from SQL first, then only those journals without APC).
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import FullQueryEngine
+from implementations.query_handlers import CategoryQueryHandler
+from bench_sqlite_pool import build_database
+
+LATENCY = 0.005
+ROW_COST = 0.00002
+JOURNALS = 20000
+
+QUERIES = [
+    ("one area, two categories", {"Area 1"}, {"Category 1", "Category 2"}, {"Q1", "Q2"}),
+    ("one area, any category", {"Area 1"}, set(), {"Q1"}),
+    ("no filter", set(), set(), set()),
+]
+
+
+class SimulatedJournalStore:
+    """Journal store with a per-request latency and a per-row transfer cost."""
+
+    def __init__(self, journals):
+        random.seed(7)
+        self._frame = pd.DataFrame([
+            {'journal': f"j{i}", 'issn': f"{i:04d}-{i % 1000:04d}", 'title': f"Journal {i:05d}",
+             'apc': 'true' if random.random() < 0.6 else 'false'}
+            for i in range(journals)
+        ])
+        self.rows = 0
+
+    def _respond(self, frame):
+        time.sleep(LATENCY + ROW_COST * len(frame))
+        self.rows += len(frame)
+        return frame
+
+    def getAllJournals(self):
+        return self._respond(self._frame)
+
+    def getJournalsWithoutAPC(self):
+        return self._respond(self._frame[self._frame['apc'] != 'true'])
+
+    def getJournalsByIssns(self, issns, without_apc=False):
+        frame = self._frame[self._frame['issn'].isin(issns)]
+        if without_apc:
+            frame = frame[frame['apc'] != 'true']
+        return self._respond(frame)
+
+
+def previous_plan(engine, area_ids, category_ids, quartiles):
+    """Previous behaviour: every journal is fetched and filtered in Python."""
+    journals_without_apc = [journal for journal in engine.getAllJournals() if not journal.hasAPC()]
+    journal_issns_in_areas = engine._issns_in_areas(area_ids)
+    journal_issns_in_categories = engine._issns_in_categories(category_ids, quartiles)
+    if journal_issns_in_categories is not None and not journal_issns_in_categories:
+        return []
+    return engine._filter_journals_by_issns(
+        journals_without_apc, journal_issns_in_areas, journal_issns_in_categories
+    )
+
+
+def timed(store, function):
+    """Return (result, wall time in milliseconds, rows transferred) of one call."""
+    store.rows = 0
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000, store.rows
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        category_handler = CategoryQueryHandler()
+        category_handler.setDbPathOrUrl(build_database(directory))
+        store = SimulatedJournalStore(JOURNALS)
+        engine = FullQueryEngine(identity_map=False)
+        engine.addJournalHandler(store)
+        engine.addCategoryHandler(category_handler)
+
+        print(f"=== diamond journals, {JOURNALS} journals in the store ===")
+        print(f"{'query':<26} {'before (ms)':>12} {'rows':>7} {'after (ms)':>11} {'rows':>7} {'speedup':>8}")
+        for label, area_ids, category_ids, quartiles in QUERIES:
+            expected, before, before_rows = timed(
+                store, lambda: previous_plan(engine, area_ids, category_ids, quartiles))
+            result, after, after_rows = timed(
+                store, lambda: engine.getDiamondJournalsInAreasAndCategoriesWithQuartile(
+                    area_ids, category_ids, quartiles))
+            print(f"{label:<26} {before:>12.1f} {before_rows:>7} {after:>11.1f} {after_rows:>7} "
+                  f"{before / after:>7.1f}x")
+            if sorted(j.getIds() for j in result) != sorted(j.getIds() for j in expected):
+                raise AssertionError(f"pushed-down plan differs for: {label}")
+
+        engine.close()
+        category_handler.close()
+
+
+if __name__ == "__main__":
+    main()
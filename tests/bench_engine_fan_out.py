@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the parallel handler fan-out in BasicQueryEngine.
+
+Registers a growing number of handlers with a fixed simulated latency and
+compares a sequential loop over the handlers with the engine's bounded
+thread pool, checking that both produce the same journals.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import BasicQueryEngine
+
+LATENCY = 0.05
+HANDLER_COUNTS = [1, 2, 4, 8]
+
+
+class SlowJournalHandler:
+    """Stand-in for a remote JournalQueryHandler with a fixed response time."""
+
+    def __init__(self, shard):
+        self._frame = pd.DataFrame(
+            [{'issn': f"{i:04d}-{shard:04d}", 'title': f"Journal {i}", 'language': f"L{shard}"}
+             for i in range(200)]
+            + [{'issn': "0000-0000", 'title': "Shared journal", 'language': f"L{shard}"}]
+        )
+
+    def getAllJournals(self):
+        time.sleep(LATENCY)
+        return self._frame
+
+
+def sequential(engine):
+    """Previous behaviour: one handler after the other."""
+    journal_map = {}
+    for handler in engine._journalQuery:
+        engine._collect_journals(handler.getAllJournals(), journal_map)
+    return list(journal_map.values())
+
+
+def signature(journals):
+    return [(j.getIds(), j.getTitle(), j.getLanguages()) for j in journals]
+
+
+def main():
+    print(f"=== getAllJournals with {LATENCY * 1000:.0f} ms per handler ===")
+    print(f"{'handlers':>9} {'sequential (ms)':>16} {'fan-out (ms)':>13} {'speedup':>9}")
+    for count in HANDLER_COUNTS:
+        engine = BasicQueryEngine(max_workers=8)
+        for shard in range(count):
+            engine.addJournalHandler(SlowJournalHandler(shard))
+
+        start = time.perf_counter()
+        expected = sequential(engine)
+        before = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        actual = engine.getAllJournals()
+        after = (time.perf_counter() - start) * 1000
+
+        if signature(expected) != signature(actual):
+            raise AssertionError("fan-out result differs from the sequential merge")
+        print(f"{count:>9} {before:>16.1f} {after:>13.1f} {before / after:>8.1f}x")
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of getEntityById on a mixed workload of ISSNs, category and area
+names and unknown identifiers.
+
+The journal store is simulated with a fixed round-trip latency; categories
+and areas come from a synthetic SQLite database. The previous lookup (every
+journal handler first, then two SQL queries) is compared with identifier
+routing, the single UNION query and the miss cache.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import BasicQueryEngine
+from implementations.query_handlers import CategoryQueryHandler
+from bench_sqlite_pool import build_database
+
+LATENCY = 0.005
+LOOKUPS = 400
+
+
+class SimulatedJournalHandler:
+    """Journal store with a fixed round-trip latency that counts its queries."""
+
+    def __init__(self, issns):
+        self._issns = set(issns)
+        self.round_trips = 0
+
+    def getById(self, entity_id):
+        self.round_trips += 1
+        time.sleep(LATENCY)
+        if entity_id in self._issns:
+            return pd.DataFrame([{'issn': entity_id, 'title': f"Journal {entity_id}"}])
+        return pd.DataFrame()
+
+
+def issn_with_check_digit(number):
+    """Return a valid ISSN for a 7-digit number."""
+    digits = f"{number:07d}"
+    check = (11 - sum(int(d) * w for d, w in zip(digits, range(8, 1, -1))) % 11) % 11
+    return f"{digits[:4]}-{digits[4:]}{'X' if check == 10 else check}"
+
+
+def previous_lookup(journal_handler, db_path, entity_id):
+    """Previous getEntityById: all journal handlers, then two SQL queries."""
+    import sqlite3
+    df = journal_handler.getById(entity_id)
+    if not df.empty:
+        return df
+    conn = sqlite3.connect(db_path)
+    try:
+        df = pd.read_sql_query("SELECT id, quartile FROM categories WHERE id = ?", conn, params=(entity_id,))
+        if df.empty:
+            df = pd.read_sql_query("SELECT id FROM areas WHERE id = ?", conn, params=(entity_id,))
+        return df
+    finally:
+        conn.close()
+
+
+def main():
+    random.seed(7)
+    issns = [issn_with_check_digit(i * 7919) for i in range(200)]
+    names = [f"Category {i}" for i in range(300)] + [f"Area {i}" for i in range(30)]
+    unknown = [f"Missing {i}" for i in range(20)]
+    workload = [random.choice(random.choice([issns, names, unknown])) for _ in range(LOOKUPS)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = build_database(directory)
+
+        journal_handler = SimulatedJournalHandler(issns)
+        start = time.perf_counter()
+        for entity_id in workload:
+            previous_lookup(journal_handler, db_path, entity_id)
+        before = time.perf_counter() - start
+        before_trips = journal_handler.round_trips
+
+        journal_handler = SimulatedJournalHandler(issns)
+        category_handler = CategoryQueryHandler(db_path)
+        engine = BasicQueryEngine()
+        engine.addJournalHandler(journal_handler)
+        engine.addCategoryHandler(category_handler)
+        start = time.perf_counter()
+        for entity_id in workload:
+            engine.getEntityById(entity_id)
+        after = time.perf_counter() - start
+        after_trips = journal_handler.round_trips
+        category_handler.close()
+        engine.close()
+
+    print(f"=== {LOOKUPS} mixed lookups, {LATENCY * 1000:.0f} ms per journal-store round trip ===")
+    print(f"previous: {before * 1000:8.1f} ms, {before_trips} journal-store queries")
+    print(f"routed:   {after * 1000:8.1f} ms, {after_trips} journal-store queries "
+          f"({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
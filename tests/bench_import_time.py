@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Startup benchmark of the implementations package, based on python -X importtime.
+
+Every import statement runs in a fresh interpreter (best of RUNS); the
+time reported is the cumulative import time of the statement, read from
+the -X importtime output. The script exits with status 1 when a budgeted
+statement takes longer than its budget or loads a dependency it should
+not (pandas, NumPy or requests); tests/test_import_time.py runs the same
+checks in the test suite.
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+RUNS = 5
+HEAVY = ('pandas', 'numpy', 'requests')
+
+# Statement, time budget in milliseconds (None: reported only), modules it must not load
+SCENARIOS = [
+    ("import implementations.impl", 25.0, HEAVY),
+    ("from implementations.impl import Journal, Category, Area", 25.0, HEAVY),
+    ("from implementations.impl import CategoryUploadHandler", 50.0, HEAVY),
+    # The query modules return DataFrames, so they load pandas (and NumPy) on import
+    ("from implementations.impl import CategoryQueryHandler", None, ('requests',)),
+    ("from implementations.impl import FullQueryEngine", None, ('requests',)),
+    ("from implementations.impl import *", None, ('requests',)),
+]
+
+
+def import_time(statement):
+    """Return (cumulative import time in ms, heavy modules loaded) of one statement in a new interpreter."""
+    probe = f"{statement}; import sys; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    total = 0
+    started = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if not started and name.strip().startswith("implementations"):
+            started = True
+        # Top-level entries after the first package import belong to the statement
+        if started and not name.startswith("  "):
+            total += int(cumulative)
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return total / 1000, loaded
+
+
+def main():
+    failures = []
+    print(f"{'statement':<60} {'ms (best of ' + str(RUNS) + ')':>16} {'budget':>8}  heavy modules loaded")
+    for statement, budget, forbidden in SCENARIOS:
+        runs = [import_time(statement) for _ in range(RUNS)]
+        best = min(elapsed for elapsed, _ in runs)
+        loaded = runs[0][1]
+        print(f"{statement:<60} {best:>16.1f} {budget if budget is not None else '-':>8}  {', '.join(loaded) or '-'}")
+        if budget is not None and best > budget:
+            failures.append(f"{statement}: {best:.1f} ms > {budget:.1f} ms")
+        unexpected = [name for name in loaded if name in forbidden]
+        if unexpected:
+            failures.append(f"{statement}: loads {', '.join(unexpected)}")
+    if failures:
+        print("Import time regression:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
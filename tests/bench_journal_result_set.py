@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the lazy JournalResultSet returned by the engines.
+
+For a large folded result it compares building every Journal up front (the
+previous List[Journal]) with the lazy result set when the caller only needs
+the count, a page of journals or one column.
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import BasicQueryEngine
+from bench_collect_journals import build_frame
+
+ROWS = 200000
+
+
+def timed(function):
+    """Return (result, wall time in milliseconds) of one call."""
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    engine = BasicQueryEngine(identity_map=False)
+    frames = [build_frame(ROWS // 2, seed=1), build_frame(ROWS // 2, seed=2)]
+
+    def eager():
+        journal_map = {}
+        for df in frames:
+            engine._collect_journals(df, journal_map)
+        return list(journal_map.values())
+
+    journals, eager_ms = timed(eager)
+    result, fold_ms = timed(lambda: engine._journal_result_set(frames))
+    print(f"=== {ROWS} rows, {len(result)} journals ===")
+    print(f"eager List[Journal]:         {eager_ms:8.1f} ms")
+    print(f"lazy result set (fold only): {fold_ms:8.1f} ms")
+
+    _, count_ms = timed(lambda: len(result))
+    _, page_ms = timed(lambda: [journal.getTitle() for journal in result[:50]])
+    titles, column_ms = timed(lambda: result.column('title'))
+    _, frame_ms = timed(result.to_dataframe)
+    print(f"  len():                     {count_ms:8.3f} ms")
+    print(f"  first page of 50 journals: {page_ms:8.3f} ms")
+    print(f"  column('title'):           {column_ms:8.3f} ms")
+    print(f"  to_dataframe():            {frame_ms:8.3f} ms")
+    _, all_ms = timed(lambda: list(result))
+    print(f"  iterate every journal:     {all_ms:8.1f} ms")
+
+    if titles != [journal.getTitle() for journal in journals]:
+        raise AssertionError("lazy result set differs from the eager list")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the local mirror mode against the remote stores.
+
+The journal store of bench_aggregates, with the round-trip latency of a
+remote endpoint, charges a latency per request and a transfer cost per
+returned row. A mirror is built once from
+it and the synthetic Scimago database; then, for a few engine queries, a
+new engine answering from the stores is compared with a new engine
+opening the existing mirror read-only (what a restarted process does):
+first query after start-up, then the same query again.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import FullQueryEngine
+from implementations.query_handlers import CategoryQueryHandler
+from bench_aggregates import CountingJournalStore
+from bench_sqlite_pool import build_database
+
+JOURNALS = 5000
+REMOTE_LATENCY = 0.05
+
+
+class RemoteJournalStore(CountingJournalStore):
+    """CountingJournalStore behind a slower network link."""
+
+    def _respond(self, frame):
+        time.sleep(REMOTE_LATENCY)
+        return super()._respond(frame)
+
+
+def timed(function):
+    """Return (result, wall time in milliseconds) of one call."""
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def remote_engine(store, db_path):
+    engine = FullQueryEngine(identity_map=False)
+    engine.addJournalHandler(store)
+    category_handler = CategoryQueryHandler()
+    category_handler.setDbPathOrUrl(db_path)
+    engine.addCategoryHandler(category_handler)
+    return engine
+
+
+def mirror_engine(directory):
+    engine = FullQueryEngine(identity_map=False)
+    if not engine.enableMirror(directory):
+        raise AssertionError("mirror could not be opened")
+    return engine
+
+
+def mirror_engine_from(store, db_path, directory):
+    """Build the first mirror version from the stores."""
+    engine = remote_engine(store, db_path)
+    if not engine.enableMirror(directory):
+        raise AssertionError("mirror could not be built")
+    engine.close()
+
+
+def ids(journals):
+    return sorted(journal.getIds()[0] for journal in journals)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = build_database(directory, JOURNALS)
+        store = RemoteJournalStore(JOURNALS)
+        mirror_directory = os.path.join(directory, "mirror")
+
+        _, build_ms = timed(lambda: mirror_engine_from(store, db_path, mirror_directory))
+        print(f"=== {JOURNALS} journals, mirror built in {build_ms:.1f} ms ===")
+
+        queries = [
+            ("licence", lambda engine: ids(engine.getJournalsWithLicense({"CC BY"}))),
+            ("area + licence", lambda engine: ids(engine.getJournalsInAreasWithLicense({"Area 3"}, {"CC BY"}))),
+            ("count per area", lambda engine: engine.countJournalsInGroups('area', licenses={"CC BY"})),
+        ]
+        print(f"{'query':<16} {'remote first':>13} {'again':>8} {'mirror first':>13} {'again':>8}")
+        for label, query in queries:
+            engine = remote_engine(store, db_path)
+            expected, remote_first = timed(lambda: query(engine))
+            _, remote_again = timed(lambda: query(engine))
+            engine.close()
+            # The first mirror query includes opening the published version
+            engine, open_ms = timed(lambda: mirror_engine(mirror_directory))
+            result, mirror_first = timed(lambda: query(engine))
+            mirror_first += open_ms
+            _, mirror_again = timed(lambda: query(engine))
+            engine.close()
+            print(f"{label:<16} {remote_first:>13.1f} {remote_again:>8.1f} {mirror_first:>13.1f} {mirror_again:>8.1f}")
+            if result != expected:
+                raise AssertionError(f"mirror result differs for {label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Memory and speed benchmark of the slot-based data model.
+
+Builds the same journals with the previous dict-backed, list-copying model
+(reproduced below) and with implementations.models, and reports the
+per-object memory measured with tracemalloc and the cost of the getters.
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations import models
+
+JOURNALS = 50000
+LICENCES = ['CC BY', 'CC BY-SA', 'CC BY-NC', 'CC BY-NC-ND']
+LANGUAGES = ['English', 'Spanish', 'French', 'German', 'Portuguese']
+
+
+class LegacyEntity:
+    """Previous IdentifiableEntity: list storage, copy on every get."""
+
+    def __init__(self):
+        self._ids = []
+
+    def getIds(self):
+        return self._ids.copy()
+
+    def setId(self, entity_id):
+        self._ids = [entity_id] if entity_id else []
+
+
+class LegacyJournal(LegacyEntity):
+    """Previous Journal."""
+
+    def __init__(self):
+        super().__init__()
+        self._title = ""
+        self._languages = []
+        self._publisher = None
+        self._seal = False
+        self._licence = ""
+        self._apc = False
+        self._categories = []
+        self._areas = []
+
+    def getLanguages(self):
+        return self._languages.copy()
+
+    def setTitle(self, title):
+        self._title = title
+
+    def setLanguages(self, languages):
+        self._languages = languages.copy() if languages else []
+
+    def setPublisher(self, publisher):
+        self._publisher = publisher
+
+    def setLicence(self, licence):
+        self._licence = licence
+
+    def setSeal(self, seal):
+        self._seal = seal
+
+    def setAPC(self, apc):
+        self._apc = apc
+
+
+def journal_values(count):
+    """Field values as they come out of a query result (fresh string objects)."""
+    rng = random.Random(0)
+    for i in range(count):
+        yield (
+            f"{i:04d}-{i % 9999:04d}",
+            f"Journal of things number {i}",
+            [''.join(language) for language in rng.sample(LANGUAGES, rng.randint(1, 2))],
+            ''.join(f"Publisher {i % 500}"),
+            ''.join(rng.choice(LICENCES)),
+            rng.random() < 0.1,
+            rng.random() < 0.5,
+        )
+
+
+def build(journal_class, count):
+    journals = []
+    for issn, title, languages, publisher, licence, seal, apc in journal_values(count):
+        journal = journal_class()
+        journal.setId(issn)
+        journal.setTitle(title)
+        journal.setLanguages(languages)
+        journal.setPublisher(publisher)
+        journal.setLicence(licence)
+        journal.setSeal(seal)
+        journal.setAPC(apc)
+        journals.append(journal)
+    return journals
+
+
+def measure(journal_class, count):
+    """Return (bytes per journal, the journals)."""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    journals = build(journal_class, count)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used / count, journals
+
+
+def getter_time(journals, repeat=5):
+    """Best time in ms to call getIds and getLanguages on every journal."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for journal in journals:
+            journal.getIds()
+            journal.getLanguages()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print(f"=== {JOURNALS} journals: dict-backed model vs slot-based model ===")
+    before, legacy = measure(LegacyJournal, JOURNALS)
+    after, current = measure(models.Journal, JOURNALS)
+    print(f"memory per journal: {before:8.1f} B -> {after:8.1f} B ({before / after:.2f}x smaller)")
+    print(f"instance __dict__:  {sys.getsizeof(legacy[0].__dict__)} B -> none (__slots__)")
+    before_ms, after_ms = getter_time(legacy), getter_time(current)
+    print(f"getIds + getLanguages on all journals: {before_ms:.1f} ms -> {after_ms:.1f} ms")
+
+    journal = models.Journal()
+    categories = [models.Category() for _ in range(2000)]
+    start = time.perf_counter()
+    for category in categories:
+        journal.addCategory(category)
+    for category in categories:
+        journal.addCategory(category)
+    print(f"addCategory x{2 * len(categories)} (half duplicates): "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of first-page latency with limit/offset pushdown.
+
+A simulated journal store charges a round-trip latency per request and a
+transfer cost per returned row; every journal has two rows (two licences),
+so a page must count journals rather than rows. A UI page of 20 journals
+is read through getAllJournals, getJournalsWithLicense and
+getJournalsInAreasWithLicense, once by fetching the full result and
+cutting it, once with limit/offset pushed down.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import FullQueryEngine
+from implementations.query_handlers import CategoryQueryHandler
+from bench_sqlite_pool import build_database
+
+LATENCY = 0.005
+ROW_COST = 0.00002
+JOURNALS = 20000
+PAGE = 20
+
+
+class PagedJournalStore:
+    """Journal store answering full and title-ordered page queries with simulated costs."""
+
+    def __init__(self, journals):
+        rows = []
+        for i in range(journals):
+            for licence in ("CC BY", "CC BY-SA"):
+                rows.append({'journal': f"j{i:06d}", 'issn': f"{i:04d}-{i % 1000:04d}",
+                             'title': f"Journal {(i * 7919) % journals:06d}", 'licence': licence})
+        self._frame = pd.DataFrame(rows).sort_values(['title', 'journal'], kind='stable')
+        self.rows = 0
+
+    def _respond(self, frame, limit, offset):
+        if limit is not None or offset:
+            journals = frame['journal'].drop_duplicates()
+            stop = None if limit is None else offset + limit
+            frame = frame[frame['journal'].isin(set(journals.iloc[offset:stop]))]
+        time.sleep(LATENCY + ROW_COST * len(frame))
+        self.rows += len(frame)
+        return frame
+
+    def getAllJournals(self, limit=None, offset=0):
+        return self._respond(self._frame, limit, offset)
+
+    def getJournalsWithLicense(self, licenses, limit=None, offset=0):
+        return self._respond(self._frame[self._frame['licence'].isin(licenses)], limit, offset)
+
+    def getJournalsByIssns(self, issns, without_apc=False, licenses=None, limit=None):
+        frame = self._frame[self._frame['issn'].isin(issns)]
+        if licenses:
+            frame = frame[frame['licence'].isin(licenses)]
+        return self._respond(frame, limit, 0)
+
+    def getStatistics(self):
+        journals = self._frame.drop_duplicates('journal')
+        return {
+            'journals': len(journals),
+            'with_apc': 0,
+            'with_seal': 0,
+            'licences': self._frame['licence'].value_counts().to_dict(),
+        }
+
+
+def timed(store, function):
+    """Return (result, wall time in milliseconds, rows transferred) of one call."""
+    store.rows = 0
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000, store.rows
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        category_handler = CategoryQueryHandler()
+        category_handler.setDbPathOrUrl(build_database(directory))
+        store = PagedJournalStore(JOURNALS)
+        engine = FullQueryEngine(identity_map=False)
+        engine.addJournalHandler(store)
+        engine.addCategoryHandler(category_handler)
+        queries = [
+            ("all journals", [0, 200, 2000], lambda **page: engine.getAllJournals(**page)),
+            ("licence", [0, 2000], lambda **page: engine.getJournalsWithLicense({"CC BY"}, **page)),
+            ("area + licence", [0, 100],
+             lambda **page: engine.getJournalsInAreasWithLicense({"Area 1"}, {"CC BY"}, **page)),
+        ]
+
+        print(f"=== page of {PAGE} journals, {JOURNALS} journals in the store ===")
+        print(f"{'query':<16} {'offset':>7} {'full (ms)':>10} {'rows':>7} {'paged (ms)':>11} {'rows':>6} {'speedup':>8}")
+        for label, offsets, query in queries:
+            for offset in offsets:
+                full, before, before_rows = timed(store, lambda: engine._page_by_title(query(), offset, PAGE))
+                page, after, after_rows = timed(store, lambda: query(limit=PAGE, offset=offset))
+                print(f"{label:<16} {offset:>7} {before:>10.1f} {before_rows:>7} {after:>11.1f} {after_rows:>6} "
+                      f"{before / after:>7.1f}x")
+                if [j.getIds() for j in page] != [j.getIds() for j in full]:
+                    raise AssertionError(f"page differs for {label} at offset {offset}")
+
+        engine.close()
+        category_handler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the cost-based planner of FullQueryEngine.
+
+getJournalsInAreasWithLicense is run with area filters of growing size
+against a simulated journal store. Both fixed evaluation orders (licensed
+journals first, area ISSNs first) are compared with the order chosen by
+the planner, which should follow the faster one.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.planner import QueryPlan, QueryPlanner
+from implementations.query_engines import FullQueryEngine
+from implementations.query_handlers import CategoryQueryHandler
+from bench_diamond_pushdown import SimulatedJournalStore
+from bench_sqlite_pool import build_database
+
+JOURNALS = 20000
+LICENSES = {"CC BY"}
+AREA_FILTERS = [1, 3, 10, 30]
+
+
+class LicensedJournalStore(SimulatedJournalStore):
+    """Simulated store with licences and planner statistics."""
+
+    def __init__(self, journals):
+        super().__init__(journals)
+        self._frame['licence'] = ["CC BY" if i % 2 else "CC BY-NC" for i in range(journals)]
+
+    def getJournalsWithLicense(self, licenses):
+        return self._respond(self._frame[self._frame['licence'].isin(licenses)])
+
+    def getJournalsByIssns(self, issns, without_apc=False, licenses=None):
+        frame = self._frame[self._frame['issn'].isin(issns)]
+        if without_apc:
+            frame = frame[frame['apc'] != 'true']
+        if licenses:
+            frame = frame[frame['licence'].isin(licenses)]
+        return self._respond(frame)
+
+    def getStatistics(self):
+        return {
+            'journals': len(self._frame),
+            'with_apc': int((self._frame['apc'] == 'true').sum()),
+            'with_seal': 0,
+            'licences': self._frame['licence'].value_counts().to_dict(),
+        }
+
+
+class FixedPlanner(QueryPlanner):
+    """Planner that always picks the same strategy."""
+
+    def __init__(self, engine, strategy):
+        super().__init__(engine)
+        self._strategy = strategy
+
+    def planJournalsInAreasWithLicense(self, area_ids, licenses):
+        return QueryPlan('getJournalsInAreasWithLicense', self._strategy, [], 0.0)
+
+
+def timed(function):
+    """Return (result, wall time in milliseconds) of one call."""
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        category_handler = CategoryQueryHandler()
+        category_handler.setDbPathOrUrl(build_database(directory))
+        store = LicensedJournalStore(JOURNALS)
+        engine = FullQueryEngine(identity_map=False)
+        engine.addJournalHandler(store)
+        engine.addCategoryHandler(category_handler)
+        planner = engine._planner
+        strategies = (QueryPlanner.JOURNALS_FIRST, QueryPlanner.ISSNS_FIRST)
+
+        print(f"=== getJournalsInAreasWithLicense, {JOURNALS} journals in the store ===")
+        print(f"{'areas':>6} {'journals first (ms)':>20} {'ISSNs first (ms)':>17} "
+              f"{'planned (ms)':>13}  chosen")
+        for count in AREA_FILTERS:
+            area_ids = {f"Area {i}" for i in range(count)}
+            timings = []
+            results = []
+            for strategy in strategies:
+                engine._planner = FixedPlanner(engine, strategy)
+                result, elapsed = timed(lambda: engine.getJournalsInAreasWithLicense(area_ids, LICENSES))
+                timings.append(elapsed)
+                results.append(sorted(journal.getIds() for journal in result))
+            engine._planner = planner
+            result, planned = timed(lambda: engine.getJournalsInAreasWithLicense(area_ids, LICENSES))
+            chosen = planner.planJournalsInAreasWithLicense(area_ids, LICENSES).getStrategy()
+            print(f"{count:>6} {timings[0]:>20.1f} {timings[1]:>17.1f} {planned:>13.1f}  {chosen}")
+            if results[0] != results[1] or sorted(journal.getIds() for journal in result) != results[0]:
+                raise AssertionError(f"strategies disagree for {count} area(s)")
+
+        print()
+        print(engine.explain('getJournalsInAreasWithLicense', {"Area 1"}, LICENSES))
+        engine.close()
+        category_handler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the batched loading of journal categories and areas.
+
+Journals come from the simulated store of bench_aggregates and relations
+from the synthetic Scimago database of bench_sqlite_pool. Reading the
+categories and areas of every journal of a result with one relation
+lookup per journal is compared with the engine's relation loader, lazy
+(first getCategories() call) and eager (first journal built).
+"""
+
+import math
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import BasicQueryEngine
+from implementations.query_handlers import CategoryQueryHandler
+from bench_aggregates import CountingJournalStore
+from bench_sqlite_pool import build_database
+
+JOURNALS = 5000
+QUERY_LATENCY = 0.001
+
+
+class CountingCategoryHandler(CategoryQueryHandler):
+    """Category handler charging and counting the SQL queries of getJournalRelationsRows."""
+
+    queries = 0
+
+    def getJournalRelationsRows(self, issns):
+        issns = {issn for issn in issns if issn}
+        queries = math.ceil(len(issns) / self.BATCH_SIZE)
+        self.queries += queries
+        time.sleep(QUERY_LATENCY * queries)
+        return super().getJournalRelationsRows(issns)
+
+
+def per_journal(engine, handler):
+    """Previous access pattern: one relation lookup per journal."""
+    relations = {}
+    for journal in engine.getAllJournals():
+        issn = journal.getIds()[0]
+        rows = handler.getJournalRelationsRows([issn])
+        relations[issn] = ([(row[2], row[3]) for row in rows if row[1] == 'category'],
+                           [row[2] for row in rows if row[1] == 'area'])
+    return relations
+
+
+def batched(engine):
+    """Read getCategories() and getAreas() of every journal of one result."""
+    return {
+        journal.getIds()[0]: ([(category.getIds()[0], category.getQuartile()) for category in journal.getCategories()],
+                              [area.getIds()[0] for area in journal.getAreas()])
+        for journal in engine.getAllJournals()
+    }
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = build_database(directory, JOURNALS)
+        store = CountingJournalStore(JOURNALS)
+        print(f"=== categories and areas of {JOURNALS} journals ===")
+        print(f"{'loading':<12} {'time (ms)':>10} {'SQL queries':>12}")
+        expected = None
+        for label, mode in [("per journal", None), ("lazy", 'lazy'), ("eager", 'eager')]:
+            handler = CountingCategoryHandler(db_path)
+            engine = BasicQueryEngine(relations=mode)
+            engine.addJournalHandler(store)
+            engine.addCategoryHandler(handler)
+            start = time.perf_counter()
+            result = per_journal(engine, handler) if mode is None else batched(engine)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{label:<12} {elapsed:>10.1f} {handler.queries:>12}")
+            if expected is None:
+                expected = result
+            elif result != expected:
+                raise AssertionError(f"relations differ for {label}")
+            engine.close()
+            handler.close()
+
+
+if __name__ == "__main__":
+    main()
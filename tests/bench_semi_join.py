@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the ISSN range semi-join against VALUES batches.
+
+A simulated journal store charges a round-trip latency per request, a
+lookup cost per identifier in a VALUES block, a scan cost per journal a
+range page examines and a transfer cost per returned row. For ISSN sets
+matching a growing share of the store, the VALUES strategy
+(_fetch_journals_by_issns) is compared with the semi-join
+(_semi_join_journals); half of each set are ISSNs the store does not hold,
+as for Scimago journals missing from DOAJ.
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import FullQueryEngine
+
+LATENCY = 0.005
+LOOKUP_COST = 0.00002
+SCAN_COST = 0.0000005
+ROW_COST = 0.00001
+JOURNALS = 50000
+SELECTIVITIES = [0.001, 0.01, 0.1, 0.5]
+
+
+class SimulatedJournalStore:
+    """Journal store answering VALUES and range page queries with simulated costs."""
+
+    def __init__(self, journals):
+        # Journal URIs end with the ISSN, so URI order is ISSN order
+        self._issns = np.array(sorted(
+            self.issn(number) for number in random.Random(3).sample(range(10 ** 7), journals)
+        ))
+        self._frame = pd.DataFrame({
+            'journal': [f"http://doaj.org/journal/{issn}" for issn in self._issns],
+            'title': [f"Journal {i:06d}" for i in range(journals)],
+            'issn': self._issns,
+        })
+        self.requests = 0
+        self.rows = 0
+
+    @staticmethod
+    def issn(number, offset=0):
+        return f"{number // 1000:04d}-{number % 1000:03d}{(number + offset) % 7}"
+
+    def issns(self):
+        return list(self._issns)
+
+    def _respond(self, positions, cost):
+        frame = self._frame.iloc[positions].reset_index(drop=True)
+        time.sleep(LATENCY + cost + ROW_COST * len(frame))
+        self.requests += 1
+        self.rows += len(frame)
+        return frame
+
+    def getJournalsByIssns(self, issns):
+        positions = np.unique(np.searchsorted(self._issns, sorted(issns)))
+        positions = positions[positions < len(self._issns)]
+        positions = positions[np.isin(self._issns[positions], list(issns))]
+        return self._respond(positions, LOOKUP_COST * len(issns))
+
+    def getJournalsInIssnRanges(self, ranges, without_apc=False, licenses=None, after=None, limit=None):
+        start = 0
+        if after:
+            start = int(np.searchsorted(self._issns, after.rsplit('/', 1)[1], side='right'))
+        positions = []
+        for low, high in ranges:
+            first = max(start, int(np.searchsorted(self._issns, low, side='left')))
+            last = int(np.searchsorted(self._issns, high, side='right'))
+            positions.extend(range(first, last))
+        positions = sorted(set(positions))[:limit] if limit else sorted(set(positions))
+        scanned = len(self._issns) - start
+        return self._respond(positions, SCAN_COST * scanned)
+
+
+def timed(store, function):
+    """Return (result, wall time in milliseconds, requests, rows) of one call."""
+    store.requests = store.rows = 0
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000, store.requests, store.rows
+
+
+def main():
+    store = SimulatedJournalStore(JOURNALS)
+    engine = FullQueryEngine(identity_map=False)
+    engine.addJournalHandler(store)
+    held = store.issns()
+    sampler = random.Random(11)
+
+    print(f"=== journals by ISSN set, {JOURNALS} journals in the store ===")
+    print(f"{'matching':>9} {'ISSNs':>7} {'VALUES (ms)':>12} {'req':>5} {'rows':>6} "
+          f"{'semi-join (ms)':>15} {'req':>5} {'rows':>6}  planner")
+    for selectivity in SELECTIVITIES:
+        matching = max(1, int(JOURNALS * selectivity))
+        issns = set(sampler.sample(held, matching))
+        # Same first seven digits as a random number, different check digit: never held
+        issns.update(store.issn(number, 1) for number in sampler.sample(range(10 ** 7), matching))
+        expected, values_ms, values_requests, values_rows = timed(
+            store, lambda: engine._fetch_journals_by_issns(issns))
+        result, semi_ms, semi_requests, semi_rows = timed(
+            store, lambda: engine._semi_join_journals(issns))
+        values_cost, _ = engine._planner._issns_first("", len(issns), matching, "")
+        semi_cost, _ = engine._planner._semi_join("", len(issns), JOURNALS, JOURNALS, "")
+        preferred = "VALUES" if values_cost <= semi_cost else "semi-join"
+        print(f"{selectivity:>9.1%} {len(issns):>7} {values_ms:>12.1f} {values_requests:>5} {values_rows:>6} "
+              f"{semi_ms:>15.1f} {semi_requests:>5} {semi_rows:>6}  {preferred}")
+        if sorted(j.getIds() for j in result) != sorted(j.getIds() for j in expected):
+            raise AssertionError(f"semi-join differs at selectivity {selectivity}")
+    engine.close()
+
+
+if __name__ == "__main__":
+    main()
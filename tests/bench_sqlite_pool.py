@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark for CategoryQueryHandler connection handling.
+
+Compares the per-query latency of opening a fresh sqlite3 connection for
+every call (the previous behaviour) with the pooled, persistent read-only
+connections, both single-threaded and under a thread pool.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.upload_handlers import CategoryUploadHandler
+from implementations.query_handlers import CategoryQueryHandler
+
+QUARTILES = ['Q1', 'Q2', 'Q3', 'Q4']
+
+
+def build_database(directory, journals=5000):
+    """Create a synthetic Scimago database and return its path."""
+    random.seed(42)
+    categories = [f"Category {i}" for i in range(300)]
+    areas = [f"Area {i}" for i in range(30)]
+    entries = []
+    for i in range(journals):
+        entries.append({
+            'identifiers': [f"{i:04d}-{i % 1000:04d}"],
+            'categories': [
+                {'id': c, 'quartile': random.choice(QUARTILES)}
+                for c in random.sample(categories, 3)
+            ],
+            'areas': random.sample(areas, 2),
+        })
+    json_path = os.path.join(directory, "scimago.json")
+    with open(json_path, 'w', encoding='utf-8') as file:
+        json.dump(entries, file)
+    db_path = os.path.join(directory, "relational.db")
+    uploader = CategoryUploadHandler()
+    uploader.setDbPathOrUrl(db_path)
+    uploader.pushDataToDb(json_path)
+    return db_path
+
+
+def fresh_connection_query(db_path, quartiles):
+    """Previous behaviour: connect, query, close."""
+    conn = sqlite3.connect(db_path)
+    placeholders = ','.join(['?' for _ in quartiles])
+    query = f"SELECT DISTINCT id, quartile FROM categories WHERE quartile IN ({placeholders}) ORDER BY id"
+    df = pd.read_sql_query(query, conn, params=list(quartiles))
+    conn.close()
+    return df
+
+
+def fresh_connection_lookup(db_path, entity_id):
+    """Previous behaviour of getById for a category."""
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query("SELECT id, quartile FROM categories WHERE id = ?", conn, params=(entity_id,))
+    conn.close()
+    return df
+
+
+def timed(function, calls, workers=1):
+    """Return the mean latency in microseconds of `calls` invocations."""
+    start = time.perf_counter()
+    if workers == 1:
+        for _ in range(calls):
+            function()
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda _: function(), range(calls)))
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main(calls=2000):
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = build_database(directory)
+        handler = CategoryQueryHandler()
+        handler.setDbPathOrUrl(db_path)
+        quartiles = {'Q1'}
+
+        print("=== CategoryQueryHandler.getCategoriesWithQuartile latency ===")
+        for workers in (1, 8):
+            before = timed(lambda: fresh_connection_query(db_path, quartiles), calls, workers)
+            after = timed(lambda: handler.getCategoriesWithQuartile(quartiles), calls, workers)
+            print(f"threads={workers}: fresh connection {before:8.1f} us/query, "
+                  f"pooled {after:8.1f} us/query ({before / after:.2f}x)")
+
+        print("\n=== Point lookup (getById) latency ===")
+        before = timed(lambda: fresh_connection_lookup(db_path, "Category 7"), calls)
+        after = timed(lambda: handler.getById("Category 7"), calls)
+        print(f"fresh connection {before:8.1f} us/query, pooled {after:8.1f} us/query "
+              f"({before / after:.2f}x)")
+        handler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the streaming iter* methods against the list methods.
+
+A simulated journal store answers getAllJournals with a round-trip
+latency and a transfer cost per returned row, either at once or in
+keyset pages after a journal URI. Every journal is visited through
+getAllJournals and through iterAllJournals, with the peak memory traced
+by tracemalloc and the time to the first journal.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import FullQueryEngine
+
+LATENCY = 0.005
+ROW_COST = 0.000002
+JOURNALS = [10000, 50000]
+PAGE_SIZES = [500, 2000]
+
+
+class PagedJournalStore:
+    """Journal store returning journals ordered by URI, at once or page by page."""
+
+    def __init__(self, journals):
+        self._frame = pd.DataFrame({
+            'journal': [f"http://doaj.org/journal/{i:06d}" for i in range(journals)],
+            'title': [f"Journal {i:06d}" for i in range(journals)],
+            'issn': [f"{i:06d}" for i in range(journals)],
+            'publisher': [f"Publisher {i % 300}" for i in range(journals)],
+            'language': ["EN" if i % 3 else "FR" for i in range(journals)],
+            'licence': ["CC BY" if i % 2 else "CC BY-NC" for i in range(journals)],
+        })
+        self._uris = self._frame['journal'].to_numpy(dtype=str)
+        self.requests = 0
+
+    def getAllJournals(self, after=None, limit=None):
+        start = 0 if after is None else int(np.searchsorted(self._uris, after, side='right'))
+        stop = len(self._uris) if limit is None else start + limit
+        frame = self._frame.iloc[start:stop].copy()
+        time.sleep(LATENCY + ROW_COST * len(frame))
+        self.requests += 1
+        return frame
+
+
+def visit(function):
+    """Touch every journal the query returns; return (count, seconds until the first one)."""
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for journal in function():
+        if first is None:
+            first = time.perf_counter() - start
+        journal.getTitle()
+        count += 1
+    return count, first
+
+
+def measured(store, function):
+    """Return (count, total ms, first-journal ms, peak MiB, requests) of one visit."""
+    store.requests = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    count, first = visit(function)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed * 1000, first * 1000, peak / 2 ** 20, store.requests
+
+
+def main():
+    print(f"{'journals':>9} {'method':<22} {'total (ms)':>11} {'first (ms)':>11} {'peak (MiB)':>11} {'req':>5}")
+    for journals in JOURNALS:
+        store = PagedJournalStore(journals)
+        engine = FullQueryEngine(identity_map=False)
+        engine.addJournalHandler(store)
+        runs = [("getAllJournals", engine.getAllJournals)]
+        engines = [engine]
+        for page_size in PAGE_SIZES:
+            paged = FullQueryEngine(identity_map=False)
+            paged.PAGE_SIZE = page_size
+            paged.addJournalHandler(store)
+            engines.append(paged)
+            runs.append((f"iterAllJournals/{page_size}", paged.iterAllJournals))
+        for label, function in runs:
+            count, total, first, peak, requests = measured(store, function)
+            if count != journals:
+                raise AssertionError(f"{label} visited {count} of {journals} journals")
+            print(f"{journals:>9} {label:<22} {total:>11.1f} {first:>11.1f} {peak:>11.1f} {requests:>5}")
+        for engine in engines:
+            engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Local stores for the unit tests.
+
+LocalStores starts an in-process SPARQL endpoint backed by an rdflib graph
+and creates a SQLite database in a temporary directory, then loads both
+with the upload handlers from a small generated DOAJ CSV and Scimago JSON.
+Unlike test.py, tests using it need no Blazegraph instance; they are
+skipped when rdflib is not installed.
+
+The data set is built to exercise the joins: journals without print ISSN
+or without EISSN, journals with several languages (several rows per
+journal), Scimago entries listing both identifiers of a journal or only
+the one that is not part of the journal URI, and journals without any
+Scimago entry.
+"""
+
+import csv
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import rdflib
+except ImportError:
+    rdflib = None
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.upload_handlers import JournalUploadHandler, CategoryUploadHandler
+
+JOURNALS = 24
+LICENCES = ["CC BY", "CC BY-SA", "CC BY-NC"]
+
+
+def issn(number: int) -> str:
+    """Return the ISSN with the given 7-digit number and its check digit."""
+    digits = f"{number:07d}"
+    total = sum(int(digit) * weight for digit, weight in zip(digits, range(8, 1, -1)))
+    check = (11 - total % 11) % 11
+    return f"{digits[:4]}-{digits[4:]}{'X' if check == 10 else check}"
+
+
+def journal_rows(count: int = JOURNALS) -> list:
+    """Return the DOAJ rows of the data set as dictionaries of CSV columns."""
+    rows = []
+    for i in range(count):
+        rows.append({
+            # Two journals share a title, so title pages have ties
+            'Journal title': f"Journal {min(i, count - 2):02d}",
+            'Journal ISSN (print version)': issn(1000 + i) if i % 4 != 3 else "",
+            'Journal EISSN (online version)': issn(2000 + i) if i % 3 != 0 or i % 4 == 3 else "",
+            'Languages in which the journal accepts manuscripts': "English, French, Spanish" if i % 2 == 0 else "English",
+            'Publisher': f"Publisher {i % 4}",
+            'DOAJ Seal': "Yes" if i % 5 == 0 else "No",
+            'Journal license': LICENCES[i % len(LICENCES)],
+            'APC': "Yes" if i % 2 == 1 else "No",
+        })
+    return rows
+
+
+def scimago_entries(count: int = JOURNALS) -> list:
+    """Return the Scimago entries of the data set (journals i % 6 == 5 have none)."""
+    entries = []
+    for row_number, row in enumerate(journal_rows(count)):
+        if row_number % 6 == 5:
+            continue
+        print_issn = row['Journal ISSN (print version)']
+        eissn = row['Journal EISSN (online version)']
+        if row_number % 2 == 0:
+            identifiers = [identifier for identifier in (print_issn, eissn) if identifier]
+        else:
+            # Only the identifier that is not the key of the journal URI
+            identifiers = [eissn or print_issn]
+        categories = [{'id': f"Category {row_number % 3}", 'quartile': f"Q{1 + row_number % 4}"}]
+        if row_number % 4 == 0:
+            categories.append({'id': "Category X", 'quartile': "Q1"})
+        areas = [f"Area {row_number % 2}"] + (["Area Z"] if row_number % 3 == 0 else [])
+        entries.append({'identifiers': identifiers, 'categories': categories, 'areas': areas})
+    return entries
+
+
+class SparqlEndpoint:
+    """SPARQL 1.1 query and update endpoint over an in-memory rdflib graph."""
+
+    def __init__(self):
+        graph = rdflib.Graph()
+        lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type='application/sparql-results+json'):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _query(self, query):
+                try:
+                    with lock:
+                        result = graph.query(query)
+                        variables = [str(variable) for variable in result.vars]
+                        bindings = [
+                            {variable: {'type': 'uri' if isinstance(row[variable], rdflib.URIRef) else 'literal',
+                                        'value': str(row[variable])}
+                             for variable in variables if row[variable] is not None}
+                            for row in result
+                        ]
+                    self._send(200, json.dumps({'head': {'vars': variables}, 'results': {'bindings': bindings}}))
+                except Exception as e:
+                    self._send(400, str(e), 'text/plain')
+
+            def do_GET(self):
+                self._query(parse_qs(urlparse(self.path).query).get('query', [''])[0])
+
+            def do_POST(self):
+                form = parse_qs(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8'))
+                if 'update' not in form:
+                    return self._query(form.get('query', [''])[0])
+                try:
+                    with lock:
+                        graph.update(form['update'][0])
+                    self._send(200, 'ok', 'text/plain')
+                except Exception as e:
+                    self._send(400, str(e), 'text/plain')
+
+        self.graph = graph
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/sparql"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class LocalStores:
+    """A SPARQL endpoint and a SQLite database loaded with the data set."""
+
+    def __init__(self, journals: int = JOURNALS):
+        self.directory = tempfile.mkdtemp(prefix="journal-stores-")
+        self.csv_path = os.path.join(self.directory, "doaj.csv")
+        self.json_path = os.path.join(self.directory, "scimago.json")
+        self.db_path = os.path.join(self.directory, "relational.db")
+        rows = journal_rows(journals)
+        with open(self.csv_path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        with open(self.json_path, 'w', encoding='utf-8') as file:
+            json.dump(scimago_entries(journals), file)
+        self.endpoint = SparqlEndpoint()
+        self.url = self.endpoint.url
+        if not JournalUploadHandler(self.url).pushDataToDb(self.csv_path):
+            raise RuntimeError("journal upload failed")
+        if not CategoryUploadHandler(self.db_path).pushDataToDb(self.json_path):
+            raise RuntimeError("category upload failed")
+
+    def useOldLayout(self) -> None:
+        """
+        Rewrite both stores as the uploaders before the identity index wrote
+        them: no doaj:identifier triples, and a SQLite database with the four
+        original tables and one relation row per listed identifier.
+        """
+        self.endpoint.graph.update("DELETE WHERE { ?journal <http://doaj.org/identifier> ?identifier }")
+        os.remove(self.db_path)
+        connection = sqlite3.connect(self.db_path)
+        connection.executescript("""
+            CREATE TABLE areas (id TEXT PRIMARY KEY);
+            CREATE TABLE categories (id TEXT PRIMARY KEY, quartile TEXT);
+            CREATE TABLE journal_categories (issn TEXT, category_id TEXT, quartile TEXT,
+                                             PRIMARY KEY (issn, category_id));
+            CREATE TABLE journal_areas (issn TEXT, area_id TEXT, PRIMARY KEY (issn, area_id));
+        """)
+        with open(self.json_path, encoding='utf-8') as file:
+            entries = json.load(file)
+        for entry in entries:
+            for area in entry['areas']:
+                connection.execute("INSERT OR IGNORE INTO areas VALUES (?)", (area,))
+            for category in entry['categories']:
+                connection.execute("INSERT OR IGNORE INTO categories VALUES (?, ?)",
+                                   (category['id'], category['quartile']))
+            for identifier in entry['identifiers']:
+                for category in entry['categories']:
+                    connection.execute("INSERT OR IGNORE INTO journal_categories VALUES (?, ?, ?)",
+                                       (identifier, category['id'], category['quartile']))
+                for area in entry['areas']:
+                    connection.execute("INSERT OR IGNORE INTO journal_areas VALUES (?, ?)", (identifier, area))
+        connection.commit()
+        connection.close()
+
+    def close(self) -> None:
+        self.endpoint.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
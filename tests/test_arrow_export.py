@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine, JournalResultSet
+from local_stores import LocalStores, rdflib
+from test_result_sets import columns, first_id, other_journal, SIZE
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+def arrow_columns(result):
+    """Expected Arrow column values of a result set, read from its journals."""
+    return {
+        'id': [first_id(journal) for journal in result],
+        'title': [journal.getTitle() for journal in result],
+        'languages': [list(journal.getLanguages()) for journal in result],
+        'publisher': [journal.getPublisher() for journal in result],
+        'seal': [journal.hasDOASeal() for journal in result],
+        'licence': [journal.getLicence() for journal in result],
+        'apc': [journal.hasAPC() for journal in result],
+    }
+
+
+def read_ipc(source):
+    """Read an Arrow IPC stream back into one table."""
+    with pyarrow.ipc.open_stream(source) as reader:
+        return reader.read_all()
+
+
+class RoundTrips:
+    """Exports a result set in every format and reads it back."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def round_trips(self, result):
+        """Tables read back from every export of a result set, by export name."""
+        parquet_path = os.path.join(self.directory, "journals.parquet")
+        ipc_path = os.path.join(self.directory, "journals.arrows")
+        result.write_parquet(parquet_path)
+        result.write_ipc(ipc_path, max_chunksize=2)
+        buffer = io.BytesIO()
+        result.write_parquet(buffer, compression="zstd")
+        stream = io.BytesIO()
+        result.write_ipc(stream)
+        return {
+            'to_arrow': result.to_arrow(),
+            'record_batches': pyarrow.Table.from_batches(result.to_record_batches(max_chunksize=4),
+                                                         schema=result.to_arrow().schema),
+            'parquet file': pyarrow.parquet.read_table(parquet_path),
+            'parquet buffer': pyarrow.parquet.read_table(io.BytesIO(buffer.getvalue())),
+            'ipc file': read_ipc(ipc_path),
+            'ipc buffer': read_ipc(io.BytesIO(stream.getvalue())),
+        }
+
+    def assertRoundTrips(self, result):
+        expected = arrow_columns(result)
+        for name, table in self.round_trips(result).items():
+            self.assertEqual(table.column_names, list(JournalResultSet.COLUMNS), name)
+            for field in JournalResultSet._arrow_schema(pyarrow):
+                if field.name == 'languages':
+                    # Parquet names the list items "element"
+                    self.assertTrue(pyarrow.types.is_list(table.schema.field('languages').type), name)
+                    self.assertEqual(table.schema.field('languages').type.value_type, pyarrow.string(), name)
+                else:
+                    self.assertEqual(table.schema.field(field.name).type, field.type, (name, field.name))
+            self.assertEqual(table.to_pydict(), expected, name)
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is needed for the Arrow exports")
+class TestArrowExport(RoundTrips, unittest.TestCase):
+
+    def test_01_lazy_result(self):
+        result = JournalResultSet(dict(columns(), languages=[(), ("English",), ("English", "French"),
+                                                             ("Ελληνικά",), (), ("French",)]))
+        self.assertRoundTrips(result)
+        self.assertEqual(result.to_arrow().column('languages').to_pylist()[:3],
+                         [[], ["English"], ["English", "French"]])
+        # The exports build no journal
+        result = JournalResultSet(columns())
+        self.round_trips(result)
+        self.assertEqual(result._journals, [None] * SIZE)
+        self.assertEqual(len(result.to_record_batches(max_chunksize=4)), 2)
+
+    def test_02_materialized_result(self):
+        result = JournalResultSet(columns())
+        result.append(other_journal())
+        del result[0]
+        self.assertTrue(result._materialized)
+        self.assertRoundTrips(result)
+        self.assertEqual(result.to_arrow().column('id').to_pylist()[-1], "9999-9999")
+
+    def test_03_empty_result(self):
+        for result in (JournalResultSet(), JournalResultSet(columns()).take([])):
+            self.assertRoundTrips(result)
+            self.assertEqual(result.to_arrow().num_rows, 0)
+
+
+@unittest.skipIf(rdflib is None or pyarrow is None, "rdflib and pyarrow are needed")
+class TestEngineArrowExport(RoundTrips, unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stores.close()
+
+    def test_04_engine_results(self):
+        engine = FullQueryEngine()
+        engine.addJournalHandler(JournalQueryHandler(self.stores.url))
+        engine.addCategoryHandler(CategoryQueryHandler(self.stores.db_path))
+        self.addCleanup(engine.close)
+        journals = engine.getAllJournals()
+        self.assertIsInstance(journals, JournalResultSet)
+        self.assertTrue(any(len(journal.getLanguages()) > 1 for journal in journals))
+        for result in (journals, engine.getJournalsInAreasWithLicense({"Area 0"}, set()),
+                       engine.getJournalsWithAPC()):
+            self.assertRoundTrips(result)
+
+
+if __name__ == "__main__":
+    unittest.main()
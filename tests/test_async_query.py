@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from implementations.impl import AsyncJournalQueryHandler, AsyncCategoryQueryHandler, AsyncFullQueryEngine
+from implementations.impl import Journal, Category, Area
+from local_stores import LocalStores, rdflib
+
+
+def describe(entity):
+    """Comparable view of an entity, including the categories and areas of journals."""
+    if entity is None:
+        return None
+    if isinstance(entity, Journal):
+        return ('journal', tuple(entity.getIds()), entity.getTitle(), tuple(entity.getLanguages()),
+                entity.getPublisher(), entity.hasDOASeal(), entity.getLicence(), entity.hasAPC(),
+                tuple(describe(category) for category in entity.getCategories()),
+                tuple(describe(area) for area in entity.getAreas()))
+    if isinstance(entity, Category):
+        return ('category', tuple(entity.getIds()), entity.getQuartile())
+    return ('area', tuple(entity.getIds()))
+
+
+# (sync method, arguments) compared between the two engines
+QUERIES = [
+    ('getAllJournals', ()),
+    ('getJournalsWithTitle', ("Journal 1",)),
+    ('getJournalsPublishedBy', ("Publisher 2",)),
+    ('getJournalsWithLicense', ({"CC BY", "CC BY-NC"},)),
+    ('getJournalsWithAPC', ()),
+    ('getJournalsWithDOAJSeal', ()),
+    ('getAllCategories', ()),
+    ('getAllAreas', ()),
+    ('getCategoriesWithQuartile', ({"Q1", "Q2"},)),
+    ('getCategoriesAssignedToAreas', ({"Area 0"},)),
+    ('getAreasAssignedToCategories', ({"Category X"},)),
+    ('getJournalsInCategoriesWithQuartile', ({"Category 0", "Category X"}, {"Q1"})),
+    ('getJournalsInAreasWithLicense', ({"Area Z"}, {"CC BY"})),
+    ('getDiamondJournalsInAreasAndCategoriesWithQuartile', ({"Area 0"}, {"Category 1", "Category 2"}, set())),
+]
+
+
+class SlowJournalHandler(JournalQueryHandler):
+    """Journal handler that answers getAllJournals after `delay` seconds."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def getAllJournals(self, **kwargs):
+        time.sleep(self.delay)
+        return pd.DataFrame()
+
+
+class FlakyJournalHandler(JournalQueryHandler):
+    """Journal handler whose first getById call raises."""
+
+    calls = 0
+
+    def getById(self, entity_id):
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("endpoint unavailable")
+        return super().getById(entity_id)
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestAsyncQuery(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+        cls.sync_engine = FullQueryEngine()
+        cls.sync_engine.addJournalHandler(JournalQueryHandler(cls.stores.url))
+        cls.sync_engine.addCategoryHandler(CategoryQueryHandler(cls.stores.db_path))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sync_engine.close()
+        cls.stores.close()
+
+    def async_engine(self, **kwargs):
+        engine = AsyncFullQueryEngine(**kwargs)
+        engine.addJournalHandler(AsyncJournalQueryHandler(self.stores.url))
+        engine.addCategoryHandler(AsyncCategoryQueryHandler(self.stores.db_path))
+        return engine
+
+    def sync_result(self, method, args):
+        result = getattr(self.sync_engine, method)(*args)
+        return [describe(entity) for entity in result]
+
+    def test_01_results_match_sync_api(self):
+        async def run():
+            async with self.async_engine() as engine:
+                results = {}
+                for method, args in QUERIES:
+                    results[method] = [describe(entity) for entity in await getattr(engine, method + 'Async')(*args)]
+                lookups = [await engine.getEntityByIdAsync(entity_id)
+                           for entity_id in ("0001-0006", "0002-0079", "Category X", "Area Z", "0000-0000")]
+                batch = await engine.getEntitiesByIdsAsync(["0001-0014", "Category 1", "Area 1", "unknown"])
+                return results, lookups, batch
+
+        results, lookups, batch = asyncio.run(run())
+        for method, args in QUERIES:
+            expected = self.sync_result(method, args)
+            self.assertTrue(expected or method == 'getJournalsWithDOAJSeal', method)
+            self.assertEqual(results[method], expected, method)
+        self.assertEqual([describe(entity) for entity in lookups],
+                         [describe(self.sync_engine.getEntityById(entity_id))
+                          for entity_id in ("0001-0006", "0002-0079", "Category X", "Area Z", "0000-0000")])
+        expected_batch = self.sync_engine.getEntitiesByIds(["0001-0014", "Category 1", "Area 1", "unknown"])
+        self.assertEqual({key: describe(value) for key, value in batch.items()},
+                         {key: describe(value) for key, value in expected_batch.items()})
+
+    def test_02_hundreds_of_concurrent_queries(self):
+        calls = [QUERIES[index % len(QUERIES)] for index in range(300)]
+
+        async def run():
+            async with self.async_engine() as engine:
+                return await asyncio.gather(*(getattr(engine, method + 'Async')(*args) for method, args in calls))
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), len(calls))
+        expected = {method: self.sync_result(method, args) for method, args in QUERIES}
+        for (method, _), result in zip(calls, results):
+            self.assertEqual([describe(entity) for entity in result], expected[method], method)
+
+    def test_03_timeout_skips_late_handlers(self):
+        async def run():
+            async with self.async_engine(timeout=0.5) as engine:
+                engine.addJournalHandler(SlowJournalHandler(3))
+                start = time.monotonic()
+                journals = await engine.getAllJournalsAsync()
+                return journals, time.monotonic() - start
+
+        journals, elapsed = asyncio.run(run())
+        self.assertLess(elapsed, 2.5)
+        self.assertEqual([describe(journal) for journal in journals], self.sync_result('getAllJournals', ()))
+
+    def test_04_failed_lookup_is_not_cached_as_miss(self):
+        async def run():
+            engine = AsyncFullQueryEngine()
+            engine.addJournalHandler(FlakyJournalHandler(self.stores.url))
+            first = await engine.getEntityByIdAsync("0001-0006")
+            second = await engine.getEntityByIdAsync("0001-0006")
+            await engine.aclose()
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertIsNone(first)
+        self.assertIsInstance(second, Journal)
+        self.assertIn("0001-0006", second.getIds())
+
+    def test_05_sessions_are_closed(self):
+        handler = AsyncJournalQueryHandler(self.stores.url)
+
+        async def with_block():
+            async with handler:
+                await handler.getAllJournalsAsync()
+                return handler._sessions[asyncio.get_running_loop()]
+
+        async def without_close():
+            await handler.getAllJournalsAsync()
+            return handler._sessions[asyncio.get_running_loop()]
+
+        session = asyncio.run(with_block())
+        self.assertTrue(session is None or session.closed)
+        # asyncio.run shuts down the loop's async generators, which closes the session
+        session = asyncio.run(without_close())
+        self.assertTrue(session is None or session.closed)
+        self.assertEqual(handler._sessions, {})
+
+    def test_06_no_requests_import(self):
+        probe = ("import sys; import implementations.async_query; "
+                 "print('requests' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+                                cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
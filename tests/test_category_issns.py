@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import itertools
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import CategoryQueryHandler
+from implementations.upload_handlers import CategoryUploadHandler
+from local_stores import issn, scimago_entries
+
+CATEGORIES = ["Category 0", "Category 1", "Category 2", "Category X", "Category Missing"]
+QUARTILES = ["Q1", "Q2", "Q3", "Q4"]
+
+
+def expected_issns(category_ids, quartiles):
+    """Identifiers of the Scimago entries with one of the categories at one of the quartiles."""
+    issns = set()
+    for entry in scimago_entries():
+        if any((not category_ids or category['id'] in category_ids)
+               and (not quartiles or category['quartile'] in quartiles)
+               for category in entry['categories']):
+            issns.update(entry['identifiers'])
+    return issns
+
+
+class TestIssnsInCategories(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        json_path = os.path.join(cls.directory, "scimago.json")
+        with open(json_path, 'w', encoding='utf-8') as file:
+            json.dump(scimago_entries(), file)
+        cls.db_path = os.path.join(cls.directory, "relational.db")
+        if not CategoryUploadHandler(cls.db_path).pushDataToDb(json_path):
+            raise RuntimeError("category upload failed")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def handlers(self):
+        sql = CategoryQueryHandler(self.db_path)
+        snapshot = CategoryQueryHandler(self.db_path)
+        snapshot.enableSnapshot()
+        for handler in (sql, snapshot):
+            self.addCleanup(handler.close)
+        return [('sql', sql), ('snapshot', snapshot)]
+
+    def test_01_quartile_of_the_journal_in_the_category(self):
+        # The categories table keeps one quartile per category; the journals have others
+        connection = sqlite3.connect(self.db_path)
+        stored = dict(connection.execute("SELECT id, quartile FROM categories").fetchall())
+        connection.close()
+        self.assertEqual(stored["Category 0"], "Q1")
+        self.assertTrue(expected_issns({"Category 0"}, {"Q2"}))
+        for name, handler in self.handlers():
+            self.assertEqual(handler.getIssnsInCategories({"Category 0"}, {"Q2"}),
+                             expected_issns({"Category 0"}, {"Q2"}), name)
+            self.assertEqual(handler.getIssnsInCategories({"Category 0"}, {"Q1"}),
+                             expected_issns({"Category 0"}, {"Q1"}), name)
+            for size in (1, 2):
+                for category_ids in itertools.combinations(CATEGORIES, size):
+                    for quartiles in itertools.combinations(QUARTILES, size):
+                        self.assertEqual(handler.getIssnsInCategories(set(category_ids), set(quartiles)),
+                                         expected_issns(set(category_ids), set(quartiles)),
+                                         (name, category_ids, quartiles))
+
+    def test_02_any_category_with_quartiles(self):
+        for name, handler in self.handlers():
+            for quartiles in ({"Q1"}, {"Q3"}, {"Q2", "Q4"}, {"Q5"}):
+                self.assertEqual(handler.getIssnsInCategories(set(), quartiles),
+                                 expected_issns(set(), quartiles), (name, quartiles))
+            self.assertEqual(handler.getIssnsInCategories(set(), {"Q5"}), set(), name)
+
+    def test_03_any_category_and_quartile(self):
+        everything = expected_issns(set(), set())
+        # Journals without a Scimago entry have no category
+        self.assertNotIn(issn(1005), everything)
+        for name, handler in self.handlers():
+            self.assertEqual(handler.getIssnsInCategories(set(), set()), everything, name)
+            self.assertEqual(handler.getIssnsInCategories({"Category Missing"}, set()), set(), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
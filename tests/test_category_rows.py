@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import CategoryQueryHandler, BasicQueryEngine
+from implementations.upload_handlers import CategoryUploadHandler
+from local_stores import scimago_entries, issn
+from test_async_query import describe
+
+CATEGORIES_IN_AREAS = """
+    SELECT DISTINCT c.id, c.quartile
+    FROM categories c
+    JOIN journal_categories jc ON c.id = jc.category_id
+    JOIN journal_areas ja ON jc.issn = ja.issn
+    WHERE ja.area_id IN ({placeholders})
+    ORDER BY c.id
+"""
+AREAS_IN_CATEGORIES = """
+    SELECT DISTINCT a.id
+    FROM areas a
+    JOIN journal_areas ja ON a.id = ja.area_id
+    JOIN journal_categories jc ON ja.issn = jc.issn
+    WHERE jc.category_id IN ({placeholders})
+    ORDER BY a.id
+"""
+ALL_CATEGORIES = "SELECT DISTINCT id, quartile FROM categories ORDER BY id"
+ALL_AREAS = "SELECT DISTINCT id FROM areas ORDER BY id"
+CATEGORIES_WITH_QUARTILE = "SELECT DISTINCT id, quartile FROM categories WHERE quartile IN ({placeholders}) ORDER BY id"
+
+# (DataFrame method, arguments, query of the DataFrame path the rows replaced, its parameters)
+QUERIES = [
+    ('getAllCategories', (), ALL_CATEGORIES, []),
+    ('getAllAreas', (), ALL_AREAS, []),
+    ('getCategoriesWithQuartile', ({"Q1", "Q3"},), CATEGORIES_WITH_QUARTILE, ["Q1", "Q3"]),
+    ('getCategoriesWithQuartile', ({"Q5"},), CATEGORIES_WITH_QUARTILE, ["Q5"]),
+    ('getCategoriesWithQuartile', (set(),), ALL_CATEGORIES, []),
+    ('getCategoriesAssignedToAreas', ({"Area 0", "Area Z"},), CATEGORIES_IN_AREAS, ["Area 0", "Area Z"]),
+    ('getCategoriesAssignedToAreas', ({"Area Missing"},), CATEGORIES_IN_AREAS, ["Area Missing"]),
+    ('getCategoriesAssignedToAreas', (set(),), ALL_CATEGORIES, []),
+    ('getAreasAssignedToCategories', ({"Category 1", "Category Unranked"},), AREAS_IN_CATEGORIES,
+     ["Category 1", "Category Unranked"]),
+    ('getAreasAssignedToCategories', (set(),), ALL_AREAS, []),
+]
+
+# (DataFrame method, arguments) of the lookups, whose rows are compared without a reference query
+LOOKUPS = [
+    ('getByIds', (["Category 0", "Area 1", "Category Unranked", "Missing"],)),
+    ('getJournalRelations', ([issn(1000), issn(2001), issn(1003), "0000-0000"],)),
+]
+
+
+def frame_tuples(frame):
+    """Rows of a DataFrame as tuples, with None for missing values."""
+    frame = frame.astype(object)
+    return list(frame.where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+class TestCategoryRows(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        json_path = os.path.join(cls.directory, "scimago.json")
+        with open(json_path, 'w', encoding='utf-8') as file:
+            # A category without quartile, stored as NULL
+            json.dump(scimago_entries() + [{'identifiers': [issn(1003)],
+                                            'categories': [{'id': "Category Unranked", 'quartile': None}],
+                                            'areas': ["Area 0"]}], file)
+        cls.db_path = os.path.join(cls.directory, "relational.db")
+        if not CategoryUploadHandler(cls.db_path).pushDataToDb(json_path):
+            raise RuntimeError("category upload failed")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def handlers(self):
+        sql = CategoryQueryHandler(self.db_path)
+        snapshot = CategoryQueryHandler(self.db_path)
+        snapshot.enableSnapshot()
+        for handler in (sql, snapshot):
+            self.addCleanup(handler.close)
+        return [('sql', sql), ('snapshot', snapshot)]
+
+    def test_01_frames_hold_the_rows(self):
+        for name, handler in self.handlers():
+            for method, args in [(method, args) for method, args, _, _ in QUERIES] + LOOKUPS:
+                frame = getattr(handler, method)(*args)
+                rows = getattr(handler, method + 'Rows')(*args)
+                self.assertEqual(frame_tuples(frame), [tuple(row) for row in rows], (name, method, args))
+        handler = CategoryQueryHandler(self.db_path)
+        self.addCleanup(handler.close)
+        self.assertIn(("Category Unranked", None), handler.getAllCategoriesRows())
+        self.assertEqual(list(handler.getAllCategories().columns), list(CategoryQueryHandler.CATEGORY_COLUMNS))
+        self.assertEqual(list(handler.getAllAreas().columns), list(CategoryQueryHandler.AREA_COLUMNS))
+        self.assertEqual(list(handler.getByIds(["Area 1"]).columns), list(CategoryQueryHandler.LOOKUP_COLUMNS))
+        self.assertEqual(list(handler.getJournalRelations([issn(1000)]).columns),
+                         list(CategoryQueryHandler.RELATION_COLUMNS))
+
+    def test_02_frames_match_the_dataframe_queries(self):
+        connection = sqlite3.connect(self.db_path)
+        self.addCleanup(connection.close)
+        for name, handler in self.handlers():
+            for method, args, query, params in QUERIES:
+                placeholders = ','.join('?' for _ in params)
+                expected = pd.read_sql_query(query.format(placeholders=placeholders), connection, params=params)
+                frame = getattr(handler, method)(*args)
+                self.assertEqual(list(frame.columns), list(expected.columns), (name, method, args))
+                self.assertEqual(frame_tuples(frame), frame_tuples(expected), (name, method, args))
+
+    def test_03_engine_builds_the_same_entities(self):
+        engine = BasicQueryEngine()
+        self.addCleanup(engine.close)
+        for name, handler in self.handlers():
+            for method, args, _, _ in QUERIES:
+                from_frame, from_rows = {}, {}
+                if method in ('getAllAreas', 'getAreasAssignedToCategories'):
+                    engine._collect_areas(getattr(handler, method)(*args), from_frame)
+                    engine._collect_area_rows(getattr(handler, method + 'Rows')(*args), from_rows)
+                else:
+                    engine._collect_categories(getattr(handler, method)(*args), from_frame)
+                    engine._collect_category_rows(getattr(handler, method + 'Rows')(*args), from_rows)
+                self.assertEqual([describe(entity) for entity in from_rows.values()],
+                                 [describe(entity) for entity in from_frame.values()], (name, method, args))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import CategoryQueryHandler
+from implementations.snapshot import CategorySnapshot
+from implementations.upload_handlers import CategoryUploadHandler
+from local_stores import scimago_entries
+
+
+class TestCategorySnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_path = self.upload("relational.db", scimago_entries())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def upload(self, name, entries):
+        json_path = os.path.join(self.directory, name + ".json")
+        with open(json_path, 'w', encoding='utf-8') as file:
+            json.dump(entries, file)
+        db_path = os.path.join(self.directory, name)
+        self.assertTrue(CategoryUploadHandler(db_path).pushDataToDb(json_path))
+        return db_path
+
+    def handler(self, check_interval=0.0):
+        handler = CategoryQueryHandler(self.db_path)
+        handler.enableSnapshot(check_interval)
+        self.addCleanup(handler.close)
+        return handler
+
+    def write(self, statement):
+        connection = sqlite3.connect(self.db_path)
+        with connection:
+            connection.execute(statement)
+        connection.close()
+
+    def test_01_unchanged_database_keeps_the_snapshot(self):
+        handler = self.handler()
+        snapshot = handler._snapshot()
+        self.assertFalse(snapshot.isStale())
+        self.assertEqual(handler.getAllAreasRows(), [("Area 0",), ("Area 1",), ("Area Z",)])
+        self.assertIs(handler._snapshot(), snapshot)
+
+    def test_02_reload_after_data_version_change(self):
+        handler = self.handler()
+        snapshot = handler._snapshot()
+        stat = os.stat(self.db_path)
+        self.write("INSERT INTO areas (id) VALUES ('Area New')")
+        # Only PRAGMA data_version can tell
+        os.utime(self.db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(os.stat(self.db_path).st_mtime_ns, stat.st_mtime_ns)
+        self.assertTrue(snapshot.isStale())
+        self.assertIn(("Area New",), handler.getAllAreasRows())
+        self.assertIsNot(handler._snapshot(), snapshot)
+        self.assertFalse(handler._snapshot().isStale())
+
+    def test_03_reload_after_mtime_change(self):
+        handler = self.handler()
+        snapshot = handler._snapshot()
+        # A rebuilt database moved into place: the open connection still sees the old file
+        rebuilt = self.upload("rebuilt.db", scimago_entries()[:2])
+        os.utime(rebuilt, ns=(os.stat(self.db_path).st_atime_ns, os.stat(self.db_path).st_mtime_ns + 10 ** 9))
+        os.replace(rebuilt, self.db_path)
+        self.assertEqual(snapshot._read_data_version(), snapshot._data_version)
+        self.assertTrue(snapshot.isStale())
+        self.assertEqual(handler.getAllCategoriesRows(), [("Category 0", "Q1"), ("Category 1", "Q2"),
+                                                          ("Category X", "Q1")])
+        self.assertIsNot(handler._snapshot(), snapshot)
+        # Touching the file is enough
+        snapshot = handler._snapshot()
+        stat = os.stat(self.db_path)
+        os.utime(self.db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertTrue(snapshot.isStale())
+        handler.getAllAreasRows()
+        self.assertIsNot(handler._snapshot(), snapshot)
+
+    def test_04_changes_wait_for_the_check_interval(self):
+        handler = self.handler(check_interval=3600)
+        snapshot = handler._snapshot()
+        self.write("INSERT INTO areas (id) VALUES ('Area New')")
+        self.assertNotIn(("Area New",), handler.getAllAreasRows())
+        self.assertIs(handler._snapshot(), snapshot)
+        # Enabling the snapshot again drops the old one
+        handler.enableSnapshot(0.0)
+        self.assertIn(("Area New",), handler.getAllAreasRows())
+
+    def test_05_snapshot_answers_like_sql_after_a_reload(self):
+        handler = self.handler()
+        sql = CategoryQueryHandler(self.db_path)
+        self.addCleanup(sql.close)
+        handler.getAllCategoriesRows()
+        self.write("UPDATE categories SET quartile = 'Q4' WHERE id = 'Category X'")
+        self.write("DELETE FROM journal_areas WHERE area_id = 'Area Z'")
+        for method, args in (('getAllCategoriesRows', ()), ('getCategoriesWithQuartileRows', ({"Q4"},)),
+                             ('getCategoriesAssignedToAreasRows', ({"Area Z"},)),
+                             ('getAreasAssignedToCategoriesRows', ({"Category X"},))):
+            self.assertEqual(getattr(handler, method)(*args), getattr(sql, method)(*args), method)
+        self.assertIsInstance(handler._snapshot(), CategorySnapshot)
+
+
+if __name__ == "__main__":
+    unittest.main()
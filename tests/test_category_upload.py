@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.loader import BulkLoader
+from implementations.upload_handlers import CategoryUploadHandler
+from local_stores import scimago_entries
+
+
+def dump(db_path):
+    """Return the sorted SQL dump of a database."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(conn.iterdump())
+    finally:
+        conn.close()
+
+
+class FailingCategoryUploadHandler(CategoryUploadHandler):
+    """Category handler failing on one batch until allowed to write it."""
+
+    BATCH_SIZE = 4
+    fail = True
+
+    def _insert_data(self, cursor, scimago_data):
+        super()._insert_data(cursor, scimago_data)
+        if self.fail and any(entry.get('areas') == ["Broken"] for entry in scimago_data):
+            raise sqlite3.OperationalError("disk I/O error")
+
+
+class TestCategoryUpload(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.entries = scimago_entries()
+        self.json_path = self.write_json("scimago.json", self.entries)
+        self.reference = os.path.join(self.directory, "reference.db")
+        self.assertTrue(CategoryUploadHandler(self.reference).pushDataToDb(self.json_path))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write_json(self, name, entries):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(entries, file)
+        return path
+
+    def loader(self, handler, **kwargs):
+        return BulkLoader(handler, batch_size=4, state_dir=self.directory, progress_interval=0,
+                          stream=io.StringIO(), **kwargs)
+
+    def test_01_push_data_is_all_or_nothing(self):
+        broken = self.entries[:8] + [{'identifiers': ["9999-9999"], 'categories': [], 'areas': ["Broken"]}]
+        path = self.write_json("broken.json", broken + self.entries[8:])
+        db_path = os.path.join(self.directory, "atomic.db")
+        shutil.copy(self.reference, db_path)
+        before = dump(db_path)
+        self.assertFalse(FailingCategoryUploadHandler(db_path).pushDataToDb(path))
+        self.assertEqual(dump(db_path), before)
+        empty = os.path.join(self.directory, "empty.db")
+        self.assertFalse(FailingCategoryUploadHandler(empty).pushDataToDb(path))
+        conn = sqlite3.connect(empty)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM journal_areas").fetchone(), (0,))
+        conn.close()
+
+    def test_02_quotes_are_bound_as_parameters(self):
+        entries = [{'identifiers': ["0000-0019"], 'categories': [{'id': "Women's Studies", 'quartile': "Q1"}],
+                    'areas': ["Arts'); DROP TABLE areas; --"]}]
+        db_path = os.path.join(self.directory, "quotes.db")
+        self.assertTrue(CategoryUploadHandler(db_path).pushDataToDb(self.write_json("quotes.json", entries)))
+        conn = sqlite3.connect(db_path)
+        self.assertEqual(conn.execute("SELECT id FROM areas").fetchall(), [("Arts'); DROP TABLE areas; --",)])
+        self.assertEqual(conn.execute("SELECT id FROM categories").fetchall(), [("Women's Studies",)])
+        conn.close()
+
+    def test_03_loader_writes_the_same_data(self):
+        db_path = os.path.join(self.directory, "loader.db")
+        progress = self.loader(CategoryUploadHandler(db_path)).load(self.json_path)
+        self.assertTrue(progress.complete)
+        self.assertEqual(dump(db_path), dump(self.reference))
+        # The dry-run script writes the same rows as the parameterized batches
+        script = io.StringIO()
+        handler = CategoryUploadHandler(os.path.join(self.directory, "dry.db"))
+        dry = self.loader(handler, dry_run=script).load(self.json_path)
+        self.assertEqual(dry.statements, progress.statements)
+        self.assertFalse(os.path.exists(handler.getDbPathOrUrl()))
+        conn = sqlite3.connect(handler.getDbPathOrUrl())
+        handler._create_tables(conn.cursor())
+        conn.executescript(script.getvalue())
+        conn.close()
+        handler.finishUpload(self.entries)
+        self.assertEqual(dump(handler.getDbPathOrUrl()), dump(self.reference))
+
+    def test_04_loader_resumes_after_a_failed_batch(self):
+        broken = {'identifiers': ["9999-9999"], 'categories': [], 'areas': ["Broken"]}
+        path = self.write_json("resume.json", self.entries[:8] + [broken] + self.entries[8:])
+        db_path = os.path.join(self.directory, "resume.db")
+        handler = FailingCategoryUploadHandler(db_path)
+        first = self.loader(handler).load(path)
+        self.assertFalse(first.complete)
+        self.assertEqual(first.failed, 1)
+        # The batches before and after the failed one are kept
+        conn = sqlite3.connect(db_path)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM areas WHERE id = 'Broken'").fetchone(), (0,))
+        self.assertGreater(conn.execute("SELECT COUNT(*) FROM journal_areas").fetchone()[0], 0)
+        conn.close()
+        handler.fail = False
+        second = self.loader(handler, resume=True).load(path)
+        self.assertTrue(second.complete)
+        self.assertEqual((second.done_batches, second.skipped), (1, first.done_batches))
+        expected = os.path.join(self.directory, "expected.db")
+        self.assertTrue(CategoryUploadHandler(expected).pushDataToDb(path))
+        self.assertEqual(dump(db_path), dump(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
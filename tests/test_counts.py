@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import unittest
+from collections import Counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from local_stores import LocalStores, rdflib, journal_rows, scimago_entries
+
+
+def groups(dimension, entity_ids=frozenset(), quartiles=frozenset()):
+    """Return (group values, identifiers, row number) of every Scimago entry of the data set."""
+    rows = journal_rows()
+    result = []
+    numbers = [number for number in range(len(rows)) if number % 6 != 5]
+    for number, entry in zip(numbers, scimago_entries()):
+        categories = [category for category in entry['categories']
+                      if (not entity_ids or category['id'] in entity_ids)
+                      and (not quartiles or category['quartile'] in quartiles)]
+        if dimension == 'area':
+            values = {area for area in entry['areas'] if not entity_ids or area in entity_ids}
+        elif dimension == 'category':
+            values = {category['id'] for category in categories}
+        else:
+            values = {category['quartile'] for category in categories}
+        result.append((values, entry['identifiers'], number))
+    return result
+
+
+def expected_counts(dimension, entity_ids=frozenset(), quartiles=frozenset(), licenses=None):
+    """Count the journals per group from the generated data set."""
+    rows = journal_rows()
+    counts = Counter()
+    for values, _, number in groups(dimension, entity_ids, quartiles):
+        if licenses and rows[number]['Journal license'] not in licenses:
+            continue
+        counts.update(values)
+    return dict(counts)
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestGroupCounts(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+        cls.journals = JournalQueryHandler(cls.stores.url)
+        cls.categories = CategoryQueryHandler(cls.stores.db_path)
+        cls.engine = FullQueryEngine()
+        cls.engine.addJournalHandler(cls.journals)
+        cls.engine.addCategoryHandler(cls.categories)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.close()
+        cls.stores.close()
+
+    def handler_counts(self, *args):
+        df = self.categories.countJournalsBy(*args)
+        return dict(zip(df['value'], df['count']))
+
+    def assertCounts(self, dimension, entity_ids=frozenset(), quartiles=frozenset()):
+        expected = expected_counts(dimension, entity_ids, quartiles)
+        self.assertTrue(expected, dimension)
+        self.assertEqual(self.handler_counts(dimension, entity_ids, quartiles), expected, dimension)
+        self.assertEqual(self.engine.countCategorizedJournalsBy(dimension, entity_ids, quartiles), expected, dimension)
+        self.assertEqual(self.engine.countJournalsInGroups(dimension, entity_ids, quartiles), expected, dimension)
+        pairs = {(value, identifier) for values, identifiers, _ in groups(dimension, entity_ids, quartiles)
+                 for value in values for identifier in identifiers}
+        self.assertEqual(set(self.categories.getIssnsGroupedBy(dimension, entity_ids, quartiles)), pairs, dimension)
+
+    def test_01_count_by_area(self):
+        self.assertCounts('area')
+        self.assertCounts('area', {"Area Z", "Area 1"})
+
+    def test_02_count_by_category(self):
+        self.assertCounts('category')
+        self.assertCounts('category', {"Category X", "Category 2"})
+        self.assertCounts('category', quartiles={"Q1"})
+
+    def test_03_count_by_quartile(self):
+        self.assertCounts('quartile')
+        self.assertCounts('quartile', {"Category 0"})
+        self.assertCounts('quartile', quartiles={"Q2", "Q3"})
+
+    def test_04_journals_with_both_identifiers_are_counted_once(self):
+        shared = [(values, identifiers) for values, identifiers, _ in groups('category') if len(identifiers) == 2]
+        self.assertTrue(shared)
+        values, identifiers = shared[0]
+        rows = self.categories.getIssnsGroupedBy('category', values)
+        for identifier in identifiers:
+            self.assertIn(identifier, {issn for _, issn in rows})
+        pairs = Counter(value for value, _ in rows)
+        counts = self.handler_counts('category', values)
+        # Both identifiers are listed, yet every journal is counted once
+        for value in values:
+            self.assertLess(counts[value], pairs[value])
+            self.assertEqual(counts[value], expected_counts('category')[value])
+
+    def test_05_counts_match_mashup_queries(self):
+        licenses = {"CC BY", "CC BY-SA"}
+        counts = self.engine.countJournalsInGroups('area', licenses=licenses)
+        self.assertEqual(counts, expected_counts('area', licenses=licenses))
+        for area, count in counts.items():
+            self.assertEqual(count, len(self.engine.getJournalsInAreasWithLicense({area}, licenses)), area)
+        counts = self.engine.countJournalsInGroups('category', quartiles={"Q1"})
+        for category, count in counts.items():
+            self.assertEqual(count, len(self.engine.getJournalsInCategoriesWithQuartile({category}, {"Q1"})),
+                             category)
+
+    def test_06_count_by_journal_field(self):
+        rows = journal_rows()
+        expected = dict(Counter(row['Journal license'] for row in rows))
+        self.assertEqual(self.engine.countJournalsBy('licence'), expected)
+        self.assertEqual(self.engine.countJournalsBy('apc'),
+                         dict(Counter(row['APC'] == "Yes" for row in rows)))
+        # A second store holding the same journals does not count them twice
+        engine = FullQueryEngine()
+        engine.addJournalHandler(self.journals)
+        engine.addJournalHandler(JournalQueryHandler(self.stores.url))
+        self.assertEqual(engine.countJournalsBy('licence'), expected)
+
+    def test_07_unknown_dimension(self):
+        with self.assertRaises(ValueError):
+            self.categories.countJournalsBy('publisher')
+        with self.assertRaises(ValueError):
+            self.categories.getIssnsGroupedBy('publisher')
+        with self.assertRaises(ValueError):
+            self.engine.countCategorizedJournalsBy('publisher')
+        with self.assertRaises(ValueError):
+            self.engine.countJournalsInGroups('journal')
+        with self.assertRaises(ValueError):
+            self.journals.countJournalsBy('title')
+        with self.assertRaises(ValueError):
+            self.engine.countJournalsBy('quartile')
+
+
+if __name__ == "__main__":
+    unittest.main()
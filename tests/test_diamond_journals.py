@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from implementations.planner import QueryPlanner
+from implementations.upload_handlers import CategoryUploadHandler
+from local_stores import LocalStores, rdflib, scimago_entries
+
+# (issn batch size, planner costs) making the planner choose each strategy
+PLANS = ((50, {}), (1, {'request_cost': 1000.0}), (1, {'row_cost': 1000.0, 'scan_cost': 0.0}))
+
+# (area_ids, category_ids, quartiles)
+FILTERS = [
+    ({"Area 0"}, set(), set()),
+    ({"Area Z", "Area 1"}, set(), set()),
+    (set(), {"Category 1"}, set()),
+    (set(), {"Category 0", "Category X"}, {"Q1"}),
+    (set(), set(), {"Q3"}),
+    ({"Area 0"}, {"Category 0", "Category 2"}, {"Q1", "Q3"}),
+    ({"Area 1"}, {"Category X"}, set()),
+    (set(), set(), set()),
+    ({"Area Missing"}, set(), set()),
+]
+
+
+def matching_identifiers(area_ids, category_ids, quartiles):
+    """Identifiers of the Scimago entries in one of the areas and with a matching category."""
+    identifiers = set()
+    for entry in scimago_entries():
+        if area_ids and not set(entry['areas']) & area_ids:
+            continue
+        if not any((not category_ids or category['id'] in category_ids)
+                   and (not quartiles or category['quartile'] in quartiles)
+                   for category in entry['categories']):
+            continue
+        identifiers.update(entry['identifiers'])
+    return identifiers
+
+
+class RecordingJournalHandler(JournalQueryHandler):
+    """Journal handler recording the names of its journal queries."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def getAllJournals(self, *args, **kwargs):
+        self.calls.append('getAllJournals')
+        return super().getAllJournals(*args, **kwargs)
+
+    def getJournalsWithoutAPC(self, *args, **kwargs):
+        self.calls.append('getJournalsWithoutAPC')
+        return super().getJournalsWithoutAPC(*args, **kwargs)
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestDiamondJournals(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stores.close()
+
+    def engine(self, journals=None, db_path=None):
+        engine = FullQueryEngine()
+        engine.addJournalHandler(journals or JournalQueryHandler(self.stores.url))
+        if db_path is not None:
+            engine.addCategoryHandler(CategoryQueryHandler(db_path))
+        self.addCleanup(engine.close)
+        return engine
+
+    def diamonds(self, journals, identifiers=None):
+        """Sorted identifiers of the journals without APC, among those with one of the identifiers."""
+        return sorted(tuple(journal.getIds()) for journal in journals
+                      if not journal.hasAPC()
+                      and (identifiers is None or set(journal.getIds()) & identifiers))
+
+    def test_01_matches_the_filtered_journals(self):
+        reference = self.engine().getAllJournals()
+        self.assertTrue(any(journal.hasAPC() for journal in reference))
+        for batch_size, costs in PLANS:
+            engine = self.engine(db_path=self.stores.db_path)
+            engine.ISSN_BATCH_SIZE = batch_size
+            engine._planner = QueryPlanner(engine, **costs)
+            for area_ids, category_ids, quartiles in FILTERS:
+                expected = self.diamonds(reference, matching_identifiers(area_ids, category_ids, quartiles))
+                result = engine.getDiamondJournalsInAreasAndCategoriesWithQuartile(
+                    area_ids, category_ids, quartiles)
+                self.assertEqual(self.diamonds(result), expected, (area_ids, category_ids, quartiles, costs))
+                self.assertEqual(len(result), len(expected))
+        # The filters select journals both with and without a match
+        self.assertTrue(self.diamonds(reference, matching_identifiers({"Area 0"}, set(), set())))
+        self.assertFalse(matching_identifiers({"Area Missing"}, set(), set()))
+
+    def test_02_without_categories_the_journal_store_selects(self):
+        reference = self.diamonds(self.engine().getAllJournals())
+        # A category store where no journal has a category or an area
+        empty = os.path.join(self.stores.directory, "empty.db")
+        path = os.path.join(self.stores.directory, "empty.json")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump([{'identifiers': ["9999-9999"], 'categories': [], 'areas': []}], file)
+        self.assertTrue(CategoryUploadHandler(empty).pushDataToDb(path))
+        for db_path in (None, empty):
+            journals = RecordingJournalHandler(self.stores.url)
+            engine = self.engine(journals, db_path)
+            result = engine.getDiamondJournalsInAreasAndCategoriesWithQuartile(set(), set(), set())
+            self.assertEqual(self.diamonds(result), reference, db_path)
+            self.assertEqual(journals.calls, ['getJournalsWithoutAPC'], db_path)
+            # A restriction nothing satisfies needs no journal query
+            self.assertEqual(engine.getDiamondJournalsInAreasAndCategoriesWithQuartile({"Area 0"}, set(), set()),
+                             [], db_path)
+            self.assertEqual(journals.calls, ['getJournalsWithoutAPC'], db_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
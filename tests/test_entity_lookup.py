@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import sqlite3
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from implementations.impl import Journal, Category, Area
+from implementations.upload_handlers import CategoryUploadHandler
+from local_stores import LocalStores, rdflib, journal_rows, scimago_entries, issn
+from test_async_query import describe
+
+# An ISSN-shaped identifier with a wrong check digit: both kinds of store may hold it
+TYPO_ISSN = issn(1234567)[:-1] + ('0' if issn(1234567)[-1] != '0' else '1')
+
+
+def journal_identifiers():
+    """Every ISSN and EISSN of the data set."""
+    return [identifier for row in journal_rows()
+            for identifier in (row['Journal ISSN (print version)'], row['Journal EISSN (online version)'])
+            if identifier]
+
+
+def category_identifiers():
+    """Every category and area of the data set."""
+    entries = scimago_entries()
+    return sorted({category['id'] for entry in entries for category in entry['categories']}
+                  | {area for entry in entries for area in entry['areas']})
+
+
+COLUMNS = ['journal', 'title', 'issn', 'eissn', 'language', 'publisher', 'seal', 'licence', 'apc']
+
+
+def sorted_rows(rows):
+    """Row tuples in a stable order, with None sorting first."""
+    return sorted((tuple(row) for row in rows),
+                  key=lambda row: tuple("" if value is None else str(value) for value in row))
+
+
+def journal_frame_rows(frame):
+    """Rows of a journal DataFrame as sorted tuples; a missing column reads as None."""
+    if frame.empty:
+        return []
+    frame = frame.reindex(columns=COLUMNS).astype(object)
+    return sorted_rows(frame.where(frame.notna(), None).itertuples(index=False))
+
+
+def comparable(entity):
+    """describe() without the languages of journals (see test_03)."""
+    described = describe(entity)
+    if described is None or described[0] != 'journal':
+        return described
+    return described[:3] + described[4:]
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestEntityLookup(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+        # A category and an area with the same name, and an identifier both stores hold
+        cls.stores.endpoint.graph.update(f"""
+            PREFIX doaj: <http://doaj.org/>
+            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+            INSERT DATA {{
+                <http://doaj.org/journal/{TYPO_ISSN}> rdf:type doaj:Journal ;
+                    doaj:title "Typo Journal" ; doaj:issn "{TYPO_ISSN}" ; doaj:identifier "{TYPO_ISSN}" .
+            }}""")
+        path = os.path.join(cls.stores.directory, "shared.json")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(scimago_entries() + [
+                {'identifiers': [issn(1000)], 'categories': [{'id': "Shared", 'quartile': "Q2"}],
+                 'areas': ["Shared"]},
+                {'identifiers': [issn(1001)], 'categories': [{'id': TYPO_ISSN, 'quartile': "Q3"}], 'areas': []},
+            ], file)
+        cls.db_path = os.path.join(cls.stores.directory, "shared.db")
+        if not CategoryUploadHandler(cls.db_path).pushDataToDb(path):
+            raise RuntimeError("category upload failed")
+        # A second category store where "Category X" has another quartile
+        path = os.path.join(cls.stores.directory, "other.json")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump([{'identifiers': [issn(1002)], 'categories': [{'id': "Category X", 'quartile': "Q4"}],
+                        'areas': ["Area Other"]}], file)
+        cls.other_db_path = os.path.join(cls.stores.directory, "other.db")
+        if not CategoryUploadHandler(cls.other_db_path).pushDataToDb(path):
+            raise RuntimeError("category upload failed")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stores.close()
+
+    def engine(self, **kwargs):
+        engine = FullQueryEngine(**kwargs)
+        engine.addJournalHandler(JournalQueryHandler(self.stores.url))
+        engine.addCategoryHandler(CategoryQueryHandler(self.db_path))
+        engine.addCategoryHandler(CategoryQueryHandler(self.other_db_path))
+        self.addCleanup(engine.close)
+        return engine
+
+    def test_01_journal_handler_chunks(self):
+        handler = JournalQueryHandler(self.stores.url)
+        known = journal_identifiers()
+        unknown = [issn(5000 + number) for number in range(2 * handler.BATCH_SIZE)]
+        ids = known + unknown + [None, ""]
+        self.assertGreater(len(ids), handler.BATCH_SIZE)
+        expected = journal_frame_rows(handler.getAllJournals())
+        # Journals are looked up by print ISSN; each answers once, with the rows of getById
+        by_id = sorted_rows({row for identifier in known
+                             for row in journal_frame_rows(handler.getById(identifier))})
+        self.assertEqual(journal_frame_rows(handler.getByIds(ids)), by_id)
+        self.assertEqual({row[0] for row in by_id}, {row[0] for row in expected if row[2] in known})
+        small = JournalQueryHandler(self.stores.url)
+        small.BATCH_SIZE = 5
+        self.assertEqual(journal_frame_rows(small.getByIds(known + unknown[:10])), by_id)
+        self.assertTrue(handler.getByIds(unknown).empty)
+        self.assertTrue(handler.getByIds([]).empty)
+
+    def test_02_category_handler_chunks(self):
+        for snapshot in (False, True):
+            handler = CategoryQueryHandler(self.db_path)
+            if snapshot:
+                handler.enableSnapshot()
+            self.addCleanup(handler.close)
+            known = category_identifiers() + ["Shared", TYPO_ISSN]
+            unknown = [f"Unknown {number}" for number in range(2 * handler.BATCH_SIZE)]
+            ids = unknown[:handler.BATCH_SIZE] + known + unknown[handler.BATCH_SIZE:] + [None]
+            connection = sqlite3.connect(self.db_path)
+            expected = sorted_rows(connection.execute(
+                "SELECT id, quartile, 'category' FROM categories UNION ALL SELECT id, NULL, 'area' FROM areas"))
+            connection.close()
+            # "Shared" is both a category and an area
+            self.assertEqual(len(expected), len(known) + 1)
+            self.assertEqual(sorted_rows(handler.getByIdsRows(ids)), expected, snapshot)
+            frame = handler.getByIds(ids)
+            self.assertEqual(sorted_rows(frame[['id', 'quartile', 'type']].astype(object)
+                                         .where(frame.notna(), None).itertuples(index=False)),
+                             expected, snapshot)
+            self.assertEqual(handler.getByIdsRows(unknown), [], snapshot)
+
+    def test_03_entities_by_ids_match_entity_by_id(self):
+        checked = (journal_identifiers() + category_identifiers()
+                   + ["Shared", TYPO_ISSN, "Area Other", issn(9999), "Unknown"])
+        # More unknown identifiers than fit in one chunk of either handler
+        padding = ([f"Unknown {number}" for number in range(CategoryQueryHandler.BATCH_SIZE)]
+                   + [issn(5000 + number) for number in range(JournalQueryHandler.BATCH_SIZE)])
+        ids = padding[::2] + checked + padding[1::2]
+        found = self.engine().getEntitiesByIds(ids)
+        self.assertEqual(list(found), ids)
+        self.assertEqual({found[identifier] for identifier in padding}, {None})
+        single = self.engine(miss_cache_size=0)
+        for identifier in checked + padding[:2] + padding[-2:]:
+            entity = single.getEntityById(identifier)
+            self.assertEqual(comparable(found[identifier]), comparable(entity), identifier)
+            # getEntityById builds a journal from its first row, with one language
+            if isinstance(entity, Journal):
+                self.assertLessEqual(set(entity.getLanguages()), set(found[identifier].getLanguages()))
+        self.assertTrue(all(isinstance(found[row['Journal ISSN (print version)']], Journal)
+                            for row in journal_rows() if row['Journal ISSN (print version)']))
+        self.assertIsNone(found[issn(9999)])
+        self.assertIsNone(found["Unknown 0"])
+        self.assertIsInstance(found["Area Other"], Area)
+
+    def test_04_precedence(self):
+        engine = self.engine()
+        # Journals before categories, categories before areas, first handler first
+        for lookup in (engine.getEntityById, lambda identifier: engine.getEntitiesByIds([identifier])[identifier]):
+            typo = lookup(TYPO_ISSN)
+            self.assertIsInstance(typo, Journal)
+            self.assertEqual(typo.getTitle(), "Typo Journal")
+            shared = lookup("Shared")
+            self.assertIsInstance(shared, Category)
+            self.assertEqual(shared.getQuartile(), "Q2")
+            self.assertEqual(lookup("Category X").getQuartile(), "Q1")
+        categories = FullQueryEngine()
+        categories.addCategoryHandler(CategoryQueryHandler(self.db_path))
+        self.addCleanup(categories.close)
+        self.assertIsInstance(categories.getEntityById(TYPO_ISSN), Category)
+        self.assertIsInstance(categories.getEntitiesByIds([TYPO_ISSN])[TYPO_ISSN], Category)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import sys
+import time
+import unittest
+from contextlib import redirect_stdout
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.query_engines import BasicQueryEngine
+
+
+class SlowJournalHandler:
+    """Journal handler answering one journal after a fixed delay."""
+
+    def __init__(self, number, latency=0.3):
+        self.number = number
+        self.latency = latency
+
+    def getAllJournals(self):
+        time.sleep(self.latency)
+        return pd.DataFrame([{'issn': f"{self.number:04d}-0000", 'title': f"Journal {self.number}",
+                              'language': "English"}])
+
+
+class TestFanOut(unittest.TestCase):
+
+    def engine(self, handlers, **kwargs):
+        engine = BasicQueryEngine(**kwargs)
+        for handler in handlers:
+            engine.addJournalHandler(handler)
+        self.addCleanup(engine.close)
+        return engine
+
+    def test_01_queued_calls_get_their_full_timeout(self):
+        # 20 calls of 0.3 s on 4 workers take 1.5 s, longer than the 1 s timeout of each call
+        engine = self.engine([SlowJournalHandler(number) for number in range(20)], max_workers=4, timeout=1.0)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            journals = engine.getAllJournals()
+        self.assertEqual([journal.getIds() for journal in journals],
+                         [[f"{number:04d}-0000"] for number in range(20)])
+        self.assertNotIn("no answer", output.getvalue())
+
+    def test_02_slow_calls_are_skipped(self):
+        handlers = [SlowJournalHandler(number, 0.05) for number in range(6)]
+        handlers[2].latency = 1.5
+        engine = self.engine(handlers, max_workers=2, timeout=0.5)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            journals = engine.getAllJournals()
+        self.assertEqual([journal.getIds()[0] for journal in journals],
+                         [f"{number:04d}-0000" for number in (0, 1, 3, 4, 5)])
+        self.assertEqual(output.getvalue().count("no answer within 0.5 s"), 1)
+
+    def test_03_results_keep_call_order(self):
+        engine = self.engine([SlowJournalHandler(number, 0.01 * (10 - number)) for number in range(10)],
+                             max_workers=3)
+        self.assertEqual([journal.getTitle() for journal in engine.getAllJournals()],
+                         [f"Journal {number}" for number in range(10)])
+
+
+if __name__ == "__main__":
+    unittest.main()
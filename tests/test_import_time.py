@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_import_time import SCENARIOS, HEAVY, import_time
+
+# Fresh interpreters per statement; the best run absorbs scheduling noise
+RUNS = 3
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_01_budgets(self):
+        for statement, budget, _ in SCENARIOS:
+            if budget is None:
+                continue
+            best = min(import_time(statement)[0] for _ in range(RUNS))
+            self.assertLessEqual(best, budget, statement)
+
+    def test_02_heavy_modules(self):
+        for statement, _, forbidden in SCENARIOS:
+            _, loaded = import_time(statement)
+            self.assertFalse(set(loaded) & set(forbidden), statement)
+
+    def test_03_exports_resolve(self):
+        _, loaded = import_time("from implementations.impl import Journal; Journal().setId('0000-0019')")
+        self.assertFalse(set(loaded) & set(HEAVY))
+        # The names of import * are the exported classes
+        import implementations.impl as impl
+        for name in impl.__all__:
+            self.assertTrue(isinstance(getattr(impl, name), type), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from implementations.mirror import LocalMirror, MirrorVersion, MirrorJournalQueryHandler, MirrorCategoryQueryHandler
+from implementations.upload_handlers import JournalUploadHandler, CategoryUploadHandler
+from local_stores import LocalStores, rdflib, journal_rows, issn, JOURNALS
+from test_async_query import describe
+from test_category_rows import QUERIES as CATEGORY_QUERIES, LOOKUPS as CATEGORY_LOOKUPS
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+COLUMNS = ['journal', 'title', 'issn', 'eissn', 'language', 'publisher', 'seal', 'licence', 'apc']
+
+# (method, arguments) of the journal queries answered by both handlers
+JOURNAL_QUERIES = [
+    ('getAllJournals', ()),
+    ('getAllJournals', (None, 5, 3)),
+    ('getAllJournals', ("", 4)),
+    ('getJournalsWithTitle', ("journal 1",)),
+    ('getJournalsWithTitle', ("Missing",)),
+    ('getJournalsPublishedBy', ("publisher 2",)),
+    ('getJournalsWithLicense', ({"CC BY", "CC BY-NC"},)),
+    ('getJournalsWithLicense', ({"CC BY"}, None, 2, 1)),
+    ('getJournalsWithLicense', ({""},)),
+    ('getJournalsWithAPC', ()),
+    ('getJournalsWithDOAJSeal', ()),
+    ('getJournalsWithoutAPC', ()),
+    ('getJournalsWithoutAPC', (None, 3)),
+    ('getById', (issn(1000),)),
+    ('getById', (issn(2001),)),
+    ('getByIds', ([issn(1000), issn(1002), issn(9999)],)),
+    ('getJournalsByIssns', ({issn(1000), issn(2001), issn(2003)},)),
+    ('getJournalsByIssns', ({issn(1000), issn(1001), issn(2003)}, True, {"CC BY"})),
+    ('getJournalsInIssnRanges', ([(issn(1000), issn(1005))],)),
+    ('getJournalsInIssnRanges', ([(issn(2000), issn(2010))], True)),
+]
+
+# (method, arguments) of the mashups compared between engines on the mirror and on the stores
+ENGINE_QUERIES = [
+    ('getAllJournals', ()),
+    ('getJournalsWithTitle', ("Journal 1",)),
+    ('getJournalsWithAPC', ()),
+    ('getAllCategories', ()),
+    ('getAllAreas', ()),
+    ('getJournalsInCategoriesWithQuartile', ({"Category 0", "Category X"}, {"Q1"})),
+    ('getJournalsInAreasWithLicense', ({"Area Z"}, {"CC BY"})),
+    ('getDiamondJournalsInAreasAndCategoriesWithQuartile', ({"Area 0"}, set(), set())),
+]
+
+
+def frame_rows(frame):
+    """Rows of a journal DataFrame as tuples over COLUMNS, with None for missing and empty values."""
+    if frame.empty:
+        return []
+    frame = frame.reindex(columns=COLUMNS).astype(object)
+    rows = [tuple(None if value is None or value == "" else value for value in row)
+            for row in frame.where(frame.notna(), None).itertuples(index=False, name=None)]
+    return sorted(rows, key=lambda row: tuple("" if value is None else str(value) for value in row))
+
+
+def journal_keys(frame):
+    """Journal URIs of a DataFrame, in result order and without repeats."""
+    return list(dict.fromkeys(frame['journal'])) if not frame.empty else []
+
+
+def write_csv(directory, rows):
+    """Write DOAJ rows to a CSV file and return its path."""
+    path = os.path.join(directory, "new.csv")
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestMirrorResults(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+        cls.mirror = LocalMirror(os.path.join(cls.stores.directory, "mirror"))
+        cls.mirror.build([JournalQueryHandler(cls.stores.url, typed_results=False)],
+                         [CategoryQueryHandler(cls.stores.db_path)])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.mirror.close()
+        cls.stores.close()
+
+    def test_01_journal_queries_match(self):
+        live = JournalQueryHandler(self.stores.url)
+        mirrored = MirrorJournalQueryHandler(self.mirror)
+        for method, args in JOURNAL_QUERIES:
+            expected = getattr(live, method)(*args)
+            result = getattr(mirrored, method)(*args)
+            self.assertEqual(frame_rows(result), frame_rows(expected), (method, args))
+            self.assertEqual(journal_keys(result), journal_keys(expected), (method, args))
+            if not expected.empty:
+                self.assertEqual(str(result['seal'].dtype), str(expected['seal'].dtype), (method, args))
+        self.assertEqual(mirrored.getStatistics(), live.getStatistics())
+        for field in MirrorJournalQueryHandler.GROUP_FIELDS:
+            expected = live.countJournalsBy(field)
+            result = mirrored.countJournalsBy(field)
+            self.assertEqual(result.astype(object).values.tolist(), expected.astype(object).values.tolist(), field)
+
+    def test_02_category_queries_match(self):
+        live = CategoryQueryHandler(self.stores.db_path)
+        mirrored = MirrorCategoryQueryHandler(self.mirror)
+        for handler in (live, mirrored):
+            self.addCleanup(handler.close)
+        for method, args in [(method, args) for method, args, _, _ in CATEGORY_QUERIES] + CATEGORY_LOOKUPS:
+            self.assertEqual(getattr(mirrored, method + 'Rows')(*args), getattr(live, method + 'Rows')(*args),
+                             (method, args))
+        self.assertEqual(mirrored.getIssnsInCategories({"Category 0"}, {"Q1"}),
+                         live.getIssnsInCategories({"Category 0"}, {"Q1"}))
+        self.assertEqual(mirrored.getIssnsInAreas({"Area Z"}), live.getIssnsInAreas({"Area Z"}))
+        self.assertEqual(mirrored.getDbPathOrUrl(), self.mirror.current().relationalPath(0))
+
+    def test_03_engines_build_the_same_entities(self):
+        engines = []
+        for journals, categories in ((JournalQueryHandler(self.stores.url), CategoryQueryHandler(self.stores.db_path)),
+                                     (MirrorJournalQueryHandler(self.mirror), MirrorCategoryQueryHandler(self.mirror))):
+            engine = FullQueryEngine()
+            engine.addJournalHandler(journals)
+            engine.addCategoryHandler(categories)
+            self.addCleanup(engine.close)
+            engines.append(engine)
+        live, mirrored = engines
+        for method, args in ENGINE_QUERIES:
+            expected = sorted(describe(entity) for entity in getattr(live, method)(*args))
+            self.assertTrue(expected, method)
+            self.assertEqual(sorted(describe(entity) for entity in getattr(mirrored, method)(*args)), expected,
+                             (method, args))
+        for identifier in (issn(1000), "Category X", "Area Z", issn(9999)):
+            self.assertEqual(describe(mirrored.getEntityById(identifier)), describe(live.getEntityById(identifier)),
+                             identifier)
+
+
+class FailingJournalHandler(JournalQueryHandler):
+    """Journal handler whose reads fail, as during an endpoint outage."""
+
+    def getAllJournals(self, *args, **kwargs):
+        raise ConnectionError("endpoint unavailable")
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestMirrorPublish(unittest.TestCase):
+
+    def setUp(self):
+        self.stores = LocalStores()
+        self.addCleanup(self.stores.close)
+        self.directory = os.path.join(self.stores.directory, "mirror")
+        self.new_rows = journal_rows(JOURNALS + 2)[JOURNALS:]
+
+    def published_versions(self):
+        """Version directories in the mirror directory, and any leftover temporary entry."""
+        entries = os.listdir(self.directory)
+        return (sorted(entry for entry in entries if entry.startswith('v')),
+                [entry for entry in entries if entry.endswith('.tmp')])
+
+    def test_01_upload_publishes_a_new_version(self):
+        writer = LocalMirror(self.directory, check_interval=0)
+        writer.attachSources([JournalQueryHandler(self.stores.url, typed_results=False)],
+                             [CategoryQueryHandler(self.stores.db_path)])
+        old = writer.current()
+        # A reader of the same directory, as in another process
+        reader = LocalMirror(self.directory, check_interval=0)
+        handler = MirrorJournalQueryHandler(reader)
+        categories = MirrorCategoryQueryHandler(reader)
+        self.addCleanup(categories.close)
+        self.assertEqual(len(journal_keys(handler.getAllJournals())), JOURNALS)
+        seen, errors, stop = set(), [], threading.Event()
+
+        def read():
+            while not stop.is_set():
+                try:
+                    name = reader.current().getName()
+                    self.assertTrue(os.path.isfile(os.path.join(self.directory, name, MirrorVersion.MANIFEST)))
+                    seen.add(len(journal_keys(handler.getAllJournals())))
+                except Exception as e:
+                    errors.append(e)
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        try:
+            self.assertTrue(JournalUploadHandler(self.stores.url).pushDataToDb(
+                write_csv(self.stores.directory, self.new_rows)))
+            path = os.path.join(self.stores.directory, "new.json")
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump([{'identifiers': [self.new_rows[0]['Journal ISSN (print version)']],
+                            'categories': [{'id': "Category New", 'quartile': "Q2"}], 'areas': ["Area New"]}], file)
+            self.assertTrue(CategoryUploadHandler(self.stores.db_path).pushDataToDb(path))
+            # The next read after the uploads rebuilds from the sources
+            new = writer.current()
+        finally:
+            stop.set()
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertNotEqual(new.getName(), old.getName())
+        self.assertEqual(new.journalCount(), JOURNALS + 2)
+        # Readers only ever saw complete versions
+        self.assertLessEqual(seen, {JOURNALS, JOURNALS + 2})
+        self.assertEqual(len(journal_keys(handler.getAllJournals())), JOURNALS + 2)
+        self.assertIn(("Area New",), categories.getAllAreasRows())
+        self.assertEqual(self.published_versions(), (sorted([old.getName(), new.getName()]), []))
+        # A version loaded before the switch stays readable
+        self.assertEqual(old.journalCount(), JOURNALS)
+        rows = old.rowsFrame(old.rowPositions(np.arange(old.journalCount())))
+        self.assertEqual(len(journal_keys(rows)), JOURNALS)
+
+    def test_02_build_after_an_upload_in_another_process(self):
+        reader = LocalMirror(self.directory, check_interval=0)
+        handler = MirrorJournalQueryHandler(reader)
+        LocalMirror(self.directory).build([JournalQueryHandler(self.stores.url, typed_results=False)],
+                                          [CategoryQueryHandler(self.stores.db_path)])
+        self.assertEqual(len(journal_keys(handler.getAllJournals())), JOURNALS)
+        # An upload and a mirror build from the command line
+        script = ("import sys; from implementations.upload_handlers import JournalUploadHandler; "
+                  "assert JournalUploadHandler(sys.argv[1]).pushDataToDb(sys.argv[2])")
+        subprocess.run([sys.executable, '-c', script, self.stores.url, write_csv(self.stores.directory, self.new_rows)],
+                       cwd=ROOT, check=True)
+        self.assertEqual(len(journal_keys(handler.getAllJournals())), JOURNALS)
+        subprocess.run([sys.executable, '-m', 'implementations.mirror', self.directory,
+                        '--sparql', self.stores.url, '--sqlite', self.stores.db_path],
+                       cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        self.assertEqual(len(journal_keys(handler.getAllJournals())), JOURNALS + 2)
+        self.assertEqual(frame_rows(handler.getById(self.new_rows[0]['Journal ISSN (print version)'])),
+                         frame_rows(JournalQueryHandler(self.stores.url).getById(
+                             self.new_rows[0]['Journal ISSN (print version)'])))
+
+    def test_03_failed_build_keeps_the_published_version(self):
+        mirror = LocalMirror(self.directory, check_interval=0)
+        published = mirror.build([JournalQueryHandler(self.stores.url, typed_results=False)],
+                                 [CategoryQueryHandler(self.stores.db_path)])
+        with self.assertRaises(ConnectionError):
+            mirror.build([FailingJournalHandler(self.stores.url)], [CategoryQueryHandler(self.stores.db_path)])
+        with self.assertRaises(Exception):
+            mirror.build([JournalQueryHandler(self.stores.url, typed_results=False)],
+                         [CategoryQueryHandler(os.path.join(self.stores.directory, "missing.db"))])
+        self.assertEqual(self.published_versions(), ([published], []))
+        self.assertEqual(mirror.current().getName(), published)
+        self.assertEqual(len(journal_keys(MirrorJournalQueryHandler(mirror).getAllJournals())), JOURNALS)
+
+    def test_04_old_versions_are_pruned(self):
+        mirror = LocalMirror(self.directory, check_interval=0, keep=2)
+        sources = ([JournalQueryHandler(self.stores.url, typed_results=False)],
+                   [CategoryQueryHandler(self.stores.db_path)])
+        names = [mirror.build(*sources) for _ in range(3)]
+        self.assertEqual(self.published_versions(), (names[1:], []))
+        self.assertEqual(mirror.current().getName(), names[-1])
+
+    def test_05_store_version_follows_the_published_version(self):
+        mirror = LocalMirror(self.directory, check_interval=0)
+        sources = ([JournalQueryHandler(self.stores.url, typed_results=False)],
+                   [CategoryQueryHandler(self.stores.db_path)])
+        mirror.build(*sources)
+        journals, categories = MirrorJournalQueryHandler(mirror), MirrorCategoryQueryHandler(mirror)
+        self.addCleanup(categories.close)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            versions = (journals.getStoreVersion(), categories.getStoreVersion())
+            self.assertEqual((journals.getStoreVersion(), categories.getStoreVersion()), versions)
+            name = mirror.build(*sources)
+            self.assertEqual(journals.getStoreVersion(), (self.directory, name))
+            self.assertEqual(categories.getStoreVersion()[0], mirror.current().relationalPath(0))
+            self.assertNotEqual(categories.getStoreVersion(), versions[1])
+        # The mirror is not queried as a SPARQL endpoint
+        self.assertEqual(output.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from implementations.impl import Journal, Category, Area
+from implementations.handlers import Handler
+from implementations.loader import BulkLoader
+from implementations.upload_handlers import JournalUploadHandler, CategoryUploadHandler
+from local_stores import LocalStores, rdflib, journal_rows, JOURNALS
+
+# Uploads the journals of a CSV file and the entries of a Scimago file, as another process would
+UPLOAD = """
+import sys
+from implementations.upload_handlers import JournalUploadHandler, CategoryUploadHandler
+url, csv_path, db_path, json_path = sys.argv[1:]
+uploaded = JournalUploadHandler(url).pushDataToDb(csv_path) and CategoryUploadHandler(db_path).pushDataToDb(json_path)
+sys.exit(0 if uploaded else 1)
+"""
+
+
+class CountingJournalHandler(JournalQueryHandler):
+    """Journal handler counting its getById calls."""
+
+    calls = 0
+
+    def getById(self, entity_id):
+        self.calls += 1
+        return super().getById(entity_id)
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestMissCache(unittest.TestCase):
+
+    def setUp(self):
+        self.stores = LocalStores()
+        self.journals = CountingJournalHandler(self.stores.url)
+        self.engine = FullQueryEngine()
+        self.engine.addJournalHandler(self.journals)
+        self.engine.addCategoryHandler(CategoryQueryHandler(self.stores.db_path))
+        # The journals after the data set, not uploaded yet
+        self.new_rows = journal_rows(JOURNALS + 2)[JOURNALS:]
+        self.new_issn = self.new_rows[0]['Journal ISSN (print version)']
+
+    def tearDown(self):
+        self.engine.close()
+        self.stores.close()
+
+    def write_csv(self, rows):
+        path = os.path.join(self.stores.directory, "new.csv")
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def test_01_misses_are_cached(self):
+        self.assertIsNone(self.engine.getEntityById(self.new_issn))
+        calls = self.journals.calls
+        self.assertIsNone(self.engine.getEntityById(self.new_issn))
+        self.assertEqual(self.engine.getEntitiesByIds([self.new_issn]), {self.new_issn: None})
+        self.assertEqual(self.journals.calls, calls)
+
+    def test_02_upload_invalidates_misses(self):
+        self.assertIsNone(self.engine.getEntityById(self.new_issn))
+        self.assertEqual(set(self.engine.getEntitiesByIds([self.new_issn, "Category New", "Area New"]).values()),
+                         {None})
+        generation = Handler.getDataGeneration()
+        self.assertTrue(JournalUploadHandler(self.stores.url).pushDataToDb(self.write_csv(self.new_rows)))
+        self.assertNotEqual(Handler.getDataGeneration(), generation)
+        journal = self.engine.getEntityById(self.new_issn)
+        self.assertIsInstance(journal, Journal)
+        self.assertIn(self.new_issn, journal.getIds())
+        self.assertIsNone(self.engine.getEntityById("Category New"))
+        path = os.path.join(self.stores.directory, "new.json")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump([{'identifiers': [self.new_issn], 'categories': [{'id': "Category New", 'quartile': "Q2"}],
+                        'areas': ["Area New"]}], file)
+        self.assertTrue(CategoryUploadHandler(self.stores.db_path).pushDataToDb(path))
+        found = self.engine.getEntitiesByIds([self.new_issn, "Category New", "Area New"])
+        self.assertIsInstance(found.get(self.new_issn), Journal)
+        self.assertIsInstance(found.get("Category New"), Category)
+        self.assertIsInstance(found.get("Area New"), Area)
+
+    def test_03_bulk_load_invalidates_misses(self):
+        self.assertIsNone(self.engine.getEntityById(self.new_issn))
+        progress = BulkLoader(JournalUploadHandler(self.stores.url), state_dir=self.stores.directory,
+                              progress_interval=0, stream=io.StringIO()).load(self.write_csv(self.new_rows))
+        self.assertTrue(progress.complete)
+        self.assertIsInstance(self.engine.getEntityById(self.new_issn), Journal)
+
+    def test_04_failed_upload_invalidates_misses(self):
+        self.assertIsNone(self.engine.getEntityById(self.new_issn))
+        # The endpoint may have written some batches before failing
+        JournalUploadHandler("http://127.0.0.1:9/sparql").pushDataToDb(self.write_csv(self.new_rows))
+        calls = self.journals.calls
+        self.assertIsNone(self.engine.getEntityById(self.new_issn))
+        self.assertGreater(self.journals.calls, calls)
+
+    def test_05_upload_from_another_process_invalidates_misses(self):
+        self.engine.STORE_CHECK_INTERVAL = 0
+        ids = [self.new_issn, "Category New", "Brand New Area"]
+        self.assertEqual(set(self.engine.getEntitiesByIds(ids).values()), {None})
+        self.assertIsNone(self.engine.getEntityById("Brand New Area"))
+        path = os.path.join(self.stores.directory, "new.json")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump([{'identifiers': [self.new_issn], 'categories': [{'id': "Category New", 'quartile': "Q2"}],
+                        'areas': ["Brand New Area"]}], file)
+        generation = Handler.getDataGeneration()
+        subprocess.run([sys.executable, '-c', UPLOAD, self.stores.url, self.write_csv(self.new_rows),
+                        self.stores.db_path, path], cwd=os.path.join(os.path.dirname(__file__), '..'), check=True)
+        self.assertEqual(Handler.getDataGeneration(), generation)
+        self.assertIsInstance(self.engine.getEntityById("Brand New Area"), Area)
+        found = self.engine.getEntitiesByIds(ids)
+        self.assertIsInstance(found.get(self.new_issn), Journal)
+        self.assertIsInstance(found.get("Category New"), Category)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import copy
+import json
+import os
+import pickle
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.models import Journal, Category, Area, FrozenList
+
+
+def journal(identifier="0000-0019", languages=("English", "French")):
+    result = Journal()
+    result.setId(identifier)
+    result.setTitle("Journal")
+    result.setLanguages(list(languages))
+    result.setLicence("CC BY")
+    return result
+
+
+def category(identifier, quartile="Q1"):
+    result = Category()
+    result.setId(identifier)
+    result.setQuartile(quartile)
+    return result
+
+
+def area(identifier):
+    result = Area()
+    result.setId(identifier)
+    return result
+
+
+class TestModels(unittest.TestCase):
+
+    def test_01_getters_return_lists(self):
+        entity = journal()
+        entity.addId("1111-1111")
+        entity.addCategory(category("Oncology"))
+        entity.addArea(area("Medicine"))
+        self.assertIsInstance(entity.getIds(), list)
+        self.assertEqual(entity.getIds(), ["0000-0019", "1111-1111"])
+        self.assertEqual(entity.getLanguages(), ["English", "French"])
+        self.assertIsInstance(entity.getCategories(), list)
+        self.assertEqual([item.getIds() for item in entity.getCategories()], [["Oncology"]])
+        self.assertIsInstance(entity.getAreas(), list)
+        self.assertEqual([item.getIds() for item in entity.getAreas()], [["Medicine"]])
+        for empty in (Journal().getIds(), Journal().getLanguages(), Journal().getCategories(),
+                      Journal().getAreas(), Area().getIds()):
+            self.assertEqual(empty, [])
+        self.assertEqual(json.loads(json.dumps(entity.getLanguages())), ["English", "French"])
+
+    def test_02_lists_reject_mutation(self):
+        entity = journal()
+        entity.addCategory(category("Oncology"))
+        mutations = [
+            lambda items: items.append("x"),
+            lambda items: items.extend(["x"]),
+            lambda items: items.insert(0, "x"),
+            lambda items: items.pop(),
+            lambda items: items.remove(items[0]),
+            lambda items: items.clear(),
+            lambda items: items.sort(),
+            lambda items: items.reverse(),
+            lambda items: items.__setitem__(0, "x"),
+            lambda items: items.__delitem__(0),
+            lambda items: items.__iadd__(["x"]),
+            lambda items: items.__imul__(2),
+        ]
+        for getter in (entity.getIds, entity.getLanguages, entity.getCategories):
+            before = list(getter())
+            for mutate in mutations:
+                with self.assertRaises(TypeError):
+                    mutate(getter())
+            self.assertEqual(getter(), before)
+        items = entity.getLanguages()
+        with self.assertRaises(TypeError):
+            items += ["German"]
+        self.assertEqual(entity.getLanguages(), ["English", "French"])
+
+    def test_03_copies_are_plain_lists(self):
+        entity = journal()
+        languages = list(entity.getLanguages())
+        languages.append("German")
+        self.assertEqual(entity.getLanguages(), ["English", "French"])
+        combined = entity.getLanguages() + ["German"]
+        self.assertIs(type(combined), list)
+        combined.append("Italian")
+        self.assertEqual(entity.getLanguages()[:1], ["English"])
+
+    def test_04_no_copy_per_call(self):
+        entity = journal()
+        self.assertIs(entity.getIds(), entity.getIds())
+        self.assertIs(entity.getLanguages(), entity.getLanguages())
+        entity.addCategory(category("Oncology"))
+        first = entity.getCategories()
+        self.assertIs(entity.getCategories(), first)
+        entity.addCategory(category("Surgery"))
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(entity.getCategories()), 2)
+
+    def test_05_collections_are_ordered_sets(self):
+        entity = journal()
+        for identifier in ["1111-1111", "0000-0019"] + [f"id-{number}" for number in range(12)] + ["id-3"]:
+            entity.addId(identifier)
+        self.assertEqual(entity.getIds(), ["0000-0019", "1111-1111"] + [f"id-{number}" for number in range(12)])
+        oncology = category("Oncology")
+        entity.addCategory(oncology)
+        entity.addCategory(oncology)
+        entity.addCategory(None)
+        self.assertEqual(entity.getCategories(), [oncology])
+
+    def test_06_pickle_and_copy(self):
+        entity = journal()
+        entity.addCategory(category("Oncology"))
+        for restored in (pickle.loads(pickle.dumps(entity)), copy.copy(entity), copy.deepcopy(entity)):
+            self.assertIsInstance(restored.getLanguages(), FrozenList)
+            self.assertEqual(restored.getLanguages(), ["English", "French"])
+            self.assertEqual(restored.getIds(), ["0000-0019"])
+            self.assertEqual([item.getIds() for item in restored.getCategories()], [["Oncology"]])
+        items = FrozenList(["a", "b"])
+        self.assertIs(copy.copy(items), items)
+        self.assertEqual(copy.deepcopy(items), ["a", "b"])
+
+    def test_07_memory_layout(self):
+        entity = journal()
+        self.assertFalse(hasattr(entity, '__dict__'))
+        self.assertFalse(hasattr(entity.getLanguages(), '__dict__'))
+        other = journal("0000-0027", ["".join(["Eng", "lish"]), "French"])
+        # Equal language lists and licences are shared between journals
+        self.assertIs(other.getLanguages(), entity.getLanguages())
+        self.assertIs(other.getLanguages()[0], entity.getLanguages()[0])
+        self.assertIs(other.getLicence(), entity.getLicence())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import sys
+import unittest
+from collections import Counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from implementations.impl import AsyncJournalQueryHandler
+from implementations.planner import QueryPlanner
+from local_stores import LocalStores, rdflib, journal_rows, scimago_entries, JOURNALS
+from test_async_query import describe
+from test_counts import expected_counts
+from test_streaming import MASHUPS
+
+# Planner settings choosing each strategy (see test_streaming)
+PLANS = ((50, {}), (1, {'request_cost': 1000.0}), (1, {'row_cost': 1000.0, 'scan_cost': 0.0}))
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestOldLayout(unittest.TestCase):
+    """Stores written before the identity index: no doaj:identifier triples, no journal_identity table."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+        cls.expected = {}
+        for number, plan in enumerate(PLANS):
+            engine = cls.engine(*plan)
+            for name, args in MASHUPS:
+                cls.expected[(number, name, repr(args))] = sorted(
+                    describe(journal) for journal in getattr(engine, 'get' + name)(*args)
+                )
+            engine.close()
+        index = JournalQueryHandler(cls.stores.url).getIdentityIndex()
+        cls.expected_index = set(zip(index['identifier'], index['key']))
+        cls.stores.useOldLayout()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stores.close()
+
+    @classmethod
+    def engine(cls, batch_size=50, costs=None):
+        engine = FullQueryEngine()
+        engine.addJournalHandler(JournalQueryHandler(cls.stores.url))
+        engine.addCategoryHandler(CategoryQueryHandler(cls.stores.db_path))
+        engine.ISSN_BATCH_SIZE = batch_size
+        engine._planner = QueryPlanner(engine, **(costs or {}))
+        return engine
+
+    def test_01_missing_index_is_detected(self):
+        self.assertFalse(JournalQueryHandler(self.stores.url).hasIdentityIndex())
+        self.assertFalse(CategoryQueryHandler(self.stores.db_path).hasIdentityIndex())
+        fresh = LocalStores(4)
+        self.assertTrue(JournalQueryHandler(fresh.url).hasIdentityIndex())
+        self.assertTrue(CategoryQueryHandler(fresh.db_path).hasIdentityIndex())
+        fresh.close()
+
+    def test_02_mashups_match_the_indexed_store(self):
+        for number, plan in enumerate(PLANS):
+            engine = self.engine(*plan)
+            for name, args in MASHUPS:
+                expected = self.expected[(number, name, repr(args))]
+                self.assertTrue(expected, (name, args))
+                self.assertEqual(sorted(describe(journal) for journal in getattr(engine, 'get' + name)(*args)),
+                                 expected, (plan, name, args))
+                self.assertEqual(sorted(describe(journal) for journal in getattr(engine, 'iter' + name)(*args)),
+                                 expected, (plan, name, args))
+            engine.close()
+
+    def test_03_identity_index(self):
+        index = JournalQueryHandler(self.stores.url).getIdentityIndex()
+        self.assertEqual(set(zip(index['identifier'], index['key'])), self.expected_index)
+
+    def test_04_async_issn_queries(self):
+        identifiers = {identifier for entry in scimago_entries() for identifier in entry['identifiers']}
+        sync = JournalQueryHandler(self.stores.url)
+
+        async def run():
+            async with AsyncJournalQueryHandler(self.stores.url) as handler:
+                return (await handler.getJournalsByIssnsAsync(identifiers),
+                        await handler.getJournalsInIssnRangesAsync([("0000-0000", "9999-999X")]))
+
+        by_issns, in_ranges = asyncio.run(run())
+        self.assertEqual(set(by_issns['journal']), set(sync.getJournalsByIssns(identifiers)['journal']))
+        self.assertEqual(by_issns['journal'].nunique(), len(scimago_entries()))
+        self.assertEqual(in_ranges['journal'].nunique(), JOURNALS)
+
+    def test_05_counts(self):
+        engine = self.engine()
+        handler = CategoryQueryHandler(self.stores.db_path)
+        for dimension in ('area', 'category', 'quartile'):
+            expected = expected_counts(dimension)
+            self.assertEqual(engine.countCategorizedJournalsBy(dimension), expected, dimension)
+            self.assertEqual(engine.countJournalsInGroups(dimension), expected, dimension)
+            # Alone, the handler cannot tell which identifiers are the same journal
+            df = handler.countJournalsBy(dimension)
+            pairs = Counter(value for value, _ in set(handler.getIssnsGroupedBy(dimension)))
+            self.assertEqual(dict(zip(df['value'], df['count'])), dict(pairs), dimension)
+        licenses = {"CC BY"}
+        self.assertEqual(engine.countJournalsInGroups('area', licenses=licenses),
+                         expected_counts('area', licenses=licenses))
+        engine.close()
+
+    def test_06_partially_indexed_store(self):
+        stores = LocalStores(8)
+        stores.useOldLayout()
+        # Journals uploaded afterwards have doaj:identifier triples, the old ones do not
+        stores.endpoint.graph.update(
+            'INSERT DATA { <http://doaj.org/journal/new> <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> '
+            '<http://doaj.org/Journal> ; <http://doaj.org/identifier> "0000-0000" }'
+        )
+        handler = JournalQueryHandler(stores.url)
+        self.assertFalse(handler.hasIdentityIndex())
+        rows = journal_rows(8)
+        eissn = rows[1]['Journal EISSN (online version)']
+        self.assertEqual(len(handler.getJournalsByIssns({eissn})), 1)
+        stores.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
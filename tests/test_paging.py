@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from implementations.impl import AsyncJournalQueryHandler, AsyncFullQueryEngine
+from local_stores import LocalStores, rdflib
+
+PAGE = 5
+COLUMNS = ['journal', 'title', 'issn', 'eissn', 'language', 'publisher', 'seal', 'licence', 'apc']
+# Sorts after every journal URI and every category or area id of the data set
+PAST_LAST = "~"
+
+
+def journal_rows(frame):
+    """Rows of a journal DataFrame grouped by journal URI, in page order."""
+    # A page without print ISSNs has no issn column at all
+    frame = frame.reindex(columns=COLUMNS).fillna("")
+    rows = {}
+    for record in frame.itertuples(index=False):
+        rows.setdefault(record.journal, []).append(tuple(record))
+    return rows
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestJournalPages(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+        cls.handler = JournalQueryHandler(cls.stores.url)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stores.close()
+
+    def assertKeysetPages(self, method, *args):
+        expected = journal_rows(getattr(self.handler, method)(*args))
+        self.assertTrue(expected, method)
+        # Journals with several languages have several rows sharing one URI
+        self.assertTrue(any(len(rows) > 1 for rows in expected.values()), method)
+        pages, after = [], ""
+        while True:
+            page = journal_rows(getattr(self.handler, method)(*args, after=after, limit=PAGE))
+            if not page:
+                break
+            self.assertLessEqual(len(page), PAGE, method)
+            self.assertEqual(list(page), sorted(page), method)
+            self.assertTrue(min(page) > after, method)
+            pages.append(page)
+            after = max(page)
+        self.assertEqual(len(pages), -(-len(expected) // PAGE), method)
+        seen = {}
+        for page in pages:
+            for journal, rows in page.items():
+                self.assertNotIn(journal, seen, method)
+                seen[journal] = rows
+        self.assertEqual({journal: sorted(rows) for journal, rows in seen.items()},
+                         {journal: sorted(rows) for journal, rows in expected.items()}, method)
+
+    def test_01_keyset_pages_do_not_split_journals(self):
+        self.assertKeysetPages('getAllJournals')
+        self.assertKeysetPages('getJournalsWithLicense', {"CC BY", "CC BY-NC"})
+        self.assertKeysetPages('getJournalsPublishedBy', "Publisher 2")
+
+    def test_02_after_the_last_journal_is_empty(self):
+        last = max(journal_rows(self.handler.getAllJournals()))
+        self.assertTrue(self.handler.getAllJournals(after=last, limit=PAGE).empty)
+        self.assertTrue(self.handler.getAllJournals(after=PAST_LAST, limit=PAGE).empty)
+        self.assertTrue(self.handler.getAllJournals(after=PAST_LAST).empty)
+
+    def test_03_title_pages_do_not_split_journals(self):
+        expected = journal_rows(self.handler.getAllJournals())
+        titles = {journal: rows[0] for journal, rows in expected.items()}
+        order = sorted(expected, key=lambda journal: (titles[journal][1], journal))
+        seen = []
+        for offset in range(0, len(expected) + PAGE, PAGE):
+            page = journal_rows(self.handler.getAllJournals(limit=PAGE, offset=offset))
+            self.assertLessEqual(len(page), PAGE)
+            for journal, rows in page.items():
+                self.assertEqual(sorted(rows), sorted(expected[journal]))
+            seen.extend(sorted(page, key=order.index))
+        self.assertEqual(seen, order)
+
+    def test_04_engine_pages_follow_title_order(self):
+        engine = FullQueryEngine()
+        engine.addJournalHandler(self.handler)
+        everything = [journal.getIds() for journal in engine.getAllJournals()]
+        pages = []
+        for offset in range(0, len(everything) + PAGE, PAGE):
+            page = engine.getAllJournals(limit=PAGE, offset=offset)
+            self.assertLessEqual(len(page), PAGE)
+            pages.extend(journal.getIds() for journal in page)
+        self.assertEqual(pages, everything)
+        self.assertEqual(engine.getAllJournals(limit=PAGE, offset=len(everything)), [])
+
+    def test_05_negative_pages_are_rejected(self):
+        queries = [
+            ('getAllJournals', ()),
+            ('getJournalsWithTitle', ("Journal",)),
+            ('getJournalsPublishedBy', ("Publisher",)),
+            ('getJournalsWithLicense', ({"CC BY"},)),
+            ('getJournalsWithAPC', ()),
+            ('getJournalsWithDOAJSeal', ()),
+        ]
+        mashups = [
+            ('getJournalsInCategoriesWithQuartile', ({"Category 1"}, {"Q2"})),
+            ('getJournalsInAreasWithLicense', ({"Area 0"}, {"CC BY"})),
+            ('getDiamondJournalsInAreasAndCategoriesWithQuartile', ({"Area 0"}, set(), set())),
+        ]
+        engine = FullQueryEngine()
+        engine.addJournalHandler(self.handler)
+        engine.addCategoryHandler(CategoryQueryHandler(self.stores.db_path))
+        async_handler = AsyncJournalQueryHandler(self.stores.url)
+        async_engine = AsyncFullQueryEngine()
+        async_engine.addJournalHandler(async_handler)
+        async_engine.addCategoryHandler(CategoryQueryHandler(self.stores.db_path))
+        try:
+            for page in ({'limit': -1}, {'offset': -1}, {'limit': PAGE, 'offset': -PAGE}):
+                for method, args in queries + [('getJournalsWithoutAPC', ())]:
+                    with self.assertRaises(ValueError, msg=(method, page)):
+                        getattr(self.handler, method)(*args, **page)
+                    with self.assertRaises(ValueError, msg=(method, page)):
+                        asyncio.run(getattr(async_handler, method + 'Async')(*args, **page))
+                for method, args in queries + mashups:
+                    with self.assertRaises(ValueError, msg=(method, page)):
+                        getattr(engine, method)(*args, **page)
+                    with self.assertRaises(ValueError, msg=(method, page)):
+                        asyncio.run(getattr(async_engine, method + 'Async')(*args, **page))
+            self.assertTrue(self.handler.getAllJournals(limit=0).empty)
+            self.assertEqual(engine.getAllJournals(limit=0), [])
+        finally:
+            engine.close()
+            async_engine.close()
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestCategoryPages(unittest.TestCase):
+
+    # (method, arguments) of the paged row queries
+    QUERIES = [
+        ('getAllCategoriesRows', ()),
+        ('getAllAreasRows', ()),
+        ('getCategoriesWithQuartileRows', ({"Q1", "Q2"},)),
+        ('getCategoriesAssignedToAreasRows', ({"Area 0", "Area Z"},)),
+        ('getAreasAssignedToCategoriesRows', ({"Category 1", "Category X"},)),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stores.close()
+
+    def pages(self, handler, method, args, limit):
+        pages, after = [], None
+        while True:
+            page = getattr(handler, method)(*args, after=after, limit=limit)
+            if not page:
+                return pages
+            pages.append(page)
+            after = page[-1][0]
+
+    def test_01_rows_pages(self):
+        handler = CategoryQueryHandler(self.stores.db_path)
+        for method, args in self.QUERIES:
+            everything = getattr(handler, method)(*args)
+            self.assertTrue(everything, method)
+            pages = self.pages(handler, method, args, 2)
+            self.assertTrue(all(len(page) <= 2 for page in pages), method)
+            self.assertEqual([row for page in pages for row in page], everything, method)
+            self.assertEqual(getattr(handler, method)(*args, after=everything[-1][0], limit=2), [], method)
+            self.assertEqual(getattr(handler, method)(*args, after=PAST_LAST), [], method)
+        handler.close()
+
+    def test_02_snapshot_pages_match_sql_pages(self):
+        sql = CategoryQueryHandler(self.stores.db_path)
+        snapshot = CategoryQueryHandler(self.stores.db_path)
+        snapshot.enableSnapshot()
+        for method, args in self.QUERIES:
+            for limit in (1, 2, 3, None):
+                self.assertEqual(self.pages(snapshot, method, args, limit),
+                                 self.pages(sql, method, args, limit), (method, limit))
+            for after in ("", "Area 0", "Category 1", "Category 1 ", PAST_LAST):
+                self.assertEqual(getattr(snapshot, method)(*args, after=after, limit=2),
+                                 getattr(sql, method)(*args, after=after, limit=2), (method, after))
+        sql.close()
+        snapshot.close()
+
+    def test_03_page_rows_matches_read_page(self):
+        handler = CategoryQueryHandler(self.stores.db_path)
+        query = "SELECT DISTINCT id, quartile FROM categories ORDER BY id"
+        rows = handler._read_rows(query)
+        for after in (None, "", "Category 0", "Category 2", "Category Y", PAST_LAST):
+            for limit in (None, 0, 1, 2, 10):
+                self.assertEqual(CategoryQueryHandler._page_rows(rows, after, limit),
+                                 handler._read_page(query, (), after, limit), (after, limit))
+        handler.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import csv
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from implementations.handlers import Handler
+from local_stores import LocalStores, rdflib, journal_rows, JOURNALS
+
+# Uploads the journals of a CSV file, as another process would
+UPLOAD = """
+import sys
+from implementations.upload_handlers import JournalUploadHandler
+sys.exit(0 if JournalUploadHandler(sys.argv[1]).pushDataToDb(sys.argv[2]) else 1)
+"""
+
+
+class CountingJournalHandler(JournalQueryHandler):
+    """Journal handler counting its getStatistics calls."""
+
+    calls = 0
+
+    def getStatistics(self):
+        self.calls += 1
+        return super().getStatistics()
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestPlannerStatistics(unittest.TestCase):
+
+    def setUp(self):
+        self.stores = LocalStores()
+        self.journals = CountingJournalHandler(self.stores.url)
+        self.engine = FullQueryEngine()
+        self.engine.STORE_CHECK_INTERVAL = 0
+        self.engine.addJournalHandler(self.journals)
+        self.engine.addCategoryHandler(CategoryQueryHandler(self.stores.db_path))
+
+    def tearDown(self):
+        self.engine.close()
+        self.stores.close()
+
+    def test_01_statistics_are_collected_once(self):
+        statistics = self.engine._planner.getStatistics()
+        self.assertTrue(statistics.isComplete())
+        self.assertEqual(statistics.journals(), JOURNALS)
+        self.assertIs(self.engine._planner.getStatistics(), statistics)
+        self.assertEqual(self.journals.calls, 1)
+
+    def test_02_upload_from_another_process_refreshes_statistics(self):
+        self.assertEqual(self.engine._planner.getStatistics().journals(), JOURNALS)
+        rows = journal_rows(JOURNALS + 2)[JOURNALS:]
+        path = os.path.join(self.stores.directory, "new.csv")
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        generation = Handler.getDataGeneration()
+        subprocess.run([sys.executable, '-c', UPLOAD, self.stores.url, path],
+                       cwd=os.path.join(os.path.dirname(__file__), '..'), check=True)
+        self.assertEqual(Handler.getDataGeneration(), generation)
+        self.assertEqual(self.engine._planner.getStatistics().journals(), JOURNALS + 2)
+        self.assertEqual(self.journals.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
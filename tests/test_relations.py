@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from local_stores import LocalStores, rdflib
+
+
+def relations(journal):
+    return ([(category.getIds()[0], category.getQuartile()) for category in journal.getCategories()],
+            [area.getIds()[0] for area in journal.getAreas()])
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestRelationLoading(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stores.close()
+
+    def engine(self, **kwargs):
+        engine = FullQueryEngine(**kwargs)
+        engine.addJournalHandler(JournalQueryHandler(self.stores.url))
+        engine.addCategoryHandler(CategoryQueryHandler(self.stores.db_path))
+        return engine
+
+    def expected(self):
+        engine = self.engine(identity_map=False)
+        return {journal.getIds()[0]: relations(journal) for journal in engine.getAllJournals()}
+
+    def test_01_journals_have_their_relations(self):
+        expected = self.expected()
+        self.assertTrue(any(categories for categories, _ in expected.values()))
+        self.assertTrue(any(not categories for categories, _ in expected.values()))
+        for mode in ('lazy', 'eager'):
+            engine = self.engine(relations=mode)
+            self.assertEqual({journal.getIds()[0]: relations(journal) for journal in engine.getAllJournals()},
+                             expected, mode)
+
+    def test_02_shared_journals_are_not_loaded_twice(self):
+        expected = self.expected()
+        for mode in ('lazy', 'eager'):
+            engine = self.engine(relations=mode)
+            # Both results hold the same journal instances through the identity map
+            first = engine.getAllJournals()
+            for journal in first:
+                journal.getCategories()
+            second = engine.getJournalsInCategoriesWithQuartile({"Category 0", "Category 1", "Category X"}, set())
+            self.assertTrue(second)
+            for journal in second:
+                self.assertIn(journal, first)
+                self.assertEqual(relations(journal), expected[journal.getIds()[0]], mode)
+
+
+if __name__ == "__main__":
+    unittest.main()
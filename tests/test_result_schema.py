@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, FullQueryEngine
+from local_stores import LocalStores, rdflib
+from test_async_query import describe
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def values(series):
+    """Values of a column as Python objects, with None for missing values."""
+    series = series.astype(object)
+    return series.where(series.notna(), None).tolist()
+
+
+def raw_frame():
+    """SPARQL-like result with string values, some missing."""
+    return pd.DataFrame({
+        'journal': ["j1", "j2", "j3", "j4", "j5", "j6", "j7"],
+        'title': ["A", "B", "C", "D", "E", "F", "G"],
+        'seal': ["true", "false", "1", "0", "Yes", "", None],
+        'apc': [" TRUE ", "no", None, "false", "true", "", "1"],
+        'licence': ["CC BY", "CC BY", "CC0", None, "CC BY", "CC0", "CC BY"],
+        'language': ["English", "French", "English", "English", None, "French", "English"],
+    })
+
+
+class TestResultSchema(unittest.TestCase):
+
+    def test_01_flags_are_nullable_booleans(self):
+        df = JournalQueryHandler()._apply_result_schema(raw_frame())
+        self.assertEqual(str(df['seal'].dtype), 'boolean')
+        self.assertEqual(str(df['apc'].dtype), 'boolean')
+        self.assertEqual(df['seal'].tolist(), [True, False, True, False, True, pd.NA, pd.NA])
+        self.assertEqual(df['apc'].tolist(), [True, False, pd.NA, False, True, pd.NA, True])
+
+    def test_02_repeated_values_are_categoricals(self):
+        df = JournalQueryHandler()._apply_result_schema(raw_frame())
+        for column in ('licence', 'language'):
+            self.assertIsInstance(df[column].dtype, pd.CategoricalDtype, column)
+            self.assertEqual(values(df[column]), values(raw_frame()[column]), column)
+        # Columns the result does not have are left out
+        self.assertNotIn('publisher', df.columns)
+        self.assertEqual(df['title'].tolist(), raw_frame()['title'].tolist())
+
+    def test_03_string_storage(self):
+        df = JournalQueryHandler(string_storage="python")._apply_result_schema(raw_frame())
+        self.assertEqual(df['title'].dtype, pd.StringDtype("python"))
+        self.assertEqual(df['journal'].dtype, pd.StringDtype("python"))
+        self.assertEqual(df['title'].tolist(), raw_frame()['title'].tolist())
+        if pyarrow is not None:
+            df = JournalQueryHandler(string_storage="pyarrow")._apply_result_schema(raw_frame())
+            self.assertEqual(df['title'].dtype, pd.StringDtype("pyarrow"))
+
+    def test_04_untyped_results_keep_strings(self):
+        handler = JournalQueryHandler(typed_results=False)
+        data = {'results': {'bindings': [{'seal': {'value': "true"}, 'licence': {'value': "CC BY"}}]}}
+        df = handler._bindings_to_dataframe(data)
+        self.assertEqual(df['seal'].tolist(), ["true"])
+        self.assertNotIsInstance(df['licence'].dtype, pd.CategoricalDtype)
+        typed = JournalQueryHandler()._bindings_to_dataframe(data)
+        self.assertEqual(str(typed['seal'].dtype), 'boolean')
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestTypedJournals(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stores.close()
+
+    def test_01_typed_results_hold_the_same_values(self):
+        typed = JournalQueryHandler(self.stores.url).getAllJournals()
+        raw = JournalQueryHandler(self.stores.url, typed_results=False).getAllJournals()
+        self.assertEqual(list(typed.columns), list(raw.columns))
+        self.assertEqual(str(typed['seal'].dtype), 'boolean')
+        self.assertIsInstance(typed['publisher'].dtype, pd.CategoricalDtype)
+        for column in ('seal', 'apc'):
+            self.assertEqual(typed[column].tolist(), [value == "true" for value in raw[column]], column)
+        for column in ('journal', 'title', 'licence', 'language', 'publisher'):
+            self.assertEqual(values(typed[column]), values(raw[column]), column)
+
+    def test_02_engine_builds_the_same_journals(self):
+        journals = {}
+        for typed in (True, False):
+            engine = FullQueryEngine()
+            engine.addJournalHandler(JournalQueryHandler(self.stores.url, typed_results=typed,
+                                                         string_storage="python" if typed else None))
+            journals[typed] = [describe(journal) for journal in engine.getAllJournals()]
+            engine.close()
+        self.assertTrue(journals[True])
+        self.assertEqual(journals[True], journals[False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+import copy
+import os
+import pickle
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalResultSet, Journal
+from test_async_query import describe
+
+SIZE = 6
+
+# (name, function) of the list operations compared between a result set and a plain list;
+# each gets a fresh sequence and a Journal that is not in it, and returns what the operation returned
+OPERATIONS = [
+    ('repr', lambda journals, other: repr(journals)),
+    ('eq', lambda journals, other: journals == list(journals)),
+    ('ne', lambda journals, other: journals != []),
+    ('contains', lambda journals, other: (journals[2] in journals, other in journals)),
+    ('reversed', lambda journals, other: list(reversed(journals))),
+    ('add', lambda journals, other: journals + [other]),
+    ('radd', lambda journals, other: [other] + journals),
+    ('iadd', lambda journals, other: journals.__iadd__([other])),
+    ('mul', lambda journals, other: journals * 2),
+    ('rmul', lambda journals, other: 2 * journals),
+    ('imul', lambda journals, other: journals.__imul__(2)),
+    ('setitem', lambda journals, other: journals.__setitem__(1, other)),
+    ('setslice', lambda journals, other: journals.__setitem__(slice(1, 3), [other])),
+    ('delitem', lambda journals, other: journals.__delitem__(-1)),
+    ('delslice', lambda journals, other: journals.__delitem__(slice(0, 4, 2))),
+    ('append', lambda journals, other: journals.append(other)),
+    ('extend', lambda journals, other: journals.extend([other, other])),
+    ('insert', lambda journals, other: journals.insert(2, other)),
+    ('pop', lambda journals, other: (journals.pop(), journals.pop(0))),
+    ('remove', lambda journals, other: journals.remove(journals[3])),
+    ('clear', lambda journals, other: journals.clear()),
+    ('index', lambda journals, other: journals.index(journals[4])),
+    ('count', lambda journals, other: journals.count(journals[0])),
+    ('sort', lambda journals, other: journals.sort(key=lambda journal: journal.getTitle(), reverse=True)),
+    ('reverse', lambda journals, other: journals.reverse()),
+    ('copy', lambda journals, other: journals.copy()),
+]
+
+
+def columns():
+    """Folded columns of SIZE journals, the last one without an identifier."""
+    return {
+        'id': [f"0000-000{number}" for number in range(SIZE - 1)] + [None],
+        'title': [f"Journal {(number * 5) % SIZE}" for number in range(SIZE)],
+        'languages': [("English",) if number % 2 else ("English", "French") for number in range(SIZE)],
+        'publisher': [f"Publisher {number % 2}" if number != 3 else None for number in range(SIZE)],
+        'seal': [number % 3 == 0 for number in range(SIZE)],
+        'licence': ["CC BY" if number % 2 else "CC0" for number in range(SIZE)],
+        'apc': [number % 2 == 0 for number in range(SIZE)],
+    }
+
+
+def other_journal():
+    """A Journal that is in no result set."""
+    journal = Journal()
+    journal.setId("9999-9999")
+    journal.setTitle("Other")
+    return journal
+
+
+def first_id(journal):
+    """First identifier of a journal, as in the id column."""
+    ids = journal.getIds()
+    return ids[0] if ids else None
+
+
+def described(value):
+    """describe() of a Journal, or of every Journal in a list or tuple."""
+    if isinstance(value, Journal):
+        return describe(value)
+    if isinstance(value, (list, tuple)):
+        return [described(item) for item in value]
+    return value
+
+
+class TestJournalResultSet(unittest.TestCase):
+
+    def test_01_reads_stay_lazy(self):
+        result = JournalResultSet(columns())
+        self.assertEqual(len(result), SIZE)
+        self.assertEqual(result.column('title'), columns()['title'])
+        self.assertEqual(len(result.to_dataframe()), SIZE)
+        self.assertEqual(result._journals, [None] * SIZE)
+        first = result[0]
+        self.assertIs(result[0], first)
+        self.assertIs(result[-SIZE], first)
+        self.assertIs(result[1:3][0], result[1])
+        self.assertEqual([journal.getTitle() for journal in result], columns()['title'])
+        self.assertEqual(result[SIZE - 1].getIds(), [])
+        for position in (SIZE, -SIZE - 1):
+            with self.assertRaises(IndexError):
+                result[position]
+        with self.assertRaises(KeyError):
+            result.column('unknown')
+        # Reads never fill the underlying list
+        self.assertFalse(result._materialized)
+        self.assertEqual(list.__len__(result), 0)
+
+    def test_02_list_operations_match_a_plain_list(self):
+        for name, operation in OPERATIONS:
+            result = JournalResultSet(columns())
+            journals = list(result)
+            other = other_journal()
+            self.assertEqual(described(operation(result, other)), described(operation(journals, other)), name)
+            self.assertTrue(result._materialized, name)
+            self.assertEqual(len(result), len(journals), name)
+            # The list keeps the same Journal objects
+            self.assertEqual([id(journal) for journal in result], [id(journal) for journal in journals], name)
+            self.assertEqual(result.column('id'), [first_id(journal) for journal in journals], name)
+            self.assertEqual(result[:], journals, name)
+
+    def test_03_two_result_sets(self):
+        left, right = JournalResultSet(columns()), JournalResultSet(columns())
+        # Equal journals are different objects
+        self.assertNotEqual(left, right)
+        self.assertTrue(right._materialized)
+        self.assertEqual(left, left)
+        joined = left + JournalResultSet(columns())
+        self.assertEqual(len(joined), 2 * SIZE)
+        self.assertEqual(JournalResultSet(), [])
+        self.assertEqual(len(JournalResultSet()), 0)
+
+    def test_04_take_and_materialize_agree(self):
+        positions = [4, 0, 4, 2]
+        lazy = JournalResultSet(columns())
+        materialized = JournalResultSet(columns()).materialize()
+        self.assertTrue(materialized._materialized)
+        self.assertIs(materialized.materialize(), materialized)
+        self.assertEqual([describe(journal) for journal in lazy], [describe(journal) for journal in materialized])
+        for result in (lazy, materialized):
+            taken = result.take(positions)
+            self.assertIsInstance(taken, JournalResultSet)
+            self.assertFalse(taken._materialized)
+            self.assertEqual(taken.column('title'), [columns()['title'][position] for position in positions])
+            self.assertEqual([id(journal) for journal in taken], [id(result[position]) for position in positions])
+        # Mutations of a materialized set show in its columns and in take()
+        materialized.reverse()
+        self.assertEqual(materialized.column('title'), columns()['title'][::-1])
+        self.assertIs(materialized.take([0])[0], materialized[0])
+
+    def test_05_share_and_copies(self):
+        shared = {}
+        result = JournalResultSet(columns(), share=lambda journal: shared.setdefault(journal.getTitle(), journal))
+        self.assertIs(result[1], shared[columns()['title'][1]])
+        for duplicate in (copy.copy(result), copy.deepcopy(result), pickle.loads(pickle.dumps(result))):
+            self.assertIs(type(duplicate), list)
+            self.assertEqual([describe(journal) for journal in duplicate], [describe(journal) for journal in result])
+        # Copying does not materialize
+        self.assertFalse(result._materialized)
+        self.assertEqual(len(shared), SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
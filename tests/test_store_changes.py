@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import csv
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from implementations.handlers import Handler
+from local_stores import LocalStores, rdflib, journal_rows, issn
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Replaces the triples of a journal and uploads its new row, as another process would
+REWRITE_JOURNAL = """
+import sys, requests
+from implementations.upload_handlers import JournalUploadHandler
+url, issn, path = sys.argv[1:]
+requests.post(url, data={'update': 'DELETE WHERE { <http://doaj.org/journal/%s> ?p ?o }' % issn}).raise_for_status()
+sys.exit(0 if JournalUploadHandler(url).pushDataToDb(path) else 1)
+"""
+
+REWRITE_QUARTILE = """
+import sqlite3, sys
+connection = sqlite3.connect(sys.argv[1])
+with connection:
+    connection.execute("UPDATE categories SET quartile = 'Q4' WHERE id = 'Category X'")
+connection.close()
+"""
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestStoreChanges(unittest.TestCase):
+
+    def setUp(self):
+        self.stores = LocalStores()
+        self.engine = FullQueryEngine()
+        # Read the store versions on every lookup
+        self.engine.STORE_CHECK_INTERVAL = 0
+        self.engine.addJournalHandler(JournalQueryHandler(self.stores.url))
+        self.engine.addCategoryHandler(CategoryQueryHandler(self.stores.db_path))
+        self.issn = issn(1000)
+
+    def tearDown(self):
+        self.engine.close()
+        self.stores.close()
+
+    def run_elsewhere(self, script, *args):
+        subprocess.run([sys.executable, '-c', script, *args], cwd=ROOT, check=True)
+
+    def renamed_row(self):
+        row = dict(journal_rows()[0])
+        row.update({'Journal title': "Renamed Journal", 'Publisher': "Publisher 9", 'DOAJ Seal': "No",
+                    'Journal license': "CC BY-SA", 'APC': "Yes"})
+        path = os.path.join(self.stores.directory, "renamed.csv")
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(row))
+            writer.writeheader()
+            writer.writerow(row)
+        return path
+
+    def assertRenamed(self, journal):
+        self.assertEqual((journal.getTitle(), journal.getPublisher(), journal.getLicence(),
+                          journal.hasDOASeal(), journal.hasAPC()),
+                         ("Renamed Journal", "Publisher 9", "CC BY-SA", False, True))
+
+    def test_01_journal_upload_from_another_process(self):
+        before = self.engine.getEntityById(self.issn)
+        self.assertEqual((before.getTitle(), before.hasDOASeal(), before.hasAPC()), ("Journal 00", True, False))
+        self.assertIs(self.engine.getEntityById(self.issn), before)
+        version = JournalQueryHandler(self.stores.url).getStoreVersion()
+        generation = Handler.getDataGeneration()
+        self.run_elsewhere(REWRITE_JOURNAL, self.stores.url, self.issn, self.renamed_row())
+        self.assertEqual(Handler.getDataGeneration(), generation)
+        self.assertNotEqual(JournalQueryHandler(self.stores.url).getStoreVersion(), version)
+        after = self.engine.getEntityById(self.issn)
+        self.assertIsNot(after, before)
+        self.assertRenamed(after)
+        self.assertEqual([journal.getIds() for journal in self.engine.getJournalsWithTitle("Renamed Journal")],
+                         [after.getIds()])
+
+    def test_02_category_write_from_another_process(self):
+        self.assertEqual(self.engine.getEntityById("Category X").getQuartile(), "Q1")
+        version = CategoryQueryHandler(self.stores.db_path).getStoreVersion()
+        self.run_elsewhere(REWRITE_QUARTILE, self.stores.db_path)
+        self.assertNotEqual(CategoryQueryHandler(self.stores.db_path).getStoreVersion(), version)
+        self.assertEqual(self.engine.getEntityById("Category X").getQuartile(), "Q4")
+
+    def test_03_fresh_rows_replace_shared_fields(self):
+        # Only the stores know about this write: the shared journal is kept
+        self.engine.STORE_CHECK_INTERVAL = 3600
+        journal = self.engine.getEntityById(self.issn)
+        uri = f"<http://doaj.org/journal/{self.issn}>"
+        self.stores.endpoint.graph.update(
+            f"PREFIX doaj: <http://doaj.org/> DELETE WHERE {{ {uri} doaj:title ?t ; doaj:publisher ?p ; "
+            f"doaj:licence ?l ; doaj:hasDOAJSeal ?s ; doaj:hasAPC ?a }}")
+        self.stores.endpoint.graph.update(
+            f"PREFIX doaj: <http://doaj.org/> PREFIX xsd: <http://www.w3.org/2001/XMLSchema#> "
+            f"INSERT DATA {{ {uri} doaj:title \"Renamed Journal\" ; doaj:publisher \"Publisher 9\" ; "
+            f"doaj:licence \"CC BY-SA\" ; doaj:hasDOAJSeal \"false\"^^xsd:boolean ; "
+            f"doaj:hasAPC \"true\"^^xsd:boolean }}")
+        journals = [shared for shared in self.engine.getAllJournals() if self.issn in shared.getIds()]
+        self.assertEqual(len(journals), 1)
+        self.assertIs(journals[0], journal)
+        self.assertRenamed(journal)
+        self.assertEqual(journal.getLanguages(), ["English", "French", "Spanish"])
+
+
+if __name__ == "__main__":
+    unittest.main()
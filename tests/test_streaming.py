@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from implementations.impl import JournalQueryHandler, CategoryQueryHandler, FullQueryEngine
+from implementations.planner import QueryPlanner
+from local_stores import LocalStores, rdflib
+from test_async_query import describe
+
+# (list method, arguments) whose iter* variant must yield the same entities
+QUERIES = [
+    ('getAllJournals', ()),
+    ('getJournalsWithTitle', ("Journal 1",)),
+    ('getJournalsPublishedBy', ("Publisher 2",)),
+    ('getJournalsWithLicense', ({"CC BY", "CC BY-NC"},)),
+    ('getJournalsWithAPC', ()),
+    ('getJournalsWithDOAJSeal', ()),
+    ('getAllCategories', ()),
+    ('getAllAreas', ()),
+    ('getCategoriesWithQuartile', ({"Q1", "Q2"},)),
+    ('getCategoriesAssignedToAreas', ({"Area 0"},)),
+    ('getAreasAssignedToCategories', ({"Category X"},)),
+]
+
+MASHUPS = [
+    ('JournalsInCategoriesWithQuartile', ({"Category 0", "Category X"}, {"Q1"})),
+    ('JournalsInCategoriesWithQuartile', (set(), set())),
+    ('JournalsInAreasWithLicense', ({"Area Z"}, {"CC BY"})),
+    ('JournalsInAreasWithLicense', ({"Area 0", "Area 1"}, set())),
+    ('DiamondJournalsInAreasAndCategoriesWithQuartile', ({"Area 0"}, {"Category 1", "Category 2"}, set())),
+    ('DiamondJournalsInAreasAndCategoriesWithQuartile', (set(), set(), {"Q2", "Q3"})),
+]
+
+
+@unittest.skipIf(rdflib is None, "rdflib is needed for the local SPARQL endpoint")
+class TestStreamingQueries(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stores = LocalStores()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stores.close()
+
+    def engine(self, **kwargs):
+        engine = FullQueryEngine(**kwargs)
+        engine.addJournalHandler(JournalQueryHandler(self.stores.url))
+        engine.addCategoryHandler(CategoryQueryHandler(self.stores.db_path))
+        return engine
+
+    def assertSameEntities(self, streamed, expected, message):
+        streamed = [describe(entity) for entity in streamed]
+        self.assertEqual(len(streamed), len(set(streamed)), message)
+        self.assertEqual(sorted(streamed), sorted(describe(entity) for entity in expected), message)
+
+    def test_01_iter_matches_list_api(self):
+        engine = self.engine()
+        for method, args in QUERIES:
+            expected = getattr(engine, method)(*args)
+            self.assertTrue(expected or method == 'getJournalsWithDOAJSeal', method)
+            self.assertSameEntities(getattr(engine, 'iter' + method[3:])(*args), expected, method)
+        engine.close()
+
+    def test_02_iter_order(self):
+        engine = self.engine()
+        categories = [category.getIds()[0] for category in engine.iterAllCategories()]
+        self.assertEqual(categories, sorted(categories))
+        areas = [area.getIds()[0] for area in engine.iterAllAreas()]
+        self.assertEqual(areas, sorted(areas))
+        engine.close()
+
+    def test_03_iter_mashups_match_list_api(self):
+        strategies = set()
+        # Costs making the planner choose each strategy for some of the queries
+        for batch_size, costs in ((50, {}), (1, {'request_cost': 1000.0}), (1, {'row_cost': 1000.0, 'scan_cost': 0.0})):
+            engine = self.engine()
+            engine.ISSN_BATCH_SIZE = batch_size
+            engine._planner = QueryPlanner(engine, **costs)
+            for name, args in MASHUPS:
+                expected = getattr(engine, 'get' + name)(*args)
+                self.assertTrue(expected, (name, args))
+                self.assertSameEntities(getattr(engine, 'iter' + name)(*args), expected, (name, args, costs))
+            strategies.update(plan.getStrategy() for plan in (
+                engine._planner.planJournalsInCategoriesWithQuartile({"Category 0"}, set()),
+                engine._planner.planJournalsInAreasWithLicense({"Area 0"}, {"CC BY"}),
+                engine._planner.planDiamondJournals({"Area 0"}, set(), set()),
+            ))
+            engine.close()
+        self.assertEqual(strategies, {QueryPlanner.ISSNS_FIRST, QueryPlanner.SEMI_JOIN, QueryPlanner.JOURNALS_FIRST})
+
+    def test_04_iter_without_identity_map(self):
+        engine = self.engine(identity_map=False, relations='eager')
+        for method, args in QUERIES[:4]:
+            self.assertSameEntities(getattr(engine, 'iter' + method[3:])(*args),
+                                    getattr(engine, method)(*args), method)
+        engine.close()
+
+
+if __name__ == "__main__":
+    unittest.main()